@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Backfill Claude narratives for a date range through the Message Batches API
+Submits one request per stored entry, polls until the batches end and writes
+the stories back in batched commits. Rerun the same command to resume an
+interrupted backfill without resubmitting.
+
+Usage: python src/backfill_claude.py --start 2025-01-01 --end 2025-03-31 [--model ID] [--poll 30]
+"""
+import argparse
+import sys
+from datetime import date
+
+from modules.backfill import POLL_INTERVAL, run_backfill
+from modules.claude_client import api_key_configured
+
+
+def _progress(job):
+    batches = job.get('batches', [])
+    ended = sum(1 for b in batches if b.get('status') == 'ended')
+    print(f"  ⏳ {ended}/{len(batches)} batches ended, {job['done']}/{job['total']} narratives written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--start', type=date.fromisoformat, required=True, help='First date (YYYY-MM-DD)')
+    parser.add_argument('--end', type=date.fromisoformat, required=True, help='Last date (YYYY-MM-DD)')
+    parser.add_argument('--model', default='claude-sonnet-4-20250514', help='Claude model ID')
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL, help='Seconds between status checks')
+    parser.add_argument('--fresh', action='store_true', help='Ignore an unfinished job for the same range')
+    args = parser.parse_args()
+
+    if not api_key_configured():
+        print("❌ ANTHROPIC_API_KEY is not set")
+        return 1
+
+    print(f"📦 Backfilling Claude narratives {args.start} → {args.end} with {args.model}")
+    try:
+        job = run_backfill(args.start, args.end, args.model, poll_interval=args.poll,
+                           resume=not args.fresh, progress=_progress)
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted - batch IDs are saved; rerun the same command to resume")
+        return 1
+
+    cost = f"${job['cost']:.4f}" if job.get('cost') is not None else "unknown"
+    print(f"{'✅' if job['status'] == 'completed' else '⚠️'} {job['status']}: "
+          f"{job['done']}/{job['total']} written, {len(job['errors'])} failed, batch cost {cost}")
+    for failed_date, message in sorted(job['errors'].items()):
+        print(f"  ❌ {failed_date}: {message}")
+    if job.get('error'):
+        print(f"  ❌ {job['error']}")
+    return 0 if job['status'] == 'completed' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
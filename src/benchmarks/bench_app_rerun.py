@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark desktop app rerun latency per view.
+
+Runs metrics_app.py headless (Streamlit AppTest) on a synthetic history in a
+temp dir and times repeated reruns with each view selected, i.e. what every
+widget change costs. With the old tab layout every view reran on every
+change; point --app at an older copy of the script to compare.
+
+Usage: python src/benchmarks/bench_app_rerun.py [--entries 365] [--reruns 10] [--app path]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SRC_DIR))
+os.environ['APP_PASSWORD'] = 'bench'
+os.environ['ANTHROPIC_API_KEY'] = ''  # Free mode: no network calls from the views
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import make_history
+from modules import (
+    anomaly, archetypes, backfill, data, effectiveness, jobs, model_catalog, narrative_cache, narratives,
+    renarrate, rollups, usage_log
+)
+from modules.narrative_cache import NarrativeCache
+
+warnings.filterwarnings('ignore')
+
+STATE_FILES = [
+    (data, 'DATA_FILE', 'metrics_data.csv'),
+    (narratives, 'NARRATIVES_FILE', 'narratives.json'),
+    (anomaly, 'ANOMALY_STATE_FILE', 'anomaly_state.json'),
+    (archetypes, 'ARCHETYPES_STATE_FILE', 'archetypes_state.json'),
+    (effectiveness, 'EFFECTIVENESS_CACHE_FILE', 'effectiveness_cache.json'),
+    (usage_log, 'USAGE_LOG_FILE', 'claude_usage.csv'),
+    (jobs, 'NARRATIVE_JOBS_FILE', 'narrative_jobs.json'),
+    (model_catalog, 'MODEL_CATALOG_FILE', 'model_catalog.json'),
+    (renarrate, 'RENARRATION_JOB_FILE', 'renarration_job.json'),
+    (backfill, 'CLAUDE_BACKFILL_JOB_FILE', 'claude_backfill_job.json'),
+    (rollups, 'ROLLUPS_STATE_FILE', 'rollups_state.json'),
+]
+
+
+def time_reruns(at: AppTest, reruns: int):
+    timings = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - started)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=365)
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--app', default=str(SRC_DIR / 'metrics_app.py'), help='App script to run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for module, name, filename in STATE_FILES:
+            setattr(module, name, Path(tmp) / filename)
+        narrative_cache._cache = NarrativeCache()
+        history = make_history(args.entries)
+        history['recommendation'] = 'Stored story.'
+        history.to_csv(data.DATA_FILE, index=False)
+
+        at = AppTest.from_file(str(Path(args.app).resolve()), default_timeout=120)
+        at.session_state['app_password_authenticated'] = True
+        at.run()  # Warm-up: imports, model state, caches
+        nav = [radio for radio in at.radio if radio.key == 'active_view']
+        views = nav[0].options if nav else ['all tabs']
+
+        print(f"📊 Desktop rerun latency, {args.entries} entries, {args.reruns} reruns per view")
+        for view in views:
+            if nav:
+                at.radio(key='active_view').set_value(view)
+                at.run()
+            timings = time_reruns(at, args.reruns)
+            print(f"   {view:16}: mean {timings.mean():7.1f} ms | p50 {np.percentile(timings, 50):7.1f} ms "
+                  f"| p95 {np.percentile(timings, 95):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark Claude call latency: new client per call (cold) vs the pooled client (warm).
+
+Runs against the local mock Messages endpoint, so it needs no API key.
+Usage: python src/benchmarks/bench_claude_client.py [--calls 200] [--latency 0.005]
+"""
+import argparse
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from anthropic import Anthropic
+
+from benchmarks.mock_anthropic import MockAnthropicServer
+from modules.claude_client import build_claude_client
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)  # Model deprecation notices
+
+PROMPT = [{"role": "user", "content": "Summarize today's metrics. " * 50}]
+
+
+def _call(client):
+    client.messages.create(model='claude-3-5-haiku-20241022', max_tokens=200, messages=PROMPT)
+
+
+def cold(server, calls):
+    """The old behaviour: construct a client for every call."""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client = Anthropic(api_key='mock-key', base_url=server.url)
+        _call(client)
+        timings.append(time.perf_counter() - start)
+        client.close()
+    return timings
+
+
+def warm(server, calls):
+    """One pooled client reused across calls."""
+    client = build_claude_client(api_key='mock-key', base_url=server.url)
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        _call(client)
+        timings.append(time.perf_counter() - start)
+    client.close()
+    return timings
+
+
+def _summary(timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return f"mean {statistics.mean(timings) * 1000:6.2f} ms | p50 {statistics.median(timings) * 1000:6.2f} ms | p95 {p95 * 1000:6.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.005, help='Mock server latency per call (s)')
+    args = parser.parse_args()
+
+    print(f"📊 Claude client latency, {args.calls} calls, mock latency {args.latency * 1000:.0f} ms")
+    for label, run in (('cold (client per call)', cold), ('warm (pooled client)  ', warm)):
+        with MockAnthropicServer(latency=args.latency) as server:
+            timings = run(server, args.calls)
+            print(f"   {label}: {_summary(timings)} | {server.connection_count} TCP connections")
+
+
+if __name__ == "__main__":
+    main()
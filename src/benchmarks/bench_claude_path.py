@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark the app's Claude path end to end against the local mock API.
+
+Drives analyze_with_narrative (Analyze & Save), the streamed regeneration
+and model listing through the app's own modules, with the mock's latency
+distribution, error rate and token usage, and reports throughput and
+latency percentiles per operation. Nothing leaves the machine: the client,
+usage log, caches and pricing page all point at the mock or a temp dir.
+
+Usage: python src/benchmarks/bench_claude_path.py [--calls 100] [--concurrency 4]
+           [--latency lognormal:0.2,0.5] [--error-rate 0.05] [--retries 2]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from benchmarks.mock_anthropic import MOCK_ERRORS, MockAnthropicServer, latency_sampler
+from benchmarks.synthetic import make_history
+from modules import analysis, claude_client, effectiveness, model_catalog, narrative_cache, narratives, resilience, usage_log
+from modules.analysis import analyze_with_narrative, analyze_with_narrative_stream
+from modules.config import ANTHROPIC_MAX_RETRIES
+from modules.data import get_metric_changes
+from modules.model_catalog import fetch_api_models
+from modules.narrative_cache import NarrativeCache
+from modules.resilience import CircuitBreaker
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)  # Model deprecation notices
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+@contextmanager
+def mock_claude(server: MockAnthropicServer, retries: int):
+    """Point the Claude client, key check, pricing page and every state file at the mock / a temp dir."""
+    targets = [
+        (usage_log, 'USAGE_LOG_FILE', 'claude_usage.csv'),
+        (effectiveness, 'EFFECTIVENESS_CACHE_FILE', 'effectiveness_cache.json'),
+        (narratives, 'NARRATIVES_FILE', 'narratives.json'),
+        (model_catalog, 'MODEL_CATALOG_FILE', 'model_catalog.json'),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in targets]
+    saved = (dict(claude_client._settings), analysis.ANTHROPIC_API_KEY, narrative_cache._cache,
+             resilience._breaker, model_catalog.PRICING_URL)
+    with tempfile.TemporaryDirectory() as tmp:
+        for module, name, filename in targets:
+            setattr(module, name, Path(tmp) / filename)
+        model_catalog.PRICING_URL = f"{server.url}/pricing"
+        narrative_cache._cache = NarrativeCache(max_entries=8)
+        resilience._breaker = CircuitBreaker()
+        analysis.ANTHROPIC_API_KEY = 'mock-key'
+        claude_client.configure_claude_client(api_key='mock-key', base_url=server.url, max_retries=retries)
+        try:
+            yield
+        finally:
+            if model_catalog._refresher is not None:
+                model_catalog._refresher.join()
+            settings, analysis.ANTHROPIC_API_KEY, narrative_cache._cache, resilience._breaker, \
+                model_catalog.PRICING_URL = saved
+            claude_client.configure_claude_client(**settings)
+            for module, name, value in originals:
+                setattr(module, name, value)
+
+
+def _entries(n: int):
+    """(metrics, previous, changes) for n consecutive synthetic days."""
+    rows = make_history(n + 1).to_dict('records')
+    for row in rows:
+        row['date'] = str(row['date'])
+    return [(rows[i], rows[i - 1], get_metric_changes(rows[i], rows[i - 1])) for i in range(1, len(rows))]
+
+
+def op_analyze(entry, model):
+    """Blocking Claude story, as submitted by Analyze & Save (cache off)."""
+    metrics, previous, changes = entry
+    started = time.perf_counter()
+    narrative, error = analyze_with_narrative(metrics, previous, changes, mode='Claude AI', model=model,
+                                              use_cache=False, fallback=False)  # Count failures, not stand-ins
+    return {'total_s': time.perf_counter() - started, 'error': error}
+
+
+def op_regenerate(entry, model):
+    """Streamed Claude story, as Regenerate renders it (time to first word and total)."""
+    metrics, previous, changes = entry
+    started = time.perf_counter()
+    stream = analyze_with_narrative_stream(metrics, previous, changes, mode='Claude AI', model=model,
+                                           use_cache=False, latency_budget=3600)
+    first = None
+    for _ in stream:
+        if first is None:
+            first = time.perf_counter() - started
+    return {'total_s': time.perf_counter() - started, 'first_token_s': first, 'error': stream.error}
+
+
+def op_models(entry, model):
+    """One Models API listing, as the model picker refreshes it."""
+    started = time.perf_counter()
+    models = fetch_api_models()
+    return {'total_s': time.perf_counter() - started, 'error': None if models else 'no models'}
+
+
+OPERATIONS = {'analyze': op_analyze, 'regenerate': op_regenerate, 'models': op_models}
+
+
+def run_operation(op, entries, calls: int, concurrency: int, model: str):
+    """Run calls invocations of op on a thread pool; returns (results, wall seconds)."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: op(entries[i % len(entries)], model), range(calls)))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, wall_s: float) -> dict:
+    """Throughput, error count and latency percentiles (ms) of successful calls."""
+    ok = [r for r in results if not r['error']]
+    summary = {
+        'calls': len(results), 'errors': len(results) - len(ok),
+        'paused': sum(1 for r in results if r['error'] and r['error'].startswith('⏸️')),
+        'throughput': len(results) / wall_s if wall_s else 0.0
+    }
+    for field in ('total_s', 'first_token_s'):
+        values = np.array([r[field] for r in ok if r.get(field) is not None]) * 1000
+        if len(values):
+            summary[field] = dict(zip(PERCENTILES, np.percentile(values, PERCENTILES)), mean=values.mean())
+    return summary
+
+
+def _row(label: str, stats: dict) -> str:
+    cells = ' | '.join(f"p{p} {stats[p]:7.1f}" for p in PERCENTILES)
+    return f"      {label:11}: mean {stats['mean']:7.1f} | {cells} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=100, help='Calls per operation')
+    parser.add_argument('--concurrency', type=int, default=4, help='Calls in flight at once')
+    parser.add_argument('--latency', default='lognormal:0.2,0.5', help='Mock latency (seconds or distribution)')
+    parser.add_argument('--chunk-delay', type=float, default=0.002, help='Seconds between streamed words')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of Messages calls that fail')
+    parser.add_argument('--error-status', type=int, nargs='+', default=[529], choices=sorted(MOCK_ERRORS))
+    parser.add_argument('--output-tokens', type=int, help='Reported output tokens per message')
+    parser.add_argument('--retries', type=int, default=ANTHROPIC_MAX_RETRIES, help='Retries per call')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', nargs='+', choices=sorted(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument('--model', default='claude-3-5-haiku-20241022')
+    args = parser.parse_args()
+
+    latency_sampler(args.latency)  # Fail fast on a bad spec
+    entries = _entries(min(args.calls, 50))
+    print(f"📊 Claude path, {args.calls} calls per operation, {args.concurrency} in flight, "
+          f"mock latency {args.latency}, error rate {args.error_rate:.0%}, {args.retries} retries")
+    for name in args.only:
+        with MockAnthropicServer(
+            latency=args.latency, chunk_delay=args.chunk_delay, error_rate=args.error_rate,
+            error_statuses=args.error_status, output_tokens=args.output_tokens, seed=args.seed
+        ) as server, mock_claude(server, args.retries):
+            results, wall_s = run_operation(OPERATIONS[name], entries, args.calls, args.concurrency, args.model)
+            summary = summarize(results, wall_s)
+            injected = server.error_count
+        print(f"   {name}: {summary['throughput']:6.1f} calls/s | {summary['errors']} failed "
+              f"({summary['paused']} skipped by the circuit breaker) | {injected} errors injected")
+        for field, label in (('total_s', 'total'), ('first_token_s', 'first token')):
+            if field in summary:
+                print(_row(label, summary[field]))
+
+
+if __name__ == "__main__":
+    main()
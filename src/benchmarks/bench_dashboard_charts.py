@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark dashboard chart payloads and build time.
+
+Builds the dashboard's line chart for a synthetic multi-year history and
+reports the Plotly JSON sent to the browser and the time to produce it:
+every entry as SVG traces (the old dashboard), every entry with the WebGL
+switch, downsampled to the chart width, and a rerun served from the
+figure cache (which st.plotly_chart still serializes).
+
+Usage: python src/benchmarks/bench_dashboard_charts.py [--entries 3650] [--metrics 4] [--width 1200]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from benchmarks.synthetic import make_history
+from modules import charts, downsample
+from modules.charts import build_metric_figure, metric_figure
+from modules.config import QUESTIONS
+from modules.downsample import max_points_for_width
+
+
+def best_ms(fn, repeats=5):
+    """Best-of-repeats milliseconds for fn() and its last result."""
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def _report(label: str, ms: float, payload: str):
+    print(f"   {label:22}: {ms:7.1f} ms | {len(payload) / 1024:8.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=3650)
+    parser.add_argument('--metrics', type=int, default=4, help='Traces on the chart')
+    parser.add_argument('--width', type=int, default=1200, help='Chart width in pixels')
+    args = parser.parse_args()
+
+    df = make_history(args.entries)
+    df['date'] = pd.to_datetime(df['date'])
+    metrics = [{'key': q['key'], 'label': q['label']} for q in QUESTIONS if q['type'] != 'yesno'][:args.metrics]
+    labels = {m['key']: m['label'] for m in metrics}
+    raw_series = {m['key']: df[['date', m['key']]] for m in metrics}
+    max_points = max_points_for_width(args.width)
+    window = len(df)
+
+    print(f"📊 Dashboard chart, {args.entries} entries, {len(metrics)} traces, {args.width}px "
+          f"({max_points} points per trace, WebGL above {charts.WEBGL_POINTS})")
+    ms, payload = best_ms(lambda: build_metric_figure(raw_series, labels, webgl_points=10**9).to_json())
+    _report("raw, SVG", ms, payload)
+    ms, payload = best_ms(lambda: build_metric_figure(raw_series, labels).to_json())
+    _report("raw, auto WebGL", ms, payload)
+
+    def fresh_downsampled():
+        downsample.clear_chart_cache()
+        charts.clear_figure_cache()
+        return metric_figure(df, metrics, window, max_points=max_points, version='bench').to_json()
+
+    ms, payload = best_ms(fresh_downsampled)
+    _report("downsampled, uncached", ms, payload)
+    ms, payload = best_ms(lambda: metric_figure(df, metrics, window, max_points=max_points,
+                                                version='bench').to_json())
+    _report("downsampled, cached", ms, payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark opening past entries in the Analysis view.
+
+Times a jump to a random past date the way the view used to load an entry
+(reload the data file, find the row and its previous entry, read the
+anomaly score, classify severity) against the history index, plus the
+one-off costs: building the index, the severity timeline for every entry,
+and extending it after a save.
+
+Usage: python src/benchmarks/bench_history.py [--entries 3650] [--jumps 200]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from benchmarks.synthetic import make_history
+from modules import anomaly, data, history
+from modules.config import THRESHOLDS
+from modules.data import get_metric_changes, load_data
+from modules.history import entry_view, load_history, severity_timeline
+from modules.severity import analyze_metrics_severity
+
+THRESHOLD_ARGS = {'problem_threshold': 6, 'increase_threshold': 1.0, 'custom_thresholds': THRESHOLDS}
+
+
+def old_jump(date: str):
+    """Entry lookup as the Analysis view did it before the index."""
+    df = load_data()
+    dates = df['date'].astype(str)
+    idx = df.index[dates == date].tolist()[-1]
+    entry = df.iloc[idx].to_dict()
+    previous = df.iloc[idx - 1].to_dict() if idx > 0 else None
+    changes = get_metric_changes(entry, previous)
+    return entry, changes, anomaly.get_entry_anomaly(date), analyze_metrics_severity(entry, previous)
+
+
+def new_jump(date: str):
+    view = entry_view(date)
+    row = severity_timeline(**THRESHOLD_ARGS).iloc[view['position']]
+    return view, row, analyze_metrics_severity(view['metrics'], view['previous'])
+
+
+def time_ms(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def _report(label: str, timings) -> None:
+    timings = np.asarray(timings)
+    print(f"   {label:26}: p50 {np.percentile(timings, 50):8.2f} ms | p95 {np.percentile(timings, 95):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=3650)
+    parser.add_argument('--jumps', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data.DATA_FILE = Path(tmp) / 'metrics_data.csv'
+        anomaly.ANOMALY_STATE_FILE = Path(tmp) / 'anomaly_state.json'
+        frame = make_history(args.entries)
+        frame.iloc[:-1].to_csv(data.DATA_FILE, index=False)
+        anomaly.load_anomaly_state(load_data())  # Built once at first start, as in the app
+
+        print(f"📊 Date jumps in the Analysis view, {args.entries} entries, {args.jumps} random dates")
+        print(f"   {'index build':26}: {time_ms(load_history):8.1f} ms (once per data version)")
+        print(f"   {'severity timeline, cold':26}: {time_ms(lambda: severity_timeline(**THRESHOLD_ARGS)):8.1f} ms "
+              "(once per threshold setting)")
+        frame.iloc[-1:].to_csv(data.DATA_FILE, mode='a', header=False, index=False)  # A save
+        print(f"   {'after a save':26}: {time_ms(load_history):8.1f} ms index + "
+              f"{time_ms(lambda: severity_timeline(**THRESHOLD_ARGS)):6.1f} ms timeline (new entry only)")
+
+        rng = np.random.default_rng(0)
+        dates = list(rng.choice(frame['date'].to_numpy(), args.jumps))
+        _report("reload per jump (old)", [time_ms(lambda: old_jump(d)) for d in dates[:max(1, args.jumps // 10)]])
+        _report("history index", [time_ms(lambda: new_jump(d)) for d in dates])
+        history.clear_history_cache()
+
+
+if __name__ == "__main__":
+    main()
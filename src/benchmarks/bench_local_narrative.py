@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark Free-mode narrative regeneration: per-entry loop vs batch API.
+
+Usage: python src/benchmarks/bench_local_narrative.py [--entries 5000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_history
+from modules.local_narrative import build_local_narrative, build_local_narratives_batch
+from modules.severity import analyze_metrics_severity
+
+
+def per_entry(df):
+    rows = df.to_dict('records')
+    narratives = []
+    for i, row in enumerate(rows):
+        previous = rows[i - 1] if i else None
+        severity = analyze_metrics_severity(row, previous)
+        narratives.append(build_local_narrative(row, previous, severity_results=severity))
+    return narratives
+
+
+def best_of(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_history(args.entries)
+    loop_time, loop_out = best_of(per_entry, df, args.repeat)
+    batch_time, batch_out = best_of(build_local_narratives_batch, df, args.repeat)
+    if loop_out != batch_out:
+        sys.exit("❌ Batch output differs from per-entry output")
+
+    print(f"📊 Free-mode narratives, {args.entries} entries (best of {args.repeat})")
+    print(f"   per-entry : {args.entries / loop_time:10.0f} narratives/s ({loop_time:.3f}s)")
+    print(f"   batch     : {args.entries / batch_time:10.0f} narratives/s ({batch_time:.3f}s)")
+    print(f"   speedup   : {loop_time / batch_time:.1f}x (outputs identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark Claude user-message size: verbose vs compact prompt encoding.
+
+Builds both encodings for consecutive synthetic entries (with the previous
+recommendation and repeated feedback, as in real use), checks the compact
+table decodes back to every value and change, and reports token counts.
+Tokens are estimated offline; with --api and ANTHROPIC_API_KEY set they are
+counted by the Messages count_tokens endpoint instead.
+
+Usage: python src/benchmarks/bench_prompt_tokens.py [--entries 50] [--api]
+"""
+import argparse
+import json
+import math
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_history
+from modules import data, effectiveness, narratives
+from modules.data import get_metric_changes
+from modules.local_narrative import build_local_narrative
+from modules.narratives import METRIC_CODES, METRIC_LEGEND, build_context_prompt
+
+FEEDBACK = [
+    ('2020-01-01', 'Please keep it shorter and lead with the one thing to do today.'),
+    ('2020-01-02', 'Please keep it shorter and lead with the one thing to do today.'),
+    ('2020-01-03', 'More about sleep, less about meetings.'),
+]
+_PIECE = re.compile(r"[A-Za-z]+|\d+|\s+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Offline BPE-like estimate: words in chunks of ~6 letters, digits in 3s, one per symbol."""
+    count = 0
+    for piece in _PIECE.findall(text):
+        if piece[0].isalpha():
+            count += math.ceil(len(piece) / 6)
+        elif piece[0].isdigit():
+            count += math.ceil(len(piece) / 3)
+        elif piece.isspace():
+            count += 1 if '\n' in piece or len(piece) > 1 else 0  # Single spaces merge into the next word
+        else:
+            count += 2 if len(piece.encode('utf-8')) > 1 else 1
+    return count
+
+
+def api_token_counter(model: str):
+    from modules.claude_client import get_claude_client
+
+    client = get_claude_client()
+
+    def count(text: str) -> int:
+        return client.messages.count_tokens(model=model, messages=[{"role": "user", "content": text}]).input_tokens
+    return count
+
+
+def decode_table(prompt: str):
+    """Compact metric table -> {key: (prev, curr, delta)} as strings ('' when a column is absent)."""
+    lines = prompt.split('## Metrics', 1)[1].split('\n')[1:]
+    header = lines[0].split()
+    keys = {code: key for key, code in METRIC_CODES.items()}
+    rows = {}
+    for line in lines[1:]:
+        if not line.strip():
+            break
+        cells = line.split()
+        cells += [''] * (len(header) - len(cells))  # Trailing blank Δ
+        row = dict(zip(header, cells))
+        rows[keys.get(row['m'], row['m'])] = (row.get('prev', ''), row['curr'], row.get('Δ', ''))
+    return rows
+
+
+def check_lossless(prompt: str, metrics, previous, changes) -> None:
+    """Every value, change and distinct feedback text of the verbose prompt is in the compact one."""
+    rows = decode_table(prompt)
+    for key, value in metrics.items():
+        if key in ('date', 'context', 'recommendation'):
+            continue
+        prev = previous.get(key)
+        if narratives._is_missing(value) and narratives._is_missing(prev):
+            assert key not in rows, key
+            continue
+        assert rows[key][:2] == (narratives._format_value(prev), narratives._format_value(value)), key
+        if key in changes and not narratives._is_missing(changes[key]['delta']):
+            assert float(rows[key][2]) == changes[key]['delta'], (key, rows[key])
+    assert previous['recommendation'] in prompt
+    for _, text in FEEDBACK[:-1]:
+        assert text in prompt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=50)
+    parser.add_argument('--api', action='store_true', help='Count tokens with the count_tokens API')
+    parser.add_argument('--model', default='claude-sonnet-4-20250514')
+    args = parser.parse_args()
+
+    count = api_token_counter(args.model) if args.api else estimate_tokens
+    saved = data.DATA_FILE, effectiveness.EFFECTIVENESS_CACHE_FILE, narratives.NARRATIVES_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        data.DATA_FILE = Path(tmp) / 'metrics_data.csv'
+        effectiveness.EFFECTIVENESS_CACHE_FILE = Path(tmp) / 'effectiveness_cache.json'
+        narratives.NARRATIVES_FILE = Path(tmp) / 'narratives.json'
+        narratives.NARRATIVES_FILE.write_text(json.dumps(
+            [{'date': d, 'narrative': '', 'feedback': f} for d, f in FEEDBACK]
+        ))
+        try:
+            rows = make_history(args.entries + 1).to_dict('records')
+            totals = {'verbose': [0, 0], 'compact': [0, 0]}
+            for i in range(1, len(rows)):
+                metrics, previous = dict(rows[i]), dict(rows[i - 1])
+                previous['recommendation'] = build_local_narrative(previous, rows[i - 2] if i > 1 else None)
+                changes = get_metric_changes(metrics, previous)
+                verbose = build_context_prompt(metrics, previous, changes, compact=False)
+                compact = build_context_prompt(metrics, previous, changes, compact=True)
+                check_lossless(compact, metrics, previous, changes)
+                for name, text in (('verbose', verbose), ('compact', compact)):
+                    totals[name][0] += len(text)
+                    totals[name][1] += count(text)
+        finally:
+            data.DATA_FILE, effectiveness.EFFECTIVENESS_CACHE_FILE, narratives.NARRATIVES_FILE = saved
+
+    n = args.entries
+    method = 'count_tokens API' if args.api else 'offline estimate'
+    print(f"📊 Claude user message, {n} entries with previous recommendation ({method})")
+    for name, (chars, tokens) in totals.items():
+        print(f"   {name:8}: {tokens / n:7.0f} tokens/entry, {chars / n:7.0f} chars/entry")
+    saving = 1 - totals['compact'][1] / totals['verbose'][1]
+    print(f"   saving  : {saving:.0%} of input tokens (all values, changes and feedback decoded back)")
+    print(f"   legend  : +{count(METRIC_LEGEND)} tokens in the cached system prompt (read at 0.1x)")
+
+
+if __name__ == "__main__":
+    main()
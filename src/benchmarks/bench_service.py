@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared metrics service with both front-ends open.
+
+Runs the desktop and mobile apps headless (Streamlit AppTest), each in its
+own process, on one synthetic history in a temp dir: first with every
+model, cache and job pool in-process in both apps, then as thin clients of
+one metrics service process. Reports rerun latency, per-call latency of
+scoring / classifying / a Free-mode narrative job, and the peak resident
+memory of every process.
+
+Usage: python src/benchmarks/bench_service.py [--entries 365] [--reruns 10] [--calls 20]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SRC_DIR))
+
+APPS = {'desktop': SRC_DIR / 'metrics_app.py', 'mobile': SRC_DIR / 'metrics_app_mobile.py'}
+
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of this process (ru_maxrss is bytes on macOS, KiB on Linux)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def _use_data_dir(data_dir: str) -> None:
+    from benchmarks.bench_app_rerun import STATE_FILES
+    for module, name, filename in STATE_FILES:
+        setattr(module, name, Path(data_dir) / filename)
+
+
+def _result(payload) -> None:
+    print('RESULT ' + json.dumps(payload), flush=True)
+
+
+def run_service(args) -> None:
+    """Serve until stdin closes, then report peak memory."""
+    _use_data_dir(args.data_dir)
+    from modules.service import OPERATIONS, MetricsService, resolve_operation
+    for name in OPERATIONS:
+        resolve_operation(name)
+    service = MetricsService(port=0).start()
+    print(f'READY {service.url}', flush=True)
+    sys.stdin.read()
+    calls = service.health()['calls']
+    service.stop()
+    _result({'rss_mib': peak_rss_mib(), 'calls': calls})
+
+
+def _mean_ms(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1000
+
+
+def run_app(args) -> None:
+    """Open one app, time its reruns and the calls it hands to the service."""
+    import numpy as np
+    from streamlit.testing.v1 import AppTest
+
+    _use_data_dir(args.data_dir)
+    from benchmarks.bench_app_rerun import time_reruns
+    from modules import service_client
+    from modules.data import get_previous_entry
+    from modules.jobs import PENDING_STATUSES
+
+    at = AppTest.from_file(str(APPS[args.role]), default_timeout=120)
+    at.session_state['app_password_authenticated'] = True
+    at.run()  # Warm-up: imports, model state, caches
+    reruns = time_reruns(at, args.reruns)
+
+    entry = dict(get_previous_entry(), date='2099-01-01')
+    timings = {
+        'score_entry': _mean_ms(lambda: service_client.score_entry(entry), args.calls),
+        'classify_entry': _mean_ms(lambda: service_client.classify_entry(entry), args.calls),
+    }
+
+    def narrative_job():
+        job_id = service_client.submit_narrative_job(entry, mode='Free')
+        while service_client.poll_job(job_id)['status'] in PENDING_STATUSES:
+            time.sleep(0.005)
+    timings['narrative_job'] = _mean_ms(narrative_job, max(1, args.calls // 4))
+
+    _result({'rerun_ms': float(np.mean(reruns)), 'rerun_p95_ms': float(np.percentile(reruns, 95)),
+             'calls_ms': timings, 'rss_mib': peak_rss_mib(), 'via_service': service_client.service_available()})
+
+
+def _spawn(role: str, args, env: dict, stdin=None) -> subprocess.Popen:
+    command = [sys.executable, __file__, '--role', role, '--data-dir', args.data_dir,
+               '--reruns', str(args.reruns), '--calls', str(args.calls)]
+    return subprocess.Popen(command, env=env, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True)
+
+
+def _read_result(process: subprocess.Popen) -> dict:
+    out, err = process.communicate()  # Streamlit's log lines go to err
+    lines = [line for line in out.splitlines() if line.startswith('RESULT ')]
+    if process.returncode != 0 or not lines:
+        raise RuntimeError(f"{process.args[3]} process failed:\n{out}\n{err[-2000:]}")
+    return json.loads(lines[-1][len('RESULT '):])
+
+
+def run_both_apps(args, service_url: str) -> dict:
+    env = dict(os.environ, APP_PASSWORD='bench', ANTHROPIC_API_KEY='', METRICS_SERVICE_URL=service_url,
+               PYTHONWARNINGS='ignore')
+    processes = {role: _spawn(role, args, env) for role in APPS}  # Both apps open at once
+    return {role: _read_result(process) for role, process in processes.items()}
+
+
+def _report(results: dict) -> None:
+    for role, result in results.items():
+        line = f"   {role:8}: peak {result['rss_mib']:6.0f} MiB"
+        if 'rerun_ms' in result:
+            calls = ' | '.join(f"{name} {ms:6.1f} ms" for name, ms in result['calls_ms'].items())
+            line += f" | rerun mean {result['rerun_ms']:6.1f} ms, p95 {result['rerun_p95_ms']:6.1f} ms | {calls}"
+        print(line)
+    print(f"   {'total':8}: peak {sum(r['rss_mib'] for r in results.values()):6.0f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=365)
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--calls', type=int, default=20, help='Timed calls per operation')
+    parser.add_argument('--role', choices=['service', *APPS], help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == 'service':
+        return run_service(args)
+    if args.role:
+        return run_app(args)
+
+    from benchmarks.synthetic import make_history
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.data_dir = tmp
+        history = make_history(args.entries)
+        history['recommendation'] = 'Stored story.'
+        history.to_csv(Path(tmp) / 'metrics_data.csv', index=False)
+
+        print(f"📊 Desktop + mobile open together, {args.entries} entries, {args.reruns} reruns, "
+              f"{args.calls} calls per operation")
+        print("   In-process (each app owns its models, caches and job pool):")
+        _report(run_both_apps(args, service_url=''))
+
+        service = _spawn('service', args, dict(os.environ, PYTHONWARNINGS='ignore'), stdin=subprocess.PIPE)
+        ready = service.stdout.readline().split()
+        if not ready or ready[0] != 'READY':
+            service.kill()
+            raise RuntimeError("service process did not start")
+        try:
+            apps = run_both_apps(args, service_url=ready[1])
+        except Exception:
+            service.kill()
+            raise
+        print(f"   Shared service ({ready[1]}):")
+        _report({**apps, 'service': _read_result(service)})  # Closing its stdin stops the service
+        if not all(result['via_service'] for result in apps.values()):
+            print("   ⚠️ an app lost the service and fell back to in-process")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic API and pricing page
+Serves the Messages (optionally streamed), Message Batches and Models
+endpoints with canned responses over HTTP/1.1 keep-alive, so client
+behaviour and latency can be measured without network access or an API key.
+Latency can follow a distribution (e.g. lognormal:0.8,0.5), a share of
+Messages calls can fail with API errors, and token usage can be fixed.
+
+Usage: python src/benchmarks/mock_anthropic.py [--port 8765] [--latency 0.05]
+           [--error-rate 0.05] [--output-tokens 400] [--seed 1]
+       then set ANTHROPIC_BASE_URL=http://127.0.0.1:8765 for the apps.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+MOCK_MODELS = [
+    ('claude-3-5-haiku-20241022', 'Claude Haiku 3.5'),
+    ('claude-3-5-sonnet-20241022', 'Claude Sonnet 3.5'),
+    ('claude-sonnet-4-20250514', 'Claude Sonnet 4'),
+    ('claude-opus-4-20250514', 'Claude Opus 4'),
+]
+MOCK_PRICING_HTML = """<html><body>
+<h3>Haiku 3.5</h3><p>Input</p><p>$0.80 / MTok</p><p>Output</p><p>$4 / MTok</p>
+<h3>Sonnet 4</h3><p>Input</p><p>$3 / MTok</p><p>Output</p><p>$15 / MTok</p>
+<h3>Opus 4</h3><p>Input</p><p>$15 / MTok</p><p>Output</p><p>$75 / MTok</p>
+</body></html>"""
+CACHE_MIN_TOKENS = 1024  # Shortest cacheable prefix (Sonnet/Opus minimum)
+DEFAULT_TEXT = "📈 **Mock narrative**: metrics received and analyzed by the local stand-in server."
+# Injected failures: status -> Anthropic error type (all retryable)
+MOCK_ERRORS = {
+    429: ('rate_limit_error', 'Number of requests has exceeded your rate limit'),
+    500: ('api_error', 'Internal server error'),
+    529: ('overloaded_error', 'Overloaded'),
+}
+
+LatencySampler = Callable[[random.Random], float]
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def latency_sampler(spec: Union[float, str, LatencySampler]) -> LatencySampler:
+    """
+    Seconds-per-call sampler from a number or a distribution spec.
+
+    Specs: '0.05' or 'fixed:0.05', 'uniform:LOW,HIGH', 'normal:MEAN,SD',
+    'lognormal:MEDIAN,SIGMA' (long right tail, like real model latency),
+    'exp:MEAN'. Samples are clipped at zero.
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    name, _, params = spec.partition(':') if ':' in spec else ('fixed', '', spec)
+    values = [float(v) for v in params.split(',') if v.strip()]
+    samplers = {
+        'fixed': (1, lambda rng, v: v[0]),
+        'uniform': (2, lambda rng, v: rng.uniform(v[0], v[1])),
+        'normal': (2, lambda rng, v: rng.gauss(v[0], v[1])),
+        'lognormal': (2, lambda rng, v: v[0] * rng.lognormvariate(0, v[1])),
+        'exp': (1, lambda rng, v: rng.expovariate(1 / v[0]) if v[0] > 0 else 0.0),
+    }
+    if name not in samplers or len(values) != samplers[name][0]:
+        raise ValueError(f"Bad latency spec {spec!r}; expected e.g. 0.05, uniform:0.02,0.2 or lognormal:0.8,0.5")
+    draw = samplers[name][1]
+    return lambda rng: max(0.0, draw(rng, values))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep connections open between requests
+    # Send headers and body in one segment; split writes on a keep-alive
+    # socket otherwise hit Nagle + delayed ACK (~40 ms per response)
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+    server: 'MockAnthropicServer'
+
+    def setup(self):
+        super().setup()
+        self.server.record_connection()
+
+    def log_message(self, format, *args):  # Keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('request-id', f"req_mock_{self.server.request_count}")
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _not_found(self) -> None:
+        self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+
+    def do_POST(self):
+        self.server.record_request()
+        path = self.path.split('?')[0]
+        if path == '/v1/messages/batches':
+            self._send_json(200, self.server.create_batch(self._read_json().get('requests', [])))
+            return
+        if path != '/v1/messages':
+            self._not_found()
+            return
+        request = self._read_json()
+        time.sleep(self.server.sample_latency())
+        status = self.server.injected_error()
+        if status:
+            error_type, message = MOCK_ERRORS.get(status, ('api_error', 'Injected error'))
+            self._send_json(status, {'type': 'error', 'error': {'type': error_type, 'message': message}})
+            return
+        message = self.server.make_message(request)
+        if request.get('stream'):
+            self._stream_message(message)
+        else:
+            self._send_json(200, message)
+
+    def _send_event(self, event: str, payload: Dict) -> None:
+        """One server-sent event as one HTTP chunk."""
+        data = f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream_message(self, message: Dict) -> None:
+        """Messages streaming protocol: the text is sent word by word, chunk_delay apart."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('request-id', f"req_mock_{self.server.request_count}")
+        self.end_headers()
+
+        text = message['content'][0]['text']
+        usage = message['usage']
+        self._send_event('message_start', {'type': 'message_start', 'message': {
+            **message, 'content': [], 'stop_reason': None, 'usage': {**usage, 'output_tokens': 1}
+        }})
+        self._send_event('content_block_start', {
+            'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}
+        })
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            if i and self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+            self._send_event('content_block_delta', {
+                'type': 'content_block_delta', 'index': 0,
+                'delta': {'type': 'text_delta', 'text': word if i == 0 else ' ' + word}
+            })
+        self._send_event('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+        self._send_event('message_delta', {
+            'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+            'usage': {'output_tokens': usage['output_tokens']}
+        })
+        self._send_event('message_stop', {'type': 'message_stop'})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        self.server.record_request()
+        if self.path.split('?')[0] == '/pricing':
+            body = MOCK_PRICING_HTML.encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            self.wfile.flush()
+            return
+        parts = self.path.split('?')[0].strip('/').split('/')
+        if parts[:3] == ['v1', 'messages', 'batches'] and len(parts) in (4, 5):
+            batch = self.server.get_batch(parts[3])
+            if batch is None:
+                self._not_found()
+            elif len(parts) == 4:
+                self._send_json(200, batch)
+            elif batch['processing_status'] != 'ended':
+                self._not_found()
+            else:
+                body = '\n'.join(json.dumps(line) for line in self.server.batches[parts[3]]['results']).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/binary')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                self.wfile.flush()
+            return
+        if parts != ['v1', 'models']:
+            self._not_found()
+            return
+        time.sleep(self.server.models_latency)
+        data = [
+            {'type': 'model', 'id': model_id, 'display_name': name, 'created_at': '2025-01-01T00:00:00Z'}
+            for model_id, name in MOCK_MODELS
+        ]
+        self._send_json(200, {'data': data, 'has_more': False, 'first_id': data[0]['id'], 'last_id': data[-1]['id']})
+
+
+class MockAnthropicServer(ThreadingHTTPServer):
+    """
+    Threaded mock server; counts TCP connections and requests so tests can
+    tell a pooled client (few connections) from a per-call client.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: Union[float, str, LatencySampler] = 0.0,
+                 text: str = DEFAULT_TEXT, chunk_delay: float = 0.0, batch_delay: float = 0.0,
+                 error_rate: float = 0.0, error_statuses: Sequence[int] = (529,), output_tokens: Optional[int] = None,
+                 models_latency: float = 0.0, seed: Optional[int] = None):
+        super().__init__((host, port), _Handler)
+        self.latency = latency          # Seconds, or a distribution (see latency_sampler)
+        self.chunk_delay = chunk_delay  # Seconds between streamed words
+        self.batch_delay = batch_delay  # Seconds before a message batch ends
+        self.error_rate = error_rate    # Share of Messages calls answered with an error
+        self.error_statuses = tuple(error_statuses)
+        self.output_tokens = output_tokens  # Reported output tokens (None: estimated from text)
+        self.models_latency = models_latency
+        self.batches: Dict[str, Dict] = {}
+        self.text = text
+        self.ids = itertools.count(1)
+        self.connection_count = 0
+        self.request_count = 0
+        self.error_count = 0
+        self._rng = random.Random(seed)
+        self._counter_lock = threading.Lock()
+        self._prompt_cache = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering this Messages call."""
+        sampler = latency_sampler(self.latency)
+        with self._counter_lock:
+            return sampler(self._rng)
+
+    def injected_error(self) -> Optional[int]:
+        """HTTP status to fail this Messages call with, or None to answer it."""
+        with self._counter_lock:
+            if not self.error_rate or self._rng.random() >= self.error_rate:
+                return None
+            self.error_count += 1
+            return self._rng.choice(self.error_statuses)
+
+    def make_message(self, request: Dict) -> Dict:
+        """Messages API response for a request body (canned text, estimated or fixed usage)."""
+        usage = self.prompt_usage(request)
+        usage['output_tokens'] = self.output_tokens or _estimate_tokens(self.text)
+        return {
+            'id': f"msg_mock_{next(self.ids)}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': request.get('model', MOCK_MODELS[0][0]),
+            'content': [{'type': 'text', 'text': self.text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': usage
+        }
+
+    def create_batch(self, requests: List[Dict]) -> Dict:
+        """
+        Message Batches: answers are computed up front and released once
+        batch_delay seconds have passed. Unknown models come back 'errored'.
+        """
+        known = {model_id for model_id, _ in MOCK_MODELS}
+        results = []
+        for request in requests:
+            params = request.get('params', {})
+            if params.get('model') in known:
+                result = {'type': 'succeeded', 'message': self.make_message(params)}
+            else:
+                result = {'type': 'errored', 'error': {'type': 'error', 'error': {
+                    'type': 'not_found_error', 'message': f"model: {params.get('model')}"
+                }}}
+            results.append({'custom_id': request['custom_id'], 'result': result})
+        batch_id = f"msgbatch_mock_{next(self.ids)}"
+        with self._counter_lock:
+            self.batches[batch_id] = {'created': time.time(), 'results': results}
+        return self.get_batch(batch_id)
+
+    def get_batch(self, batch_id: str) -> Optional[Dict]:
+        """MessageBatch object for batch_id, or None if unknown."""
+        stored = self.batches.get(batch_id)
+        if stored is None:
+            return None
+        created = datetime.fromtimestamp(stored['created'], timezone.utc)
+        ended = time.time() - stored['created'] >= self.batch_delay
+        results = stored['results']
+        succeeded = sum(1 for r in results if r['result']['type'] == 'succeeded')
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {
+                'processing': 0 if ended else len(results),
+                'succeeded': succeeded if ended else 0,
+                'errored': len(results) - succeeded if ended else 0,
+                'canceled': 0,
+                'expired': 0
+            },
+            'created_at': created.isoformat(),
+            'ended_at': (created + timedelta(seconds=self.batch_delay)).isoformat() if ended else None,
+            'expires_at': (created + timedelta(days=1)).isoformat(),
+            'cancel_initiated_at': None,
+            'archived_at': None,
+            'results_url': f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None
+        }
+
+    def prompt_usage(self, request: Dict) -> Dict[str, int]:
+        """
+        Input-token usage with prompt caching: system blocks up to the last one
+        marked cache_control form a cacheable prefix (if >= CACHE_MIN_TOKENS);
+        the first request writes it, later identical prefixes read it.
+        """
+        system = request.get('system') or []
+        if isinstance(system, str):
+            system = [{'type': 'text', 'text': system}]
+        marked = [i for i, block in enumerate(system) if block.get('cache_control')]
+        split = marked[-1] + 1 if marked else 0
+        prefix = ''.join(block.get('text', '') for block in system[:split])
+        rest = ''.join(block.get('text', '') for block in system[split:]) + json.dumps(request.get('messages', []))
+        usage = {'input_tokens': _estimate_tokens(rest), 'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0}
+        if not prefix:
+            return usage
+        prefix_tokens = _estimate_tokens(prefix)
+        if prefix_tokens < CACHE_MIN_TOKENS:
+            usage['input_tokens'] += prefix_tokens
+            return usage
+        key = (request.get('model'), prefix)
+        with self._counter_lock:
+            hit = key in self._prompt_cache
+            self._prompt_cache.add(key)
+        usage['cache_read_input_tokens' if hit else 'cache_creation_input_tokens'] = prefix_tokens
+        return usage
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_connection(self) -> None:
+        with self._counter_lock:
+            self.connection_count += 1
+
+    def record_request(self) -> None:
+        with self._counter_lock:
+            self.request_count += 1
+
+    def start(self) -> 'MockAnthropicServer':
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name='mock-anthropic', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='0.05',
+                        help='Seconds added to each Messages call, or a distribution (e.g. lognormal:0.8,0.5)')
+    parser.add_argument('--chunk-delay', type=float, default=0.02, help='Seconds between streamed words')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of Messages calls that fail')
+    parser.add_argument('--error-status', type=int, nargs='+', default=[529], choices=sorted(MOCK_ERRORS),
+                        help='Statuses injected failures use')
+    parser.add_argument('--output-tokens', type=int, help='Reported output tokens per message')
+    parser.add_argument('--seed', type=int, help='Seed for latency and error draws')
+    args = parser.parse_args()
+
+    latency_sampler(args.latency)  # Fail fast on a bad spec
+    server = MockAnthropicServer(
+        args.host, args.port, latency=args.latency, chunk_delay=args.chunk_delay, error_rate=args.error_rate,
+        error_statuses=args.error_status, output_tokens=args.output_tokens, seed=args.seed
+    )
+    print(f"🧪 Mock Anthropic API on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
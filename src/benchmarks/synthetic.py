@@ -0,0 +1,30 @@
+"""
+Synthetic history generator for benchmarks
+Produces a load_data()-shaped frame with realistic gaps in optional metrics.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from modules.config import QUESTIONS
+
+
+def make_history(n: int, seed: int = 0, missing_rate: float = 0.3) -> pd.DataFrame:
+    """Random daily entries: required sliders as ints, optional ones with NaN gaps."""
+    rng = np.random.default_rng(seed)
+    start = date(2020, 1, 1)
+    data = {'date': [(start + timedelta(days=i)).isoformat() for i in range(n)]}
+    level = rng.normal(5, 1.5, n).clip(0, 10)  # Shared day-level drift
+    for q in QUESTIONS:
+        if q['type'] == 'yesno':
+            values = (rng.random(n) < 0.3).astype(float)
+        else:
+            values = (level + rng.normal(0, 2, n)).round().clip(0, q.get('max', 10))
+        if q.get('required'):
+            values = values.astype(int)
+        else:
+            values[rng.random(n) < missing_rate] = np.nan
+        data[q['key']] = values
+    data['recommendation'] = [''] * n
+    return pd.DataFrame(data)
@@ -6,7 +6,6 @@ Uses story-based narratives with feedback loop
 
 import math
 import streamlit as st
-import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
 
@@ -39,13 +38,31 @@ def normalize_date_value(date_value):
 # Import our modules
 from modules.config import QUESTIONS
 from modules.data import (
-    load_data, save_entry, get_previous_entry,
-    should_prompt_today, get_metric_changes
+    load_data, get_previous_entry,
+    should_prompt_today, get_metric_changes, get_data_version
 )
-from modules.analysis import analyze_with_narrative, update_narrative_with_feedback
 from modules.insights import generate_quick_insights, should_recommend_delivery_log
 from modules.severity import analyze_metrics_severity, get_top_issues, calculate_severity_statistics
-from modules.ui_controls import render_model_controls
+from modules.ui_controls import (
+    browser_session_id, render_model_controls, render_model_comparison, render_narrative_fallback,
+    render_narrative_job, write_narrative
+)
+from modules.speculation import speculation_key
+from modules.claude_client import api_key_configured
+from modules.anomaly import describe_anomaly
+from modules.effectiveness import get_effectiveness, effectiveness_table_rows
+from modules.archetypes import get_archetype_summary
+# Writes, model state, narrative jobs and caches go through the shared service when it runs
+from modules.service_client import (
+    save_entry, update_entry_recommendation, save_narrative, update_narrative_with_feedback, score_entry,
+    classify_entry, record_narrative_job, submit_narrative_job, discard_speculation, speculate, take_speculation
+)
+from modules.charts import metric_figure
+from modules.rollups import load_rollups, rollup_table
+from modules.history import (
+    entry_dates, entry_view, load_history, nearest_entry_date, severity_timeline, step_entry_date, timeline_figure
+)
+from modules.downsample import max_points_for_width
 
 # Page config
 st.set_page_config(
@@ -69,6 +86,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Widget state that must outlive a switch to another view: Streamlit drops
+# the state of widgets that are not drawn in a run
+VIEW_STATE_SUFFIXES = ('_required_slider', '_required_yesno', '_optional_slider', '_optional_yesno')
+VIEW_STATE_PREFIXES = ('chart_', 'compare_models_')
+VIEW_STATE_KEYS = {'free_form_context', 'feedback_input', 'renarrate_range', 'show_archetype_centroids'}
+
+
+def keep_view_state():
+    """Re-store view widget values so hidden views keep them (buttons are never re-stored)."""
+    for key in list(st.session_state.keys()):
+        if key in VIEW_STATE_KEYS or key.endswith(VIEW_STATE_SUFFIXES) or key.startswith(VIEW_STATE_PREFIXES):
+            st.session_state[key] = st.session_state[key]
+
+
 def main():
     require_app_password()
     st.title("📊 Work & Individual Metrics Tracker")
@@ -123,40 +154,159 @@ def main():
     # Check if input needed
     needs_prompt, reason = should_prompt_today()
     
-    # Tab navigation (New Entry first, Configuration last)
-    tab_entry, tab_dashboard, tab_analysis, tab_about, tab_config = st.tabs([
-        "📝 New Entry",
-        "📊 Dashboard",
-        "📖 Analysis",
-        "ℹ️ About",
-        "⚙️ Configuration"
-    ])
-
-    with tab_entry:
+    # View navigation (New Entry first, Configuration last); only the selected
+    # view runs, so a widget change does not rebuild the other four
+    keep_view_state()
+    view = st.radio(
+        "View",
+        options=list(VIEWS),
+        horizontal=True,
+        key="active_view",
+        label_visibility="collapsed"
+    )
+    if view == "📝 New Entry":
         show_input_tab(needs_prompt)
+    else:
+        VIEWS[view]()
 
-    with tab_dashboard:
-        show_dashboard_tab()
 
-    with tab_analysis:
-        show_analysis_tab()
+def show_renarration_panel():
+    """Regenerate stored Free-mode narratives for a date range in the background."""
+    from modules.narratives import kept_narrative_dates
+    from modules.renarrate import (
+        threshold_profile, start_renarration, stop_renarration,
+        load_renarration_job, renarration_running
+    )
 
-    with tab_about:
-        show_about_tab()
+    df = load_data()
+    days = pd.to_datetime(df['date'], errors='coerce').dropna().dt.date if 'date' in df.columns else pd.Series(dtype=object)
+    if days.empty:
+        st.info("No saved entries to re-narrate yet.")
+        return
 
-    with tab_config:
-        show_configuration_tab()
+    st.caption(
+        "Re-runs the rule-based (Free) narrative for past entries with the thresholds above. "
+        "Runs on a background process pool; progress is saved, so a stopped or interrupted "
+        "run resumes where it left off."
+    )
+    first, last = days.min(), days.max()
+    selected = st.date_input(
+        "Date range",
+        value=(first, last),
+        min_value=first,
+        max_value=last,
+        key="renarrate_range"
+    )
+    low, high = selected if isinstance(selected, (tuple, list)) and len(selected) == 2 else (first, last)
+    kept = sum(1 for day in kept_narrative_dates() if str(low) <= day <= str(high))
+    overwrite = False
+    if kept:
+        overwrite = st.checkbox(
+            f"Also replace {kept} Claude or feedback-regenerated stor{'y' if kept == 1 else 'ies'}",
+            key="renarrate_overwrite",
+            help="Unticked, these stories are kept and only Free-mode stories are regenerated."
+        )
+    running = renarration_running()
+
+    col_start, col_stop, col_refresh = st.columns(3)
+    with col_start:
+        if st.button("▶️ Start / Resume", disabled=running, use_container_width=True):
+            if isinstance(selected, (tuple, list)) and len(selected) == 2:
+                profile = threshold_profile(st.session_state.config_thresholds)
+                start_renarration(selected[0], selected[1], profile, overwrite=overwrite)
+                st.rerun()
+            else:
+                st.warning("Pick both a start and an end date.")
+    with col_stop:
+        if st.button("⏹️ Stop", disabled=not running, use_container_width=True):
+            stop_renarration()
+            st.rerun()
+    with col_refresh:
+        if st.button("🔄 Refresh status", use_container_width=True):
+            st.rerun()
 
-def show_configuration_tab():
-    """Configuration Tab - Adjust thresholds in real-time"""
-    from modules.config import THRESHOLDS, ANTHROPIC_API_KEY
-    
-    st.header("⚙️ Configuration")
-    
-    st.markdown("""
-    **Adjust threshold parameters in real-time.** Changes apply immediately to your next analysis.
-    The `.env` file provides starting values, but you can experiment here.
-    """)
+    job = load_renarration_job()
+    if job:
+        total = job.get('total', 0)
+        done = job.get('done', 0)
+        label = f"{job['status'].title()}: {done}/{total} entries ({job['start']} → {job['end']})"
+        if job.get('skipped'):
+            label += f", {job['skipped']} kept"
+        st.progress(min(done / total, 1.0) if total else 1.0, text=label)
+        if job.get('error'):
+            st.error(f"❌ Re-narration failed: {job['error']}")
+
+
+def show_narrative_cache_panel():
+    """Hit-rate statistics for memoized narratives, with a clear button."""
+    from modules.narrative_cache import CLAUDE_CACHE_TTL
+    from modules.service_client import clear_narrative_cache, narrative_cache_stats, prompt_cache_stats
+
+    stats = narrative_cache_stats()
+    col_rate, col_hits, col_misses, col_size = st.columns(4)
+    with col_rate:
+        st.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+    with col_hits:
+        st.metric("Hits (memory / disk)", f"{stats['hits']} / {stats['disk_hits']}")
+    with col_misses:
+        st.metric("Misses", stats['misses'])
+    with col_size:
+        st.metric("Cached in memory", f"{stats['size']} / {stats['max_entries']}")
+    disk_note = "on disk too" if stats['disk'] else "memory only"
+    st.caption(
+        f"Identical inputs reuse the stored narrative instead of regenerating it. "
+        f"Claude results ({disk_note}) expire after {CLAUDE_CACHE_TTL / 3600:g} h; "
+        f"{stats['evictions']} evicted, {stats['expired']} expired."
+    )
+    prompt_stats = prompt_cache_stats()
+    if prompt_stats['calls']:
+        st.caption(
+            f"🧠 Claude prompt cache ({prompt_stats['calls']} calls since startup): "
+            f"{prompt_stats['cache_hit_rate']:.0%} of prompt tokens read from cache "
+            f"({prompt_stats['cache_read_input_tokens']:,} cached, "
+            f"{prompt_stats['cache_creation_input_tokens']:,} written, "
+            f"{prompt_stats['input_tokens']:,} uncached)."
+        )
+    if st.button("🧹 Clear narrative cache"):
+        clear_narrative_cache()
+        st.rerun()
+
+
+def show_usage_panel(days=30):
+    """Claude token usage, cost and latency per day and model from the usage log."""
+    from modules.usage_log import usage_rollup, usage_totals
+
+    totals = usage_totals(days)
+    if not totals['calls']:
+        st.caption("No Claude calls logged yet. Every Claude narrative request is recorded here with its tokens and cost.")
+        return
+    prompt_tokens = totals['input_tokens'] + totals['cache_read_input_tokens'] + totals['cache_creation_input_tokens']
+    col_calls, col_tokens, col_cost, col_latency = st.columns(4)
+    with col_calls:
+        st.metric(f"Calls ({days} days)", totals['calls'], help=f"{totals['errors']} failed")
+    with col_tokens:
+        st.metric("Tokens in / out", f"{prompt_tokens:,} / {totals['output_tokens']:,}")
+    with col_cost:
+        st.metric("Cost", f"${totals['cost_usd']:.4f}")
+    with col_latency:
+        if totals['p50_latency_s'] is not None:
+            st.metric("Latency p50 / p95", f"{totals['p50_latency_s']:.2f}s / {totals['p95_latency_s']:.2f}s")
+    rollup = usage_rollup(days)
+    st.dataframe(
+        rollup.rename(columns={
+            'day': 'Day', 'model': 'Model', 'calls': 'Calls', 'errors': 'Errors',
+            'input_tokens': 'Input', 'output_tokens': 'Output',
+            'cache_read_input_tokens': 'Cache read', 'cache_creation_input_tokens': 'Cache write',
+            'cost_usd': 'Cost ($)', 'p50_latency_s': 'p50 (s)', 'p95_latency_s': 'p95 (s)'
+        }),
+        hide_index=True, use_container_width=True
+    )
+    st.caption("Input counts uncached prompt tokens; batch backfills are billed at half price and have no latency.")
+
+
+def show_threshold_settings():
+    """Configuration Tab - Analysis mode, Claude model and threshold controls"""
+    from modules.config import THRESHOLDS
     
     # Mode Selection (Most Important Parameter)
     st.subheader("🤖 Analysis Mode")
@@ -216,6 +366,24 @@ def show_configuration_tab():
             
             st.caption(f"ℹ️ {selected_model['description']}")
             st.caption(f"📊 **Cost Comparison:** {selected_model['cost_comparison']}")
+
+            from modules.model_catalog import catalog_status, refresh_in_background
+            status = catalog_status()
+            col_cat1, col_cat2 = st.columns([3, 1])
+            with col_cat1:
+                if status['refreshing']:
+                    st.caption("🔄 Refreshing model list and pricing in the background...")
+                elif status['fetched_at']:
+                    st.caption(
+                        f"🗂️ Catalog updated {status['fetched_at'][:16].replace('T', ' ')} "
+                        f"(pricing: {status['pricing_source']}, models: {status['models_source']})"
+                    )
+                else:
+                    st.caption("🗂️ Using built-in model list and pricing")
+            with col_cat2:
+                if st.button("🔄 Refresh catalog", key="refresh_model_catalog", disabled=status['refreshing']):
+                    refresh_in_background(force=True)
+                    st.rerun()
             
         else:
             st.error("⚠️ Claude AI mode requires an API key in your `.env` file (ANTHROPIC_API_KEY)")
@@ -510,7 +678,43 @@ def show_configuration_tab():
         
         Higher scores appear first in the findings list.
         """)
+
+
+# Every mode and threshold widget lives in this panel, so as a fragment a
+# moved slider reruns only the panel. The other views read config_thresholds
+# when they next run, so nothing else needs recomputing here.
+if hasattr(st, 'fragment'):
+    show_threshold_settings = st.fragment(show_threshold_settings)
+
+
+def show_configuration_tab():
+    """Configuration Tab - Adjust thresholds in real-time"""
+    from modules.config import ANTHROPIC_API_KEY
+    
+    st.header("⚙️ Configuration")
+    
+    st.markdown("""
+    **Adjust threshold parameters in real-time.** Changes apply immediately to your next analysis.
+    The `.env` file provides starting values, but you can experiment here.
+    """)
+    
+    show_threshold_settings()
     
+    # Bulk re-narration with the thresholds above
+    st.markdown("---")
+    st.subheader("♻️ Re-narrate History")
+    show_renarration_panel()
+
+    # Narrative cache statistics
+    st.markdown("---")
+    st.subheader("🗄️ Narrative Cache")
+    show_narrative_cache_panel()
+
+    # Claude token and cost accounting
+    st.markdown("---")
+    st.subheader("💰 Claude Usage")
+    show_usage_panel()
+
     # API Configuration
     st.markdown("---")
     st.subheader("🔑 API Configuration")
@@ -552,6 +756,41 @@ def show_configuration_tab():
     
     st.info("💡 **Tip**: Lower thresholds make the system more sensitive, higher thresholds make it less sensitive.")
 
+def show_narrative_timing():
+    """Caption with time-to-first-token and total latency of the last streamed story."""
+    timing = st.session_state.get('latest_narrative_timing')
+    if timing and timing.get('first_token_s') is not None:
+        st.caption(
+            f"⏱️ {timing['model']}: first token {timing['first_token_s']:.2f}s · "
+            f"complete {timing['total_s']:.2f}s"
+        )
+
+
+def free_mode_thresholds():
+    """(custom_thresholds, problem_threshold, increase_threshold) for Free-mode analysis from the config panel."""
+    from modules.config import THRESHOLDS
+    custom_thresholds = THRESHOLDS.copy()
+    for key, value in st.session_state.config_thresholds.items():
+        if key in custom_thresholds:
+            custom_thresholds[key] = value
+    return (
+        custom_thresholds,
+        st.session_state.config_thresholds.get('problem_threshold', 6),
+        st.session_state.config_thresholds.get('increase_threshold', 1.0)
+    )
+
+
+def read_input_answer(question, kind):
+    """Answer to an input-tab question from its widget state ('required'/'optional'); None if -NA."""
+    suffix = 'yesno' if question.get('type') == 'yesno' else 'slider'
+    selection = st.session_state.get(f"{question['key']}_{kind}_{suffix}", '-NA')
+    if selection == '-NA':
+        return None
+    if suffix == 'yesno':
+        return 1 if selection == 'Yes' else 0
+    return int(selection)
+
+
 def show_input_tab(needs_prompt):
     """New Entry Tab - Form Input"""
     previous = get_previous_entry()
@@ -697,7 +936,33 @@ def show_input_tab(needs_prompt):
     render_model_controls("entry", show_heading=False)
     st.caption("Pick a model before you submit so both the story and regenerate flow use your choice.")
 
-    with st.form("metrics_form"):
+    def speculate_from_answers():
+        """Precompute the Free-mode analysis once every required answer is in."""
+        if st.session_state.config_thresholds.get('mode', 'Free') != 'Free':
+            return
+        optional_qs = work_qs + individual_optional
+        if not all(
+            f"{q['key']}_optional_{'yesno' if q.get('type') == 'yesno' else 'slider'}" in st.session_state
+            for q in optional_qs
+        ):
+            return  # Optional widgets not drawn yet (first run)
+        answers = {'date': metrics['date']}
+        for question in adhd_primary:
+            answers[question['key']] = read_input_answer(question, 'required')
+            if answers[question['key']] is None:
+                return
+        for question in optional_qs:
+            value = read_input_answer(question, 'optional')
+            if value is not None:
+                answers[question['key']] = value
+        key = speculate(answers, previous, *free_mode_thresholds())
+        if st.session_state.get('speculation_key') not in (None, key):
+            discard_speculation(st.session_state.speculation_key)
+        st.session_state.speculation_key = key
+
+    # Outside the form so each answer can start the speculative analysis;
+    # as a fragment, a changed answer reruns only this section
+    def render_primary_signals():
         st.subheader("🌟 ADHD Primary Signals (required)")
         st.caption("These eight checks keep you honest about stress build-up. Complete them before saving.")
 
@@ -711,9 +976,13 @@ def show_input_tab(needs_prompt):
             else:
                 with col_right:
                     st.empty()
+        speculate_from_answers()
 
-        st.markdown("---")
+    if hasattr(st, 'fragment'):
+        render_primary_signals = st.fragment(render_primary_signals)
+    render_primary_signals()
 
+    with st.form("metrics_form"):
         st.subheader("💼 Work Signals (optional)")
         for i in range(0, len(work_qs), 2):
             col_left, col_right = st.columns(2)
@@ -811,55 +1080,60 @@ def show_input_tab(needs_prompt):
                     # For Free mode, compute severity results with custom thresholds
                     severity_results = None
                     custom_thresholds = None
+                    speculative = None
                     if current_mode == 'Free':
-                        # Get custom thresholds from config
-                        from modules.config import THRESHOLDS
-                        custom_thresholds = THRESHOLDS.copy()
-                        # Apply any user overrides from session state
-                        for key, value in st.session_state.config_thresholds.items():
-                            if key in custom_thresholds:
-                                custom_thresholds[key] = value
-                        
-                        # Compute severity with same thresholds
-                        problem_threshold = st.session_state.config_thresholds.get('problem_threshold', 6)
-                        increase_threshold = st.session_state.config_thresholds.get('increase_threshold', 1.0)
-                        severity_results = analyze_metrics_severity(
-                            metrics,
-                            previous,
-                            problem_threshold=problem_threshold,
-                            increase_threshold=increase_threshold,
-                            custom_thresholds=custom_thresholds
+                        custom_thresholds, problem_threshold, increase_threshold = free_mode_thresholds()
+                        # Usually computed already while the answers were filled in
+                        speculative = take_speculation(speculation_key(
+                            metrics, previous, custom_thresholds, problem_threshold, increase_threshold
+                        ))
+                        st.session_state.speculation_key = None
+
+                    if speculative:
+                        st.session_state.narrative_job_id = record_narrative_job(
+                            speculative['narrative'],
+                            metrics, previous, changes,
+                            mode=current_mode,
+                            model=current_model,
+                            severity_results=speculative['severity_results'],
+                            custom_thresholds=custom_thresholds,
+                            anomaly=speculative['anomaly'],
+                            archetype=speculative['archetype'],
+                            session_id=browser_session_id()
+                        )
+                    else:
+                        if current_mode == 'Free':
+                            # Compute severity with same thresholds
+                            severity_results = analyze_metrics_severity(
+                                metrics,
+                                previous,
+                                problem_threshold=problem_threshold,
+                                increase_threshold=increase_threshold,
+                                custom_thresholds=custom_thresholds
+                            )
+
+                        # Whole-day anomaly score against history (read-only until saved)
+                        anomaly = score_entry(metrics)
+                        archetype = classify_entry(metrics)
+
+                        # The story is written by a background job; the Analysis tab picks it up
+                        st.session_state.narrative_job_id = submit_narrative_job(
+                            metrics, previous, changes,
+                            mode=current_mode,
+                            model=current_model,
+                            severity_results=severity_results,
+                            custom_thresholds=custom_thresholds,
+                            anomaly=anomaly,
+                            archetype=archetype,
+                            session_id=browser_session_id()
                         )
-                    
-                    narrative, error = analyze_with_narrative(
-                        metrics, previous, changes, 
-                        mode=current_mode, 
-                        model=current_model,
-                        severity_results=severity_results,
-                        custom_thresholds=custom_thresholds
-                    )
-                    
-                    if error:
-                        st.error(error)
-                        return
-                    
-                    # Add recommendation to metrics before saving
-                    metrics['recommendation'] = narrative
-
-                    # Store in session state for analysis tab (persist after user confirmation)
-                    st.session_state.latest_narrative = narrative
-                    st.session_state.latest_metrics = dict(metrics)
-                    st.session_state.latest_previous = previous
-                    st.session_state.latest_changes = changes
                     st.session_state.last_analysis_date = normalize_date_value(metrics.get('date'))
-                    st.session_state.pending_save_required = True
-                    st.session_state.pending_save_mode = 'new'
-                    st.session_state.pending_feedback_text = None
-                    st.session_state.checkbox_reset_date = metrics['date']
-                    st.session_state.pop('confirm_save_checkbox', None)
-                    
-                    st.success("✅ Analysis ready!")
-                    st.info("☑️ Review the story in the '📖 Analysis' tab and tick the save box to keep it in your history.")
+
+                    if speculative:
+                        st.success("✅ Analysis ready!")
+                    else:
+                        st.success("✅ Entry submitted - your story is being written in the background.")
+                    st.info("☑️ Open the '📖 Analysis' tab to read it and tick the save box to keep it in your history.")
                     
                 except Exception as e:
                     st.error(f"❌ Error: {str(e)}")
@@ -868,45 +1142,104 @@ def show_input_tab(needs_prompt):
 
 
 
+NO_STORED_STORY = "<em>No story was saved for this entry. Use Feedback & Regenerate below to write one.</em>"
+
+
+def load_stored_entry(date):
+    """Show a stored entry and its story in the Analysis view (False if no entry has that date)."""
+    view = entry_view(date)
+    if view is None:
+        return False
+    date_str = view['metrics']['date']
+    st.session_state.latest_narrative = view['narrative'] or NO_STORED_STORY
+    st.session_state.latest_metrics = view['metrics']
+    st.session_state.latest_previous = view['previous']
+    st.session_state.latest_changes = view['changes']
+    st.session_state.latest_anomaly = view['anomaly']
+    st.session_state.last_analysis_date = date_str
+    st.session_state.last_saved_narrative_date = date_str if view['narrative'] else None
+    st.session_state.pending_save_required = False
+    st.session_state.pending_save_mode = None
+    st.session_state.pending_feedback_text = None
+    st.session_state.checkbox_reset_date = date_str
+    st.session_state.pop('confirm_save_checkbox', None)
+    return True
+
+
+def open_history_date(date):
+    """Widget callback: jump to the stored entry on or before date."""
+    target = nearest_entry_date(date)
+    if target:
+        load_stored_entry(target)
+
+
+def show_history_browser(problem_threshold, increase_threshold, custom_thresholds):
+    """Date picker, step buttons and severity timeline over every stored entry."""
+    history = load_history()
+    dates = entry_dates(history)
+    if len(dates) < 2:
+        return
+
+    current = normalize_date_value(st.session_state.get('last_analysis_date'))
+    stored = current is not None and nearest_entry_date(current, history) == current
+    if stored:
+        st.session_state.history_date = pd.Timestamp(current).date()  # Follow the entry on show
+    locked = bool(st.session_state.get('pending_save_required'))  # Never drop an unsaved story
+
+    col_date, col_first, col_prev, col_next, col_last = st.columns([2.2, 0.7, 0.7, 0.7, 0.7])
+    with col_date:
+        st.date_input(
+            "🗓️ Entry date",
+            min_value=pd.Timestamp(dates[0]).date(),
+            max_value=pd.Timestamp(dates[-1]).date(),
+            key="history_date",
+            on_change=lambda: open_history_date(st.session_state.history_date),
+            disabled=locked
+        )
+    anchor = current if stored else dates[-1]
+    for column, key, label, target in (
+        (col_first, "history_first", "⏮ First", dates[0]),
+        (col_prev, "history_previous", "◀ Previous", step_entry_date(anchor, -1, history) if stored else dates[-1]),
+        (col_next, "history_next", "Next ▶", step_entry_date(anchor, 1, history)),
+        (col_last, "history_latest", "Latest ⏭", dates[-1]),
+    ):
+        with column:
+            st.markdown("<div style='height: 28px'></div>", unsafe_allow_html=True)
+            st.button(label, key=key, on_click=open_history_date,
+                      args=(target,), disabled=locked or (stored and target == current),
+                      use_container_width=True)
+
+    timeline = severity_timeline(problem_threshold, increase_threshold, custom_thresholds, history)
+    st.plotly_chart(
+        timeline_figure(problem_threshold, increase_threshold, custom_thresholds,
+                        max_points_for_width(), history),
+        use_container_width=True
+    )
+    if locked:
+        st.caption("💾 Save or regenerate the story below before browsing other dates.")
+    elif stored:
+        position = dates.index(current)
+        row = timeline.iloc[history['positions'][current]]
+        st.caption(f"Entry {position + 1} of {len(dates)} · {row['increasing']} increasing, "
+                   f"{row['continuous']} continuous")
+    else:
+        st.caption("Showing an entry that is not saved yet.")
+
+
 def show_analysis_tab():
     """Analysis Tab - 2-Column Layout: Findings (left) + Narrative (right)"""
     st.header("📖 Your Metrics Analysis")
+
+    # A story still being written by "Analyze & Save" (survives reruns and reloads)
+    if render_narrative_job('confirm_save_checkbox'):
+        return
     
     if 'latest_narrative' not in st.session_state:
-        df = load_data()
-        if len(df) == 0:
-            st.info("👈 Submit a new entry first to see your personalized analysis!")
-            return
-
-        last_entry = df.iloc[-1]
-        last_recommendation = last_entry.get('recommendation')
-
-        if pd.isna(last_recommendation) or last_recommendation in (None, ""):
+        dates = entry_dates()
+        if not dates:
             st.info("👈 Submit a new entry first to see your personalized analysis!")
             return
-
-        last_entry_dict = last_entry.to_dict()
-        last_date_value = last_entry_dict.get('date')
-        last_date_str = normalize_date_value(last_date_value)
-        last_entry_dict['date'] = last_date_str
-
-        previous_entry = df.iloc[-2].to_dict() if len(df) > 1 else None
-        if previous_entry:
-            previous_entry['date'] = normalize_date_value(previous_entry.get('date'))
-
-        last_changes = get_metric_changes(last_entry_dict, previous_entry) if previous_entry else None
-
-        st.session_state.latest_narrative = last_recommendation
-        st.session_state.latest_metrics = last_entry_dict
-        st.session_state.latest_previous = previous_entry
-        st.session_state.latest_changes = last_changes
-        st.session_state.last_analysis_date = last_date_str
-        st.session_state.last_saved_narrative_date = last_date_str
-        st.session_state.pending_save_required = False
-        st.session_state.pending_save_mode = None
-        st.session_state.pending_feedback_text = None
-        st.session_state.checkbox_reset_date = last_date_str
-        st.session_state.pop('confirm_save_checkbox', None)
+        load_stored_entry(dates[-1])  # A story-less entry shows NO_STORED_STORY
     
     if 'last_analysis_date' in st.session_state:
         st.session_state.last_analysis_date = normalize_date_value(st.session_state.last_analysis_date)
@@ -936,6 +1269,9 @@ def show_analysis_tab():
         prefix = "+" if show_sign and numeric > 0 else ""
         return f"{prefix}{numeric:.1f}"
     
+    # Any past entry, straight from the history index
+    show_history_browser(problem_threshold, increase_threshold, custom_thresholds)
+
     # Show parameters being used
     st.markdown(f"""
     <div style="background: #e8f4f8; padding: 10px; border-radius: 6px; margin-bottom: 15px; font-size: 0.85em; border-left: 3px solid #3498db;">
@@ -1016,6 +1352,17 @@ def show_analysis_tab():
                     </div>
                     """, unsafe_allow_html=True)
         
+        # Multivariate anomaly (whole-day pattern vs. your own history)
+        anomaly = st.session_state.get('latest_anomaly')
+        if anomaly:
+            anomaly_colors = {'rare': '#e74c3c', 'unusual': '#f39c12', 'typical': '#2ecc71'}
+            st.markdown(f"""
+            <div style="background: #f4f6fb; padding: 12px; border-radius: 8px; border-left: 4px solid {anomaly_colors.get(anomaly['level'], '#3498db')}; margin-top: 15px; font-size: 0.9em;">
+                🧭 <strong>Anomaly score: {anomaly['distance']:.1f}</strong> ({anomaly['level']}, percentile {anomaly['percentile']:.0f})<br>
+                {describe_anomaly(anomaly)}
+            </div>
+            """, unsafe_allow_html=True)
+
         # Delivery log recommendation (if needed)
         should_recommend, triggered = should_recommend_delivery_log(metrics, st.session_state.config_thresholds)
         if should_recommend:
@@ -1026,16 +1373,47 @@ def show_analysis_tab():
                 High metrics: {', '.join([t.split('(')[0].strip() for t in triggered])}
             </div>
             """, unsafe_allow_html=True)
+
+        # Recurring kind of day (mini-batch k-means archetypes)
+        archetypes = get_archetype_summary()
+        if archetypes:
+            current_archetype = classify_entry(metrics)
+            with st.expander("🗂️ Day Archetypes", expanded=False):
+                if current_archetype:
+                    st.markdown(f"**This entry:** {current_archetype['name']} (distance {current_archetype['distance']:.1f})")
+                st.dataframe(pd.DataFrame([
+                    {
+                        'Archetype': a['name'],
+                        'Entries': a['size'],
+                        'Typical highs': ', '.join(f"{s['label']} {s['value']:.1f}" for s in a['signature'])
+                    }
+                    for a in archetypes
+                ]), use_container_width=True, hide_index=True)
+                if st.checkbox("Show centroids", key="show_archetype_centroids"):
+                    st.dataframe(
+                        pd.DataFrame({a['name']: a['centroid'] for a in archetypes}),
+                        use_container_width=True
+                    )
+
+        # Measured effect of past recommendations (cached per data version)
+        effect_rows = effectiveness_table_rows(get_effectiveness()['effects'])
+        if effect_rows:
+            with st.expander("📈 What Has Helped Before", expanded=False):
+                st.caption("Average change in each protocol's target metrics 1–3 entries after it was recommended. Negative = improvement.")
+                st.dataframe(pd.DataFrame(effect_rows), use_container_width=True, hide_index=True)
     
     # RIGHT COLUMN: Narrative
     with col_narrative:
         st.subheader("� Story")
         
-        st.markdown(f"""
+        render_narrative_fallback("analysis", st.session_state.get('last_analysis_date'), 'confirm_save_checkbox')
+        story_box = st.empty()  # Regenerate streams into this spot
+        story_box.markdown(f"""
         <div style="background: white; padding: 24px; border-radius: 12px; box-shadow: 0 2px 10px rgba(0,0,0,0.12); max-height: 640px; overflow-y: auto; font-size: 1.05em; line-height: 1.6;">
             {st.session_state.latest_narrative}
         </div>
         """, unsafe_allow_html=True)
+        show_narrative_timing()
 
         # Confirmation checkbox logic to persist narrative
         current_story_date = normalize_date_value(st.session_state.get('last_analysis_date'))
@@ -1044,148 +1422,196 @@ def show_analysis_tab():
             return
 
         st.session_state.last_analysis_date = current_story_date
-        pending_save = st.session_state.get('pending_save_required', False)
 
         # Reset checkbox state when viewing a different story date
         if st.session_state.get('checkbox_reset_date') != current_story_date:
             st.session_state.checkbox_reset_date = current_story_date
             st.session_state.pop('confirm_save_checkbox', None)
 
-        if pending_save:
-            st.warning("Review the story above. Tick the box below to save it to your history.")
-
-            confirm_checked = st.checkbox(
-                "✅ Save this story to my history",
-                key="confirm_save_checkbox"
-            )
-
-            if confirm_checked:
-                save_mode = st.session_state.get('pending_save_mode', 'new')
-                if save_mode == 'update':
-                    from modules.data import update_entry_recommendation
-                    update_entry_recommendation(current_story_date, st.session_state.latest_narrative)
-                else:
-                    save_entry(st.session_state.latest_metrics)
+        # The save box and the feedback expander rerun on their own as fragments;
+        # saving or regenerating changes the story, so both end with a full rerun
+        def render_save_confirmation():
+            pending_save = st.session_state.get('pending_save_required', False)
+            if pending_save:
+                st.warning("Review the story above. Tick the box below to save it to your history.")
 
-                from modules.narratives import save_narrative
-                save_narrative(
-                    current_story_date,
-                    st.session_state.latest_narrative,
-                    st.session_state.get('pending_feedback_text')
+                confirm_checked = st.checkbox(
+                    "✅ Save this story to my history",
+                    key="confirm_save_checkbox"
                 )
 
-                st.session_state.pending_save_required = False
-                st.session_state.last_saved_narrative_date = current_story_date
-                st.session_state.pending_feedback_text = None
-                st.session_state.pop('confirm_save_checkbox', None)
-
-                st.success("💾 Story saved to history!")
-                st.rerun()
-        else:
-            if st.session_state.get('last_saved_narrative_date') == current_story_date:
-                st.success("💾 Story saved to history.")
-
-        # Feedback section (compact)
-        st.markdown("<br>", unsafe_allow_html=True)
-        with st.expander("💬 Feedback & Regenerate", expanded=False):
-            st.caption("Provide feedback and optionally switch models before regenerating.")
-            render_model_controls("analysis", show_heading=False)
-            st.caption("Model changes here are remembered for future runs.")
-            feedback = st.text_area(
-                "Your feedback:",
-                placeholder="What was inaccurate? What should be adjusted?",
-                key="feedback_input",
-                height=100
-            )
-            
-            if st.button("🔄 Regenerate with Feedback", use_container_width=True):
-                feedback_text = feedback.strip()
-                if not feedback_text:
-                    st.warning("Enter feedback first")
-                    return
-
-                with st.spinner("🤔 Regenerating recommendation with your feedback..."):
-                    update_narrative_with_feedback(current_story_date, feedback_text)
-
-                    from modules.data import get_entry_by_date
+                if confirm_checked:
+                    save_mode = st.session_state.get('pending_save_mode', 'new')
+                    if save_mode == 'update':
+                        update_entry_recommendation(current_story_date, st.session_state.latest_narrative)
+                    else:
+                        save_entry(st.session_state.latest_metrics)
 
-                    entry = get_entry_by_date(current_story_date)
-                    entry_source = "stored"
+                    save_narrative(
+                        current_story_date,
+                        st.session_state.latest_narrative,
+                        st.session_state.get('pending_feedback_text'),
+                        mode=st.session_state.config_thresholds.get('mode', 'Free')
+                    )
 
-                    if not entry:
-                        latest_metrics = st.session_state.get('latest_metrics')
-                        if latest_metrics:
-                            entry = dict(latest_metrics)
-                            entry['date'] = normalize_date_value(entry.get('date')) or current_story_date
-                            entry_source = "session"
+                    st.session_state.pending_save_required = False
+                    st.session_state.last_saved_narrative_date = current_story_date
+                    st.session_state.pending_feedback_text = None
+                    st.session_state.pop('confirm_save_checkbox', None)
 
-                    if not entry:
-                        st.error("Could not find entry for this date. Save the story first, then try again.")
+                    st.success("💾 Story saved to history!")
+                    st.rerun()
+            else:
+                if st.session_state.get('last_saved_narrative_date') == current_story_date:
+                    st.success("💾 Story saved to history.")
+
+        def render_feedback():
+            st.markdown("<br>", unsafe_allow_html=True)
+            with st.expander("💬 Feedback & Regenerate", expanded=False):
+                st.caption("Provide feedback and optionally switch models before regenerating.")
+                render_model_controls("analysis", show_heading=False)
+                st.caption("Model changes here are remembered for future runs.")
+                feedback = st.text_area(
+                    "Your feedback:",
+                    placeholder="What was inaccurate? What should be adjusted?",
+                    key="feedback_input",
+                    height=100
+                )
+            
+                if st.button("🔄 Regenerate with Feedback", use_container_width=True):
+                    feedback_text = feedback.strip()
+                    if not feedback_text:
+                        st.warning("Enter feedback first")
                         return
 
-                    previous = None
-                    if entry_source == "stored":
-                        df = load_data()
-                        if len(df) > 0:
-                            df = df.copy()
-                            df['date'] = df['date'].astype(str)
-                            matching_indices = df.index[df['date'] == entry['date']].tolist()
-                            if matching_indices:
-                                idx = matching_indices[-1]
-                                previous = df.iloc[idx - 1].to_dict() if idx > 0 else None
-                    else:
-                        previous = st.session_state.get('latest_previous')
-
-                    changes = get_metric_changes(entry, previous)
-
-                    current_mode = st.session_state.config_thresholds.get('mode', 'Free')
-                    current_model = st.session_state.config_thresholds.get('claude_model', 'claude-3-5-haiku-20241022')
-
-                    severity_results = None
-                    custom_thresholds = None
-                    if current_mode == 'Free':
-                        from modules.config import THRESHOLDS
-                        custom_thresholds = THRESHOLDS.copy()
-                        for key, value in st.session_state.config_thresholds.items():
-                            if key in custom_thresholds:
-                                custom_thresholds[key] = value
-
-                        problem_threshold = st.session_state.config_thresholds.get('problem_threshold', 6)
-                        increase_threshold = st.session_state.config_thresholds.get('increase_threshold', 1.0)
-                        severity_results = analyze_metrics_severity(
+                    with st.spinner("🤔 Regenerating recommendation with your feedback..."):
+                        update_narrative_with_feedback(current_story_date, feedback_text)
+
+                        stored = entry_view(current_story_date)
+                        entry = stored['metrics'] if stored else None
+                        entry_source = "stored"
+
+                        if not entry:
+                            latest_metrics = st.session_state.get('latest_metrics')
+                            if latest_metrics:
+                                entry = dict(latest_metrics)
+                                entry['date'] = normalize_date_value(entry.get('date')) or current_story_date
+                                entry_source = "session"
+
+                        if not entry:
+                            st.error("Could not find entry for this date. Save the story first, then try again.")
+                            return
+
+                        if entry_source == "stored":
+                            previous = stored['previous']
+                        else:
+                            previous = st.session_state.get('latest_previous')
+
+                        changes = get_metric_changes(entry, previous)
+
+                        current_mode = st.session_state.config_thresholds.get('mode', 'Free')
+                        current_model = st.session_state.config_thresholds.get('claude_model', 'claude-3-5-haiku-20241022')
+
+                        severity_results = None
+                        custom_thresholds = None
+                        if current_mode == 'Free':
+                            from modules.config import THRESHOLDS
+                            custom_thresholds = THRESHOLDS.copy()
+                            for key, value in st.session_state.config_thresholds.items():
+                                if key in custom_thresholds:
+                                    custom_thresholds[key] = value
+
+                            problem_threshold = st.session_state.config_thresholds.get('problem_threshold', 6)
+                            increase_threshold = st.session_state.config_thresholds.get('increase_threshold', 1.0)
+                            severity_results = analyze_metrics_severity(
+                                entry,
+                                previous,
+                                problem_threshold=problem_threshold,
+                                increase_threshold=increase_threshold,
+                                custom_thresholds=custom_thresholds
+                            )
+
+                        anomaly = stored['anomaly'] if entry_source == "stored" else score_entry(entry)
+
+                        new_narrative, error = write_narrative(
+                            current_story_date,
                             entry,
                             previous,
-                            problem_threshold=problem_threshold,
-                            increase_threshold=increase_threshold,
-                            custom_thresholds=custom_thresholds
+                            changes,
+                            placeholder=story_box if current_mode == 'Claude AI' else None,
+                            mode=current_mode,
+                            model=current_model,
+                            severity_results=severity_results,
+                            custom_thresholds=custom_thresholds,
+                            anomaly=anomaly,
+                            archetype=classify_entry(entry)
                         )
 
-                    new_narrative, error = analyze_with_narrative(
-                        entry,
-                        previous,
-                        changes,
-                        mode=current_mode,
-                        model=current_model,
-                        severity_results=severity_results,
-                        custom_thresholds=custom_thresholds
-                    )
+                        if error:
+                            st.error(error)
+                            return
+
+                        st.session_state.latest_narrative = new_narrative
+                        entry_with_recommendation = dict(entry)
+                        entry_with_recommendation['recommendation'] = new_narrative
+                        st.session_state.latest_metrics = entry_with_recommendation
+                        st.session_state.latest_anomaly = anomaly
+                        st.session_state.pending_save_required = True
+                        st.session_state.pending_save_mode = 'update' if entry_source == "stored" else 'new'
+                        st.session_state.pending_feedback_text = feedback_text
+                        st.session_state.checkbox_reset_date = current_story_date
+                        st.session_state.pop('confirm_save_checkbox', None)
+
+                        st.success("✅ Story regenerated. Tick the save box to update history.")
+                        st.rerun()
+
+        if hasattr(st, 'fragment'):
+            render_save_confirmation = st.fragment(render_save_confirmation)
+            render_feedback = st.fragment(render_feedback)
+        render_save_confirmation()
 
-                    if error:
-                        st.error(error)
-                        return
+        # Feedback section (compact)
+        render_feedback()
+
+    # Full width below the story: side-by-side answers from several Claude models
+    if st.session_state.config_thresholds.get('mode') == 'Claude AI' and api_key_configured():
+        with st.expander("⚖️ Compare Claude Models", expanded=False):
+            st.caption("Sends this entry's prompt to the selected models at once. Nothing is saved; "
+                       "pick the model you prefer above and regenerate to keep its story.")
+            render_model_comparison(
+                "analysis",
+                metrics,
+                previous,
+                st.session_state.get('latest_changes'),
+                st.session_state.get('latest_anomaly')
+            )
 
-                    st.session_state.latest_narrative = new_narrative
-                    entry_with_recommendation = dict(entry)
-                    entry_with_recommendation['recommendation'] = new_narrative
-                    st.session_state.latest_metrics = entry_with_recommendation
-                    st.session_state.pending_save_required = True
-                    st.session_state.pending_save_mode = 'update' if entry_source == "stored" else 'new'
-                    st.session_state.pending_feedback_text = feedback_text
-                    st.session_state.checkbox_reset_date = current_story_date
-                    st.session_state.pop('confirm_save_checkbox', None)
+GRANULARITY_LABELS = {'entry': "Entry", 'week': "Week", 'month': "Month"}
+ROLLUP_STAT_LABELS = {'mean': "Mean", 'max': "Max", 'p90': "90th percentile"}
+SUMMARY_PERIODS = 8  # Most recent weeks / months per metric in the summary table
+
+
+def rollup_summary_rows(df, metrics, granularity, n_entries, thresholds):
+    """Latest rollup buckets of each charted metric as display rows."""
+    import pandas as pd
+
+    state = load_rollups(df)
+    since = df['date'].iloc[-n_entries]
+    frames = []
+    for metric in metrics:
+        table = rollup_table(granularity, metric['key'], thresholds, since=since, state=state)
+        table = table.tail(SUMMARY_PERIODS).iloc[::-1]
+        frames.append(pd.DataFrame({
+            'Metric': metric['label'],
+            GRANULARITY_LABELS[granularity]: table['date'].dt.strftime('%Y-%m-%d'),
+            'Entries': table['count'],
+            'Mean': table['mean'],
+            'Max': table['max'],
+            'P90': table['p90'],
+            '≥ threshold': (table['above'] * 100).round().astype(int).astype(str) + '%',
+        }))
+    return pd.concat(frames, ignore_index=True)
 
-                    st.success("✅ Story regenerated. Tick the save box to update history.")
-                    st.rerun()
 
 def show_dashboard_tab():
     """Dashboard Tab - Visualizations"""
@@ -1207,8 +1633,35 @@ def show_dashboard_tab():
     st.info(f"📊 Total entries: {len(df)} | Latest: {latest['date'].strftime('%Y-%m-%d')}")
     
     # Filter options
-    n_entries = st.sidebar.slider("Show last N entries", 1, max(1, len(df)), min(10, len(df)))
+    max_window = max(1, len(df))
+    st.session_state.chart_window = min(st.session_state.get('chart_window', 10), max_window)  # Kept across views
+    n_entries = st.sidebar.slider("Show last N entries", 1, max_window, key="chart_window")
+    granularity = st.sidebar.radio(
+        "Granularity", options=list(GRANULARITY_LABELS), format_func=GRANULARITY_LABELS.get,
+        horizontal=True, key="chart_granularity",
+        help="Entry: one point per entry. Week / Month: one aggregate per period, read from stored rollups"
+    )
+    rollup_stat = 'mean'
+    if granularity != 'entry':
+        rollup_stat = st.sidebar.selectbox(
+            "Statistic", options=list(ROLLUP_STAT_LABELS), format_func=ROLLUP_STAT_LABELS.get,
+            key="chart_rollup_stat"
+        )
+    show_raw = st.sidebar.checkbox(
+        "Show raw points", key="chart_raw_points", disabled=granularity != 'entry',
+        help="Plot every entry instead of a downsampled line that keeps each period's highs and lows"
+    )
     df_display = df.tail(n_entries)
+    max_points = max_points_for_width()
+    data_version = get_data_version()
+    charted = []
+
+    def show_metric_chart(metrics, style):
+        """Cached figure for the ticked metrics (shared with the mobile dashboard)."""
+        fig = metric_figure(df, metrics, n_entries, style, raw=show_raw, max_points=max_points,
+                            version=data_version, granularity=granularity, stat=rollup_stat)
+        st.plotly_chart(fig, use_container_width=True)
+        charted.extend(metrics)
     
     # Key Metrics Cards
     st.markdown("### ADHD Radar Snapshot")
@@ -1238,6 +1691,12 @@ def show_dashboard_tab():
     st.markdown("---")
     st.subheader("📈 Metric Visualization")
     st.caption("Select metrics to visualize (easier to read individually)")
+    if granularity != 'entry':
+        st.caption(f"Each point is the {GRANULARITY_LABELS[granularity].lower()}ly "
+                   f"{ROLLUP_STAT_LABELS[rollup_stat].lower()} of the entries in that period.")
+    elif n_entries > max_points and not show_raw:
+        st.caption(f"Long ranges are drawn from up to {max_points} points per line, keeping every "
+                   "high and low. Tick 'Show raw points' in the sidebar to plot all entries.")
     
     # Get all available numeric metrics from QUESTIONS
     available_metrics = []
@@ -1265,30 +1724,7 @@ def show_dashboard_tab():
                     selected_adhd.append(metric)
 
         if selected_adhd:
-            fig_adhd = go.Figure()
-            colors = ['#ff8fa3', '#f6bd60', '#84a59d', '#f28482', '#f5cac3', '#b8c0ff']
-
-            for i, metric in enumerate(selected_adhd):
-                fig_adhd.add_trace(go.Scatter(
-                    x=df_display['date'],
-                    y=df_display[metric['key']],
-                    name=metric['label'],
-                    mode='lines+markers',
-                    line=dict(color=colors[i % len(colors)], width=3),
-                    marker=dict(size=8)
-                ))
-
-            fig_adhd.update_layout(
-                height=320,
-                hovermode='x unified',
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                yaxis=dict(range=[0, 10], title="Score (0-10)"),
-                xaxis=dict(title="Date"),
-                showlegend=True
-            )
-
-            st.plotly_chart(fig_adhd, use_container_width=True)
+            show_metric_chart(selected_adhd, 'adhd')
     
     # Work Metrics Selection
     if work_metrics:
@@ -1301,30 +1737,7 @@ def show_dashboard_tab():
                     selected_work.append(metric)
         
         if selected_work:
-            fig_work = go.Figure()
-            colors = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#fa709a', '#fee140', '#30cfd0']
-            
-            for i, metric in enumerate(selected_work):
-                fig_work.add_trace(go.Scatter(
-                    x=df_display['date'],
-                    y=df_display[metric['key']],
-                    name=metric['label'],
-                    mode='lines+markers',
-                    line=dict(color=colors[i % len(colors)], width=3),
-                    marker=dict(size=8)
-                ))
-            
-            fig_work.update_layout(
-                height=400,
-                hovermode='x unified',
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                yaxis=dict(range=[0, 10], title="Score (1-10)"),
-                xaxis=dict(title="Date"),
-                showlegend=True
-            )
-            
-            st.plotly_chart(fig_work, use_container_width=True)
+            show_metric_chart(selected_work, 'work')
     
     # Individual Metrics Selection
     if individual_metrics:
@@ -1337,34 +1750,7 @@ def show_dashboard_tab():
                     selected_individual.append(metric)
         
         if selected_individual:
-            fig_individual = go.Figure()
-            colors = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#fa709a', '#fee140', '#30cfd0']
-            
-            for i, metric in enumerate(selected_individual):
-                fig_individual.add_trace(go.Scatter(
-                    x=df_display['date'],
-                    y=df_display[metric['key']],
-                    name=metric['label'],
-                    mode='lines+markers',
-                    line=dict(color=colors[i % len(colors)], width=3),
-                    marker=dict(size=8)
-                ))
-            
-            fig_individual.update_layout(
-                height=400,
-                hovermode='x unified',
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                yaxis=dict(range=[0, 10], title="Score (1-10)"),
-                xaxis=dict(title="Date"),
-                showlegend=True
-            )
-            
-            st.plotly_chart(fig_individual, use_container_width=True)
-    
-    # Current Insights
-    st.markdown("---")
-    st.subheader("🎯 Current Status")
+            show_metric_chart(selected_individual, 'individual')
     
     # Use custom thresholds from configuration
     from modules.config import THRESHOLDS
@@ -1374,6 +1760,21 @@ def show_dashboard_tab():
             if key in custom_thresholds:
                 custom_thresholds[key] = value
 
+    # Period aggregates of the charted metrics
+    if granularity != 'entry' and charted:
+        period = GRANULARITY_LABELS[granularity]
+        with st.expander(f"📅 {period}ly Summary", expanded=False):
+            st.caption("Latest periods first. '≥ threshold' is the share of entries at or above "
+                       "each metric's alert threshold from Configuration.")
+            st.dataframe(
+                rollup_summary_rows(df, charted, granularity, n_entries, custom_thresholds),
+                use_container_width=True, hide_index=True
+            )
+
+    # Current Insights
+    st.markdown("---")
+    st.subheader("🎯 Current Status")
+
     insights = generate_quick_insights(
         latest.to_dict(), 
         previous.to_dict() if previous is not None else None,
@@ -1428,5 +1829,14 @@ def show_about_tab():
 # Missing import at the top
 import pandas as pd
 
+# Navigation label -> view (New Entry also gets the prompt flag)
+VIEWS = {
+    "📝 New Entry": show_input_tab,
+    "📊 Dashboard": show_dashboard_tab,
+    "📖 Analysis": show_analysis_tab,
+    "ℹ️ About": show_about_tab,
+    "⚙️ Configuration": show_configuration_tab
+}
+
 if __name__ == "__main__":
     main()
@@ -15,17 +15,22 @@ from datetime import datetime
 
 # Import shared modules (no changes to existing code)
 from modules.auth import require_app_password
-from modules.config import QUESTIONS, ANTHROPIC_API_KEY
+from modules.config import QUESTIONS, ANTHROPIC_API_KEY, MOBILE_CHART_WIDTH_PX
 from modules.data import (
-    load_data, save_entry, get_previous_entry,
+    load_data, get_previous_entry,
     should_prompt_today, get_metric_changes
 )
-from modules.analysis import (
-    analyze_with_narrative,
-    update_narrative_with_feedback,
-    get_available_claude_models,
-)
+from modules.analysis import get_available_claude_models
 from modules.severity import analyze_metrics_severity, calculate_severity_statistics
+from modules.anomaly import describe_anomaly
+# Writes, model state and narrative jobs go through the shared service when it runs
+from modules.service_client import (
+    save_entry, update_entry_recommendation, save_narrative, update_narrative_with_feedback, score_entry,
+    get_entry_anomaly, classify_entry
+)
+from modules.ui_controls import render_narrative_fallback, write_narrative
+from modules.charts import metric_figure
+from modules.downsample import max_points_for_width
 
 # Page config optimized for mobile
 st.set_page_config(
@@ -142,7 +147,7 @@ def main():
         st.session_state.adhd_widgets_initialized = True
     
     # Simple tab navigation
-    tab_entry, tab_analysis = st.tabs(["📝 New Entry", "📖 Last Analysis"])
+    tab_entry, tab_analysis, tab_trends = st.tabs(["📝 New Entry", "📖 Last Analysis", "📊 Trends"])
     
     with tab_entry:
         show_entry_tab()
@@ -150,6 +155,9 @@ def main():
     with tab_analysis:
         show_analysis_tab()
 
+    with tab_trends:
+        show_trends_tab()
+
 def show_entry_tab():
     """Mobile-optimized entry form - single column, touch-friendly"""
     previous = get_previous_entry()
@@ -256,12 +264,18 @@ def show_entry_tab():
                             custom_thresholds=custom_thresholds
                         )
                     
-                    narrative, error = analyze_with_narrative(
+                    anomaly = score_entry(metrics)
+
+                    # Falls back to the local story if Claude is slow or failing
+                    narrative, error = write_narrative(
+                        normalize_date_value(metrics.get('date')),
                         metrics, previous, changes,
                         mode=current_mode,
                         model=current_model,
                         severity_results=severity_results,
-                        custom_thresholds=custom_thresholds
+                        custom_thresholds=custom_thresholds,
+                        anomaly=anomaly,
+                        archetype=classify_entry(metrics)
                     )
                     
                     if error:
@@ -275,6 +289,7 @@ def show_entry_tab():
                     st.session_state.latest_metrics = dict(metrics)
                     st.session_state.latest_previous = previous
                     st.session_state.latest_changes = changes
+                    st.session_state.latest_anomaly = anomaly
                     analysis_date = normalize_date_value(metrics.get('date'))
                     st.session_state.last_analysis_date = analysis_date
                     st.session_state.pending_save_required = True
@@ -322,6 +337,7 @@ def show_analysis_tab():
         st.session_state.latest_metrics = last_entry_dict
         st.session_state.latest_previous = previous_entry
         st.session_state.latest_changes = last_changes
+        st.session_state.latest_anomaly = get_entry_anomaly(last_date)
         st.session_state.last_analysis_date = last_date
         st.session_state.last_saved_narrative_date = last_date
         st.session_state.pending_save_required = False
@@ -331,11 +347,20 @@ def show_analysis_tab():
         st.session_state.last_analysis_date = normalize_date_value(st.session_state.last_analysis_date)
 
     # Display narrative
+    render_narrative_fallback("mobile", st.session_state.get('last_analysis_date'), 'confirm_save_mobile')
     st.markdown(f"""
     <div class="narrative-box">
         {st.session_state.latest_narrative}
     </div>
     """, unsafe_allow_html=True)
+
+    anomaly = st.session_state.get('latest_anomaly')
+    if anomaly:
+        st.caption(f"🧭 Anomaly score {anomaly['distance']:.1f} · {describe_anomaly(anomaly)}")
+
+    archetype = classify_entry(st.session_state.latest_metrics) if 'latest_metrics' in st.session_state else None
+    if archetype:
+        st.caption(f"🗂️ Day archetype: {archetype['name']} ({archetype['size']} similar entries)")
     
     # Save confirmation
     current_story_date = normalize_date_value(st.session_state.get('last_analysis_date'))
@@ -356,16 +381,15 @@ def show_analysis_tab():
         if st.checkbox("✅ Save this story", key="confirm_save_mobile"):
             save_mode = st.session_state.get('pending_save_mode', 'new')
             if save_mode == 'update':
-                from modules.data import update_entry_recommendation
                 update_entry_recommendation(current_story_date, st.session_state.latest_narrative)
             else:
                 save_entry(st.session_state.latest_metrics)
             
-            from modules.narratives import save_narrative
             save_narrative(
                 current_story_date,
                 st.session_state.latest_narrative,
-                st.session_state.get('pending_feedback_text')
+                st.session_state.get('pending_feedback_text'),
+                mode=st.session_state.config_thresholds.get('mode', 'Free')
             )
             
             st.session_state.pending_save_required = False
@@ -432,12 +456,17 @@ def show_analysis_tab():
 
                 changes = get_metric_changes(entry, previous)
 
-                new_narrative, error = analyze_with_narrative(
+                anomaly = get_entry_anomaly(entry['date']) if entry_source == "stored" else score_entry(entry)
+
+                new_narrative, error = write_narrative(
+                    current_story_date,
                     entry,
                     previous,
                     changes,
                     mode=current_mode,
-                    model=current_model
+                    model=current_model,
+                    anomaly=anomaly,
+                    archetype=classify_entry(entry)
                 )
 
                 if error:
@@ -448,6 +477,7 @@ def show_analysis_tab():
                 entry_with_recommendation = dict(entry)
                 entry_with_recommendation['recommendation'] = new_narrative
                 st.session_state.latest_metrics = entry_with_recommendation
+                st.session_state.latest_anomaly = anomaly
                 st.session_state.pending_save_required = True
                 st.session_state.pending_save_mode = 'update' if entry_source == "stored" else 'new'
                 st.session_state.pending_feedback_text = feedback_text
@@ -456,5 +486,42 @@ def show_analysis_tab():
                 st.success("✅ Story regenerated. Review and save.")
                 st.rerun()
 
+def show_trends_tab():
+    """Compact dashboard - one chart, same cached figures as the desktop Dashboard"""
+    df = load_data()
+    if len(df) == 0:
+        st.info("👈 Submit your first entry to see trends")
+        return
+    df['date'] = pd.to_datetime(df['date'])
+
+    metrics = [
+        {'key': q['key'], 'label': q['label']}
+        for q in QUESTIONS
+        if q.get('type') != 'yesno' and q['key'] in df.columns and df[q['key']].notna().any()
+    ]
+    labels = {m['key']: m['label'] for m in metrics}
+    radar = [q['key'] for q in QUESTIONS if q.get('category') == 'adhd_primary' and q['key'] in labels]
+    selected = st.multiselect(
+        "Metrics",
+        options=list(labels),
+        default=radar[:2],
+        format_func=labels.get,
+        key="mobile_trend_metrics"
+    )
+    windows = {"30 entries": 30, "90 entries": 90, "1 year": 365, "All": len(df)}
+    window = st.radio("Range", options=list(windows), horizontal=True, key="mobile_trend_window")
+    if not selected:
+        st.caption("Pick at least one metric.")
+        return
+
+    fig = metric_figure(
+        df,
+        [m for m in metrics if m['key'] in selected],
+        min(windows[window], len(df)),
+        style='mobile',
+        max_points=max_points_for_width(MOBILE_CHART_WIDTH_PX)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
 if __name__ == "__main__":
     main()
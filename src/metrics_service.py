@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Shared metrics service for the desktop and mobile apps
+Owns saves, anomaly / archetype model state, the narrative pipeline,
+background jobs and speculation for both front-ends, so their caches and
+worker pools exist once. Apps with METRICS_SERVICE_URL set use it; they
+run everything but background stories in-process while it is not running.
+Serving on a non-loopback --host requires METRICS_SERVICE_TOKEN.
+
+Usage: python src/metrics_service.py [--host 127.0.0.1] [--port 8503]
+"""
+import argparse
+import sys
+from urllib.parse import urlparse
+
+from modules.config import METRICS_SERVICE_TOKEN, METRICS_SERVICE_URL
+from modules.service import OPERATIONS, MetricsService, resolve_operation
+
+
+def main():
+    default = urlparse(METRICS_SERVICE_URL or 'http://127.0.0.1:8503')
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default=default.hostname or '127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=default.port or 8503, help='Port to listen on')
+    args = parser.parse_args()
+
+    for name in OPERATIONS:
+        resolve_operation(name)  # Import every module up front, not on the first request
+
+    try:
+        service = MetricsService(args.host, args.port, token=METRICS_SERVICE_TOKEN or None)
+    except ValueError as e:
+        print(f"❌ Refusing to start: {e}")
+        return 1
+    except OSError as e:
+        print(f"❌ Cannot listen on {args.host}:{args.port}: {e}")
+        return 1
+
+    print(f"🧩 Metrics service on {service.url} ({len(OPERATIONS)} operations)")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Metrics service stopped")
+    finally:
+        service.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,211 +3,78 @@ Analysis module for narrative generation.
 Routes to either Claude AI or local rule-based narratives based on mode.
 """
 
-from typing import Dict, Optional, Tuple, List
-import requests
-from bs4 import BeautifulSoup
-import re
-from anthropic import Anthropic
-from modules.config import ANTHROPIC_API_KEY
-from modules.narratives import build_context_prompt, save_narrative
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from typing import Dict, Iterator, Optional, Tuple, List
+from modules.config import ANTHROPIC_API_KEY, CLAUDE_LATENCY_BUDGET
+from modules.claude_client import client_settings, get_claude_client
+from modules.model_catalog import get_model_catalog, load_snapshot, FALLBACK_PRICING
+from modules.narratives import SYSTEM_PROMPT, build_context_prompt, build_system_prompt, save_narrative
 from modules.local_narrative import build_local_narrative
+from modules.narrative_cache import get_narrative_cache, narrative_cache_key, prompt_cache_key, CLAUDE_CACHE_TTL
+from modules.resilience import CircuitOpenError, call_with_retries, get_claude_breaker
+from modules.usage_log import log_claude_call
+
+CLAUDE_MAX_TOKENS = 2000
+_timings = deque(maxlen=200)  # Latest narrative request timings + token usage (newest last)
+USAGE_LOGGED_SOURCES = ('request', 'stream', 'compare')  # Timing sources that are real Claude calls
+
+
+def usage_tokens(usage) -> Dict[str, int]:
+    """Token counts from a Messages API usage object (prompt-cache fields default to 0)."""
+    return {
+        'input_tokens': getattr(usage, 'input_tokens', None) or 0,
+        'output_tokens': getattr(usage, 'output_tokens', None) or 0,
+        'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0,
+        'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0
+    }
 
 
 def fetch_claude_pricing_from_web() -> Dict[str, Dict[str, float]]:
     """
-    Scrape latest Claude pricing data from Anthropic's website.
-    Falls back to cached values if scraping fails.
-    
+    Latest known Claude pricing (per million tokens).
+
+    Reads the model catalog snapshot, which is refreshed from Anthropic's
+    website in the background; falls back to built-in values.
+
     Returns:
         Dictionary mapping model IDs to pricing info
     """
-    # Fallback pricing data (current as of Nov 2024)
-    fallback_costs = {
-        'claude-3-5-haiku-20241022': {'input_cost': 1.0, 'output_cost': 5.0},
-        'claude-3-5-sonnet-20241022': {'input_cost': 3.0, 'output_cost': 15.0},
-        'claude-sonnet-4-20250514': {'input_cost': 3.0, 'output_cost': 15.0},
-        'claude-opus-4-20250514': {'input_cost': 15.0, 'output_cost': 75.0}
-    }
-    
-    try:
-        # Fetch Anthropic pricing page
-        response = requests.get('https://www.anthropic.com/pricing', timeout=5)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try to extract pricing data
-        pricing_data = {}
-        
-        # Look for pricing patterns in the page
-        # Typical format: "$X per million tokens" or "$X / MTok"
-        text_content = soup.get_text()
-        
-        # Extract Haiku pricing
-        haiku_match = re.search(r'Haiku.*?\$(\d+\.?\d*)\s*(?:per million|MTok|/\s*MTok).*?input.*?\$(\d+\.?\d*)\s*(?:per million|MTok|/\s*MTok).*?output', 
-                               text_content, re.IGNORECASE | re.DOTALL)
-        if haiku_match:
-            pricing_data['claude-3-5-haiku-20241022'] = {
-                'input_cost': float(haiku_match.group(1)),
-                'output_cost': float(haiku_match.group(2))
-            }
-        
-        # Extract Sonnet pricing
-        sonnet_match = re.search(r'Sonnet.*?\$(\d+\.?\d*)\s*(?:per million|MTok|/\s*MTok).*?input.*?\$(\d+\.?\d*)\s*(?:per million|MTok|/\s*MTok).*?output', 
-                                text_content, re.IGNORECASE | re.DOTALL)
-        if sonnet_match:
-            input_cost = float(sonnet_match.group(1))
-            output_cost = float(sonnet_match.group(2))
-            pricing_data['claude-3-5-sonnet-20241022'] = {
-                'input_cost': input_cost,
-                'output_cost': output_cost
-            }
-            pricing_data['claude-sonnet-4-20250514'] = {
-                'input_cost': input_cost,
-                'output_cost': output_cost
-            }
-        
-        # Extract Opus pricing
-        opus_match = re.search(r'Opus.*?\$(\d+\.?\d*)\s*(?:per million|MTok|/\s*MTok).*?input.*?\$(\d+\.?\d*)\s*(?:per million|MTok|/\s*MTok).*?output', 
-                              text_content, re.IGNORECASE | re.DOTALL)
-        if opus_match:
-            pricing_data['claude-opus-4-20250514'] = {
-                'input_cost': float(opus_match.group(1)),
-                'output_cost': float(opus_match.group(2))
-            }
-        
-        # If we successfully extracted any pricing, use it
-        if pricing_data:
-            # Merge with fallback for any missing models
-            return {**fallback_costs, **pricing_data}
-    
-    except Exception as e:
-        # If scraping fails, use fallback
-        print(f"⚠️ Could not fetch live pricing from Anthropic website: {e}")
-        print("📦 Using cached pricing data")
-    
-    return fallback_costs
+    snapshot = load_snapshot()
+    return {**FALLBACK_PRICING, **(snapshot or {}).get('pricing', {})}
 
 
 def get_available_claude_models() -> List[Dict[str, str]]:
     """
-    Fetch available Claude models from Anthropic API and enrich with live cost data.
-    Scrapes pricing from Anthropic website, falls back to cached values if needed.
-    Models are ordered by cost (cheapest to most expensive).
-    
+    Available Claude models enriched with cost data, cheapest first.
+
+    Served instantly from the model catalog snapshot; a stale snapshot is
+    refreshed (Models API + pricing page) in the background.
+
     Returns:
         List of dicts with keys: id, name, description, use_case, cost_detail, cost_comparison
     """
-    # Fetch live pricing data from Anthropic website
-    pricing_data = fetch_claude_pricing_from_web()
-    
-    # Model metadata (descriptions and use cases)
-    model_metadata = {
-        'claude-3-5-haiku-20241022': {
-            'description': 'Fastest and most affordable',
-            'use_case': '⚡ Budget-friendly option for quick daily check-ins'
-        },
-        'claude-3-5-sonnet-20241022': {
-            'description': 'Previous generation, still very capable',
-            'use_case': '💼 Solid choice for detailed narratives'
-        },
-        'claude-sonnet-4-20250514': {
-            'description': 'Best balance of intelligence and speed',
-            'use_case': '✨ Recommended for most users - excellent quality, fast responses'
-        },
-        'claude-opus-4-20250514': {
-            'description': 'Highest intelligence and capability',
-            'use_case': '🎯 Best for complex analysis requiring deep insights'
-        }
-    }
-    
-    # Merge pricing with metadata
-    model_costs = {}
-    for model_id, pricing in pricing_data.items():
-        if model_id in model_metadata:
-            model_costs[model_id] = {
-                **pricing,
-                **model_metadata[model_id]
-            }
-    
-    # Try to fetch live models from Anthropic API
-    available_models = []
-    
-    try:
-        if ANTHROPIC_API_KEY and ANTHROPIC_API_KEY != 'your_key_here':
-            client = Anthropic(api_key=ANTHROPIC_API_KEY)
-            # Fetch models list
-            models_response = client.models.list()
-            
-            # Process each model
-            for model in models_response.data:
-                model_id = model.id
-                
-                # Only include Claude models with known pricing
-                if model_id in model_costs:
-                    cost_info = model_costs[model_id]
-                    
-                    # Calculate cost comparison to cheapest (Haiku)
-                    base_input = 1.0
-                    base_output = 5.0
-                    cost_multiplier_input = cost_info['input_cost'] / base_input
-                    cost_multiplier_output = cost_info['output_cost'] / base_output
-                    
-                    if cost_multiplier_input == 1.0:
-                        cost_comparison = 'Baseline (cheapest)'
-                    else:
-                        avg_multiplier = (cost_multiplier_input + cost_multiplier_output) / 2
-                        percent_increase = int((avg_multiplier - 1) * 100)
-                        cost_comparison = f'+{percent_increase}% cost vs Haiku ({int(cost_multiplier_input)}x input, {int(cost_multiplier_output)}x output)'
-                    
-                    available_models.append({
-                        'id': model_id,
-                        'name': model.display_name if hasattr(model, 'display_name') else model_id.replace('-', ' ').title(),
-                        'description': cost_info['description'],
-                        'use_case': cost_info['use_case'],
-                        'cost_detail': f"${int(cost_info['input_cost'])} in / ${int(cost_info['output_cost'])} out per million tokens",
-                        'cost_comparison': cost_comparison,
-                        'input_cost': cost_info['input_cost'],
-                        'output_cost': cost_info['output_cost']
-                    })
-            
-            # Sort by cost (input_cost + output_cost)
-            available_models.sort(key=lambda x: x['input_cost'] + x['output_cost'])
-            
-    except Exception as e:
-        # If API fetch fails, return fallback list
-        pass
-    
-    # Fallback to hardcoded list if API fetch failed or no API key
-    if not available_models:
-        for model_id, cost_info in model_costs.items():
-            base_input = 1.0
-            base_output = 5.0
-            cost_multiplier_input = cost_info['input_cost'] / base_input
-            cost_multiplier_output = cost_info['output_cost'] / base_output
-            
-            if cost_multiplier_input == 1.0:
-                cost_comparison = 'Baseline (cheapest)'
-            else:
-                avg_multiplier = (cost_multiplier_input + cost_multiplier_output) / 2
-                percent_increase = int((avg_multiplier - 1) * 100)
-                cost_comparison = f'+{percent_increase}% cost vs Haiku ({int(cost_multiplier_input)}x input, {int(cost_multiplier_output)}x output)'
-            
-            available_models.append({
-                'id': model_id,
-                'name': model_id.replace('-', ' ').title(),
-                'description': cost_info['description'],
-                'use_case': cost_info['use_case'],
-                'cost_detail': f"${int(cost_info['input_cost'])} in / ${int(cost_info['output_cost'])} out per million tokens",
-                'cost_comparison': cost_comparison,
-                'input_cost': cost_info['input_cost'],
-                'output_cost': cost_info['output_cost']
-            })
-        
-        # Sort by cost
-        available_models.sort(key=lambda x: x['input_cost'] + x['output_cost'])
-    
-    return available_models
+    return get_model_catalog()
+
+
+def claude_cache_key(model: str, metrics: Dict, previous: Optional[Dict] = None,
+                     changes: Optional[Dict] = None,
+                     anomaly: Optional[Dict] = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    User message of a Claude-mode request and its narrative-cache key, hashed
+    from the exact prompt (so feedback, effectiveness data and the prompt
+    encoding are all part of it).
+
+    Returns:
+        (key, prompt, None), or (None, None, error message) when no API key is configured
+    """
+    if not ANTHROPIC_API_KEY or ANTHROPIC_API_KEY == 'your_key_here':
+        return None, None, "⚠️ Claude AI mode requires API key. Add ANTHROPIC_API_KEY to your .env file or switch to Free mode."
+    prompt = build_context_prompt(metrics, previous, changes, anomaly=anomaly)
+    return prompt_cache_key(model, SYSTEM_PROMPT, prompt), prompt, None
 
 
 def analyze_with_narrative(
@@ -217,10 +84,20 @@ def analyze_with_narrative(
     mode: str = 'Free',
     model: str = 'claude-sonnet-4-20250514',
     severity_results: Optional[Dict] = None,
-    custom_thresholds: Optional[Dict] = None
+    custom_thresholds: Optional[Dict] = None,
+    anomaly: Optional[Dict] = None,
+    archetype: Optional[Dict] = None,
+    use_cache: bool = True,
+    fallback: bool = True
 ) -> Tuple[Optional[str], Optional[str]]:
     """
     Generate narrative analysis using selected mode.
+
+    Results are memoized by a fingerprint of the inputs (the exact prompt in
+    Claude mode), so reruns and repeated regenerates are served from cache.
+    Like NarrativeStream, a Claude call that fails after its retries or is
+    skipped by the open circuit breaker returns the local story instead,
+    headed by a notice saying why (never cached as Claude's answer).
     
     Args:
         metrics: Current metric values
@@ -230,44 +107,358 @@ def analyze_with_narrative(
         model: Claude model ID (only used if mode is 'Claude AI')
         severity_results: Pre-computed severity analysis (optional, for Free mode)
         custom_thresholds: Custom threshold dict (optional, for Free mode)
+        anomaly: Multivariate anomaly score for the entry (optional, both modes)
+        archetype: Day archetype for the entry (optional, for Free mode)
+        use_cache: Serve/store the result in the narrative cache
+        fallback: Return the local story when Claude fails (False: the error)
     
     Returns:
         (narrative, error_message) - narrative is None if error occurred
     """
+    cache = get_narrative_cache()
+
     # Route based on mode
     if mode == 'Free':
+        key = narrative_cache_key(
+            mode, None, metrics, previous,
+            custom_thresholds=custom_thresholds,
+            severity_results=severity_results,
+            anomaly=anomaly,
+            archetype=archetype
+        )
+        cached = cache.get(key) if use_cache else None
+        if cached is not None:
+            return cached, None
         try:
             narrative = build_local_narrative(
                 metrics, 
                 previous, 
                 changes,
                 severity_results=severity_results,
-                custom_thresholds=custom_thresholds
+                custom_thresholds=custom_thresholds,
+                anomaly=anomaly,
+                archetype=archetype
             )
-            return narrative, None
         except Exception as e:
             return None, f"❌ Error generating local narrative: {str(e)}"
+        if use_cache:
+            cache.put(key, narrative, persist=False, mode='Free')  # Cheap to rebuild; keep off disk
+        return narrative, None
     
     elif mode == 'Claude AI':
-        if not ANTHROPIC_API_KEY or ANTHROPIC_API_KEY == 'your_key_here':
-            return None, "⚠️ Claude AI mode requires API key. Add ANTHROPIC_API_KEY to your .env file or switch to Free mode."
-        
-        prompt = build_context_prompt(metrics, previous, changes)
-        
+        key, prompt, error = claude_cache_key(model, metrics, previous, changes, anomaly)
+        if error:
+            return None, error
+
+        cached = cache.get(key) if use_cache else None
+        if cached is not None:
+            return cached, None
+
+
+        started = time.perf_counter()
         try:
-            client = Anthropic(api_key=ANTHROPIC_API_KEY)
-            message = client.messages.create(
-                model=model,
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
+            # Retries (jittered backoff) and the circuit breaker are ours, not the SDK's
+            client = get_claude_client().with_options(max_retries=0)
+            message = call_with_retries(
+                lambda: client.messages.create(
+                    model=model,
+                    max_tokens=CLAUDE_MAX_TOKENS,
+                    system=build_system_prompt(),
+                    messages=[{"role": "user", "content": prompt}]
+                ),
+                client_settings()['max_retries']
             )
-            return message.content[0].text, None
+            narrative = message.content[0].text
         except Exception as e:
-            return None, f"❌ Error calling Claude API: {str(e)}"
+            if isinstance(e, CircuitOpenError):
+                error, notice = f"⏸️ {e}", f"⏸️ {e} - showing the local story."
+            else:
+                record_narrative_timing({
+                    'mode': mode, 'model': model, 'source': 'request', 'first_token_s': None,
+                    'total_s': round(time.perf_counter() - started, 4), 'error': True, 'usage': None
+                })
+                error = f"❌ Error calling Claude API: {str(e)}"
+                notice = f"{error} - showing the local story instead."
+            if not fallback:
+                return None, error
+            local, _ = analyze_with_narrative(
+                metrics, previous, changes, mode='Free', severity_results=severity_results,
+                custom_thresholds=custom_thresholds, anomaly=anomaly, archetype=archetype, use_cache=use_cache
+            )
+            return (f"> {notice}\n\n{local}", None) if local is not None else (None, error)
+        record_narrative_timing({
+            'mode': mode, 'model': model, 'source': 'request', 'first_token_s': None,
+            'total_s': round(time.perf_counter() - started, 4), 'error': False,
+            'usage': usage_tokens(message.usage)
+        })
+        if use_cache:
+            cache.put(key, narrative, ttl=CLAUDE_CACHE_TTL)
+        return narrative, None
     
     else:
         return None, f"❌ Unknown mode: {mode}"
 
+
+class PendingNarrative:
+    """
+    A streamed Claude call running on a background thread.
+
+    Deltas are handed over through a queue (None marks the end). When the
+    call finishes, the narrative is cached under key and its timing recorded
+    whether or not anyone is still reading, so a late answer is never lost.
+    """
+
+    def __init__(self, model: str, prompt: str, key: Optional[str] = None):
+        self.model = model
+        self.narrative: Optional[str] = None
+        self.error: Optional[str] = None
+        self.timing: Optional[Dict] = None
+        self._deltas = queue.Queue()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(prompt, key), name='claude-narrative', daemon=True)
+        self._thread.start()
+
+    def _run(self, prompt: str, key: Optional[str]) -> None:
+        started = time.perf_counter()
+        first_token = None
+        usage = None
+        parts = []
+        skipped = False
+        client = get_claude_client().with_options(max_retries=0)
+        try:
+            with ExitStack() as stack:
+                # Only opening the stream is retried; a stream that dies midway is not
+                stream = call_with_retries(
+                    lambda: stack.enter_context(client.messages.stream(
+                        model=self.model,
+                        max_tokens=CLAUDE_MAX_TOKENS,
+                        system=build_system_prompt(),
+                        messages=[{"role": "user", "content": prompt}]
+                    )),
+                    client_settings()['max_retries']
+                )
+                for delta in stream.text_stream:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    parts.append(delta)
+                    self._deltas.put(delta)
+                usage = usage_tokens(stream.get_final_message().usage)
+            self.narrative = ''.join(parts)
+        except CircuitOpenError as e:
+            skipped = True
+            self.error = f"⏸️ {e}"
+        except Exception as e:
+            if parts:
+                get_claude_breaker().record_failure()
+            self.error = f"❌ Error calling Claude API: {str(e)}"
+
+        if self.narrative is not None and key is not None:
+            get_narrative_cache().put(key, self.narrative, ttl=CLAUDE_CACHE_TTL)
+        if not skipped:
+            self.timing = {
+                'mode': 'Claude AI',
+                'model': self.model,
+                'source': 'stream',
+                'first_token_s': round(first_token - started, 4) if first_token is not None else None,
+                'total_s': round(time.perf_counter() - started, 4),
+                'error': self.error is not None,
+                'usage': usage
+            }
+            record_narrative_timing(self.timing)
+        self._done.set()
+        self._deltas.put(None)
+
+    def next_delta(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Next text delta, or None once the call has finished; raises queue.Empty on timeout."""
+        return self._deltas.get(timeout=timeout)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class NarrativeStream:
+    """
+    Streaming counterpart of analyze_with_narrative.
+
+    Iterating yields text deltas as Claude produces them (Free mode and cache
+    hits yield the whole narrative at once). Once exhausted, narrative and
+    error hold the same values analyze_with_narrative would have returned, and
+    timing holds time-to-first-token and total latency in seconds (plus token
+    usage for streamed Claude calls).
+
+    In Claude mode the local narrative is built while the request runs. If no
+    token arrives within latency_budget seconds, the call fails, or the circuit
+    breaker is open, the local story is yielded instead: fallback is True,
+    notice says why, and pending holds the still-running Claude call (if any)
+    whose late result can replace it.
+    """
+
+    def __init__(self, metrics: Dict[str, int], previous: Optional[Dict[str, int]] = None,
+                 changes: Optional[Dict[str, float]] = None, mode: str = 'Free',
+                 model: str = 'claude-sonnet-4-20250514', use_cache: bool = True,
+                 latency_budget: Optional[float] = None, **context):
+        self.metrics = metrics
+        self.previous = previous
+        self.changes = changes
+        self.mode = mode
+        self.model = model
+        self.use_cache = use_cache
+        self.latency_budget = CLAUDE_LATENCY_BUDGET if latency_budget is None else latency_budget
+        self.context = context  # severity_results, custom_thresholds, anomaly, archetype
+        self.narrative: Optional[str] = None
+        self.error: Optional[str] = None
+        self.timing: Optional[Dict] = None
+        self.fallback = False
+        self.notice: Optional[str] = None
+        self.pending: Optional[PendingNarrative] = None
+
+    def _local(self) -> Tuple[Optional[str], Optional[str]]:
+        return analyze_with_narrative(
+            self.metrics, self.previous, self.changes, mode='Free',
+            use_cache=self.use_cache, **self.context
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        started = time.perf_counter()
+        first_token = None
+        source = 'stream'
+        anomaly = self.context.get('anomaly')
+        key, prompt, key_error = claude_cache_key(
+            self.model, self.metrics, self.previous, self.changes, anomaly
+        ) if self.mode == 'Claude AI' else (None, None, None)
+        if self.mode != 'Claude AI':
+            source = 'local'
+            self.narrative, self.error = analyze_with_narrative(
+                self.metrics, self.previous, self.changes, mode=self.mode, model=self.model,
+                use_cache=self.use_cache, **self.context
+            )
+            if self.narrative:
+                first_token = time.perf_counter()
+                yield self.narrative
+        elif key_error:
+            source = 'unconfigured'
+            self.error = key_error
+        else:
+            cache = get_narrative_cache()
+            cached = cache.get(key) if self.use_cache else None
+            if cached is not None:
+                source = 'cache'
+                self.narrative = cached
+                first_token = time.perf_counter()
+                yield cached
+            else:
+                breaker = get_claude_breaker()
+                call = None
+                delta = None
+                if breaker.state == 'open':
+                    self.notice = (f"⏸️ Claude calls are paused after repeated failures "
+                                   f"(retrying in {breaker.retry_in():.0f}s) - showing the local story.")
+                else:
+                    call = PendingNarrative(self.model, prompt, key if self.use_cache else None)
+                local, local_error = self._local()  # Ready before Claude's first token, just in case
+                if call is not None:
+                    budget = self.latency_budget
+                    try:
+                        delta = call.next_delta(
+                            timeout=max(0.0, budget - (time.perf_counter() - started)) if budget > 0 else None
+                        )
+                        if delta is None and call.error:
+                            self.notice = f"{call.error} - showing the local story instead."
+                    except queue.Empty:
+                        self.pending = call
+                        self.notice = (f"⏱️ Claude has not answered within {budget:g}s - showing the local "
+                                       f"story; Claude's will replace it when it arrives.")
+
+                if call is not None and self.pending is None and not call.error:
+                    # Claude answered in time: stream the rest as it comes
+                    while delta is not None:
+                        yield delta
+                        delta = call.next_delta()
+                    self.narrative, self.error, self.timing = call.narrative, call.error, call.timing
+                    return
+                if local is None:
+                    self.error = call.error if call is not None and call.error else local_error
+                else:
+                    source = 'fallback'
+                    self.fallback = True
+                    self.narrative = local
+                    first_token = time.perf_counter()
+                    yield local
+
+        finished = time.perf_counter()
+        self.timing = {
+            'mode': self.mode,
+            'model': self.model if self.mode == 'Claude AI' else None,
+            'source': source,
+            'first_token_s': round(first_token - started, 4) if first_token is not None else None,
+            'total_s': round(finished - started, 4),
+            'error': self.error is not None,
+            'usage': None
+        }
+        record_narrative_timing(self.timing)
+
+
+def analyze_with_narrative_stream(
+    metrics: Dict[str, int],
+    previous: Optional[Dict[str, int]] = None,
+    changes: Optional[Dict[str, float]] = None,
+    mode: str = 'Free',
+    model: str = 'claude-sonnet-4-20250514',
+    severity_results: Optional[Dict] = None,
+    custom_thresholds: Optional[Dict] = None,
+    anomaly: Optional[Dict] = None,
+    archetype: Optional[Dict] = None,
+    use_cache: bool = True,
+    latency_budget: Optional[float] = None
+) -> NarrativeStream:
+    """
+    Same arguments as analyze_with_narrative (plus latency_budget, default
+    CLAUDE_LATENCY_BUDGET), but returns a NarrativeStream to iterate for text
+    deltas; read .narrative / .error / .timing / .fallback afterwards.
+    """
+    return NarrativeStream(
+        metrics, previous, changes, mode=mode, model=model, use_cache=use_cache, latency_budget=latency_budget,
+        severity_results=severity_results, custom_thresholds=custom_thresholds,
+        anomaly=anomaly, archetype=archetype
+    )
+
+
+def record_narrative_timing(timing: Dict) -> None:
+    """
+    Add a request record (mode, model, source, latency, usage) to the in-process
+    log; actual Claude calls also go to the persistent usage log.
+    """
+    _timings.append(timing)
+    if timing.get('source') in USAGE_LOGGED_SOURCES:
+        log_claude_call(timing)
+
+
+def recent_narrative_timings(n: int = 20) -> List[Dict]:
+    """Timings (and Claude token usage) of the last n narrative requests in this process, newest last."""
+    return list(_timings)[-n:]
+
+
+def prompt_cache_stats() -> Dict:
+    """
+    Prompt-cache effect over the Claude calls recorded in this process.
+
+    cache_hit_rate is the share of prompt tokens read from the cache; cached
+    reads are billed at about a tenth of normal input tokens.
+    """
+    calls = [t for t in _timings if t.get('usage')]
+    totals = {
+        key: sum(t['usage'][key] for t in calls)
+        for key in ('input_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens', 'output_tokens')
+    }
+    prompt_tokens = totals['input_tokens'] + totals['cache_read_input_tokens'] + totals['cache_creation_input_tokens']
+    totals['calls'] = len(calls)
+    totals['cache_hit_rate'] = totals['cache_read_input_tokens'] / prompt_tokens if prompt_tokens else 0.0
+    return totals
+
+
 def update_narrative_with_feedback(date, feedback):
     save_narrative(date, None, feedback)
     return True
@@ -0,0 +1,263 @@
+"""
+Anomaly module - multivariate "unusual day" score for each entry
+Mahalanobis distance against a running mean/covariance, so a day can be
+flagged even when no single metric crosses its *_high threshold.
+"""
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import ANOMALY_STATE_FILE, QUESTIONS
+
+# Every question is numeric once stored (yes/no answers are saved as 0/1)
+ANOMALY_KEYS = [q['key'] for q in QUESTIONS]
+METRIC_LABELS = {q['key']: q['label'] for q in QUESTIONS}
+
+MIN_HISTORY = 3          # Entries needed before a score is meaningful
+VARIANCE_FLOOR = 0.25    # Keeps never-changing metrics from exploding the distance
+UNUSUAL_PERCENTILE = 0.95
+RARE_PERCENTILE = 0.99
+
+_verified_version: Optional[str] = None  # Data version whose entry count the state file matched
+
+
+def _chi2_cdf(value: float, dof: int) -> float:
+    """Wilson-Hilferty approximation of the chi-square CDF (no scipy needed)."""
+    if value <= 0 or dof <= 0:
+        return 0.0
+    scale = 2.0 / (9.0 * dof)
+    z = ((value / dof) ** (1.0 / 3.0) - (1.0 - scale)) / math.sqrt(scale)
+    return 0.5 * math.erfc(-z / math.sqrt(2.0))
+
+
+class RunningCovariance:
+    """
+    Welford-style running mean and co-moment matrix over ANOMALY_KEYS.
+
+    update() is a rank-one update (O(k²)) so each new entry is folded in
+    without refitting the full history. Missing metrics are imputed with the
+    running mean, which leaves the mean untouched for that metric.
+    """
+
+    def __init__(self, keys: Optional[List[str]] = None, n: int = 0,
+                 mean: Optional[List[float]] = None, m2: Optional[List[List[float]]] = None,
+                 entries: Optional[int] = None):
+        self.keys = list(keys) if keys is not None else list(ANOMALY_KEYS)
+        k = len(self.keys)
+        self.n = int(n)
+        self.entries = self.n if entries is None else int(entries)  # Folded in, incl. entries with no values
+        self.mean = np.zeros(k) if mean is None else np.asarray(mean, dtype=float)
+        self.m2 = np.zeros((k, k)) if m2 is None else np.asarray(m2, dtype=float)
+
+    def _vector(self, entry: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (values, observed_mask) for an entry dict."""
+        values = np.zeros(len(self.keys))
+        observed = np.zeros(len(self.keys), dtype=bool)
+        for i, key in enumerate(self.keys):
+            raw = entry.get(key)
+            if raw is None or isinstance(raw, str):
+                continue
+            try:
+                value = float(raw)
+            except (ValueError, TypeError):
+                continue
+            if math.isnan(value):
+                continue
+            values[i] = value
+            observed[i] = True
+        return values, observed
+
+    def update(self, entry: Dict) -> None:
+        """Fold a single entry into the running statistics."""
+        self.entries += 1
+        values, observed = self._vector(entry)
+        if not observed.any():
+            return
+        values = np.where(observed, values, self.mean)
+        self.n += 1
+        delta = values - self.mean
+        self.mean += delta / self.n
+        self.m2 += np.outer(delta, values - self.mean)
+
+    def shrinkage(self) -> float:
+        """Shrinkage intensity toward the diagonal: strong for short histories."""
+        k = len(self.keys)
+        return k / (k + self.n) if self.n > 0 else 1.0
+
+    def covariance(self) -> np.ndarray:
+        """Shrunk covariance: (1 - λ)·S + λ·diag(S), with floored variances."""
+        sample = self.m2 / max(self.n - 1, 1)
+        variances = np.maximum(np.diag(sample), VARIANCE_FLOOR)
+        floored = sample.copy()
+        np.fill_diagonal(floored, variances)
+        lam = self.shrinkage()
+        return (1.0 - lam) * floored + lam * np.diag(variances)
+
+    def score(self, entry: Dict) -> Optional[Dict]:
+        """
+        Score an entry against the current statistics (does not update them).
+
+        Returns:
+            dict with distance, percentile, level and top contributing metrics,
+            or None when the history is too short or the entry is empty
+        """
+        if self.n < MIN_HISTORY:
+            return None
+        values, observed = self._vector(entry)
+        idx = np.flatnonzero(observed)
+        if idx.size == 0:
+            return None
+
+        cov = self.covariance()[np.ix_(idx, idx)]
+        diff = values[idx] - self.mean[idx]
+        weights = np.linalg.solve(cov, diff)
+        d2 = float(diff @ weights)
+        contributions = diff * weights  # Sums to d2; shows which metrics drive it
+
+        percentile = _chi2_cdf(d2, int(idx.size))
+        if percentile >= RARE_PERCENTILE:
+            level = 'rare'
+        elif percentile >= UNUSUAL_PERCENTILE:
+            level = 'unusual'
+        else:
+            level = 'typical'
+
+        top = []
+        for pos in np.argsort(-contributions)[:3]:
+            if contributions[pos] <= 0:
+                break
+            key = self.keys[idx[pos]]
+            top.append({
+                'key': key,
+                'label': METRIC_LABELS.get(key, key.replace('_', ' ').title()),
+                'value': float(values[idx[pos]]),
+                'mean': round(float(self.mean[idx[pos]]), 2),
+                'contribution': round(float(contributions[pos]), 2)
+            })
+
+        return {
+            'distance': round(math.sqrt(max(d2, 0.0)), 2),
+            'percentile': round(percentile * 100, 1),
+            'level': level,
+            'dof': int(idx.size),
+            'history': self.n,
+            'top_contributors': top
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'keys': self.keys,
+            'n': self.n,
+            'entries': self.entries,
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist()
+        }
+
+
+def _rebuild_from_history(history) -> Tuple[RunningCovariance, Dict[str, Dict]]:
+    """One-off replay of stored entries (state missing, stale or metric set changed)."""
+    stats = RunningCovariance()
+    scores = {}
+    if history is None or len(history) == 0:
+        return stats, scores
+    for entry in history.to_dict('records'):
+        result = stats.score(entry)
+        if result:
+            scores[str(entry.get('date'))] = result
+        stats.update(entry)
+    return stats, scores
+
+
+def load_anomaly_state(history=None) -> Tuple[RunningCovariance, Dict[str, Dict]]:
+    """
+    Load running statistics and stored per-date scores.
+
+    Rebuilds from history if the state file is missing, built for another
+    metric set, or counts a different number of entries than the history
+    (the data file was edited, replaced or restored outside the app). Without
+    history, the data file is counted once per data version.
+
+    Args:
+        history: DataFrame of stored entries to check against and rebuild from
+            (loaded if omitted and needed)
+    """
+    global _verified_version
+    from .data import get_data_version, load_data
+
+    version = get_data_version() if history is None else None
+    if ANOMALY_STATE_FILE.exists():
+        try:
+            with open(ANOMALY_STATE_FILE, 'r') as f:
+                state = json.load(f)
+            if state.get('keys') == ANOMALY_KEYS:
+                if version is not None and version != _verified_version:
+                    history = load_data()
+                if history is None or state['entries'] == len(history):
+                    if version is not None:
+                        _verified_version = version
+                    stats = RunningCovariance(state['keys'], state['n'], state['mean'], state['m2'],
+                                              state['entries'])
+                    return stats, state.get('scores', {})
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    if history is None:
+        history = load_data()
+    stats, scores = _rebuild_from_history(history)
+    _save_anomaly_state(stats, scores)
+    return stats, scores
+
+
+def _save_anomaly_state(stats: RunningCovariance, scores: Dict[str, Dict]) -> None:
+    ANOMALY_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(ANOMALY_STATE_FILE, 'w') as f:
+        json.dump({**stats.to_dict(), 'scores': scores}, f)
+
+
+def score_entry(entry: Dict) -> Optional[Dict]:
+    """Score an unsaved entry against the stored history (read-only)."""
+    stats, _ = load_anomaly_state()
+    return stats.score(entry)
+
+
+def record_entry(entry: Dict, history=None) -> Optional[Dict]:
+    """
+    Score a newly saved entry against the history before it, then fold it in.
+
+    Args:
+        entry: Metrics dict being saved
+        history: Entries stored before this one (used to validate / rebuild)
+    """
+    stats, scores = load_anomaly_state(history)
+    result = stats.score(entry)
+    stats.update(entry)
+    if result:
+        scores[str(entry.get('date'))] = result
+    _save_anomaly_state(stats, scores)
+    return result
+
+
+def get_entry_anomaly(date) -> Optional[Dict]:
+    """Return the stored anomaly score for a saved entry, if any."""
+    _, scores = load_anomaly_state()
+    return scores.get(str(date))
+
+
+def describe_anomaly(anomaly: Optional[Dict]) -> Optional[str]:
+    """One-line, human-readable summary for narratives and prompts."""
+    if not anomaly:
+        return None
+    drivers = ', '.join(
+        f"{c['label']} ({c['value']:.0f} vs usual {c['mean']:.1f})"
+        for c in anomaly.get('top_contributors', [])
+    )
+    text = (
+        f"{anomaly['level'].title()} combination of metrics "
+        f"(distance {anomaly['distance']:.1f}, percentile {anomaly['percentile']:.0f} "
+        f"against {anomaly['history']} past entries)"
+    )
+    if drivers:
+        text += f" — driven by {drivers}"
+    return text
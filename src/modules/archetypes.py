@@ -0,0 +1,320 @@
+"""
+Archetypes module - recognizes recurring "kinds of days" from the full metric vector
+Mini-batch k-means (Sculley, 2010) fitted once from history, then updated with a
+single online step each time an entry is saved, so it never needs a full retrain
+(unless the data file is edited, replaced or restored outside the app).
+"""
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import ARCHETYPES_STATE_FILE, QUESTIONS
+
+ARCHETYPE_KEYS = [q['key'] for q in QUESTIONS]
+METRIC_LABELS = {q['key']: q['label'] for q in QUESTIONS}
+# Yes/no answers are stored as 0/1; scale everything onto 0..1
+_SCALES = np.array([1.0 if q.get('type') == 'yesno' else float(q.get('max', 10)) for q in QUESTIONS])
+
+DEFAULT_K = 5
+MIN_ENTRIES_PER_CLUSTER = 3  # Fit only once there are k * this many entries
+BATCH_SIZE = 32
+FIT_ITERATIONS = 50
+
+# Named archetypes: a centroid takes the name whose signature metrics are highest
+ARCHETYPE_SIGNATURES = [
+    ('Meeting overload', ['unwanted_meetings', 'quiet_blocks_insufficient', 'urgent_alignment']),
+    ('Sleep-debt spiral', ['sleep_issues', 'signal_energy_drain', 'signal_tension_headache']),
+    ('Chaos crunch', ['project_chaos', 'deadline_pressure', 'unmet_requests']),
+    ('Anxious overdrive', ['anxiety', 'signal_mind_noise', 'signal_body_tension']),
+    ('Boundary strain', ['cannot_say_no', 'flag_people_pleasing', 'apologies']),
+    ('Blocked & stuck', ['jira_blocked', 'no_ownership', 'signal_focus_friction']),
+]
+SIGNATURE_LEVEL = 0.55  # Average scaled value a signature needs to name a centroid
+STEADY_LEVEL = 0.35
+
+_verified_version: Optional[str] = None  # Data version whose entry count the state file matched
+
+
+class ArchetypeModel:
+    """
+    Mini-batch k-means over scaled metric vectors with missing-value masks.
+
+    Each centroid dimension keeps its own update count, so the per-dimension
+    learning rate is 1 / count and unanswered optional metrics never pull a
+    centroid toward zero.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, centroids=None, counts=None, sizes=None, entries: int = 0):
+        self.k = k
+        self.entries = int(entries)  # Stored entries fitted or folded in, incl. unassignable ones
+        d = len(ARCHETYPE_KEYS)
+        self.centroids = np.zeros((k, d)) if centroids is None else np.asarray(centroids, dtype=float)
+        self.counts = np.zeros((k, d)) if counts is None else np.asarray(counts, dtype=float)
+        self.sizes = np.zeros(k, dtype=int) if sizes is None else np.asarray(sizes, dtype=int)
+
+    @staticmethod
+    def _vector(entry: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (scaled_values, observed_mask) for an entry dict."""
+        values = np.zeros(len(ARCHETYPE_KEYS))
+        observed = np.zeros(len(ARCHETYPE_KEYS), dtype=bool)
+        for i, key in enumerate(ARCHETYPE_KEYS):
+            raw = entry.get(key)
+            if raw is None or isinstance(raw, str):
+                continue
+            try:
+                value = float(raw)
+            except (ValueError, TypeError):
+                continue
+            if math.isnan(value):
+                continue
+            values[i] = value / _SCALES[i]
+            observed[i] = True
+        return values, observed
+
+    def _distances(self, values: np.ndarray, observed: np.ndarray) -> np.ndarray:
+        """Mean squared distance to every centroid over the observed metrics."""
+        if not observed.any():
+            return np.full(self.k, np.inf)
+        diff = self.centroids[:, observed] - values[observed]
+        return (diff ** 2).mean(axis=1)
+
+    def assign(self, entry: Dict) -> Tuple[Optional[int], float]:
+        """Nearest centroid for an entry: (cluster, rms_distance)."""
+        values, observed = self._vector(entry)
+        distances = self._distances(values, observed)
+        if not np.isfinite(distances).any():
+            return None, float('inf')
+        cluster = int(np.argmin(distances))
+        return cluster, float(math.sqrt(distances[cluster]))
+
+    def partial_fit(self, entries: List[Dict]) -> List[Optional[int]]:
+        """One mini-batch step: assign the batch, then move each centroid toward its members."""
+        batch = [self._vector(entry) for entry in entries]
+        clusters = []
+        for values, observed in batch:
+            distances = self._distances(values, observed)
+            clusters.append(int(np.argmin(distances)) if np.isfinite(distances).any() else None)
+        for (values, observed), cluster in zip(batch, clusters):
+            if cluster is None:
+                continue
+            self.counts[cluster, observed] += 1
+            rate = 1.0 / self.counts[cluster, observed]
+            self.centroids[cluster, observed] += rate * (values[observed] - self.centroids[cluster, observed])
+        return clusters
+
+    def fit(self, entries: List[Dict], seed: int = 0) -> List[Optional[int]]:
+        """Initial fit: k-means++ seeding, then random mini-batches; returns assignments."""
+        rng = np.random.default_rng(seed)
+        vectors = [self._vector(entry) for entry in entries]
+        matrix = np.array([values for values, _ in vectors])
+        masks = np.array([observed for _, observed in vectors])
+        column_means = np.divide(
+            (matrix * masks).sum(axis=0), masks.sum(axis=0),
+            out=np.zeros(matrix.shape[1]), where=masks.sum(axis=0) > 0
+        )
+        imputed = np.where(masks, matrix, column_means)
+
+        # k-means++ seeding on the imputed matrix
+        centers = [imputed[rng.integers(len(imputed))]]
+        for _ in range(1, self.k):
+            nearest = np.min([((imputed - c) ** 2).sum(axis=1) for c in centers], axis=0)
+            total = nearest.sum()
+            probabilities = nearest / total if total > 0 else None
+            centers.append(imputed[rng.choice(len(imputed), p=probabilities)])
+        self.centroids = np.array(centers, dtype=float)
+        self.counts = np.zeros_like(self.centroids)
+
+        for _ in range(FIT_ITERATIONS):
+            picks = rng.choice(len(entries), size=min(BATCH_SIZE, len(entries)), replace=False)
+            self.partial_fit([entries[i] for i in picks])
+
+        assignments = [self.assign(entry)[0] for entry in entries]
+        self.sizes = np.bincount([a for a in assignments if a is not None], minlength=self.k)
+        self.entries = len(entries)
+        return assignments
+
+    def name(self, cluster: int) -> str:
+        """Human-readable archetype name derived from the centroid."""
+        centroid = dict(zip(ARCHETYPE_KEYS, self.centroids[cluster]))
+        best_name, best_level = None, SIGNATURE_LEVEL
+        for name, keys in ARCHETYPE_SIGNATURES:
+            level = float(np.mean([centroid[key] for key in keys]))
+            if level >= best_level:
+                best_name, best_level = name, level
+        if best_name:
+            return best_name
+        sliders = [centroid[q['key']] for q in QUESTIONS if q.get('type') != 'yesno']
+        return 'Steady day' if float(np.mean(sliders)) < STEADY_LEVEL else 'Mixed load'
+
+    def names(self) -> List[str]:
+        """Names for all clusters, disambiguated when two centroids share one."""
+        base = [self.name(c) for c in range(self.k)]
+        seen = {}
+        names = []
+        for name in base:
+            seen[name] = seen.get(name, 0) + 1
+            names.append(f"{name} ({seen[name]})" if base.count(name) > 1 else name)
+        return names
+
+    def signature(self, cluster: int, top: int = 3) -> List[Dict]:
+        """Highest slider metrics of a centroid on the original 0-10 scale."""
+        centroid = np.where(_SCALES > 1, self.centroids[cluster], -np.inf)
+        order = np.argsort(-centroid)[:top]
+        return [
+            {
+                'key': ARCHETYPE_KEYS[i],
+                'label': METRIC_LABELS[ARCHETYPE_KEYS[i]],
+                'value': round(float(centroid[i] * _SCALES[i]), 1)
+            }
+            for i in order
+        ]
+
+    def to_dict(self) -> Dict:
+        return {
+            'keys': ARCHETYPE_KEYS,
+            'k': self.k,
+            'centroids': self.centroids.tolist(),
+            'counts': self.counts.tolist(),
+            'sizes': self.sizes.tolist(),
+            'entries': self.entries
+        }
+
+
+def _save_state(model: ArchetypeModel, assignments: Dict[str, int]) -> None:
+    ARCHETYPES_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(ARCHETYPES_STATE_FILE, 'w') as f:
+        json.dump({**model.to_dict(), 'assignments': assignments}, f)
+
+
+def load_archetypes(history=None) -> Tuple[Optional[ArchetypeModel], Dict[str, int]]:
+    """
+    Load the fitted model and per-date assignments.
+
+    Fits from history when no usable state exists, or the state was fitted on
+    a different number of entries than the history (the data file was edited,
+    replaced or restored outside the app), and enough entries are stored;
+    returns (None, {}) while the history is still too short. Without history,
+    the data file is counted once per data version.
+
+    Args:
+        history: DataFrame of stored entries to check against and fit from
+            (loaded if omitted and needed)
+    """
+    global _verified_version
+    from .data import get_data_version, load_data
+
+    version = get_data_version() if history is None else None
+    if ARCHETYPES_STATE_FILE.exists():
+        try:
+            with open(ARCHETYPES_STATE_FILE, 'r') as f:
+                state = json.load(f)
+            if state.get('keys') == ARCHETYPE_KEYS:
+                if version is not None and version != _verified_version:
+                    history = load_data()
+                if history is None or state['entries'] == len(history):
+                    if version is not None:
+                        _verified_version = version
+                    model = ArchetypeModel(state['k'], state['centroids'], state['counts'], state['sizes'],
+                                           state['entries'])
+                    return model, state.get('assignments', {})
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    if history is None:
+        history = load_data()
+    if len(history) < DEFAULT_K * MIN_ENTRIES_PER_CLUSTER:
+        return None, {}
+
+    entries = history.to_dict('records')
+    model = ArchetypeModel(DEFAULT_K)
+    clusters = model.fit(entries)
+    assignments = {
+        str(entry.get('date')): cluster
+        for entry, cluster in zip(entries, clusters) if cluster is not None
+    }
+    _save_state(model, assignments)
+    return model, assignments
+
+
+def update_archetypes(entry: Dict, history=None) -> Optional[int]:
+    """
+    Assign a newly saved entry and fold it in with one online mini-batch step.
+
+    Args:
+        entry: Metrics dict being saved
+        history: Entries stored before this one (used to validate / fit)
+    """
+    model, assignments = load_archetypes(history)
+    if model is None:
+        return None
+    cluster = model.partial_fit([entry])[0]
+    model.entries += 1
+    if cluster is not None:
+        model.sizes[cluster] += 1
+        assignments[str(entry.get('date'))] = cluster
+    _save_state(model, assignments)
+    return cluster
+
+
+def _cluster_info(model: ArchetypeModel, cluster: int, distance: float, names: List[str]) -> Dict:
+    total = int(model.sizes.sum())
+    return {
+        'cluster': cluster,
+        'name': names[cluster],
+        'distance': round(distance * 10, 2),  # RMS distance on the 0-10 scale
+        'size': int(model.sizes[cluster]),
+        'share': round(100 * float(model.sizes[cluster]) / total, 1) if total else 0.0,
+        'signature': model.signature(cluster)
+    }
+
+
+def classify_entry(entry: Dict) -> Optional[Dict]:
+    """Archetype of an entry against the current model (read-only)."""
+    return classify_entries([entry])[0]
+
+
+def classify_entries(entries: List[Dict]) -> List[Optional[Dict]]:
+    """Archetypes for many entries, loading the model once (read-only)."""
+    model, _ = load_archetypes()
+    if model is None:
+        return [None] * len(entries)
+    names = model.names()
+    results = []
+    for entry in entries:
+        cluster, distance = model.assign(entry)
+        results.append(None if cluster is None else _cluster_info(model, cluster, distance, names))
+    return results
+
+
+def get_archetype_summary() -> List[Dict]:
+    """All archetypes with sizes and centroids (on the original scale)."""
+    model, _ = load_archetypes()
+    if model is None:
+        return []
+    names = model.names()
+    return [
+        {
+            'cluster': c,
+            'name': names[c],
+            'size': int(model.sizes[c]),
+            'signature': model.signature(c),
+            'centroid': {
+                key: round(float(value * _SCALES[i]), 1)
+                for i, (key, value) in enumerate(zip(ARCHETYPE_KEYS, model.centroids[c]))
+            }
+        }
+        for c in range(model.k)
+    ]
+
+
+def describe_archetype(archetype: Optional[Dict]) -> Optional[str]:
+    """One-line citation of an entry's archetype for narratives."""
+    if not archetype:
+        return None
+    typical = ', '.join(f"{s['label']} {s['value']:.1f}" for s in archetype['signature'])
+    return (
+        f"Looks like a *{archetype['name']}* day — {archetype['size']} past entries "
+        f"({archetype['share']:.0f}% of history) share this pattern; typical: {typical}"
+    )
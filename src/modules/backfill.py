@@ -0,0 +1,261 @@
+"""
+Backfill module - bulk Claude narratives through the Message Batches API
+Builds the regular Claude prompt for every stored entry in a date range,
+submits them as message batches (half the per-token price, no UI latency),
+polls until the batches end and writes the narratives back in batched
+commits. Batch IDs are saved to a job file before polling, so an interrupted
+run resumes collecting instead of paying for the same requests twice.
+"""
+import hashlib
+import json
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import CLAUDE_BACKFILL_JOB_FILE
+from .usage_log import append_usage, narrative_cost, usage_record
+
+BATCH_MAX_REQUESTS = 10_000  # Requests per submitted batch (API limit is 100k / 256 MB)
+POLL_INTERVAL = 30           # Seconds between batch status checks
+COMMIT_EVERY = 500           # Narratives buffered before each write to the data file
+BATCH_DISCOUNT = 0.5         # Batch requests cost half the standard token price
+
+_stop = threading.Event()
+
+
+def _job_key(start: date, end: date, model: str) -> str:
+    payload = json.dumps([str(start), str(end), model])
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def _save_job(job: Dict) -> None:
+    CLAUDE_BACKFILL_JOB_FILE.parent.mkdir(parents=True, exist_ok=True)
+    job['updated_at'] = datetime.now().isoformat()
+    with open(CLAUDE_BACKFILL_JOB_FILE, 'w') as f:
+        json.dump(job, f)
+
+
+def load_backfill_job() -> Optional[Dict]:
+    """Last Claude backfill job (batches, progress, usage), or None if none was run."""
+    if not CLAUDE_BACKFILL_JOB_FILE.exists():
+        return None
+    try:
+        with open(CLAUDE_BACKFILL_JOB_FILE, 'r') as f:
+            job = json.load(f)
+    except ValueError:
+        return None
+    job['done'] = len(job.get('completed', []))
+    return job
+
+
+def _clean(entry: Dict) -> Dict:
+    """NaN (missing answers) -> None, as entries built in the UI have them."""
+    return {key: (None if not isinstance(value, str) and pd.isna(value) else value) for key, value in entry.items()}
+
+
+def build_batch_requests(df: pd.DataFrame, positions: List[int], model: str) -> List[Dict]:
+    """
+    One Message Batches request per row position, custom_id = entry date.
+
+    Each prompt is exactly what Regenerate would send for that entry: the
+    cached system prompt plus build_context_prompt with the previous entry,
+    changes and the stored anomaly score.
+    """
+    from .analysis import CLAUDE_MAX_TOKENS
+    from .anomaly import load_anomaly_state
+    from .data import get_metric_changes
+    from .effectiveness import prompt_effects
+    from .narratives import build_context_prompt, build_system_prompt
+
+    _, scores = load_anomaly_state(df)
+    system = build_system_prompt()
+    effects = prompt_effects()  # Same table for every request
+    records = df.to_dict('records')
+    requests = []
+    for position in positions:
+        entry = _clean(records[position])
+        entry['date'] = str(entry['date'])
+        previous = _clean(records[position - 1]) if position > 0 else None
+        prompt = build_context_prompt(
+            entry, previous, get_metric_changes(entry, previous), anomaly=scores.get(entry['date']), effects=effects
+        )
+        requests.append({
+            'custom_id': entry['date'],
+            'params': {
+                'model': model,
+                'max_tokens': CLAUDE_MAX_TOKENS,
+                'system': system,
+                'messages': [{'role': 'user', 'content': prompt}]
+            }
+        })
+    return requests
+
+
+def _submit(client, job: Dict, df: pd.DataFrame, start: date, end: date) -> None:
+    """
+    Submit every entry in range not yet in a batch, saving each batch ID as
+    soon as it exists (a resumed job only submits what is left).
+    """
+    dates = df['date'].astype(str)
+    days = pd.to_datetime(dates, errors='coerce').dt.date
+    in_range = np.flatnonzero(((days >= start) & (days <= end)).to_numpy())
+    # One request per date (custom_ids must be unique); the last row for a date wins
+    last = ~dates.iloc[in_range].duplicated(keep='last').to_numpy()
+    positions = [int(p) for p in in_range[last]]
+    job['total'] = len(positions)
+
+    submitted = {d for batch in job['batches'] for d in batch['dates']}
+    positions = [p for p in positions if dates.iloc[p] not in submitted]
+    _save_job(job)
+    for offset in range(0, len(positions), BATCH_MAX_REQUESTS):
+        if _stop.is_set():
+            return
+        requests = build_batch_requests(df, positions[offset:offset + BATCH_MAX_REQUESTS], job['model'])
+        batch = client.messages.batches.create(requests=requests)
+        job['batches'].append({
+            'id': batch.id, 'dates': [r['custom_id'] for r in requests],
+            'status': batch.processing_status, 'collected': False
+        })
+        _save_job(job)
+    job['submitted'] = True
+
+
+def _collect(client, job: Dict, batch: Dict, commit: Callable[[], None], buffer: Dict) -> None:
+    """Stream an ended batch's results into the write buffer and the usage log."""
+    from .analysis import fetch_claude_pricing_from_web, usage_tokens
+
+    price_table = fetch_claude_pricing_from_web()
+    records = []
+    for item in client.messages.batches.results(batch['id']):
+        result = item.result
+        if result.type == 'succeeded':
+            buffer[item.custom_id] = ''.join(
+                block.text for block in result.message.content if getattr(block, 'type', None) == 'text'
+            )
+            usage = usage_tokens(result.message.usage)
+            for key in job['usage']:
+                job['usage'][key] += usage[key]
+            cost = narrative_cost(usage, price_table.get(job['model']))
+            records.append(usage_record(
+                job['model'], 'batch', usage, None, cost=cost * BATCH_DISCOUNT if cost is not None else None,
+                pricing=price_table
+            ))
+            if len(buffer) >= COMMIT_EVERY:
+                commit()
+        elif result.type == 'errored':
+            job['errors'][item.custom_id] = getattr(getattr(result.error, 'error', None), 'message', None) or 'errored'
+            records.append(usage_record(job['model'], 'batch', None, None, error=True))
+        else:  # canceled / expired
+            job['errors'][item.custom_id] = result.type
+    append_usage(records)
+    batch['collected'] = True
+
+
+def batch_cost(usage: Dict[str, int], model: str) -> Optional[float]:
+    """Dollar cost of a backfill's token usage at the batch discount; None if the model is unpriced."""
+    from .analysis import fetch_claude_pricing_from_web
+
+    cost = narrative_cost(usage, fetch_claude_pricing_from_web().get(model))
+    return cost * BATCH_DISCOUNT if cost is not None else None
+
+
+def run_backfill(
+    start: date,
+    end: date,
+    model: str,
+    poll_interval: float = POLL_INTERVAL,
+    resume: bool = True,
+    progress: Optional[Callable[[Dict], None]] = None,
+    client=None
+) -> Dict:
+    """
+    Replace the stored narratives in [start, end] with Claude narratives via batches.
+
+    Args:
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        model: Claude model ID
+        poll_interval: Seconds between status checks while batches run
+        resume: Reuse the batches of an unfinished job with the same range and model
+        progress: Optional callback(job) after each poll round and batched write
+        client: Anthropic client (default: the shared pooled client)
+
+    Returns:
+        dict: the final job record (status, total, done, errors, usage, cost)
+    """
+    from .claude_client import get_claude_client
+    from .data import data_file_lock, load_data, update_entry_recommendations
+    from .narratives import replace_narratives
+
+    client = client or get_claude_client()
+    key = _job_key(start, end, model)
+    previous = load_backfill_job()
+    if resume and previous and previous.get('key') == key and previous.get('status') != 'completed':
+        job = previous
+        job['status'] = 'running'
+    else:
+        job = {
+            'key': key, 'start': str(start), 'end': str(end), 'model': model,
+            'status': 'running', 'total': 0, 'submitted': False, 'batches': [], 'completed': [], 'errors': {},
+            'usage': {'input_tokens': 0, 'output_tokens': 0,
+                      'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0},
+            'error': None, 'started_at': datetime.now().isoformat()
+        }
+
+    buffer = {}
+
+    def commit():
+        if buffer:
+            with data_file_lock():  # Entries saved meanwhile are kept
+                update_entry_recommendations(buffer)
+                replace_narratives(buffer, 'Claude AI')  # So a Free re-narration keeps them
+            job['completed'].extend(buffer)
+            buffer.clear()
+        job['cost'] = batch_cost(job['usage'], model)
+        _save_job(job)
+        if progress:
+            progress(load_backfill_job())
+
+    try:
+        if not job.get('submitted'):
+            df = load_data()
+            if len(df) == 0 or 'date' not in df.columns:
+                job['status'] = 'completed'
+                _save_job(job)
+                return load_backfill_job()
+            _submit(client, job, df, start, end)
+
+        while not _stop.is_set():
+            waiting = False
+            for batch in job['batches']:
+                if batch['collected']:
+                    continue
+                status = client.messages.batches.retrieve(batch['id'])
+                batch['status'] = status.processing_status
+                batch['counts'] = status.request_counts.model_dump()
+                if status.processing_status == 'ended':
+                    _collect(client, job, batch, commit, buffer)
+                else:
+                    waiting = True
+            commit()
+            if not waiting:
+                break
+            _stop.wait(poll_interval)
+        finished = job.get('submitted') and all(b['collected'] for b in job['batches'])
+        job['status'] = 'completed' if finished else 'interrupted'
+    except Exception as e:
+        commit()
+        job['status'] = 'failed'
+        job['error'] = str(e)
+    _stop.clear()
+    job['cost'] = batch_cost(job['usage'], model)
+    _save_job(job)
+    return load_backfill_job()
+
+
+def stop_backfill() -> None:
+    """Stop polling after the current round; batch IDs are kept for a later resume."""
+    _stop.set()
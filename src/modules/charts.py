@@ -0,0 +1,180 @@
+"""
+Charts module - one cached figure builder for the desktop and mobile dashboards
+Traces come from the downsampled series (every entry when raw points are
+asked for, or weekly / monthly rollups) and switch to WebGL (Scattergl) once
+a trace is long enough for SVG to drag. Built figures are memoised per
+metric selection, window, granularity, style and data version, so an
+unchanged chart is not rebuilt on a rerun (st.plotly_chart still serializes
+it each time).
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from .downsample import chart_series, max_points_for_width, minmax_indices
+
+WEBGL_POINTS = 1000     # Points per trace above which Scattergl replaces Scatter
+GRANULARITIES = ('entry', 'week', 'month')
+ROLLUP_STATS = ('mean', 'max', 'p90')
+FIGURE_CACHE_SLOTS = 16
+
+PASTEL_COLORS = ['#ff8fa3', '#f6bd60', '#84a59d', '#f28482', '#f5cac3', '#b8c0ff']
+GRADIENT_COLORS = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#fa709a', '#fee140', '#30cfd0']
+
+CHART_STYLES = {
+    'adhd': {'height': 320, 'y_title': "Score (0-10)", 'colors': PASTEL_COLORS},
+    'work': {'height': 400, 'y_title': "Score (1-10)", 'colors': GRADIENT_COLORS},
+    'individual': {'height': 400, 'y_title': "Score (1-10)", 'colors': GRADIENT_COLORS},
+    'mobile': {'height': 300, 'y_title': "Score", 'colors': PASTEL_COLORS, 'legend_below': True},
+}
+
+_lock = threading.Lock()
+_figures: 'OrderedDict[tuple, go.Figure]' = OrderedDict()
+
+
+def build_metric_figure(series: Dict[str, pd.DataFrame], labels: Dict[str, str], style: str = 'adhd',
+                        webgl_points: int = WEBGL_POINTS) -> go.Figure:
+    """
+    Line chart with one trace per metric.
+
+    Args:
+        series: metric key -> frame with 'date' and the metric column
+        labels: metric key -> legend label
+        style: key of CHART_STYLES (height, axis title, palette)
+        webgl_points: traces longer than this are drawn with Scattergl
+    """
+    spec = CHART_STYLES[style]
+    colors = spec['colors']
+    fig = go.Figure()
+    for i, (key, points) in enumerate(series.items()):
+        trace = go.Scattergl if len(points) > webgl_points else go.Scatter
+        fig.add_trace(trace(
+            x=points['date'],
+            y=points[key],
+            name=labels.get(key, key),
+            mode='lines+markers',
+            line=dict(color=colors[i % len(colors)], width=3),
+            marker=dict(size=8)
+        ))
+
+    fig.update_layout(
+        height=spec['height'],
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        yaxis=dict(range=[0, 10], title=spec['y_title']),
+        xaxis=dict(title="Date"),
+        showlegend=True
+    )
+    if spec.get('legend_below'):
+        fig.update_layout(legend=dict(orientation='h', y=-0.25), margin=dict(l=10, r=10, t=10, b=10))
+    return fig
+
+
+def build_timeline_figure(timeline: pd.DataFrame, max_points: Optional[int] = None) -> go.Figure:
+    """
+    Stacked area of problem metrics per entry (increasing on top of continuous).
+
+    Args:
+        timeline: frame from history.severity_timeline()
+        max_points: entries kept, by min/max of the problem count (default: chart width)
+    """
+    if max_points is None:
+        max_points = max_points_for_width()
+    problems = (timeline['increasing'] + timeline['continuous']).to_numpy(dtype=float)
+    points = timeline.iloc[minmax_indices(problems, max_points)]
+    fig = go.Figure()
+    for column, name, color in (('continuous', "Continuous", '#f39c12'), ('increasing', "Increasing", '#e74c3c')):
+        fig.add_trace(go.Scatter(
+            x=points['date'],
+            y=points[column],
+            name=name,
+            mode='lines',
+            stackgroup='problems',
+            line=dict(color=color, width=1)
+        ))
+    fig.update_layout(
+        height=160,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin=dict(l=10, r=10, t=10, b=10),
+        yaxis=dict(title="Problems"),
+        legend=dict(orientation='h', y=1.15),
+        showlegend=True
+    )
+    return fig
+
+
+def _rollup_series(df: pd.DataFrame, keys, window: int, period: str, stat: str) -> Dict[str, pd.DataFrame]:
+    """Per-metric weekly or monthly stat for the buckets covering the last window rows."""
+    from .rollups import load_rollups, rollup_table
+
+    state = load_rollups(df)
+    since = df['date'].iloc[-min(window, len(df))]
+    return {
+        key: rollup_table(period, key, since=since, state=state)[['date', stat]].rename(columns={stat: key})
+        for key in keys
+    }
+
+
+def metric_figure(df: pd.DataFrame, metrics: List[Dict], window: int, style: str = 'adhd',
+                  raw: bool = False, max_points: Optional[int] = None,
+                  version: Optional[str] = None, granularity: str = 'entry',
+                  stat: str = 'mean') -> go.Figure:
+    """
+    Cached dashboard figure for the selected metrics over the last window rows.
+    Treat the result as read-only; it is shared by every session.
+
+    Args:
+        df: full history with parsed dates
+        metrics: selected metrics as {'key': ..., 'label': ...}
+        window: rows from the end of df to plot
+        style: key of CHART_STYLES
+        raw: plot every entry instead of the downsampled series
+        max_points: points per trace when downsampling (default: chart width)
+        version: data version (default: get_data_version())
+        granularity: 'entry', or 'week' / 'month' to plot rollup buckets
+        stat: rollup statistic to plot ('mean', 'max' or 'p90')
+    """
+    if max_points is None:
+        max_points = max_points_for_width()
+    if version is None:
+        from .data import get_data_version
+        version = get_data_version()
+
+    keys = tuple(metric['key'] for metric in metrics)
+    if granularity == 'entry':
+        stat = None  # Unused options must not split the cache
+    else:
+        raw = False
+    cache_key = (version, keys, window, style, raw, max_points, granularity, stat)
+    with _lock:
+        if cache_key in _figures:
+            _figures.move_to_end(cache_key)
+            return _figures[cache_key]
+
+    if granularity != 'entry':
+        series = _rollup_series(df, keys, window, granularity, stat)
+    elif raw:
+        window_df = df.tail(window)
+        series = {key: window_df[['date', key]] for key in keys}
+    else:
+        series = {key: chart_series(df, key, window, max_points, version) for key in keys}
+    labels = {metric['key']: metric.get('label', metric['key']) for metric in metrics}
+    figure = build_metric_figure(series, labels, style)
+
+    with _lock:
+        _figures[cache_key] = figure
+        while len(_figures) > FIGURE_CACHE_SLOTS:
+            _figures.popitem(last=False)
+    return figure
+
+
+def clear_figure_cache() -> None:
+    """Drop every memoised figure."""
+    with _lock:
+        _figures.clear()
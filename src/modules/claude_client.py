@@ -0,0 +1,126 @@
+"""
+Claude client module - one pooled Anthropic client per process
+Reusing the client keeps HTTP keep-alive connections (and TLS sessions)
+warm across calls instead of reconnecting for every narrative.
+"""
+import threading
+from typing import Dict, Optional
+
+import anthropic
+from anthropic import Anthropic, AsyncAnthropic
+
+from .config import (
+    ANTHROPIC_API_KEY, ANTHROPIC_BASE_URL, ANTHROPIC_MAX_CONNECTIONS,
+    ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS, ANTHROPIC_KEEPALIVE_EXPIRY,
+    ANTHROPIC_TIMEOUT, ANTHROPIC_CONNECT_TIMEOUT, ANTHROPIC_MAX_RETRIES
+)
+
+# Limits/Timeout classes of whichever httpx build the installed SDK uses
+_Limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+_Timeout = type(anthropic.DEFAULT_TIMEOUT)
+
+_settings = {
+    'api_key': ANTHROPIC_API_KEY,
+    'base_url': ANTHROPIC_BASE_URL,
+    'max_connections': ANTHROPIC_MAX_CONNECTIONS,
+    'max_keepalive_connections': ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS,
+    'keepalive_expiry': ANTHROPIC_KEEPALIVE_EXPIRY,
+    'timeout': ANTHROPIC_TIMEOUT,
+    'connect_timeout': ANTHROPIC_CONNECT_TIMEOUT,
+    'max_retries': ANTHROPIC_MAX_RETRIES
+}
+_client: Optional[Anthropic] = None
+_lock = threading.Lock()
+
+
+def client_settings() -> Dict:
+    """Current pool/timeout settings (api_key omitted)."""
+    return {k: v for k, v in _settings.items() if k != 'api_key'}
+
+
+def api_key_configured() -> bool:
+    """True when the client has a real (non-placeholder) API key."""
+    api_key = _settings['api_key']
+    return bool(api_key) and api_key != 'your_key_here'
+
+
+def _check_settings(overrides: Dict) -> None:
+    unknown = set(overrides) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown Claude client settings: {', '.join(sorted(unknown))}")
+
+
+def _pool_options(settings: Dict) -> Dict:
+    """Connection-pool limits and timeouts for the SDK's httpx client."""
+    return {
+        'limits': _Limits(
+            max_connections=settings['max_connections'],
+            max_keepalive_connections=settings['max_keepalive_connections'],
+            keepalive_expiry=settings['keepalive_expiry']
+        ),
+        'timeout': _Timeout(settings['timeout'], connect=settings['connect_timeout'])
+    }
+
+
+def build_claude_client(**overrides) -> Anthropic:
+    """
+    New Anthropic client with its own connection pool.
+
+    Args:
+        **overrides: Any key of the module settings (api_key, base_url,
+            max_connections, max_keepalive_connections, keepalive_expiry,
+            timeout, connect_timeout, max_retries)
+    """
+    _check_settings(overrides)
+    settings = {**_settings, **overrides}
+    http_client = anthropic.DefaultHttpxClient(**_pool_options(settings))
+    return Anthropic(
+        api_key=settings['api_key'],
+        base_url=settings['base_url'],
+        max_retries=settings['max_retries'],
+        http_client=http_client
+    )
+
+
+def build_async_claude_client(**overrides) -> AsyncAnthropic:
+    """
+    AsyncAnthropic client with the same settings as build_claude_client.
+
+    Async clients are tied to the event loop that uses them, so build one per
+    asyncio.run() (e.g. per model comparison) and close it before the loop ends.
+    """
+    _check_settings(overrides)
+    settings = {**_settings, **overrides}
+    http_client = anthropic.DefaultAsyncHttpxClient(**_pool_options(settings))
+    return AsyncAnthropic(
+        api_key=settings['api_key'],
+        base_url=settings['base_url'],
+        max_retries=settings['max_retries'],
+        http_client=http_client
+    )
+
+
+def get_claude_client() -> Anthropic:
+    """Process-wide pooled client, created on first use (thread-safe)."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = build_claude_client()
+    return _client
+
+
+def configure_claude_client(**overrides) -> None:
+    """Change settings for the shared client; the next call builds a fresh pool."""
+    global _client
+    with _lock:
+        _check_settings(overrides)
+        _settings.update(overrides)
+        old, _client = _client, None
+    if old is not None:
+        old.close()
+
+
+def close_claude_client() -> None:
+    """Close the shared client's connections (it is rebuilt on next use)."""
+    configure_claude_client()
@@ -0,0 +1,94 @@
+"""
+Compare module - one prompt, several Claude models, in parallel
+Sends the same narrative prompt to 2-4 models concurrently (asyncio +
+AsyncAnthropic) and reports each result as soon as it finishes, with its
+latency, token usage and cost from the cached pricing table.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+from .analysis import CLAUDE_MAX_TOKENS, fetch_claude_pricing_from_web, record_narrative_timing, usage_tokens
+from .claude_client import api_key_configured, build_async_claude_client
+from .narrative_cache import get_narrative_cache, prompt_cache_key, CLAUDE_CACHE_TTL
+from .narratives import SYSTEM_PROMPT, build_context_prompt, build_system_prompt
+from .usage_log import narrative_cost
+
+MIN_MODELS = 2
+MAX_MODELS = 4
+
+async def _ask(client, model: str, system: List[Dict], prompt: str, pricing: Dict) -> Dict:
+    started = time.perf_counter()
+    result = {'model': model, 'narrative': None, 'error': None, 'usage': None, 'cost': None}
+    try:
+        message = await client.messages.create(
+            model=model,
+            max_tokens=CLAUDE_MAX_TOKENS,
+            system=system,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        result['narrative'] = message.content[0].text
+        result['usage'] = usage_tokens(message.usage)
+        result['cost'] = narrative_cost(result['usage'], pricing.get(model))
+    except Exception as e:
+        result['error'] = f"❌ Error calling Claude API: {str(e)}"
+    result['latency_s'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+async def _compare(models: List[str], system: List[Dict], prompt: str, pricing: Dict,
+                   on_result: Optional[Callable[[Dict], None]]) -> List[Dict]:
+    client = build_async_claude_client()
+    try:
+        tasks = [asyncio.ensure_future(_ask(client, model, system, prompt, pricing)) for model in models]
+        for finished in asyncio.as_completed(tasks):
+            result = await finished
+            if on_result:
+                on_result(result)
+        return [task.result() for task in tasks]
+    finally:
+        await client.close()
+
+
+def compare_models(
+    metrics: Dict,
+    previous: Optional[Dict],
+    changes: Optional[Dict],
+    models: List[str],
+    anomaly: Optional[Dict] = None,
+    on_result: Optional[Callable[[Dict], None]] = None
+) -> List[Dict]:
+    """
+    Generate the same Claude narrative with several models at once.
+
+    Args:
+        metrics: Current metric values
+        previous: Previous metric values (optional)
+        changes: Calculated changes (optional)
+        models: 2-4 Claude model IDs
+        anomaly: Multivariate anomaly score for the entry (optional)
+        on_result: Called with each result as soon as that model finishes
+
+    Returns:
+        One dict per model, in the order given: model, narrative, error,
+        latency_s, usage (token counts) and cost (USD, None if unpriced)
+    """
+    if not MIN_MODELS <= len(models) <= MAX_MODELS:
+        raise ValueError(f"Choose between {MIN_MODELS} and {MAX_MODELS} models to compare")
+    if not api_key_configured():
+        raise ValueError("Model comparison requires ANTHROPIC_API_KEY")
+
+    prompt = build_context_prompt(metrics, previous, changes, anomaly=anomaly)
+    results = asyncio.run(_compare(models, build_system_prompt(), prompt, fetch_claude_pricing_from_web(), on_result))
+
+    # Each answer is what analyze_with_narrative would return for that model
+    cache = get_narrative_cache()
+    for result in results:
+        record_narrative_timing({
+            'mode': 'Claude AI', 'model': result['model'], 'source': 'compare', 'first_token_s': None,
+            'total_s': result['latency_s'], 'error': result['error'] is not None, 'usage': result['usage']
+        })
+        if result['narrative'] is not None:
+            key = prompt_cache_key(result['model'], SYSTEM_PROMPT, prompt)
+            cache.put(key, result['narrative'], ttl=CLAUDE_CACHE_TTL)
+    return results
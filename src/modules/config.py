@@ -10,8 +10,40 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent.parent.parent  # Go up to project root
 DATA_FILE = BASE_DIR / 'data' / 'metrics_data.csv'
 NARRATIVES_FILE = BASE_DIR / 'data' / 'narratives.json'
+ANOMALY_STATE_FILE = BASE_DIR / 'data' / 'anomaly_state.json'
+EFFECTIVENESS_CACHE_FILE = BASE_DIR / 'data' / 'effectiveness_cache.json'
+ARCHETYPES_STATE_FILE = BASE_DIR / 'data' / 'archetypes_state.json'
+RENARRATION_JOB_FILE = BASE_DIR / 'data' / 'renarration_job.json'
+CLAUDE_BACKFILL_JOB_FILE = BASE_DIR / 'data' / 'claude_backfill_job.json'
+NARRATIVE_CACHE_DIR = BASE_DIR / 'data' / 'narrative_cache'
+MODEL_CATALOG_FILE = BASE_DIR / 'data' / 'model_catalog.json'
+USAGE_LOG_FILE = BASE_DIR / 'data' / 'claude_usage.csv'
+NARRATIVE_JOBS_FILE = BASE_DIR / 'data' / 'narrative_jobs.json'
+ROLLUPS_STATE_FILE = BASE_DIR / 'data' / 'rollups_state.json'
 
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
+ANTHROPIC_BASE_URL = os.getenv('ANTHROPIC_BASE_URL') or None  # e.g. a local mock server
+
+# Shared Anthropic client: connection pool, keep-alive and timeouts (seconds)
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv('ANTHROPIC_MAX_CONNECTIONS', 10))
+ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS', 5))
+ANTHROPIC_KEEPALIVE_EXPIRY = float(os.getenv('ANTHROPIC_KEEPALIVE_EXPIRY', 60))
+ANTHROPIC_TIMEOUT = float(os.getenv('ANTHROPIC_TIMEOUT', 60))
+ANTHROPIC_CONNECT_TIMEOUT = float(os.getenv('ANTHROPIC_CONNECT_TIMEOUT', 5))
+ANTHROPIC_MAX_RETRIES = int(os.getenv('ANTHROPIC_MAX_RETRIES', 2))
+
+# Claude latency budget (seconds to first token before the local story is shown)
+# and circuit breaker (consecutive failures before pausing calls, pause length)
+CLAUDE_LATENCY_BUDGET = float(os.getenv('CLAUDE_LATENCY_BUDGET', 10))
+CLAUDE_BREAKER_FAILURES = int(os.getenv('CLAUDE_BREAKER_FAILURES', 3))
+CLAUDE_BREAKER_COOLDOWN = float(os.getenv('CLAUDE_BREAKER_COOLDOWN', 60))
+
+# Claude user-message encoding: 'verbose' (labelled metric lists, the default) or
+# 'compact' (one metric table, abbreviated keys, deduplicated feedback; opt-in)
+CLAUDE_PROMPT_ENCODING = os.getenv('CLAUDE_PROMPT_ENCODING', 'verbose').lower()
+
+# Model catalog snapshot (model list + pricing) lifetime before a background refresh
+MODEL_CATALOG_TTL_HOURS = float(os.getenv('MODEL_CATALOG_TTL_HOURS', 24))
 
 THRESHOLDS = {
     # ADHD primary signals (high values = problems)
@@ -52,6 +84,24 @@ THRESHOLDS = {
     'delivery_log': int(os.getenv('DELIVERY_LOG_THRESHOLD', 6))
 }
 
+# Narrative cache (in-memory LRU + optional disk tier; Claude results expire)
+NARRATIVE_CACHE_SIZE = int(os.getenv('NARRATIVE_CACHE_SIZE', 256))
+NARRATIVE_CACHE_DISK = os.getenv('NARRATIVE_CACHE_DISK', 'true').lower() in ('1', 'true', 'yes')
+CLAUDE_CACHE_TTL_HOURS = float(os.getenv('CLAUDE_CACHE_TTL_HOURS', 24))
+
+# Background narrative jobs (worker threads for "Analyze & Save")
+NARRATIVE_JOB_WORKERS = int(os.getenv('NARRATIVE_JOB_WORKERS', 2))
+
+# Dashboard chart widths in pixels (desktop, mobile); long traces are downsampled to fit
+CHART_WIDTH_PX = int(os.getenv('CHART_WIDTH_PX', 1200))
+MOBILE_CHART_WIDTH_PX = int(os.getenv('MOBILE_CHART_WIDTH_PX', 400))
+
+# Shared metrics service (src/metrics_service.py); the apps run everything in-process while it is down
+METRICS_SERVICE_URL = os.getenv('METRICS_SERVICE_URL', '')  # Empty: both apps fully in-process
+METRICS_SERVICE_TIMEOUT = float(os.getenv('METRICS_SERVICE_TIMEOUT', 180))  # Seconds per call (Claude included)
+METRICS_SERVICE_RETRY = float(os.getenv('METRICS_SERVICE_RETRY', 30))      # Seconds in-process after a failed connect
+METRICS_SERVICE_TOKEN = os.getenv('METRICS_SERVICE_TOKEN', '')  # Shared secret; required to listen beyond loopback
+
 PROMPT_WEEKDAYS = [int(d) for d in os.getenv('PROMPT_WEEKDAYS', '2,4').split(',')]
 
 QUESTIONS = [
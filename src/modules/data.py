@@ -1,10 +1,43 @@
 """
 Data module - handles loading, saving, and managing metrics data
+Every write to the data file (and to narratives.json) holds
+data_file_lock(), so a background re-narration or backfill cannot lose an
+entry saved at the same time by the app or the metrics service.
 """
+import os
+import threading
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
 from .config import DATA_FILE, QUESTIONS
 
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+_lock = threading.RLock()
+_file_holds = 0  # Nesting depth of data_file_lock() (held by one thread at a time under _lock)
+_file_handle = None
+
+@contextmanager
+def data_file_lock():
+    """Exclusive use of the data files across threads and processes (re-entrant)."""
+    global _file_holds, _file_handle
+    with _lock:
+        if _file_holds == 0 and fcntl is not None:
+            DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _file_handle = open(DATA_FILE.with_suffix('.lock'), 'a')
+            fcntl.flock(_file_handle, fcntl.LOCK_EX)
+        _file_holds += 1
+        try:
+            yield
+        finally:
+            _file_holds -= 1
+            if _file_holds == 0 and _file_handle is not None:
+                _file_handle.close()  # Releases the flock
+                _file_handle = None
+
 def load_data():
     if not DATA_FILE.exists():
         return pd.DataFrame()
@@ -14,14 +47,31 @@ def load_data():
             df[q['key']] = pd.to_numeric(df[q['key']], errors='coerce')
     return df
 
+def get_data_version():
+    """Cheap fingerprint of the data file, used to invalidate derived caches."""
+    if not DATA_FILE.exists():
+        return '0'
+    stat = DATA_FILE.stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
 def save_entry(metrics):
-    df = load_data()
-    new_entry = pd.DataFrame([metrics])
-    if len(df) == 0:
-        df = new_entry
-    else:
-        df = pd.concat([df, new_entry], ignore_index=True)
-    df.to_csv(DATA_FILE, index=False)
+    from .anomaly import record_entry
+    from .archetypes import update_archetypes
+    from .rollups import record_rollup
+    with data_file_lock():
+        df = load_data()
+        # Score against the history before this entry, then fold it in (O(k²))
+        record_entry(metrics, history=df)
+        # One online mini-batch k-means step (no full retrain)
+        update_archetypes(metrics, history=df)
+        # Add to this week's and month's aggregates (O(1) per metric)
+        record_rollup(metrics, history=df)
+        new_entry = pd.DataFrame([metrics])
+        if len(df) == 0:
+            df = new_entry
+        else:
+            df = pd.concat([df, new_entry], ignore_index=True)
+        df.to_csv(DATA_FILE, index=False)
 
 def get_previous_entry():
     df = load_data()
@@ -72,20 +122,52 @@ def update_entry_recommendation(date, recommendation):
         date: Date string (YYYY-MM-DD) of the entry to update
         recommendation: New recommendation text to store
     """
-    df = load_data()
-    if len(df) == 0:
-        return False
+    with data_file_lock():
+        df = load_data()
+        if len(df) == 0:
+            return False
     
-    # Find the row with matching date
-    normalized_date = str(date)
-    mask = df['date'].astype(str) == normalized_date
-    if not mask.any():
-        return False
+        # Find the row with matching date
+        normalized_date = str(date)
+        mask = df['date'].astype(str) == normalized_date
+        if not mask.any():
+            return False
     
-    # Update the recommendation column
-    df.loc[mask, 'recommendation'] = recommendation
-    df.to_csv(DATA_FILE, index=False)
-    return True
+        # Update the recommendation column
+        df.loc[mask, 'recommendation'] = recommendation
+        df.to_csv(DATA_FILE, index=False)
+        return True
+
+def update_entry_recommendations(recommendations):
+    """
+    Update recommendations for many dates with a single rewrite of the data file.
+
+    The file is replaced atomically so a reader never sees a half-written CSV.
+
+    Args:
+        recommendations: Dict mapping date string (YYYY-MM-DD) to recommendation text
+
+    Returns:
+        int: Number of entries updated
+    """
+    with data_file_lock():
+        df = load_data()
+        if len(df) == 0 or not recommendations:
+            return 0
+
+        dates = df['date'].astype(str)
+        mask = dates.isin(recommendations.keys())
+        if not mask.any():
+            return 0
+
+        if 'recommendation' not in df.columns:
+            df['recommendation'] = None
+        df['recommendation'] = df['recommendation'].astype(object)
+        df.loc[mask, 'recommendation'] = dates[mask].map(recommendations)
+        tmp_file = DATA_FILE.with_suffix('.csv.tmp')
+        df.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, DATA_FILE)
+        return int(mask.sum())
 
 def get_entry_by_date(date):
     """
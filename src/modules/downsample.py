@@ -0,0 +1,106 @@
+"""
+Downsample module - shape-preserving point reduction for dashboard charts
+A trace longer than its chart is wide is cut into equal buckets and only
+each bucket's lowest and highest point is kept, plus the first and last
+entry, so spikes and dips survive while a multi-year history reaches
+Plotly as a few hundred points. Results are memoised per data version,
+window and point cap.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import CHART_WIDTH_PX
+
+PIXELS_PER_POINT = 2   # More points than this per pixel are invisible anyway
+MIN_POINTS = 50        # Never thin a trace below this many points
+SERIES_CACHE_SLOTS = 64
+
+_lock = threading.Lock()
+_series: 'OrderedDict[tuple, pd.DataFrame]' = OrderedDict()
+
+
+def max_points_for_width(width_px: int = CHART_WIDTH_PX) -> int:
+    """Points per trace worth sending to a chart width_px pixels wide."""
+    return max(MIN_POINTS, int(width_px) // PIXELS_PER_POINT)
+
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Sorted positions to keep so that at most max_points remain: the first and
+    last value plus the minimum and maximum of each bucket in between.
+    Vectorised: one lexsort groups the values by bucket, ordered by value.
+
+    Args:
+        values: finite values in plotting order
+        max_points: cap on the number of positions returned
+    """
+    n = len(values)
+    if n <= max(max_points, 2):
+        return np.arange(n)
+    buckets = max(1, (max_points - 2) // 2)
+    inner = np.arange(1, n - 1)
+    bucket = (inner - 1) * buckets // (n - 2)
+    order = np.lexsort((values[inner], bucket))
+    grouped = bucket[order]
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    picks = inner[np.concatenate([order[starts], order[ends]])]
+    return np.unique(np.r_[0, picks, n - 1])
+
+
+def downsample_series(df: pd.DataFrame, key: str, max_points: int, x: str = 'date') -> pd.DataFrame:
+    """
+    x and key columns of df thinned to at most max_points rows.
+    Missing values are skipped when thinning; short series come back whole.
+    """
+    frame = df[[x, key]]
+    if len(frame) <= max_points:
+        return frame
+    frame = frame[frame[key].notna()]
+    keep = minmax_indices(frame[key].to_numpy(dtype=float), max_points)
+    return frame.iloc[keep]
+
+
+def chart_series(df: pd.DataFrame, key: str, window: int, max_points: Optional[int] = None,
+                 version: Optional[str] = None) -> pd.DataFrame:
+    """
+    Downsampled date/value frame for key over the last window rows of df.
+
+    Memoised on (data version, window, max_points, key), so reruns and metric
+    toggles reuse earlier work until an entry is saved.
+
+    Args:
+        df: full history as shown on the dashboard (dates already parsed)
+        key: metric column
+        window: rows from the end of df to plot
+        max_points: cap per trace (default: max_points_for_width())
+        version: data version (default: get_data_version())
+    """
+    if max_points is None:
+        max_points = max_points_for_width()
+    if version is None:
+        from .data import get_data_version
+        version = get_data_version()
+
+    cache_key = (version, window, max_points, key)
+    with _lock:
+        if cache_key in _series:
+            _series.move_to_end(cache_key)
+            return _series[cache_key]
+
+    result = downsample_series(df.tail(window), key, max_points)
+    with _lock:
+        _series[cache_key] = result
+        while len(_series) > SERIES_CACHE_SLOTS:
+            _series.popitem(last=False)
+    return result
+
+
+def clear_chart_cache() -> None:
+    """Drop every memoised series."""
+    with _lock:
+        _series.clear()
@@ -0,0 +1,218 @@
+"""
+Effectiveness module - measures whether recommendations actually helped
+Tags each stored recommendation with the protocols it triggered, then
+averages the change in each protocol's target metrics over the next 1-3 entries.
+"""
+import json
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import EFFECTIVENESS_CACHE_FILE, QUESTIONS
+from .data import load_data, get_data_version
+
+# Protocol -> phrases that identify it in a stored recommendation, and the
+# metrics it is meant to bring down. Phrases cover both the Free-mode
+# recommendations (local_narrative / insights) and the Claude reflex rules.
+PROTOCOLS = {
+    'Calm Reset': {
+        'markers': ['calm reset', 'stress management techniques', 'nvns'],
+        'targets': ['anxiety', 'irritability', 'signal_mind_noise', 'signal_body_tension'],
+    },
+    'Anti-Chaos Routine': {
+        'markers': ['anti-chaos', 'address project chaos', 'chaos protocol'],
+        'targets': ['project_chaos', 'deadline_pressure', 'urgent_alignment'],
+    },
+    'Deep-Work Anchor': {
+        'markers': ['deep-work anchor', 'deep work anchor', 'protect deep work time'],
+        'targets': ['quiet_blocks_insufficient', 'signal_focus_friction', 'unwanted_meetings'],
+    },
+    'Sleep Recovery Plan': {
+        'markers': ['sleep recovery plan', 'address sleep issues'],
+        'targets': ['sleep_issues', 'signal_energy_drain'],
+    },
+    'Boundary Setting': {
+        'markers': ['boundary-setting', 'setting boundaries', 'terp escalation', 'skip-meeting template'],
+        'targets': ['cannot_say_no', 'unmet_requests', 'unwanted_meetings'],
+    },
+    'Self-Authorization Rule': {
+        'markers': ['self-authorization', 'unblock work'],
+        'targets': ['jira_blocked', 'no_ownership'],
+    },
+    'Therapy & Source Check': {
+        'markers': ['therapy & source check', 'therapy support', 'source check'],
+        'targets': ['stress_outside'],
+    },
+    'Delivery Log': {
+        'markers': ['delivery_log', 'delivery log'],
+        'targets': ['deadline_pressure', 'unmet_requests', 'project_chaos'],
+    },
+}
+
+HORIZONS = (1, 2, 3)
+MIN_USES = 2  # Protocols used fewer times are hidden from the UI/prompt
+
+_lock = threading.Lock()
+_memo: Dict = {}  # Last result per process, so prompts don't touch the disk per request
+
+_MARKER_PATTERNS = {
+    name: re.compile('|'.join(re.escape(m) for m in spec['markers']), re.IGNORECASE)
+    for name, spec in PROTOCOLS.items()
+}
+
+
+def tag_recommendation(text) -> List[str]:
+    """Return the protocols a recommendation text triggered."""
+    if not isinstance(text, str) or not text:
+        return []
+    return [name for name, pattern in _MARKER_PATTERNS.items() if pattern.search(text)]
+
+
+def compute_effectiveness(df: pd.DataFrame, tags: Optional[List[List[str]]] = None) -> List[Dict]:
+    """
+    Average change in each protocol's target metrics after it was recommended.
+
+    For every horizon h, the change is value[t + h] - value[t] over rows t whose
+    recommendation triggered the protocol. The baseline is the same change over
+    rows that did not trigger it, so 'net' separates the protocol from plain
+    regression to the mean. Negative values mean improvement (higher = worse).
+
+    Args:
+        df: Entries in chronological order
+        tags: Precomputed protocol tags per row (computed if omitted)
+
+    Returns:
+        list of dicts sorted by uses: protocol, uses, targets, horizons
+        ({h: {'mean_change', 'baseline', 'net', 'effect_size', 'n'}})
+    """
+    if len(df) == 0 or 'recommendation' not in df.columns:
+        return []
+    if tags is None:
+        tags = [tag_recommendation(text) for text in df['recommendation']]
+
+    numeric = df.reindex(columns=[q['key'] for q in QUESTIONS]).apply(pd.to_numeric, errors='coerce')
+    forward = {h: numeric.shift(-h) - numeric for h in HORIZONS}
+
+    results = []
+    for name, spec in PROTOCOLS.items():
+        used = pd.Series([name in row_tags for row_tags in tags], index=df.index)
+        uses = int(used.sum())
+        if uses == 0:
+            continue
+        targets = [t for t in spec['targets'] if t in df.columns]
+        horizons = {}
+        for h, deltas in forward.items():
+            treated = deltas.loc[used, targets].to_numpy().ravel()
+            treated = treated[~np.isnan(treated)]
+            untreated = deltas.loc[~used, targets].to_numpy().ravel()
+            untreated = untreated[~np.isnan(untreated)]
+            if treated.size == 0:
+                continue
+            mean_change = float(treated.mean())
+            baseline = float(untreated.mean()) if untreated.size else 0.0
+            spread = float(treated.std(ddof=1)) if treated.size > 1 else 0.0
+            horizons[h] = {
+                'mean_change': round(mean_change, 2),
+                'baseline': round(baseline, 2),
+                'net': round(mean_change - baseline, 2),
+                'effect_size': round(mean_change / spread, 2) if spread > 0 else 0.0,
+                'n': int(len(treated))
+            }
+        results.append({'protocol': name, 'uses': uses, 'targets': targets, 'horizons': horizons})
+
+    results.sort(key=lambda r: r['uses'], reverse=True)
+    return results
+
+
+def _read_cache_file(version: str) -> Optional[Dict]:
+    if not EFFECTIVENESS_CACHE_FILE.exists():
+        return None
+    try:
+        with open(EFFECTIVENESS_CACHE_FILE, 'r') as f:
+            cached = json.load(f)
+        if cached.get('version') != version:
+            return None
+        for row in cached['effects']:
+            row['horizons'] = {int(h): v for h, v in row['horizons'].items()}
+        return cached
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def get_effectiveness(write_cache: bool = True) -> Dict:
+    """
+    Return per-entry tags and aggregated effects for the current data version.
+    Served from memory, then from the cache file, and recomputed only when the
+    data file changed. Treat the result as read-only.
+
+    Args:
+        write_cache: store a recomputed result in EFFECTIVENESS_CACHE_FILE
+            (prompt building passes False: it must not write files)
+    """
+    version = get_data_version()
+    with _lock:
+        if _memo.get('version') == version:
+            return _memo
+    result = _read_cache_file(version)
+    if result is None:
+        df = load_data()
+        tags = [tag_recommendation(text) for text in df['recommendation']] if 'recommendation' in df.columns else []
+        dates = df['date'].astype(str).tolist() if 'date' in df.columns else []
+        result = {
+            'version': version,
+            'tags': {date: row_tags for date, row_tags in zip(dates, tags) if row_tags},
+            'effects': compute_effectiveness(df, tags)
+        }
+        if write_cache:
+            EFFECTIVENESS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(EFFECTIVENESS_CACHE_FILE, 'w') as f:
+                json.dump(result, f)
+    with _lock:
+        _memo.clear()
+        _memo.update(result)
+    return result
+
+
+def prompt_effects() -> List[Dict]:
+    """Effects for the Claude prompt: computed once per data version, never written to disk."""
+    return get_effectiveness(write_cache=False)['effects']
+
+
+def effectiveness_table_rows(effects: List[Dict]) -> List[Dict]:
+    """Flatten effects into display rows (one per protocol) for the UI."""
+    rows = []
+    for effect in effects:
+        if effect['uses'] < MIN_USES:
+            continue
+        row = {'Protocol': effect['protocol'], 'Uses': effect['uses']}
+        for h in HORIZONS:
+            stats = effect['horizons'].get(h)
+            row[f'Δ +{h}'] = stats['mean_change'] if stats else None
+        first = effect['horizons'].get(HORIZONS[0])
+        row['Net vs baseline (+1)'] = first['net'] if first else None
+        rows.append(row)
+    return rows
+
+
+def format_effectiveness_table(effects: List[Dict]) -> Optional[str]:
+    """Compact markdown table for the Claude prompt (None if nothing to report)."""
+    rows = effectiveness_table_rows(effects)
+    if not rows:
+        return None
+
+    def fmt(value):
+        return '–' if value is None else f"{value:+.1f}"
+
+    lines = [
+        "| Protocol | Uses | Δ+1 | Δ+2 | Δ+3 | Net+1 |",
+        "|---|---|---|---|---|---|"
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['Protocol']} | {row['Uses']} | {fmt(row['Δ +1'])} | {fmt(row['Δ +2'])} "
+            f"| {fmt(row['Δ +3'])} | {fmt(row['Net vs baseline (+1)'])} |"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,239 @@
+"""
+History module - indexed access to stored entries for the Analysis browser
+Built once per data version: entry rows in file order, a date -> row index
+and the stored anomaly scores, so opening any past entry with its previous
+entry, changes and story is a dict lookup instead of a CSV reload. Severity
+counts of every entry are computed once per threshold setting and carried
+over when entries are appended; they drive the history timeline.
+"""
+import bisect
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import QUESTIONS
+from .data import get_data_version, get_metric_changes, load_data
+from .severity import analyze_metrics_severity, calculate_severity_statistics
+
+SEVERITY_KEYS = [q['key'] for q in QUESTIONS if q.get('type') != 'yesno']
+TIMELINE_CACHE_SLOTS = 4
+
+_lock = threading.Lock()
+_history: Optional[Dict] = None
+_timelines: 'OrderedDict[tuple, Dict]' = OrderedDict()
+
+
+def _date_key(value) -> Optional[str]:
+    """Stored date as YYYY-MM-DD (None for blanks)."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    try:
+        return pd.Timestamp(str(value)).strftime('%Y-%m-%d')
+    except (ValueError, TypeError):
+        return str(value)
+
+
+def _build_history(version: str) -> Dict:
+    from .anomaly import load_anomaly_state
+
+    df = load_data()
+    dates = []
+    if len(df) > 0:
+        parsed = pd.to_datetime(df['date'].astype(str), errors='coerce', format='mixed')
+        dates = [
+            day if isinstance(day, str) else _date_key(raw)
+            for day, raw in zip(parsed.dt.strftime('%Y-%m-%d'), df['date'])
+        ]
+        df['date'] = dates
+    columns = [key for key in SEVERITY_KEYS if key in df.columns]
+    _, scores = load_anomaly_state(df) if len(df) > 0 else (None, {})
+    return {
+        'version': version,
+        'frame': df,  # Rows become dicts only when viewed or counted
+        'positions': {date: i for i, date in enumerate(dates) if date},  # Last entry wins on duplicates
+        'sorted_dates': sorted(date for date in set(dates) if date),
+        'values': df[columns].to_numpy(dtype=float) if columns else np.empty((len(df), 0)),
+        'columns': columns,
+        'anomaly': scores,
+    }
+
+
+def load_history(version: Optional[str] = None) -> Dict:
+    """
+    The entry index for the current data file, rebuilt only when it changes.
+    Treat the result as read-only; it is shared by every session.
+
+    Args:
+        version: data version (default: get_data_version())
+    """
+    global _history
+    version = version if version is not None else get_data_version()
+    with _lock:
+        if _history is not None and _history['version'] == version:
+            return _history
+    history = _build_history(version)
+    with _lock:
+        _history = history
+    return history
+
+
+def entry_dates(history: Optional[Dict] = None) -> List[str]:
+    """Dates that have a stored entry, oldest first."""
+    return (history or load_history())['sorted_dates']
+
+
+def nearest_entry_date(date, history: Optional[Dict] = None) -> Optional[str]:
+    """The entry date on or before date (the first entry if date is earlier than all)."""
+    dates = entry_dates(history)
+    if not dates:
+        return None
+    index = bisect.bisect_right(dates, _date_key(date)) - 1
+    return dates[max(index, 0)]
+
+
+def step_entry_date(date, offset: int, history: Optional[Dict] = None) -> Optional[str]:
+    """The entry date offset entries after (or before, if negative) date, clamped to the ends."""
+    dates = entry_dates(history)
+    current = nearest_entry_date(date, history)
+    if current is None:
+        return None
+    index = bisect.bisect_left(dates, current) + offset
+    return dates[min(max(index, 0), len(dates) - 1)]
+
+
+def entry_view(date, history: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    A stored entry with what the Analysis view shows next to it.
+
+    Args:
+        date: entry date (anything pandas can parse)
+        history: index from load_history() (loaded if omitted)
+
+    Returns:
+        Dict with metrics, previous, changes, narrative and anomaly (copies,
+        safe to modify), or None if no entry has that date
+    """
+    history = history or load_history()
+    position = history['positions'].get(_date_key(date))
+    if position is None:
+        return None
+    rows = history['frame'].iloc[max(position - 1, 0):position + 1].to_dict('records')
+    metrics = rows[-1]
+    previous = rows[0] if position > 0 else None
+    narrative = metrics.get('recommendation')
+    if narrative is not None and not isinstance(narrative, str):
+        narrative = None  # NaN from an empty CSV cell
+    return {
+        'metrics': metrics,
+        'previous': previous,
+        'changes': get_metric_changes(metrics, previous) if previous else None,
+        'narrative': narrative or None,
+        'anomaly': history['anomaly'].get(metrics['date']),
+        'position': position,
+    }
+
+
+def _thresholds_key(problem_threshold, increase_threshold, custom_thresholds) -> str:
+    return json.dumps([problem_threshold, increase_threshold, sorted((custom_thresholds or {}).items())],
+                      default=str)
+
+
+def _severity_counts(frame: pd.DataFrame, start: int, problem_threshold, increase_threshold,
+                     custom_thresholds) -> List[Dict]:
+    """Counts for rows start onwards (the row before start is only used as their previous entry)."""
+    records = frame.iloc[max(start - 1, 0):].to_dict('records')
+    offset = 1 if start > 0 else 0
+    rows = []
+    for i in range(offset, len(records)):
+        results = analyze_metrics_severity(
+            records[i], records[i - 1] if i > 0 else None,
+            problem_threshold=problem_threshold,
+            increase_threshold=increase_threshold,
+            custom_thresholds=custom_thresholds
+        )
+        stats = calculate_severity_statistics(results)
+        rows.append({
+            'date': records[i]['date'],
+            'increasing': stats['severity_increase_count'],
+            'continuous': stats['continuous_issue_count'],
+            'safe': stats['safe_count'],
+        })
+    return rows
+
+
+def _reusable_timeline(history: Dict, thresholds_key: str) -> Optional[Dict]:
+    """A cached timeline (older version, same thresholds) whose rows are a prefix of history."""
+    for (_, key), cached in reversed(_timelines.items()):
+        if key != thresholds_key or cached['columns'] != history['columns']:
+            continue
+        done = len(cached['values'])
+        if done <= len(history['values']) and np.array_equal(
+                cached['values'], history['values'][:done], equal_nan=True):
+            return cached  # Entries were only appended (or a story changed): its counts still hold
+    return None
+
+
+def _timeline_entry(problem_threshold, increase_threshold, custom_thresholds, history: Optional[Dict]) -> Dict:
+    history = history or load_history()
+    thresholds_key = _thresholds_key(problem_threshold, increase_threshold, custom_thresholds)
+    cache_key = (history['version'], thresholds_key)
+    with _lock:
+        if cache_key in _timelines:
+            _timelines.move_to_end(cache_key)
+            return _timelines[cache_key]
+        reusable = _reusable_timeline(history, thresholds_key)
+
+    start = len(reusable['table']) if reusable else 0
+    added = pd.DataFrame(
+        _severity_counts(history['frame'], start, problem_threshold, increase_threshold, custom_thresholds),
+        columns=['date', 'increasing', 'continuous', 'safe']
+    )
+    added['date'] = pd.to_datetime(added['date'])
+    table = pd.concat([reusable['table'], added], ignore_index=True) if start else added
+    entry = {'table': table, 'values': history['values'], 'columns': history['columns'], 'figures': {}}
+
+    with _lock:
+        _timelines[cache_key] = entry
+        while len(_timelines) > TIMELINE_CACHE_SLOTS:
+            _timelines.popitem(last=False)
+    return entry
+
+
+def severity_timeline(problem_threshold=None, increase_threshold=None, custom_thresholds=None,
+                      history: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Severity counts of every stored entry, oldest first.
+    Treat the result as read-only; it is shared by every session.
+
+    Args:
+        problem_threshold, increase_threshold, custom_thresholds: as for
+            analyze_metrics_severity()
+        history: index from load_history() (loaded if omitted)
+
+    Returns:
+        DataFrame with date and the number of increasing, continuous and safe metrics
+    """
+    return _timeline_entry(problem_threshold, increase_threshold, custom_thresholds, history)['table']
+
+
+def timeline_figure(problem_threshold=None, increase_threshold=None, custom_thresholds=None,
+                    max_points: Optional[int] = None, history: Optional[Dict] = None):
+    """Cached charts.build_timeline_figure() of severity_timeline() (read-only, shared)."""
+    from .charts import build_timeline_figure
+
+    entry = _timeline_entry(problem_threshold, increase_threshold, custom_thresholds, history)
+    if max_points not in entry['figures']:
+        entry['figures'][max_points] = build_timeline_figure(entry['table'], max_points)
+    return entry['figures'][max_points]
+
+
+def clear_history_cache() -> None:
+    """Drop the entry index and every severity timeline."""
+    global _history
+    with _lock:
+        _history = None
+        _timelines.clear()
@@ -3,65 +3,55 @@ Insights module - generates quick insights without API calls
 """
 from .config import THRESHOLDS
 
+# Threshold alerts in display order: (metric, severity, message, threshold key, default, gate).
+# Gate 'present' fires for any recorded value; 'truthy' also ignores zeros (legacy metrics).
+QUICK_INSIGHT_RULES = [
+    # ADHD radar (required metrics, 0-10 scale)
+    ('signal_body_tension', 'high', "⚠️ Body tension rising ({value}/10). Schedule a short somatic reset (stretch, breathe).", 'signal_body_tension_high', 7, 'present'),
+    ('signal_mind_noise', 'high', "⚠️ Mind noise is loud ({value}/10). Capture intrusive thoughts and regroup.", 'signal_mind_noise_high', 7, 'present'),
+    ('signal_focus_friction', 'high', "⚠️ Focus friction high ({value}/10). Try a 5-minute single-task warmup.", 'signal_focus_friction_high', 7, 'present'),
+    ('signal_emotion_wave', 'medium', "⚡ Emotional spikes ({value}/10). Name the emotion and slow the pace.", 'signal_emotion_wave_high', 7, 'present'),
+    ('signal_energy_drain', 'high', "⚠️ Battery low ({value}/10). Block a recovery break before continuing.", 'signal_energy_drain_high', 7, 'present'),
+
+    # ADHD fast flags (binary)
+    ('flag_rushing_loop', 'high', "⚠️ You're in a rushing loop. Pause, reset priorities, and slow execution.", 'flag_rushing_loop_high', 1, 'present'),
+    ('flag_skipped_reset', 'medium', "⚡ Reset skipped. Take the five-minute pause before momentum slips.", 'flag_skipped_reset_high', 1, 'present'),
+    ('flag_people_pleasing', 'medium', "⚡ Said yes while overloaded. Revisit commitments and renegotiate if needed.", 'flag_people_pleasing_high', 1, 'present'),
+
+    # Legacy individual/work metrics (all follow "high values = problems")
+    ('anxiety', 'high', "⚠️ High anxiety ({value}/10). Use nVNS + 10 min walk.", 'anxiety_high', 7, 'truthy'),
+    ('project_chaos', 'high', "⚠️ High project chaos ({value}/10). Activate Anti-Chaos Routine.", 'project_chaos_high', 7, 'truthy'),
+    ('deadline_pressure', 'high', "⚠️ High deadline pressure ({value}/10). Review priorities.", 'deadline_pressure_high', 7, 'truthy'),
+    ('urgent_alignment', 'high', "⚠️ High urgent alignment needed ({value}/10). Schedule stakeholder sync.", 'urgent_alignment_high', 7, 'truthy'),
+    ('unmet_requests', 'high', "⚠️ High unmet requests ({value}/10). Consider delegation or pushback.", 'unmet_requests_high', 7, 'truthy'),
+    ('irritability', 'medium', "⚡ High irritability ({value}/10). Take a break.", 'irritability_high', 7, 'truthy'),
+    ('stress_outside', 'medium', "⚡ High external stress ({value}/10). Practice self-care.", 'stress_outside_high', 7, 'truthy'),
+    ('apologies', 'medium', "⚡ Many apologies ({value}/10). Review commitments.", 'apologies_high', 6, 'truthy'),
+    ('unwanted_meetings', 'medium', "⚡ Many unwanted meetings ({value}/10). Use skip-meeting template.", 'unwanted_meetings_high', 6, 'truthy'),
+
+    # INVERTED metrics (now follow "high = worse" pattern like all others)
+    ('no_ownership', 'medium', "⚡ Lacking ownership ({value}/10). Address root causes and reclaim control.", 'no_ownership_high', 7, 'truthy'),
+    ('sleep_issues', 'high', "⚠️ Significant sleep issues ({value}/10). Review Sleep Recovery Plan.", 'sleep_issues_high', 7, 'truthy'),
+    ('jira_blocked', 'medium', "⚡ Many Jira stories blocked ({value}/10). Discuss with leadership.", 'jira_blocked_high', 7, 'truthy'),
+    ('quiet_blocks_insufficient', 'medium', "⚡ Insufficient quiet work blocks ({value}/10). Protect your 2-hour deep work anchor.", 'quiet_blocks_insufficient_high', 7, 'truthy'),
+    ('cannot_say_no', 'medium', "⚡ Difficulty saying no ({value}/10). Practice setting boundaries.", 'cannot_say_no_high', 7, 'truthy'),
+    ('self_development_unrealized', 'low', "💡 Self-development time not realized ({value}/10). Schedule learning blocks.", 'self_development_unrealized_high', 7, 'truthy'),
+]
+
+
 def generate_quick_insights(metrics, previous, custom_thresholds=None):
     # Use custom thresholds if provided, otherwise use defaults from config
     thresholds = custom_thresholds if custom_thresholds else THRESHOLDS
     
     insights = []
     
-    # ADHD radar (required metrics, 0-10 scale)
-    if metrics.get('signal_body_tension') is not None and metrics['signal_body_tension'] >= thresholds.get('signal_body_tension_high', 7):
-        insights.append(('high', f"⚠️ Body tension rising ({metrics['signal_body_tension']}/10). Schedule a short somatic reset (stretch, breathe)."))
-    if metrics.get('signal_mind_noise') is not None and metrics['signal_mind_noise'] >= thresholds.get('signal_mind_noise_high', 7):
-        insights.append(('high', f"⚠️ Mind noise is loud ({metrics['signal_mind_noise']}/10). Capture intrusive thoughts and regroup."))
-    if metrics.get('signal_focus_friction') is not None and metrics['signal_focus_friction'] >= thresholds.get('signal_focus_friction_high', 7):
-        insights.append(('high', f"⚠️ Focus friction high ({metrics['signal_focus_friction']}/10). Try a 5-minute single-task warmup."))
-    if metrics.get('signal_emotion_wave') is not None and metrics['signal_emotion_wave'] >= thresholds.get('signal_emotion_wave_high', 7):
-        insights.append(('medium', f"⚡ Emotional spikes ({metrics['signal_emotion_wave']}/10). Name the emotion and slow the pace."))
-    if metrics.get('signal_energy_drain') is not None and metrics['signal_energy_drain'] >= thresholds.get('signal_energy_drain_high', 7):
-        insights.append(('high', f"⚠️ Battery low ({metrics['signal_energy_drain']}/10). Block a recovery break before continuing."))
-
-    # ADHD fast flags (binary)
-    if metrics.get('flag_rushing_loop') is not None and metrics['flag_rushing_loop'] >= thresholds.get('flag_rushing_loop_high', 1):
-        insights.append(('high', "⚠️ You're in a rushing loop. Pause, reset priorities, and slow execution."))
-    if metrics.get('flag_skipped_reset') is not None and metrics['flag_skipped_reset'] >= thresholds.get('flag_skipped_reset_high', 1):
-        insights.append(('medium', "⚡ Reset skipped. Take the five-minute pause before momentum slips."))
-    if metrics.get('flag_people_pleasing') is not None and metrics['flag_people_pleasing'] >= thresholds.get('flag_people_pleasing_high', 1):
-        insights.append(('medium', "⚡ Said yes while overloaded. Revisit commitments and renegotiate if needed."))
+    for key, severity, message, threshold_key, default, gate in QUICK_INSIGHT_RULES:
+        value = metrics.get(key)
+        if value is None or (gate == 'truthy' and not value):
+            continue
+        if value >= thresholds.get(threshold_key, default):
+            insights.append((severity, message.format(value=value)))
 
-    # Legacy individual/work metrics (all follow "high values = problems")
-    if metrics.get('anxiety') and metrics['anxiety'] >= thresholds.get('anxiety_high', 7):
-        insights.append(('high', f"⚠️ High anxiety ({metrics['anxiety']}/10). Use nVNS + 10 min walk."))
-    if metrics.get('project_chaos') and metrics['project_chaos'] >= thresholds.get('project_chaos_high', 7):
-        insights.append(('high', f"⚠️ High project chaos ({metrics['project_chaos']}/10). Activate Anti-Chaos Routine."))
-    if metrics.get('deadline_pressure') and metrics['deadline_pressure'] >= thresholds.get('deadline_pressure_high', 7):
-        insights.append(('high', f"⚠️ High deadline pressure ({metrics['deadline_pressure']}/10). Review priorities."))
-    if metrics.get('urgent_alignment') and metrics['urgent_alignment'] >= thresholds.get('urgent_alignment_high', 7):
-        insights.append(('high', f"⚠️ High urgent alignment needed ({metrics['urgent_alignment']}/10). Schedule stakeholder sync."))
-    if metrics.get('unmet_requests') and metrics['unmet_requests'] >= thresholds.get('unmet_requests_high', 7):
-        insights.append(('high', f"⚠️ High unmet requests ({metrics['unmet_requests']}/10). Consider delegation or pushback."))
-    if metrics.get('irritability') and metrics['irritability'] >= thresholds.get('irritability_high', 7):
-        insights.append(('medium', f"⚡ High irritability ({metrics['irritability']}/10). Take a break."))
-    if metrics.get('stress_outside') and metrics['stress_outside'] >= thresholds.get('stress_outside_high', 7):
-        insights.append(('medium', f"⚡ High external stress ({metrics['stress_outside']}/10). Practice self-care."))
-    if metrics.get('apologies') and metrics['apologies'] >= thresholds.get('apologies_high', 6):
-        insights.append(('medium', f"⚡ Many apologies ({metrics['apologies']}/10). Review commitments."))
-    if metrics.get('unwanted_meetings') and metrics['unwanted_meetings'] >= thresholds.get('unwanted_meetings_high', 6):
-        insights.append(('medium', f"⚡ Many unwanted meetings ({metrics['unwanted_meetings']}/10). Use skip-meeting template."))
-    
-    # INVERTED metrics (now follow "high = worse" pattern like all others)
-    if metrics.get('no_ownership') and metrics['no_ownership'] >= thresholds.get('no_ownership_high', 7):
-        insights.append(('medium', f"⚡ Lacking ownership ({metrics['no_ownership']}/10). Address root causes and reclaim control."))
-    if metrics.get('sleep_issues') and metrics['sleep_issues'] >= thresholds.get('sleep_issues_high', 7):
-        insights.append(('high', f"⚠️ Significant sleep issues ({metrics['sleep_issues']}/10). Review Sleep Recovery Plan."))
-    if metrics.get('jira_blocked') and metrics['jira_blocked'] >= thresholds.get('jira_blocked_high', 7):
-        insights.append(('medium', f"⚡ Many Jira stories blocked ({metrics['jira_blocked']}/10). Discuss with leadership."))
-    if metrics.get('quiet_blocks_insufficient') and metrics['quiet_blocks_insufficient'] >= thresholds.get('quiet_blocks_insufficient_high', 7):
-        insights.append(('medium', f"⚡ Insufficient quiet work blocks ({metrics['quiet_blocks_insufficient']}/10). Protect your 2-hour deep work anchor."))
-    if metrics.get('cannot_say_no') and metrics['cannot_say_no'] >= thresholds.get('cannot_say_no_high', 7):
-        insights.append(('medium', f"⚡ Difficulty saying no ({metrics['cannot_say_no']}/10). Practice setting boundaries."))
-    if metrics.get('self_development_unrealized') and metrics['self_development_unrealized'] >= thresholds.get('self_development_unrealized_high', 7):
-        insights.append(('low', f"💡 Self-development time not realized ({metrics['self_development_unrealized']}/10). Schedule learning blocks."))
     # Positive trends (all metrics use same pattern now: decrease = improvement)
     if previous:
         if metrics.get('anxiety') and previous.get('anxiety'):
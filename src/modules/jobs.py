@@ -0,0 +1,293 @@
+"""
+Jobs module - background narrative generation off the Streamlit script thread
+"Analyze & Save" submits a narrative stream to a small thread pool and
+returns at once; the Analysis tab polls the job, showing the text written so
+far, until its story is ready. Claude mode keeps its latency budget: a late
+or failed call leaves the local story on the job, with the notice and, once
+it arrives, Claude's late story. Every job (inputs, status, result) is kept
+in a JSON job table, so a rerun or a page reload finds the same job again,
+and a job cut off by a server restart is re-queued from its stored inputs.
+
+Several processes (both apps, the metrics service) may share the table:
+writes take a file lock, each job records the process running it (pid and
+start time) and only jobs whose process has died are re-queued, and a
+reloaded page only picks up jobs of its own browser session.
+"""
+import json
+import os
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+import numpy as np
+
+from .config import NARRATIVE_JOBS_FILE, NARRATIVE_JOB_WORKERS
+
+MAX_JOBS = 50  # Newest jobs kept in the table; older ones are dropped on write
+PENDING_STATUSES = ('queued', 'running')
+PARTIAL_SAVE_INTERVAL = 0.5  # Seconds between writes of the text streamed so far
+
+_lock = threading.RLock()
+_executor: Optional[ThreadPoolExecutor] = None
+_futures: Dict[str, Future] = {}
+_table_holds = 0  # Nesting depth of _table_lock() (held by one thread at a time under _lock)
+_table_handle = None
+
+
+def _plain(value):
+    """json.dump fallback: numpy scalars -> Python values, anything else -> str."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _read_table() -> List[Dict]:
+    if not NARRATIVE_JOBS_FILE.exists():
+        return []
+    try:
+        with open(NARRATIVE_JOBS_FILE, 'r') as f:
+            return json.load(f)
+    except ValueError:
+        return []
+
+
+def _write_table(jobs: List[Dict]) -> None:
+    NARRATIVE_JOBS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = NARRATIVE_JOBS_FILE.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(jobs[-MAX_JOBS:], f, default=_plain)
+    os.replace(tmp, NARRATIVE_JOBS_FILE)  # Readers never see a half-written table
+
+
+@contextmanager
+def _table_lock():
+    """Exclusive use of the job table across threads and processes (re-entrant)."""
+    global _table_holds, _table_handle
+    with _lock:
+        if _table_holds == 0 and fcntl is not None:
+            NARRATIVE_JOBS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _table_handle = open(NARRATIVE_JOBS_FILE.with_suffix('.lock'), 'a')
+            fcntl.flock(_table_handle, fcntl.LOCK_EX)
+        _table_holds += 1
+        try:
+            yield
+        finally:
+            _table_holds -= 1
+            if _table_holds == 0 and _table_handle is not None:
+                _table_handle.close()  # Releases the flock
+                _table_handle = None
+
+
+def _process_started(pid: int) -> Optional[str]:
+    """Start time of a running process as the OS reports it (None if no such process)."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()[19]  # Field 22: starttime in clock ticks
+    except FileNotFoundError:
+        if os.path.isdir('/proc/self'):
+            return None
+    except OSError:
+        return None
+    try:  # No procfs (macOS)
+        started = subprocess.run(['ps', '-o', 'lstart=', '-p', str(pid)], capture_output=True, text=True,
+                                 timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return started or None
+
+
+_owners: Dict[int, Dict] = {}
+
+
+def _owner() -> Dict:
+    """This process as a job owner (computed per pid, so forked children are told apart)."""
+    pid = os.getpid()
+    if pid not in _owners:
+        _owners[pid] = {'pid': pid, 'started': _process_started(pid)}
+    return _owners[pid]
+
+
+def _orphaned(job: Dict) -> bool:
+    """A pending job no live worker is running: ours but not in _futures, or its owner process is gone."""
+    owner = job.get('owner')
+    if owner == _owner():
+        return job['id'] not in _futures
+    return not owner or _process_started(owner['pid']) != owner['started']
+
+
+def _update(job_id: str, **fields) -> Optional[Dict]:
+    """Set fields on one job record and persist the table."""
+    with _table_lock():
+        jobs = _read_table()
+        for job in jobs:
+            if job['id'] == job_id:
+                job.update(fields)
+                job['updated_at'] = datetime.now().isoformat()
+                _write_table(jobs)
+                return job
+    return None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(NARRATIVE_JOB_WORKERS, 1),
+                                           thread_name_prefix='narrative-job')
+        return _executor
+
+
+def _run(job_id: str, args: Dict) -> None:
+    """
+    Worker: stream the story onto the job (partial holds the text so far),
+    then store the result or the error. A local fallback finishes the job at
+    once; the worker then waits for the late Claude call and stores it as late.
+    """
+    from .analysis import analyze_with_narrative_stream
+
+    _update(job_id, status='running', started_at=datetime.now().isoformat())
+    stream = analyze_with_narrative_stream(**args)
+    parts = []
+    saved_at = time.monotonic()
+    try:
+        for delta in stream:
+            parts.append(delta)
+            if time.monotonic() - saved_at >= PARTIAL_SAVE_INTERVAL:
+                _update(job_id, partial=''.join(parts))
+                saved_at = time.monotonic()
+        narrative, error = stream.narrative, stream.error
+    except Exception as e:
+        narrative, error = None, f"❌ Error generating narrative: {str(e)}"
+    pending = stream.pending
+    _update(job_id, status='failed' if error else 'completed', narrative=narrative, error=error, partial=None,
+            fallback=stream.fallback, notice=stream.notice, timing=stream.timing,
+            late={'status': 'pending', 'model': pending.model} if pending is not None else None,
+            finished_at=datetime.now().isoformat())
+
+    if pending is not None:
+        pending.wait()
+        job = _update(job_id, late={'status': 'failed' if pending.error else 'completed', 'model': pending.model,
+                                    'narrative': pending.narrative, 'error': pending.error})
+        if job and job['claimed']:
+            with _lock:
+                _futures.pop(job_id, None)
+
+
+def _start(job_id: str, args: Dict) -> None:
+    with _lock:
+        _futures[job_id] = _get_executor().submit(_run, job_id, args)
+
+
+def _add_job(args: Dict, **fields) -> Dict:
+    job = {
+        'id': uuid.uuid4().hex[:12], 'kind': 'narrative', 'status': 'queued', 'args': args,
+        'owner': _owner(), 'session': None,
+        'narrative': None, 'error': None, 'partial': None, 'fallback': False, 'notice': None, 'late': None,
+        'timing': None,
+        'claimed': False,
+        'submitted_at': datetime.now().isoformat(), 'started_at': None, 'finished_at': None,
+        **fields
+    }
+    with _table_lock():
+        jobs = _read_table()
+        jobs.append(job)
+        _write_table(jobs)
+    return job
+
+
+def submit_narrative_job(metrics: Dict, previous: Optional[Dict] = None, changes: Optional[Dict] = None,
+                         session_id: Optional[str] = None, **options) -> str:
+    """
+    Queue a narrative stream for an entry and return the job ID at once.
+
+    Args:
+        metrics: Current metric values
+        previous: Previous metric values (optional)
+        changes: Calculated changes (optional)
+        session_id: Browser session the job belongs to (see latest_unclaimed_job)
+        **options: Remaining analyze_with_narrative_stream arguments (mode,
+            model, severity_results, custom_thresholds, anomaly, archetype,
+            latency_budget)
+
+    Returns:
+        str: job ID for poll_job()
+    """
+    args = {'metrics': metrics, 'previous': previous, 'changes': changes, **options}
+    with _lock:
+        job = _add_job(args, session=session_id)
+        _start(job['id'], args)
+    return job['id']
+
+
+def record_narrative_job(narrative: str, metrics: Dict, previous: Optional[Dict] = None,
+                         changes: Optional[Dict] = None, session_id: Optional[str] = None, **options) -> str:
+    """
+    Add a job that is already completed with narrative (e.g. a precomputed
+    story), so it reaches the Analysis tab the same way as a queued one.
+
+    Args are those of submit_narrative_job, after the finished narrative.
+    """
+    now = datetime.now().isoformat()
+    args = {'metrics': metrics, 'previous': previous, 'changes': changes, **options}
+    return _add_job(args, session=session_id, status='completed', narrative=narrative, started_at=now,
+                    finished_at=now)['id']
+
+
+def poll_job(job_id: str) -> Optional[Dict]:
+    """
+    Current record of a job, or None if it is unknown (e.g. pruned).
+
+    A job the table lists as queued/running whose owner process has died
+    (the server restarted) is adopted by this process and queued again from
+    its stored inputs; one another live process is running is left alone.
+    """
+    job = next((j for j in _read_table() if j['id'] == job_id), None)
+    if not job or job['status'] not in PENDING_STATUSES or not _orphaned(job):
+        return job
+    with _table_lock():
+        job = next((j for j in _read_table() if j['id'] == job_id), None)  # Re-read: another process may adopt it
+        if job and job['status'] in PENDING_STATUSES and _orphaned(job):
+            job = _update(job_id, status='queued', owner=_owner(), requeued_at=datetime.now().isoformat())
+            _start(job_id, job['args'])
+    return job
+
+
+def wait_job(job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Block until the job has finished, late Claude story included (or timeout), then return its record."""
+    future = _futures.get(job_id)
+    if future is None:
+        poll_job(job_id)
+        future = _futures.get(job_id)
+    if future is not None:
+        future.exception(timeout=timeout)  # Waits without raising the worker's error
+    return poll_job(job_id)
+
+
+def latest_unclaimed_job(session_id: Optional[str] = None) -> Optional[Dict]:
+    """
+    The newest job of a browser session, if nobody has taken its result yet
+    (what a reloaded page should pick up again); None when that job was
+    already shown. Other sessions' jobs are never handed out.
+    """
+    jobs = [job for job in _read_table() if job.get('session') == session_id]
+    if not jobs or jobs[-1].get('claimed'):
+        return None
+    return poll_job(jobs[-1]['id'])
+
+
+def claim_job(job_id: str) -> None:
+    """Mark a finished job's result as shown, so a reload does not show it again."""
+    _update(job_id, claimed=True)
+    with _lock:
+        if job_id in _futures and _futures[job_id].done():  # Its worker may still wait for a late story
+            _futures.pop(job_id)
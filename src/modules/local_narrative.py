@@ -3,10 +3,16 @@ Local narrative generation using rule-based analysis.
 This module generates narratives without requiring Claude API calls.
 """
 
-from typing import Dict, List, Optional, Tuple
-from modules.severity import classify_metric_severity, get_top_issues
-from modules.insights import generate_quick_insights
-from modules.config import QUESTIONS
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.severity import classify_metric_severity, get_top_issues, PROBLEM_THRESHOLD, INCREASE_THRESHOLD
+from modules.insights import generate_quick_insights, QUICK_INSIGHT_RULES
+from modules.config import QUESTIONS, THRESHOLDS
+from modules.anomaly import describe_anomaly
+from modules.archetypes import describe_archetype
 
 
 def _get_metric_name(key: str) -> str:
@@ -17,6 +23,56 @@ def _get_metric_name(key: str) -> str:
     return key.replace('_', ' ').title()
 
 
+METRIC_LABELS = {q['key']: q['label'] for q in QUESTIONS}
+HIGH_LEVEL = 7  # Value at which correlation/recommendation rules treat a metric as high
+
+# Pattern rules: all listed metrics must be high
+CORRELATION_RULES = [
+    (('project_chaos', 'anxiety'), "High project chaos correlates with elevated anxiety"),
+    (('unwanted_meetings', 'quiet_blocks_insufficient'), "Excessive meetings correlate with insufficient quiet work time"),
+    (('sleep_issues', 'anxiety'), "Sleep issues correlate with elevated anxiety"),
+    (('sleep_issues', 'irritability'), "Sleep issues correlate with increased irritability"),
+    (('cannot_say_no', 'unmet_requests'), "Difficulty saying no correlates with high unmet requests"),
+    (('stress_outside', 'irritability'), "External stress correlates with increased irritability"),
+]
+
+# Recommendation rules: all of the first group and (if given) any of the second must be high
+RECOMMENDATION_RULES = [
+    (('sleep_issues',), (), "🛌 **Address sleep issues** - impacts physical health, energy, and cognitive function"),
+    (('cannot_say_no',), ('unmet_requests', 'unwanted_meetings'), "🚫 **Practice boundary-setting** - declining low-value commitments can reduce overwhelm"),
+    (('project_chaos',), (), "📋 **Address project chaos** - clarify priorities, scope, and communication channels"),
+    ((), ('anxiety', 'stress_outside'), "🧘 **Stress management techniques** - consider mindfulness, exercise, or therapy support"),
+    (('quiet_blocks_insufficient',), (), "⚡ **Protect deep work time** - schedule breaks, reduce meeting load, guard 2-hour quiet blocks"),
+    (('jira_blocked',), (), "🎯 **Unblock work** - discuss dependencies and task assignment process with leadership"),
+]
+MAX_CORRELATIONS = 3
+MAX_RECOMMENDATIONS = 4
+MAX_ALERTS = 5
+MAX_PRIORITY_ISSUES = 3
+
+# Render templates, bound once at import so rendering is plain formatting
+_THEME = {
+    'safe': "✅ **All Metrics Safe**: No issues detected - all metrics within healthy ranges".format,
+    'escalation': "📈 **Escalation Alert**: {increasing} metrics rising, {continuous} persistently elevated".format,
+    'persistent': "⚠️ **Persistent Pressure**: {continuous} metrics remain elevated, {increasing} worsening".format,
+    'mixed': "📊 **Mixed State**: {problems} issues detected, {safe} metrics safe".format,
+}
+_ISSUE = {
+    'severity_increase': "- 🔴 **{label}**: {current}/10 (↗ +{delta})".format,
+    'continuous_issue': "- 🟠 **{label}**: {current}/10 (persistent)".format,
+}
+_STATUS = (
+    "**Overall Status:**\n"
+    "- {increasing} metrics worsening\n"
+    "- {continuous} metrics persistently elevated\n"
+    "- {safe} metrics within safe ranges\n"
+).format
+_ANOMALY = "**Overall Pattern:**\n- 🧭 {}\n".format
+_ARCHETYPE = "**Day Archetype:**\n- 🗂️ {}\n".format
+_BULLET = "- {}".format
+_CORRELATION = "- 🔗 {}".format
+
+
 def _analyze_trends(metrics: Dict[str, int], previous: Optional[Dict[str, int]]) -> Dict[str, List[str]]:
     """Analyze metric trends across time periods. ALL metrics now follow 'higher = worse' pattern."""
     trends = {
@@ -63,34 +119,34 @@ def _analyze_trends(metrics: Dict[str, int], previous: Optional[Dict[str, int]])
     return trends
 
 
+def _high_metrics(metrics: Dict) -> set:
+    """Keys whose numeric value reaches HIGH_LEVEL (computed once per entry)."""
+    high = set()
+    for key, value in metrics.items():
+        if value is None or isinstance(value, str):
+            continue
+        try:
+            if value >= HIGH_LEVEL:
+                high.add(key)
+        except TypeError:
+            continue
+    return high
+
+
+def _matching_correlations(high: set) -> List[str]:
+    return [text for keys, text in CORRELATION_RULES if all(k in high for k in keys)]
+
+
+def _matching_recommendations(high: set) -> List[str]:
+    return [
+        text for all_of, any_of, text in RECOMMENDATION_RULES
+        if all(k in high for k in all_of) and (not any_of or any(k in high for k in any_of))
+    ][:MAX_RECOMMENDATIONS]
+
+
 def _identify_correlations(metrics: Dict[str, int]) -> List[str]:
     """Identify potential correlations between metrics. ALL metrics now follow 'higher = worse' pattern."""
-    correlations = []
-    
-    # Work chaos → Anxiety/Stress
-    if metrics.get('project_chaos', 0) >= 7 and metrics.get('anxiety', 0) >= 7:
-        correlations.append("High project chaos correlates with elevated anxiety")
-    
-    # Meetings → Insufficient quiet blocks
-    if metrics.get('unwanted_meetings', 0) >= 7 and metrics.get('quiet_blocks_insufficient', 0) >= 7:
-        correlations.append("Excessive meetings correlate with insufficient quiet work time")
-    
-    # Sleep issues → Other problems (INVERTED: now sleep_issues with high = bad)
-    if metrics.get('sleep_issues', 0) >= 7:
-        if metrics.get('anxiety', 0) >= 7:
-            correlations.append("Sleep issues correlate with elevated anxiety")
-        if metrics.get('irritability', 0) >= 7:
-            correlations.append("Sleep issues correlate with increased irritability")
-    
-    # Cannot say no → Chaos/Requests (INVERTED: now cannot_say_no with high = bad)
-    if metrics.get('cannot_say_no', 0) >= 7 and metrics.get('unmet_requests', 0) >= 7:
-        correlations.append("Difficulty saying no correlates with high unmet requests")
-    
-    # Stress spillover
-    if metrics.get('stress_outside', 0) >= 7 and metrics.get('irritability', 0) >= 7:
-        correlations.append("External stress correlates with increased irritability")
-    
-    return correlations
+    return _matching_correlations(_high_metrics(metrics))
 
 
 def _generate_insights(metrics: Dict[str, int], previous: Optional[Dict[str, int]], trends: Dict[str, List[str]]) -> List[str]:
@@ -124,139 +180,328 @@ def _generate_insights(metrics: Dict[str, int], previous: Optional[Dict[str, int
 
 def _generate_recommendations(metrics: Dict[str, int], correlations: List[str]) -> List[str]:
     """Generate evidence-based recommendations. ALL metrics now follow 'higher = worse' pattern."""
-    recommendations = []
-    
-    # Sleep intervention (INVERTED: now sleep_issues with high = bad)
-    if metrics.get('sleep_issues', 0) >= 7:
-        recommendations.append("🛌 **Address sleep issues** - impacts physical health, energy, and cognitive function")
-    
-    # Boundary setting (INVERTED: now cannot_say_no with high = bad)
-    if metrics.get('cannot_say_no', 0) >= 7 and (metrics.get('unmet_requests', 0) >= 7 or metrics.get('unwanted_meetings', 0) >= 7):
-        recommendations.append("🚫 **Practice boundary-setting** - declining low-value commitments can reduce overwhelm")
-    
-    # Chaos management
-    if metrics.get('project_chaos', 0) >= 7:
-        recommendations.append("📋 **Address project chaos** - clarify priorities, scope, and communication channels")
-    
-    # Stress management
-    if metrics.get('anxiety', 0) >= 7 or metrics.get('stress_outside', 0) >= 7:
-        recommendations.append("🧘 **Stress management techniques** - consider mindfulness, exercise, or therapy support")
-    
-    # Quiet blocks (INVERTED: now quiet_blocks_insufficient with high = bad)
-    if metrics.get('quiet_blocks_insufficient', 0) >= 7:
-        recommendations.append("⚡ **Protect deep work time** - schedule breaks, reduce meeting load, guard 2-hour quiet blocks")
-    
-    # Jira blocked (INVERTED: now jira_blocked with high = bad)
-    if metrics.get('jira_blocked', 0) >= 7:
-        recommendations.append("🎯 **Unblock work** - discuss dependencies and task assignment process with leadership")
-    
-    return recommendations[:4]  # Limit to top 4
+    return _matching_recommendations(_high_metrics(metrics))
 
 
-def build_local_narrative(
+def _describe_context(anomaly: Optional[Dict], archetype: Optional[Dict]) -> Tuple[Optional[str], Optional[str]]:
+    """Whole-day pattern line (only for unusual/rare days) and archetype line."""
+    anomaly_text = describe_anomaly(anomaly) if anomaly and anomaly.get('level') in ('unusual', 'rare') else None
+    archetype_text = describe_archetype(archetype) if archetype else None
+    return anomaly_text, archetype_text
+
+
+def build_narrative_facts(
     metrics: Dict[str, int],
     previous: Optional[Dict[str, int]] = None,
-    changes: Optional[Dict[str, float]] = None,
     severity_results: Optional[Dict] = None,
-    custom_thresholds: Optional[Dict] = None
-) -> str:
+    custom_thresholds: Optional[Dict] = None,
+    anomaly: Optional[Dict] = None,
+    archetype: Optional[Dict] = None
+) -> Dict:
     """
-    Generate rule-based narrative without AI API calls.
-    
+    Compute everything a Free-mode narrative says, without any formatting.
+
     Args:
         metrics: Current metric values
         previous: Previous metric values (optional)
-        changes: Calculated changes (optional)
         severity_results: Pre-computed severity analysis results (optional)
         custom_thresholds: Custom threshold dict for insights (optional)
-    
+        anomaly: Multivariate anomaly score from modules.anomaly (optional)
+        archetype: Day archetype from modules.archetypes (optional)
+
     Returns:
-        Formatted narrative string
+        dict with counts ('increasing', 'continuous', 'safe'), 'issues'
+        [(severity_type, label, current, delta)], 'correlations',
+        'recommendations', 'alerts', 'anomaly' and 'archetype' texts
     """
     # Use provided severity results or compute them
     if severity_results is None:
         from modules.severity import analyze_metrics_severity
         severity_results = analyze_metrics_severity(metrics, previous)
-    
-    # Extract top issues from severity results
-    top_issues = []
-    for score, detail in severity_results['severity_increase'][:3]:
-        top_issues.append(('severity_increase', score, detail))
-    
-    # Add top continuous issues if we have fewer than 3 severity increases
-    if len(top_issues) < 3:
-        for score, detail in severity_results['continuous_issue'][:3 - len(top_issues)]:
-            top_issues.append(('continuous_issue', score, detail))
-    
-    # Count problem metrics
-    problem_count = len(severity_results['severity_increase']) + len(severity_results['continuous_issue'])
-    increasing_count = len(severity_results['severity_increase'])
-    continuous_count = len(severity_results['continuous_issue'])
-    safe_count = len(severity_results['safe'])
-    
-    # Build narrative sections based on actual severity results
-    narrative_parts = []
-    
+
+    # Top issues: severity increases first, then continuous issues up to the limit
+    ranked = [('severity_increase', detail) for _, detail in severity_results['severity_increase'][:MAX_PRIORITY_ISSUES]]
+    ranked += [
+        ('continuous_issue', detail)
+        for _, detail in severity_results['continuous_issue'][:MAX_PRIORITY_ISSUES - len(ranked)]
+    ]
+    issues = [
+        (
+            severity_type,
+            detail.get('label', detail.get('key', 'Unknown')),
+            detail.get('current', '?'),
+            detail.get('delta', 0)
+        )
+        for severity_type, detail in ranked
+    ]
+
+    high = _high_metrics(metrics)
+    quick_insights = generate_quick_insights(metrics, previous, custom_thresholds=custom_thresholds)
+    anomaly_text, archetype_text = _describe_context(anomaly, archetype)
+
+    return {
+        'increasing': len(severity_results['severity_increase']),
+        'continuous': len(severity_results['continuous_issue']),
+        'safe': len(severity_results['safe']),
+        'issues': issues,
+        'correlations': _matching_correlations(high),
+        'recommendations': _matching_recommendations(high) if issues else [],
+        'alerts': [text for sev, text in quick_insights if sev in ('high', 'medium')],
+        'anomaly': anomaly_text,
+        'archetype': archetype_text
+    }
+
+
+def render_narrative(facts: Dict) -> str:
+    """Render narrative facts into the Free-mode markdown narrative."""
+    increasing, continuous, safe = facts['increasing'], facts['continuous'], facts['safe']
+    problems = increasing + continuous
+
     # 1. Theme/Summary (based on actual flagged issues)
-    if problem_count == 0:
-        theme = "✅ **All Metrics Safe**: No issues detected - all metrics within healthy ranges"
-    elif increasing_count > 0 and increasing_count >= continuous_count:
-        theme = f"📈 **Escalation Alert**: {increasing_count} metrics rising, {continuous_count} persistently elevated"
-    elif continuous_count > 0:
-        theme = f"⚠️ **Persistent Pressure**: {continuous_count} metrics remain elevated, {increasing_count} worsening"
+    if problems == 0:
+        theme = 'safe'
+    elif increasing > 0 and increasing >= continuous:
+        theme = 'escalation'
+    elif continuous > 0:
+        theme = 'persistent'
     else:
-        theme = f"📊 **Mixed State**: {problem_count} issues detected, {safe_count} metrics safe"
-    
-    narrative_parts.append(theme)
-    narrative_parts.append("")
-    
+        theme = 'mixed'
+    parts = [
+        _THEME[theme](increasing=increasing, continuous=continuous, problems=problems, safe=safe),
+        ""
+    ]
+
+    # 1b. Whole-day pattern (can flag a day even when no single metric is high)
+    if facts['anomaly']:
+        parts.append(_ANOMALY(facts['anomaly']))
+
+    # 1c. Recurring kind of day (cluster of similar past entries)
+    if facts['archetype']:
+        parts.append(_ARCHETYPE(facts['archetype']))
+
     # 2. Top Issues (from actual severity results)
-    if top_issues:
-        narrative_parts.append("**Priority Issues:**")
-        for severity_type, score, detail in top_issues:
-            emoji = "🔴" if severity_type == 'severity_increase' else "🟠"
-            metric_name = detail.get('label', detail.get('key', 'Unknown'))
-            current = detail.get('current', '?')
-            delta = detail.get('delta', 0)
-            
-            if severity_type == 'severity_increase':
-                narrative_parts.append(f"- {emoji} **{metric_name}**: {current}/10 (↗ +{delta})")
-            else:
-                narrative_parts.append(f"- {emoji} **{metric_name}**: {current}/10 (persistent)")
-        narrative_parts.append("")
-    
+    if facts['issues']:
+        parts.append("**Priority Issues:**")
+        for severity_type, label, current, delta in facts['issues']:
+            parts.append(_ISSUE[severity_type](label=label, current=current, delta=delta))
+        parts.append("")
+
     # 3. Summary Statistics
-    if problem_count > 3:
-        narrative_parts.append("**Overall Status:**")
-        narrative_parts.append(f"- {increasing_count} metrics worsening")
-        narrative_parts.append(f"- {continuous_count} metrics persistently elevated")
-        narrative_parts.append(f"- {safe_count} metrics within safe ranges")
-        narrative_parts.append("")
-    
-    # 4. Identify correlations from top issues
-    correlations = _identify_correlations(metrics)
-    if correlations:
-        narrative_parts.append("**Pattern Recognition:**")
-        for corr in correlations[:3]:
-            narrative_parts.append(f"- 🔗 {corr}")
-        narrative_parts.append("")
-    
-    # 5. Recommendations based on top issues
-    if top_issues:
-        recommendations = _generate_recommendations(metrics, correlations)
-        if recommendations:
-            narrative_parts.append("**Recommended Actions:**")
-            for rec in recommendations[:4]:
-                narrative_parts.append(f"- {rec}")
-            narrative_parts.append("")
-    
+    if problems > 3:
+        parts.append(_STATUS(increasing=increasing, continuous=continuous, safe=safe))
+
+    # 4. Correlations
+    if facts['correlations']:
+        parts.append("**Pattern Recognition:**")
+        parts.extend(_CORRELATION(corr) for corr in facts['correlations'][:MAX_CORRELATIONS])
+        parts.append("")
+
+    # 5. Recommendations (only when something needs attention)
+    if facts['recommendations']:
+        parts.append("**Recommended Actions:**")
+        parts.extend(_BULLET(rec) for rec in facts['recommendations'])
+        parts.append("")
+
     # 6. Quick insights with custom thresholds
-    quick_insights = generate_quick_insights(metrics, previous, custom_thresholds=custom_thresholds)
-    high_medium_insights = [(sev, text) for sev, text in quick_insights if sev in ['high', 'medium']]
-    
-    if high_medium_insights:
-        narrative_parts.append("**Immediate Alerts:**")
-        for severity, insight_text in high_medium_insights[:5]:
-            narrative_parts.append(f"- {insight_text}")
-    
-    return "\n".join(narrative_parts)
+    if facts['alerts']:
+        parts.append("**Immediate Alerts:**")
+        parts.extend(_BULLET(alert) for alert in facts['alerts'][:MAX_ALERTS])
+
+    return "\n".join(parts)
+
+
+def build_local_narrative(
+    metrics: Dict[str, int],
+    previous: Optional[Dict[str, int]] = None,
+    changes: Optional[Dict[str, float]] = None,
+    severity_results: Optional[Dict] = None,
+    custom_thresholds: Optional[Dict] = None,
+    anomaly: Optional[Dict] = None,
+    archetype: Optional[Dict] = None
+) -> str:
+    """
+    Generate rule-based narrative without AI API calls.
+
+    Args:
+        metrics: Current metric values
+        previous: Previous metric values (optional)
+        changes: Calculated changes (optional)
+        severity_results: Pre-computed severity analysis results (optional)
+        custom_thresholds: Custom threshold dict for insights (optional)
+        anomaly: Multivariate anomaly score from modules.anomaly (optional)
+        archetype: Day archetype from modules.archetypes (optional)
+
+    Returns:
+        Formatted narrative string
+    """
+    facts = build_narrative_facts(
+        metrics, previous,
+        severity_results=severity_results,
+        custom_thresholds=custom_thresholds,
+        anomaly=anomaly,
+        archetype=archetype
+    )
+    return render_narrative(facts)
+
+
+def _numeric_columns(entries: pd.DataFrame, keys: List[str]) -> np.ndarray:
+    """(rows x keys) float matrix; missing, non-numeric and text values become NaN."""
+    columns = []
+    for key in keys:
+        column = entries[key]
+        if column.dtype == object:
+            column = column.map(lambda v: np.nan if isinstance(v, str) else v)
+        columns.append(pd.to_numeric(column, errors='coerce').to_numpy(dtype=float))
+    return np.column_stack(columns) if columns else np.empty((len(entries), 0))
+
+
+def build_narrative_facts_batch(
+    entries: pd.DataFrame,
+    problem_threshold: Optional[float] = None,
+    increase_threshold: Optional[float] = None,
+    custom_thresholds: Optional[Dict] = None,
+    anomalies: Optional[Sequence[Optional[Dict]]] = None,
+    archetypes: Optional[Sequence[Optional[Dict]]] = None
+) -> List[Dict]:
+    """
+    Narrative facts for every row of a history frame in one vectorized pass.
+
+    Each row is compared with the row before it, exactly as if
+    analyze_metrics_severity + build_narrative_facts were called per entry
+    with the same thresholds.
+
+    Args:
+        entries: Entries in chronological order (as returned by load_data)
+        problem_threshold: Fallback problem threshold for severity
+        increase_threshold: Delta counted as a significant increase
+        custom_thresholds: Threshold overrides (severity and alerts)
+        anomalies: Per-row anomaly scores (optional)
+        archetypes: Per-row archetypes (optional)
+
+    Returns:
+        list of facts dicts, one per row
+    """
+    n = len(entries)
+    if n == 0:
+        return []
+
+    severity_map = custom_thresholds if custom_thresholds is not None else THRESHOLDS
+    alert_map = custom_thresholds if custom_thresholds else THRESHOLDS
+    fallback = problem_threshold if problem_threshold is not None else PROBLEM_THRESHOLD
+    increase_by = increase_threshold if increase_threshold is not None else INCREASE_THRESHOLD
+
+    # Severity classification (mirrors classify_metric_severity)
+    keys = [c for c in entries.columns if c in METRIC_LABELS]  # Same order as a row dict
+    index = {key: j for j, key in enumerate(keys)}
+    values = _numeric_columns(entries, keys)
+    previous = np.vstack([np.full((1, len(keys)), np.nan), values[:-1]])
+    limits = np.array([
+        severity_map.get(f"{key}_high") if severity_map.get(f"{key}_high") is not None else fallback
+        for key in keys
+    ], dtype=float)
+
+    observed = ~np.isnan(values)
+    has_previous = ~np.isnan(previous)
+    delta = values - previous
+    with np.errstate(invalid='ignore'):
+        high = values >= limits
+        rising = has_previous & (delta >= increase_by)
+        stable = has_previous & (np.abs(delta) < increase_by)
+    increase = observed & high & rising
+    continuous = observed & high & ~increase & (stable | ~has_previous)
+    safe = observed & ~increase & ~continuous
+
+    # Rank within each category: descending score, ties keep column order
+    increase_order = np.argsort(np.where(increase, -(values * 10 + delta * 5), np.inf), axis=1, kind='stable')
+    continuous_order = np.argsort(np.where(continuous, -(values * 5), np.inf), axis=1, kind='stable')
+    increase_counts = increase.sum(axis=1)
+    continuous_counts = continuous.sum(axis=1)
+    safe_counts = safe.sum(axis=1)
+
+    # Correlation and recommendation rules on the HIGH_LEVEL mask
+    with np.errstate(invalid='ignore'):
+        at_level = values >= HIGH_LEVEL
+
+    def level(key):
+        return at_level[:, index[key]] if key in index else np.zeros(n, dtype=bool)
+
+    correlation_hits = [
+        (np.logical_and.reduce([level(k) for k in rule_keys]), text)
+        for rule_keys, text in CORRELATION_RULES
+    ]
+    recommendation_hits = []
+    for all_of, any_of, text in RECOMMENDATION_RULES:
+        fires = np.logical_and.reduce([level(k) for k in all_of]) if all_of else np.ones(n, dtype=bool)
+        if any_of:
+            fires = fires & np.logical_or.reduce([level(k) for k in any_of])
+        recommendation_hits.append((fires, text))
+
+    # Threshold alerts (mirrors generate_quick_insights, high/medium only)
+    alert_hits = []
+    for key, severity, message, threshold_key, default, gate in QUICK_INSIGHT_RULES:
+        if severity not in ('high', 'medium') or key not in index:
+            continue
+        column = values[:, index[key]]
+        with np.errstate(invalid='ignore'):
+            fires = column >= alert_map.get(threshold_key, default)
+        if gate == 'truthy':
+            fires &= column != 0
+        alert_hits.append((fires, message, entries[key].to_numpy()))
+
+    facts = []
+    for i in range(n):
+        issues = [
+            ('severity_increase', METRIC_LABELS[keys[j]], float(values[i, j]), float(delta[i, j]))
+            for j in increase_order[i, :min(increase_counts[i], MAX_PRIORITY_ISSUES)]
+        ]
+        issues += [
+            ('continuous_issue', METRIC_LABELS[keys[j]], float(values[i, j]),
+             float(delta[i, j]) if has_previous[i, j] else None)
+            for j in continuous_order[i, :min(continuous_counts[i], MAX_PRIORITY_ISSUES - len(issues))]
+        ]
+        anomaly_text, archetype_text = _describe_context(
+            anomalies[i] if anomalies is not None else None,
+            archetypes[i] if archetypes is not None else None
+        )
+        facts.append({
+            'increasing': int(increase_counts[i]),
+            'continuous': int(continuous_counts[i]),
+            'safe': int(safe_counts[i]),
+            'issues': issues,
+            'correlations': [text for fires, text in correlation_hits if fires[i]],
+            'recommendations': (
+                [text for fires, text in recommendation_hits if fires[i]][:MAX_RECOMMENDATIONS] if issues else []
+            ),
+            'alerts': [message.format(value=raw[i]) for fires, message, raw in alert_hits if fires[i]],
+            'anomaly': anomaly_text,
+            'archetype': archetype_text
+        })
+    return facts
+
+
+def build_local_narratives_batch(
+    entries: pd.DataFrame,
+    problem_threshold: Optional[float] = None,
+    increase_threshold: Optional[float] = None,
+    custom_thresholds: Optional[Dict] = None,
+    anomalies: Optional[Sequence[Optional[Dict]]] = None,
+    archetypes: Optional[Sequence[Optional[Dict]]] = None
+) -> List[str]:
+    """
+    Regenerate Free-mode narratives for a whole history frame.
+
+    Same output as calling build_local_narrative row by row (each row against
+    the one before it), but the rule evaluation runs once over the frame.
+
+    Returns:
+        list of narrative strings, one per row
+    """
+    facts = build_narrative_facts_batch(
+        entries,
+        problem_threshold=problem_threshold,
+        increase_threshold=increase_threshold,
+        custom_thresholds=custom_thresholds,
+        anomalies=anomalies,
+        archetypes=archetypes
+    )
+    return [render_narrative(f) for f in facts]
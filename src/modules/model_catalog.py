@@ -0,0 +1,346 @@
+"""
+Model catalog module - Claude model list and pricing, served from a snapshot
+Renders read a persisted snapshot (data/model_catalog.json) and never touch the
+network. When the snapshot is older than its TTL, one background thread
+refreshes it from the Models API and the pricing page; the HTML parse is
+size-capped, linear-time and bounded by a time budget.
+"""
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from html import unescape
+from typing import Dict, List, Optional, Tuple
+
+from .config import MODEL_CATALOG_FILE, MODEL_CATALOG_TTL_HOURS
+
+PRICING_URL = 'https://www.anthropic.com/pricing'
+PRICING_TIMEOUT = (3, 5)       # Connect / read seconds (background thread only)
+MAX_PRICING_HTML = 2_000_000   # Characters of HTML parsed at most
+PARSE_TIME_BUDGET = 2.0        # Seconds before the parse gives up with what it has
+PRICE_WINDOW = 400             # Max characters between a family name and its prices
+SCAN_CHUNK = 65_536            # Characters scanned between deadline checks (also the longest tag)
+RETRY_AFTER = 15 * 60          # Seconds between attempts after a failed refresh
+
+# Fallback pricing per million tokens (current as of Nov 2024)
+FALLBACK_PRICING = {
+    'claude-3-5-haiku-20241022': {'input_cost': 1.0, 'output_cost': 5.0},
+    'claude-3-5-sonnet-20241022': {'input_cost': 3.0, 'output_cost': 15.0},
+    'claude-sonnet-4-20250514': {'input_cost': 3.0, 'output_cost': 15.0},
+    'claude-opus-4-20250514': {'input_cost': 15.0, 'output_cost': 75.0}
+}
+
+# Pricing-page family name -> model IDs priced by it
+PRICING_FAMILIES = [
+    ('Haiku', ['claude-3-5-haiku-20241022']),
+    ('Sonnet', ['claude-3-5-sonnet-20241022', 'claude-sonnet-4-20250514']),
+    ('Opus', ['claude-opus-4-20250514']),
+]
+
+MODEL_METADATA = {
+    'claude-3-5-haiku-20241022': {
+        'description': 'Fastest and most affordable',
+        'use_case': '⚡ Budget-friendly option for quick daily check-ins'
+    },
+    'claude-3-5-sonnet-20241022': {
+        'description': 'Previous generation, still very capable',
+        'use_case': '💼 Solid choice for detailed narratives'
+    },
+    'claude-sonnet-4-20250514': {
+        'description': 'Best balance of intelligence and speed',
+        'use_case': '✨ Recommended for most users - excellent quality, fast responses'
+    },
+    'claude-opus-4-20250514': {
+        'description': 'Highest intelligence and capability',
+        'use_case': '🎯 Best for complex analysis requiring deep insights'
+    }
+}
+
+# Cost comparison baseline (Haiku)
+BASE_INPUT_COST = 1.0
+BASE_OUTPUT_COST = 5.0
+
+_PRICE = re.compile(r'\$(\d+\.?\d*)\s*(?:per million|MTok|/\s*MTok)', re.IGNORECASE)
+_FAMILY = re.compile('|'.join(name for name, _ in PRICING_FAMILIES), re.IGNORECASE)
+_TAG = re.compile(r'<!--|<(/?[a-zA-Z!?][^\s<>/]*)[^<>]*>')  # [^<>] stops at the next '<': no backtracking
+_SKIPPED_ELEMENTS = {'script': '</script', 'style': '</style'}
+
+_snapshot: Optional[Dict] = None
+_snapshot_mtime: Optional[int] = None
+_refresher: Optional[threading.Thread] = None
+_refresh_lock = threading.Lock()
+_last_attempt = 0.0
+
+
+def _page_text(html: str, deadline: float) -> Optional[str]:
+    """
+    Visible text of html, tags replaced by spaces and script/style/comments
+    dropped, in one left-to-right pass. None once deadline has passed.
+    """
+    lowered = html.lower()
+    pieces = []
+    position = 0
+    while position < len(html):
+        if time.monotonic() > deadline:
+            return None
+        window_end = min(position + SCAN_CHUNK, len(html))
+        tag = _TAG.search(html, position, window_end)
+        if tag is None:
+            # No whole tag in this window: keep its text up to a '<' or '&' that may continue past it
+            cut = -1
+            if window_end < len(html):
+                cut = max(html.rfind('<', position + 1, window_end), html.rfind('&', position + 1, window_end))
+            cut = window_end if cut < 0 else cut
+            pieces.append(unescape(html[position:cut]))
+            position = cut
+            continue
+        pieces.append(unescape(html[position:tag.start()]))
+        position = tag.end()
+        name = (tag.group(1) or '').lower()
+        if tag.group(0) == '<!--':
+            end = lowered.find('-->', tag.start() + 4)
+            position = len(html) if end < 0 else end + 3
+        elif name in _SKIPPED_ELEMENTS:
+            end = lowered.find(_SKIPPED_ELEMENTS[name], position)
+            position = len(html) if end < 0 else end
+    return ' '.join(pieces)
+
+
+def parse_pricing_html(html: str, time_budget: float = PARSE_TIME_BUDGET) -> Dict[str, Dict[str, float]]:
+    """
+    Extract per-million-token input/output prices from the pricing page.
+
+    Each family takes the first two prices after its name (input, then output),
+    provided 'input' is labelled before the second price and 'output' after the
+    first, all within PRICE_WINDOW characters. Every step, tag stripping
+    included, is a single linear pass (no nested lazy DOTALL patterns), the
+    HTML is capped at MAX_PRICING_HTML characters and the deadline is checked
+    per tag and per family mention, so the parse stops once time_budget
+    seconds have passed.
+
+    Returns:
+        Model ID -> {'input_cost', 'output_cost'} for the families found
+    """
+    deadline = time.monotonic() + time_budget
+    text = _page_text(html[:MAX_PRICING_HTML], deadline)
+    if text is None:
+        return {}
+
+    prices = []
+    for count, m in enumerate(_PRICE.finditer(text)):
+        if count % 1000 == 0 and time.monotonic() > deadline:
+            return {}
+        prices.append((m.start(), m.end(), float(m.group(1))))
+    lowered = text.lower()
+    families = dict(PRICING_FAMILIES)
+    pricing = {}
+    found = set()
+    price_index = 0
+    for mention in _FAMILY.finditer(text):
+        if time.monotonic() > deadline or len(found) == len(families):
+            break
+        name = next(n for n in families if n.lower() == mention.group(0).lower())
+        if name in found:
+            continue
+        while price_index < len(prices) and prices[price_index][0] < mention.end():
+            price_index += 1
+        if price_index + 1 >= len(prices):
+            break
+        (in_start, in_end, input_cost), (out_start, out_end, output_cost) = prices[price_index:price_index + 2]
+        if in_start - mention.end() > PRICE_WINDOW or out_start - in_end > PRICE_WINDOW:
+            continue
+        if 'input' not in lowered[mention.end():out_start] or 'output' not in lowered[in_end:out_end + PRICE_WINDOW]:
+            continue
+        found.add(name)
+        for model_id in families[name]:
+            pricing[model_id] = {'input_cost': input_cost, 'output_cost': output_cost}
+    return pricing
+
+
+def fetch_live_pricing() -> Optional[Dict[str, Dict[str, float]]]:
+    """Download and parse the pricing page; None if unreachable or nothing parsed."""
+    import requests
+
+    try:
+        response = requests.get(PRICING_URL, timeout=PRICING_TIMEOUT)
+        response.raise_for_status()
+        return parse_pricing_html(response.text) or None
+    except Exception as e:
+        print(f"⚠️ Could not fetch live pricing from Anthropic website: {e}")
+        return None
+
+
+def fetch_api_models() -> Optional[List[Tuple[str, str]]]:
+    """(id, display name) pairs from the Models API; None without a key or on error."""
+    from .claude_client import api_key_configured, get_claude_client
+
+    if not api_key_configured():
+        return None
+    try:
+        response = get_claude_client().models.list()
+        return [(model.id, getattr(model, 'display_name', None) or model.id) for model in response.data]
+    except Exception as e:
+        print(f"⚠️ Could not list Claude models: {e}")
+        return None
+
+
+def _cost_comparison(input_cost: float, output_cost: float) -> str:
+    multiplier_input = input_cost / BASE_INPUT_COST
+    multiplier_output = output_cost / BASE_OUTPUT_COST
+    if multiplier_input == 1.0:
+        return 'Baseline (cheapest)'
+    percent_increase = int(((multiplier_input + multiplier_output) / 2 - 1) * 100)
+    return f'+{percent_increase}% cost vs Haiku ({int(multiplier_input)}x input, {int(multiplier_output)}x output)'
+
+
+def build_catalog(pricing: Dict[str, Dict[str, float]],
+                  api_models: Optional[List[Tuple[str, str]]] = None) -> List[Dict]:
+    """
+    Model list for the selectors, cheapest first.
+
+    With api_models, only listed models with known pricing are included (named
+    by their display name); otherwise every priced model is.
+    """
+    if api_models:
+        candidates = [(model_id, name) for model_id, name in api_models if model_id in pricing]
+    else:
+        candidates = []
+    if not candidates:
+        candidates = [(model_id, model_id.replace('-', ' ').title()) for model_id in pricing]
+
+    catalog = []
+    for model_id, name in candidates:
+        if model_id not in MODEL_METADATA:
+            continue
+        cost = pricing[model_id]
+        catalog.append({
+            'id': model_id,
+            'name': name,
+            'description': MODEL_METADATA[model_id]['description'],
+            'use_case': MODEL_METADATA[model_id]['use_case'],
+            'cost_detail': f"${int(cost['input_cost'])} in / ${int(cost['output_cost'])} out per million tokens",
+            'cost_comparison': _cost_comparison(cost['input_cost'], cost['output_cost']),
+            'input_cost': cost['input_cost'],
+            'output_cost': cost['output_cost']
+        })
+    catalog.sort(key=lambda m: m['input_cost'] + m['output_cost'])
+    return catalog
+
+
+def _fallback_snapshot() -> Dict:
+    return {
+        'fetched_at': None,
+        'pricing_source': 'fallback',
+        'models_source': 'fallback',
+        'pricing': FALLBACK_PRICING,
+        'models': build_catalog(FALLBACK_PRICING)
+    }
+
+
+def load_snapshot() -> Optional[Dict]:
+    """Persisted snapshot, re-read only when the file changes; None if absent or unreadable."""
+    global _snapshot, _snapshot_mtime
+    try:
+        mtime = MODEL_CATALOG_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _snapshot is not None and mtime == _snapshot_mtime:
+        return _snapshot
+    try:
+        with open(MODEL_CATALOG_FILE, 'r') as f:
+            snapshot = json.load(f)
+    except ValueError:
+        return None
+    _snapshot, _snapshot_mtime = snapshot, mtime
+    return snapshot
+
+
+def _save_snapshot(snapshot: Dict) -> None:
+    MODEL_CATALOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MODEL_CATALOG_FILE.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, MODEL_CATALOG_FILE)
+
+
+def _is_stale(snapshot: Optional[Dict], now: float) -> bool:
+    if not snapshot or not snapshot.get('fetched_at'):
+        return True
+    age = now - datetime.fromisoformat(snapshot['fetched_at']).timestamp()
+    return age > MODEL_CATALOG_TTL_HOURS * 3600
+
+
+def refresh_model_catalog() -> Dict:
+    """
+    Fetch pricing and the model list, then persist a new snapshot (blocking).
+
+    Parts that fail keep the previous snapshot's values (or the fallbacks), so a
+    refresh never makes the catalog worse.
+    """
+    global _last_attempt
+    _last_attempt = time.time()
+    previous = load_snapshot() or _fallback_snapshot()
+    live_pricing = fetch_live_pricing()
+    api_models = fetch_api_models()
+
+    pricing = {**FALLBACK_PRICING, **previous.get('pricing', {}), **(live_pricing or {})}
+    previous_models = [(m['id'], m['name']) for m in previous.get('models', [])]
+    snapshot = {
+        'fetched_at': datetime.now().isoformat(),
+        'pricing_source': 'live' if live_pricing else previous.get('pricing_source', 'fallback'),
+        'models_source': 'api' if api_models else previous.get('models_source', 'fallback'),
+        'pricing': pricing,
+        'models': build_catalog(
+            pricing, api_models or (previous_models if previous.get('models_source') == 'api' else None)
+        )
+    }
+    if not (live_pricing or api_models):
+        # Nothing new: keep the old snapshot and its timestamp; retry after RETRY_AFTER
+        return previous
+    _save_snapshot(snapshot)
+    return snapshot
+
+
+def refresh_in_background(force: bool = False) -> bool:
+    """
+    Start a refresh thread unless one is running or (without force) the last
+    attempt was under RETRY_AFTER seconds ago.
+    """
+    global _refresher
+    with _refresh_lock:
+        if catalog_refreshing() or (not force and time.time() - _last_attempt < RETRY_AFTER):
+            return False
+        _refresher = threading.Thread(target=refresh_model_catalog, name='model-catalog', daemon=True)
+        _refresher.start()
+        return True
+
+
+def catalog_refreshing() -> bool:
+    return _refresher is not None and _refresher.is_alive()
+
+
+def get_model_catalog(background_refresh: bool = True) -> List[Dict]:
+    """
+    Claude models for the selectors, cheapest first - never blocks on the network.
+
+    Returns the persisted snapshot (or the built-in fallback if there is none)
+    and, when it is past its TTL, kicks off a background refresh.
+    """
+    snapshot = load_snapshot()
+    if background_refresh and _is_stale(snapshot, time.time()):
+        refresh_in_background()
+    return (snapshot or _fallback_snapshot())['models']
+
+
+def catalog_status() -> Dict:
+    """When and from where the current catalog was fetched, for display."""
+    snapshot = load_snapshot() or _fallback_snapshot()
+    return {
+        'fetched_at': snapshot.get('fetched_at'),
+        'pricing_source': snapshot.get('pricing_source'),
+        'models_source': snapshot.get('models_source'),
+        'stale': _is_stale(snapshot, time.time()),
+        'refreshing': catalog_refreshing()
+    }
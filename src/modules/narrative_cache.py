@@ -0,0 +1,231 @@
+"""
+Narrative cache module - memoizes narrative generation by input fingerprint
+An in-memory LRU sits in front of an optional on-disk tier. Free-mode
+narratives are deterministic and never expire; Claude results expire after
+a TTL so a stale paid answer is not served forever.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import (
+    NARRATIVE_CACHE_DIR, NARRATIVE_CACHE_SIZE, NARRATIVE_CACHE_DISK, CLAUDE_CACHE_TTL_HOURS
+)
+
+CLAUDE_CACHE_TTL = CLAUDE_CACHE_TTL_HOURS * 3600  # Seconds
+DISK_MAX_ENTRIES = 2000  # Oldest files are pruned beyond this
+_PRUNE_EVERY = 50        # Puts between disk prunes
+
+
+def _json_default(value):
+    """Serialize numpy scalars and anything else json can't (dates, Paths)."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _canonical(value):
+    """Treat NaN as missing and unwrap numpy scalars; int vs float stays distinct."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        return _canonical(value.item())
+    return value
+
+
+def narrative_cache_key(
+    mode: str,
+    model: Optional[str],
+    metrics: Dict,
+    previous: Optional[Dict] = None,
+    custom_thresholds: Optional[Dict] = None,
+    severity_results: Optional[Dict] = None,
+    anomaly: Optional[Dict] = None,
+    archetype: Optional[Dict] = None,
+    feedback: Optional[List[Tuple[str, str]]] = None
+) -> str:
+    """
+    Canonical SHA-256 of everything that determines a narrative.
+
+    The model only counts in Claude mode, and feedback should be passed in
+    Claude mode only (it feeds the prompt, not the rule-based narrative).
+    """
+    payload = {
+        'mode': mode,
+        'model': model if mode != 'Free' else None,
+        'metrics': metrics,
+        'previous': previous,
+        'thresholds': custom_thresholds,
+        'severity': severity_results,
+        'anomaly': anomaly,
+        'archetype': archetype,
+        'feedback': feedback
+    }
+    encoded = json.dumps(_canonical(payload), sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def prompt_cache_key(model: str, system: str, prompt: str) -> str:
+    """
+    SHA-256 of a Claude request as sent: model, system prompt and user message.
+
+    Anything that changes the prompt (feedback, the effectiveness table, the
+    prompt encoding) changes the key, so a cached story always answers the
+    prompt that would be sent now.
+    """
+    encoded = json.dumps({'mode': 'Claude AI', 'model': model, 'system': system, 'prompt': prompt},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class NarrativeCache:
+    """
+    Thread-safe LRU of narratives with an optional JSON-file-per-key disk tier.
+
+    Memory misses fall through to disk; disk hits are promoted back into memory.
+    Each record keeps its own TTL (None = never expires).
+    """
+
+    def __init__(self, max_entries: int = NARRATIVE_CACHE_SIZE, disk_dir: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._memory: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    @staticmethod
+    def _is_expired(record: Dict, now: float) -> bool:
+        ttl = record.get('ttl')
+        return ttl is not None and now - record['created_at'] > ttl
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, record: Dict) -> None:
+        if not self.disk_dir:
+            return
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._disk_path(key), 'w') as f:
+            json.dump(record, f)
+        self._puts += 1
+        if self._puts % _PRUNE_EVERY == 0:
+            files = sorted(self.disk_dir.glob('*.json'), key=lambda p: p.stat().st_mtime)
+            for stale in files[:max(0, len(files) - DISK_MAX_ENTRIES)]:
+                stale.unlink(missing_ok=True)
+
+    def _remember(self, key: str, record: Dict) -> None:
+        self._memory[key] = record
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached narrative for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            record = self._memory.get(key)
+            source = 'hits'
+            if record is None:
+                record = self._read_disk(key)
+                source = 'disk_hits'
+            if record is not None and self._is_expired(record, now):
+                self._memory.pop(key, None)
+                if self.disk_dir:
+                    self._disk_path(key).unlink(missing_ok=True)
+                self._stats['expired'] += 1
+                record = None
+            if record is None:
+                self._stats['misses'] += 1
+                return None
+            self._remember(key, record)
+            self._stats[source] += 1
+            return record['narrative']
+
+    def put(self, key: str, narrative: str, ttl: Optional[float] = None, persist: bool = True,
+            mode: Optional[str] = None) -> None:
+        """Store a narrative; ttl in seconds (None = keep until evicted), persist = also write to disk."""
+        record = {'narrative': narrative, 'created_at': time.time(), 'ttl': ttl, 'mode': mode}
+        with self._lock:
+            self._remember(key, record)
+            if persist:
+                self._write_disk(key, record)
+
+    def discard_mode(self, mode: str) -> int:
+        """Drop every entry stored for a mode (memory and disk); returns how many were dropped."""
+        with self._lock:
+            keys = [key for key, record in self._memory.items() if record.get('mode') == mode]
+            for key in keys:
+                del self._memory[key]
+            dropped = set(keys)
+            if self.disk_dir and self.disk_dir.exists():
+                for path in self.disk_dir.glob('*.json'):
+                    record = self._read_disk(path.stem)
+                    if record is not None and record.get('mode') == mode:
+                        path.unlink(missing_ok=True)
+                        dropped.add(path.stem)
+        return len(dropped)
+
+    def clear(self) -> None:
+        """Drop every entry (memory and disk) and reset statistics."""
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir and self.disk_dir.exists():
+                for path in self.disk_dir.glob('*.json'):
+                    path.unlink(missing_ok=True)
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def stats(self) -> Dict:
+        """Counters plus size and overall hit rate (memory + disk hits over lookups)."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._memory)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+_cache: Optional[NarrativeCache] = None
+
+
+def get_narrative_cache() -> NarrativeCache:
+    """Process-wide cache (survives Streamlit reruns; shared by all sessions)."""
+    global _cache
+    if _cache is None:
+        _cache = NarrativeCache(NARRATIVE_CACHE_SIZE, NARRATIVE_CACHE_DIR if NARRATIVE_CACHE_DISK else None)
+    return _cache
+
+
+def narrative_cache_stats() -> Dict:
+    """stats() of the process-wide cache, with its capacity and whether it has a disk tier."""
+    cache = get_narrative_cache()
+    return {**cache.stats(), 'max_entries': cache.max_entries, 'disk': cache.disk_dir is not None}
+
+
+def clear_narrative_cache() -> None:
+    """Empty the process-wide cache."""
+    get_narrative_cache().clear()
+
+
+def discard_cached_narratives(mode: str) -> int:
+    """Drop the process-wide cache's stories of one mode (e.g. after a re-narration replaced them)."""
+    return get_narrative_cache().discard_mode(mode)
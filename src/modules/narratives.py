@@ -1,9 +1,16 @@
 """
 Narratives module - builds stories using OFFICIAL instructions from YAML
+The Claude prompt is split into a static, cacheable system prompt (priority
+rules + OFFICIAL instructions) and a short per-request user message.
 """
 import json
+import math
+import os
 from datetime import datetime
-from .config import NARRATIVES_FILE
+from .config import NARRATIVES_FILE, QUESTIONS, CLAUDE_PROMPT_ENCODING
+from .data import data_file_lock
+from .anomaly import describe_anomaly
+from .effectiveness import prompt_effects, format_effectiveness_table
 
 OFFICIAL_INSTRUCTIONS = """
 You are analyzing work and individual metrics to build a coherent data-driven STORY about patterns and relationships.
@@ -141,29 +148,232 @@ def load_narratives():
     with open(NARRATIVES_FILE, 'r') as f:
         return json.load(f)
 
-def save_narrative(date, narrative, feedback=None):
-    narratives = load_narratives()
-    existing = next((n for n in narratives if n['date'] == date), None)
-    if existing:
-        if feedback:
-            existing['feedback'] = feedback
-            existing['updated_at'] = datetime.now().isoformat()
-    else:
-        narratives.append({
-            'date': date,
-            'narrative': narrative,
-            'feedback': feedback,
-            'created_at': datetime.now().isoformat()
-        })
-    with open(NARRATIVES_FILE, 'w') as f:
+def _write_narratives(narratives):
+    tmp = NARRATIVES_FILE.with_suffix('.json.tmp')
+    with open(tmp, 'w') as f:
         json.dump(narratives, f, indent=2)
+    os.replace(tmp, NARRATIVES_FILE)
+
+def save_narrative(date, narrative, feedback=None, mode=None):
+    """
+    Store the story saved for an entry, or add feedback to it.
+
+    Args:
+        date: Date string (YYYY-MM-DD) of the entry
+        narrative: Story text (None = keep the stored one, e.g. feedback only)
+        feedback: User feedback on the story (optional)
+        mode: 'Free' or 'Claude AI', whichever produced the story
+    """
+    with data_file_lock():
+        narratives = load_narratives()
+        existing = next((n for n in narratives if n['date'] == date), None)
+        if existing:
+            if narrative is not None:
+                existing['narrative'] = narrative
+                existing['mode'] = mode
+            if feedback:
+                existing['feedback'] = feedback
+            if narrative is not None or feedback:
+                existing['updated_at'] = datetime.now().isoformat()
+        else:
+            narratives.append({
+                'date': date,
+                'narrative': narrative,
+                'feedback': feedback,
+                'mode': mode,
+                'created_at': datetime.now().isoformat()
+            })
+        _write_narratives(narratives)
+
+def replace_narratives(stories, mode):
+    """
+    Store many regenerated stories at once (re-narration, backfill).
+
+    Dates without a record get one, placed among the others by date so
+    get_recent_narratives still returns the latest entries.
+
+    Args:
+        stories: Dict mapping date string (YYYY-MM-DD) to story text
+        mode: 'Free' or 'Claude AI', whichever produced the stories
+    """
+    if not stories:
+        return
+    with data_file_lock():
+        narratives = load_narratives()
+        now = datetime.now().isoformat()
+        for record in narratives:
+            if record['date'] in stories:
+                record.update(narrative=stories[record['date']], mode=mode, updated_at=now)
+        known = {record['date'] for record in narratives}
+        for date in sorted(set(stories) - known):
+            at = next((i for i, record in enumerate(narratives) if str(record['date']) > date), len(narratives))
+            narratives.insert(at, {'date': date, 'narrative': stories[date], 'feedback': None, 'mode': mode,
+                                   'created_at': now})
+        _write_narratives(narratives)
+
+def kept_narrative_dates():
+    """
+    Dates whose stored story a Free-mode re-narration must not replace:
+    Claude stories, stories regenerated from feedback, and stories saved
+    before the mode was recorded.
+    """
+    return {
+        str(record['date']) for record in load_narratives()
+        if record.get('feedback') or record.get('mode') != 'Free'
+    }
 
 def get_recent_narratives(n=3):
     narratives = load_narratives()
     return narratives[-n:] if len(narratives) >= n else narratives
 
-def build_context_prompt(metrics, previous, changes):
-    """Build prompt using OFFICIAL YAML instructions"""
+def get_recent_feedback(n=3):
+    """(date, feedback) pairs from the recent narratives the Claude prompt quotes."""
+    return [(narr['date'], narr['feedback']) for narr in get_recent_narratives(n) if narr.get('feedback')]
+
+# Static rules for the dynamic sections of the user message. They sit in the
+# system prompt (with OFFICIAL_INSTRUCTIONS) so the whole prefix is cacheable.
+PRIORITY_RULES = """
+## Priority Rules You Must Follow
+1. If an "Immediate User Directive" appears in the user message, answer it explicitly and confirm how your story addresses it before doing anything else.
+2. Incorporate any "User's Additional Context" into your reasoning and recommendations.
+3. Only after completing steps 1 and 2 should you follow the OFFICIAL narrative instructions below.
+
+## Reading the User Message
+- **Previous Recommendation**: compare the previous metrics with the current ones to assess (1) whether following the previous recommendations appears to have helped (look at metric changes), (2) which specific recommendations seem to have been effective, and (3) which areas still need attention or different approaches. Incorporate this effectiveness assessment into your new narrative and recommendations.
+- **Measured Protocol Effectiveness**: average change in each protocol's target metrics 1-3 entries after it was recommended (negative = improvement; Net+1 = change minus entries without that protocol). Favour protocols that have measurably helped this user.
+- **Changes from Previous Entry** and **Multivariate Anomaly Check** are for your reference. The anomaly check says how unusual today's combination of metrics is against this user's own history, even if no single metric crosses a threshold.
+- **Earlier User Feedback** is background context; use it only after you fully satisfy the immediate directive.
+"""
+
+_SKIP_KEYS = ('date', 'context', 'recommendation')
+
+
+def _metric_codes(questions):
+    """Short, unique code per metric key: word initials (or first 3 letters of one-word keys)."""
+    codes = {}
+    for q in questions:
+        words = q['key'].split('_')
+        base = ''.join(word[0] for word in words) if len(words) > 1 else q['key'][:3]
+        code, n = base, 2
+        while code in codes.values():
+            code, n = f"{base}{n}", n + 1
+        codes[q['key']] = code
+    return codes
+
+
+METRIC_CODES = _metric_codes(QUESTIONS)
+
+# Legend for the compact metric table; static, so it lives in the cached prefix
+METRIC_LEGEND = """
+## Reading the Metrics Table (compact encoding)
+Metrics may arrive as one table instead of labelled lists: `m` is the metric code below, `prev` and `curr` the previous and current entry, and `Δ` = curr − prev (the **Changes from Previous Entry**; blank when not tracked). `-` means no answer. Sliders are 0-10; yes/no flags are 1 = yes, 0 = no. Earlier feedback given on several days is listed once with all its dates.
+Codes: """ + "; ".join(f"{code} = {q['label']}" for q, code in zip(QUESTIONS, METRIC_CODES.values())) + "\n"
+
+SYSTEM_PROMPT = PRIORITY_RULES + METRIC_LEGEND + OFFICIAL_INSTRUCTIONS
+
+
+def build_system_prompt():
+    """
+    Static system prompt as content blocks, marked for Anthropic prompt caching.
+
+    Identical for every request, so after the first call it is read from the
+    prompt cache instead of being reprocessed.
+    """
+    return [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+def _metric_lines(entry):
+    return "".join(
+        f"- {key.replace('_', ' ').title()}: {value}\n"
+        for key, value in entry.items()
+        if key not in ('date', 'context', 'recommendation') and value is not None
+    )
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _format_value(value):
+    if _is_missing(value):
+        return '-'
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def _metric_table(metrics, previous, changes):
+    """
+    One aligned metric | prev | curr | Δ table (prev/Δ columns only when there
+    is a previous entry / changes), with abbreviated metric codes.
+    """
+    keys = [k for k in metrics if k not in _SKIP_KEYS]
+    if previous:
+        keys += [k for k in previous if k not in _SKIP_KEYS and k not in metrics]
+
+    header = ['m'] + (['prev'] if previous else []) + ['curr'] + (['Δ'] if changes else [])
+    rows = []
+    for key in keys:
+        current = metrics.get(key)
+        prior = previous.get(key) if previous else None
+        if _is_missing(current) and _is_missing(prior):
+            continue
+        row = [METRIC_CODES.get(key, key)]
+        if previous:
+            row.append(_format_value(prior))
+        row.append(_format_value(current))
+        if changes:
+            delta = changes[key]['delta'] if key in changes else None
+            row.append('' if _is_missing(delta) else f"{delta:+g}")
+        rows.append(row)
+    if not rows:
+        return ''
+
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+    return "".join(
+        " ".join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row)).rstrip()
+        + "\n"
+        for row in [header] + rows
+    )
+
+
+def _dedupe_feedback(narratives, directive=None):
+    """(dates, feedback) for distinct feedback texts, oldest first, skipping the directive's text."""
+    def normalize(text):
+        return ' '.join(text.split()).casefold()
+
+    skip = normalize(directive) if directive else None
+    grouped = {}
+    for narr in narratives:
+        text = narr.get('feedback')
+        if not text or normalize(text) == skip:
+            continue
+        grouped.setdefault(normalize(text), (text, []))[1].append(narr['date'])
+    return [(dates, text) for text, dates in grouped.values()]
+
+
+def build_context_prompt(metrics, previous, changes, anomaly=None, compact=None, effects=None):
+    """
+    Dynamic part of the Claude prompt (the user message).
+
+    Sent after build_system_prompt(); holds only what changes per request:
+    the latest feedback directive, context, metrics, previous entry, measured
+    effectiveness, changes, anomaly and earlier feedback.
+
+    The compact encoding (opt-in: CLAUDE_PROMPT_ENCODING=compact, or
+    compact=True) puts current, previous and change values in one table with
+    codes explained by the system prompt's legend, and lists repeated
+    feedback once. Verbose labelled lists are the default.
+
+    effects is the effectiveness table (default: prompt_effects(), computed
+    once per data version); callers building many prompts pass it in.
+    Building a prompt never writes files.
+    """
+    if compact is None:
+        compact = CLAUDE_PROMPT_ENCODING == 'compact'
+    if effects is None:
+        effects = prompt_effects()
+
     recent_narratives = get_recent_narratives(3)
 
     # Locate the most recent piece of user feedback (if any)
@@ -186,33 +396,29 @@ def build_context_prompt(metrics, previous, changes):
     # Add user's free-form context prominently just below the directive if provided
     if user_context:
         prompt += "## User's Additional Context\n"
-        prompt += "**Use this situational context to interpret the metrics and frame your story.**\n\n"
         prompt += f"> {user_context}\n\n"
     
+    if compact:
+        return prompt + _compact_sections(metrics, previous, changes, anomaly, recent_narratives, latest_feedback_entry,
+                                   effects)
+
     prompt += "## Current Metrics\n"
-    for key, value in metrics.items():
-        if key != 'date' and key != 'context' and key != 'recommendation' and value is not None:
-            prompt += f"- {key.replace('_', ' ').title()}: {value}\n"
+    prompt += _metric_lines(metrics)
     
-    # Add previous recommendation effectiveness analysis
+    # Previous entry and its recommendation (effectiveness assessment)
     if previous and 'recommendation' in previous and previous['recommendation']:
-        prompt += "\n## Previous Recommendation Effectiveness Analysis\n"
-        prompt += "**Previous Entry Date:** " + str(previous.get('date', 'Unknown')) + "\n\n"
+        prompt += f"\n## Previous Recommendation ({previous.get('date', 'Unknown')})\n"
         prompt += "**Previous Metrics:**\n"
-        for key, value in previous.items():
-            if key != 'date' and key != 'context' and key != 'recommendation' and value is not None:
-                prompt += f"- {key.replace('_', ' ').title()}: {value}\n"
-        
-        prompt += "\n**Previous Recommendation:**\n"
-        prompt += f"{previous['recommendation']}\n\n"
-        prompt += "**Your Task:** Compare the previous metrics with current metrics to assess:\n"
-        prompt += "1. Did following the previous recommendations appear to help? (Look at metric changes)\n"
-        prompt += "2. Which specific recommendations seem to have been effective?\n"
-        prompt += "3. Which areas still need attention or different approaches?\n"
-        prompt += "4. Incorporate this effectiveness assessment into your new narrative and recommendations.\n\n"
+        prompt += _metric_lines(previous)
+        prompt += f"\n**Previous Recommendation:**\n{previous['recommendation']}\n"
     
+    effectiveness_table = format_effectiveness_table(effects)
+    if effectiveness_table:
+        prompt += "\n## Measured Protocol Effectiveness\n"
+        prompt += effectiveness_table + "\n"
+
     if changes:
-        prompt += "\n## Changes from Previous Entry (for your reference)\n"
+        prompt += "\n## Changes from Previous Entry\n"
         
         rising = []
         declining = []
@@ -240,22 +446,47 @@ def build_context_prompt(metrics, previous, changes):
             for item in stable:
                 prompt += f"- {item}\n"
     
+    if anomaly:
+        prompt += "\n## Multivariate Anomaly Check\n"
+        prompt += f"- {describe_anomaly(anomaly)}\n"
+
     historical_feedback = [
         narr for narr in recent_narratives
         if narr.get('feedback') and narr != latest_feedback_entry
     ]
 
     if historical_feedback:
-        prompt += "\n## Earlier User Feedback (Reference Only)\n"
-        prompt += "Use these prior comments for background context after you fully satisfy the immediate directive.\n"
+        prompt += "\n## Earlier User Feedback\n"
         for narr in historical_feedback:
             prompt += f"{narr['date']}: {narr['feedback']}\n"
     
-    prompt += "\n## Priority Rules You Must Follow\n"
-    prompt += "1. If an \"Immediate User Directive\" appears above, answer it explicitly and confirm how your story addresses it before doing anything else.\n"
-    prompt += "2. Incorporate any \"User's Additional Context\" into your reasoning and recommendations.\n"
-    prompt += "3. Only after completing steps 1 and 2 should you follow the OFFICIAL narrative instructions that follow.\n"
-
-    prompt += "\n" + OFFICIAL_INSTRUCTIONS
-    
     return prompt
+
+
+def _compact_sections(metrics, previous, changes, anomaly, recent_narratives, latest_feedback_entry, effects):
+    """Everything after the directive/context in the compact encoding."""
+    dates = []
+    if previous and previous.get('date'):
+        dates.append(f"prev {previous['date']}")
+    if metrics.get('date'):
+        dates.append(f"curr {metrics['date']}")
+    section = f"## Metrics ({', '.join(dates)})\n" if dates else "## Metrics\n"
+    section += _metric_table(metrics, previous, changes)
+
+    if previous and previous.get('recommendation'):
+        section += f"\n## Previous Recommendation ({previous.get('date', 'Unknown')})\n{previous['recommendation']}\n"
+
+    effectiveness_table = format_effectiveness_table(effects)
+    if effectiveness_table:
+        section += "\n## Measured Protocol Effectiveness\n" + effectiveness_table + "\n"
+
+    if anomaly:
+        section += f"\n## Multivariate Anomaly Check\n- {describe_anomaly(anomaly)}\n"
+
+    directive = latest_feedback_entry['feedback'] if latest_feedback_entry else None
+    earlier = [narr for narr in recent_narratives if narr is not latest_feedback_entry]
+    feedback = _dedupe_feedback(earlier, directive)
+    if feedback:
+        section += "\n## Earlier User Feedback\n"
+        section += "".join(f"{', '.join(dates)}: {text}\n" for dates, text in feedback)
+    return section
@@ -0,0 +1,243 @@
+"""
+Renarrate module - bulk regeneration of stored Free-mode narratives
+Re-runs severity + the local narrative for a date range on a process pool,
+writes results to the data file in batches and records progress in a job
+file so an interrupted run picks up where it stopped. Claude stories and
+stories regenerated from feedback are kept unless overwrite is asked for.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import RENARRATION_JOB_FILE, THRESHOLDS
+
+CHUNK_SIZE = 250    # Entries per worker task
+COMMIT_EVERY = 500  # Narratives buffered before each write to the data file
+
+_worker: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def threshold_profile(config_thresholds: Dict) -> Dict:
+    """Free-mode thresholds from the Configuration tab, as Analyze & Save uses them."""
+    custom_thresholds = THRESHOLDS.copy()
+    for key, value in config_thresholds.items():
+        if key in custom_thresholds:
+            custom_thresholds[key] = value
+    return {
+        'custom_thresholds': custom_thresholds,
+        'problem_threshold': config_thresholds.get('problem_threshold', 6),
+        'increase_threshold': config_thresholds.get('increase_threshold', 1.0)
+    }
+
+
+def _job_key(start: date, end: date, profile: Dict, overwrite: bool = False) -> str:
+    payload = json.dumps([str(start), str(end), profile, overwrite], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def _save_job(job: Dict) -> None:
+    RENARRATION_JOB_FILE.parent.mkdir(parents=True, exist_ok=True)
+    job['updated_at'] = datetime.now().isoformat()
+    with open(RENARRATION_JOB_FILE, 'w') as f:
+        json.dump(job, f)
+
+
+def load_renarration_job() -> Optional[Dict]:
+    """
+    Last re-narration job (progress, status), or None if none was run.
+
+    A job left 'running' by a process that no longer runs it reports 'interrupted'.
+    """
+    if not RENARRATION_JOB_FILE.exists():
+        return None
+    try:
+        with open(RENARRATION_JOB_FILE, 'r') as f:
+            job = json.load(f)
+    except ValueError:
+        return None
+    if job.get('status') == 'running' and not renarration_running():
+        job['status'] = 'interrupted'
+    job['done'] = len(job.get('completed', []))
+    return job
+
+
+def _narrate_chunk(frame: pd.DataFrame, keep: List[int], profile: Dict,
+                   anomalies: List[Optional[Dict]], archetypes: List[Optional[Dict]]) -> List[Tuple[str, str]]:
+    """Worker task: (date, narrative) for the frame rows listed in keep."""
+    from .local_narrative import build_local_narratives_batch
+    narratives = build_local_narratives_batch(frame, anomalies=anomalies, archetypes=archetypes, **profile)
+    dates = frame['date'].astype(str).tolist()
+    return [(dates[i], narratives[i]) for i in keep]
+
+
+def _plan_tasks(df: pd.DataFrame, pending: List[int], profile: Dict, chunk_size: int) -> List[Tuple]:
+    """Split pending row positions into chunks, each carrying the row before it as context."""
+    from .anomaly import load_anomaly_state
+    from .archetypes import classify_entries
+
+    dates = df['date'].astype(str).tolist()
+    _, scores = load_anomaly_state(df)
+    archetypes = dict(zip(pending, classify_entries(df.iloc[pending].to_dict('records'))))
+
+    tasks = []
+    for offset in range(0, len(pending), chunk_size):
+        group = pending[offset:offset + chunk_size]
+        lo, hi = max(group[0] - 1, 0), group[-1] + 1
+        wanted = set(group)
+        tasks.append((
+            df.iloc[lo:hi],
+            [p - lo for p in group],
+            profile,
+            [scores.get(dates[p]) if p in wanted else None for p in range(lo, hi)],
+            [archetypes.get(p) for p in range(lo, hi)]
+        ))
+    return tasks
+
+
+def run_renarration(
+    start: date,
+    end: date,
+    profile: Dict,
+    workers: Optional[int] = None,
+    resume: bool = True,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+    overwrite: bool = False
+) -> Dict:
+    """
+    Regenerate Free-mode narratives for every stored entry in [start, end].
+
+    Each batch is written under the data file lock, so entries saved
+    meanwhile are kept. Stories narratives.json does not mark as Free-mode
+    (see kept_narrative_dates) are skipped unless overwrite is set; replaced
+    stories are updated in narratives.json too, and cached Free stories are
+    dropped.
+
+    Args:
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        profile: Thresholds from threshold_profile()
+        workers: Process count (None = one per CPU, 1 = run in this process)
+        resume: Skip dates an unfinished job with the same range and profile already wrote
+        chunk_size: Entries per worker task
+        progress: Optional callback(done, total) after each batched write
+        overwrite: Also replace Claude stories and stories regenerated from feedback
+
+    Returns:
+        dict: the final job record (status, total, done, skipped, error)
+    """
+    from .data import data_file_lock, load_data, update_entry_recommendations
+    from .narratives import kept_narrative_dates, replace_narratives
+    from .service_client import call
+
+    key = _job_key(start, end, profile, overwrite)
+    job = {
+        'key': key, 'start': str(start), 'end': str(end), 'profile': profile, 'overwrite': overwrite,
+        'status': 'running', 'total': 0, 'completed': [], 'skipped': 0, 'error': None,
+        'started_at': datetime.now().isoformat()
+    }
+    previous = load_renarration_job()
+    if resume and previous and previous.get('key') == key and previous.get('status') != 'completed':
+        job['completed'] = previous.get('completed', [])
+        job['skipped'] = previous.get('skipped', 0)
+
+    df = load_data()
+    if len(df) == 0 or 'date' not in df.columns:
+        job['status'] = 'completed'
+        _save_job(job)
+        return load_renarration_job()
+
+    dates = df['date'].astype(str)
+    days = pd.to_datetime(dates, errors='coerce').dt.date
+    in_range = ((days >= start) & (days <= end)).to_numpy()
+    done = set(job['completed'])
+    pending = [int(p) for p in np.flatnonzero(in_range) if dates.iloc[p] not in done]
+    job['total'] = int(in_range.sum())
+    _save_job(job)
+
+    buffer = {}
+
+    def commit():
+        if buffer:
+            with data_file_lock():
+                kept = set() if overwrite else kept_narrative_dates()
+                stories = {day: text for day, text in buffer.items() if day not in kept}
+                update_entry_recommendations(stories)
+                replace_narratives(stories, 'Free')
+            if stories:
+                call('discard_cached_narratives', 'Free')
+            job['skipped'] += len(buffer) - len(stories)
+            job['completed'].extend(buffer)
+            buffer.clear()
+        _save_job(job)
+        if progress:
+            progress(len(job['completed']), job['total'])
+
+    try:
+        tasks = _plan_tasks(df, pending, profile, chunk_size) if pending else []
+        if workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                if _stop.is_set():
+                    break
+                buffer.update(_narrate_chunk(*task))
+                if len(buffer) >= COMMIT_EVERY:
+                    commit()
+        else:
+            # Spawn (not fork): the job usually runs from a thread inside Streamlit
+            context = multiprocessing.get_context('spawn')
+            max_workers = min(workers or os.cpu_count() or 1, len(tasks))
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+                futures = [pool.submit(_narrate_chunk, *task) for task in tasks]
+                for future in as_completed(futures):
+                    if _stop.is_set():
+                        for pending_future in futures:
+                            pending_future.cancel()
+                        break
+                    buffer.update(future.result())
+                    if len(buffer) >= COMMIT_EVERY:
+                        commit()
+        commit()
+        job['status'] = 'completed' if len(job['completed']) >= job['total'] else 'interrupted'
+    except Exception as e:
+        commit()
+        job['status'] = 'failed'
+        job['error'] = str(e)
+    _stop.clear()
+    _save_job(job)
+    return load_renarration_job()
+
+
+def start_renarration(start: date, end: date, profile: Dict, workers: Optional[int] = None,
+                      overwrite: bool = False) -> bool:
+    """Run run_renarration in a background thread; False if a job is already running."""
+    global _worker
+    if renarration_running():
+        return False
+    _stop.clear()
+    _worker = threading.Thread(
+        target=run_renarration,
+        args=(start, end, profile),
+        kwargs={'workers': workers, 'overwrite': overwrite},
+        name='renarration',
+        daemon=True
+    )
+    _worker.start()
+    return True
+
+
+def stop_renarration() -> None:
+    """Ask the running job to stop after the current chunk (progress so far is kept)."""
+    _stop.set()
+
+
+def renarration_running() -> bool:
+    return _worker is not None and _worker.is_alive()
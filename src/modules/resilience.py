@@ -0,0 +1,142 @@
+"""
+Resilience module - jittered retries and a circuit breaker for Claude calls
+Transient failures (connection errors, timeouts, 429/5xx/overloaded) are
+retried with full-jitter exponential backoff. After CLAUDE_BREAKER_FAILURES
+consecutive failures the breaker opens and calls skip the network entirely
+for CLAUDE_BREAKER_COOLDOWN seconds, then a single trial call decides
+whether to close it again.
+"""
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+import anthropic
+
+from .config import CLAUDE_BREAKER_FAILURES, CLAUDE_BREAKER_COOLDOWN
+
+BACKOFF_BASE = 0.5  # Seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 8.0   # Cap on a single backoff wait
+
+T = TypeVar('T')
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Claude while the breaker is open."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Claude calls paused after repeated failures; retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker: closed -> open (after failure_threshold
+    failures) -> half-open (one trial after cooldown) -> closed or open.
+    """
+
+    def __init__(self, failure_threshold: int = CLAUDE_BREAKER_FAILURES,
+                 cooldown: float = CLAUDE_BREAKER_COOLDOWN, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if self._clock() - self._opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call is allowed (0 when closed)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """True if a call may go out now (half-open lets exactly one trial through)."""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+_breaker = CircuitBreaker()
+
+
+def get_claude_breaker() -> CircuitBreaker:
+    """Process-wide breaker shared by every Claude narrative call."""
+    return _breaker
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Full-jitter backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def is_retryable(error: Exception) -> bool:
+    """Network errors, timeouts, rate limits and server-side errors; not bad requests."""
+    if isinstance(error, anthropic.APIConnectionError):  # Includes APITimeoutError
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def call_with_retries(fn: Callable[[], T], retries: int, breaker: Optional[CircuitBreaker] = None,
+                      sleep: Callable[[float], None] = time.sleep) -> T:
+    """
+    Call fn, retrying transient failures up to retries times with jittered backoff.
+
+    Every transient failure counts towards the breaker; while it is open the
+    call raises CircuitOpenError without touching the network. Non-transient
+    errors are raised at once (they say nothing about Claude's health).
+    """
+    breaker = breaker or _breaker
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.retry_in())
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.record_success()  # The service answered
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            sleep(backoff_delay(attempt))
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,172 @@
+"""
+Rollups module - weekly and monthly aggregates per metric for the dashboard
+Every bucket keeps a count, sum, max and a histogram of the whole-number
+answers, so saving an entry touches one week and one month bucket in O(1),
+and mean, max, p90 and the share at or above any threshold are read back
+exactly (thresholds can change in Configuration without a rebuild).
+"""
+import json
+import math
+import os
+from datetime import timedelta
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .config import QUESTIONS, ROLLUPS_STATE_FILE, THRESHOLDS
+from .severity import PROBLEM_THRESHOLD
+
+# Yes/no answers are not charted, so they are not rolled up either
+ROLLUP_KEYS = [q['key'] for q in QUESTIONS if q.get('type') != 'yesno']
+PERIODS = ('week', 'month')
+P90 = 0.9
+
+
+def bucket_start(value, period: str) -> str:
+    """First day (ISO date) of the week (Monday) or month holding value."""
+    day = pd.Timestamp(str(value)).date()
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+    elif period == 'month':
+        start = day.replace(day=1)
+    else:
+        raise ValueError(f"Unknown rollup period: {period}")
+    return start.isoformat()
+
+
+def _number(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def _add_entry(state: Dict, entry: Dict) -> None:
+    """Fold one entry into its week and month buckets."""
+    state['entries'] += 1
+    if not entry.get('date'):
+        return
+    for period in PERIODS:
+        bucket = state['buckets'][period].setdefault(bucket_start(entry['date'], period), {})
+        for key in ROLLUP_KEYS:
+            value = _number(entry.get(key))
+            if value is None:
+                continue
+            stats = bucket.setdefault(key, {'n': 0, 'sum': 0.0, 'max': value, 'hist': {}})
+            stats['n'] += 1
+            stats['sum'] += value
+            stats['max'] = max(stats['max'], value)
+            level = str(int(round(value)))
+            stats['hist'][level] = stats['hist'].get(level, 0) + 1
+
+
+def _empty_state() -> Dict:
+    return {'keys': ROLLUP_KEYS, 'entries': 0, 'buckets': {period: {} for period in PERIODS}}
+
+
+def _rebuild_from_history(history) -> Dict:
+    """One-off replay of stored entries (state missing, stale or metric set changed)."""
+    state = _empty_state()
+    if history is not None and len(history) > 0:
+        for entry in history.to_dict('records'):
+            _add_entry(state, entry)
+    return state
+
+
+def load_rollups(history=None) -> Dict:
+    """
+    Load the rollup state, rebuilding it if it is missing, built for another
+    metric set, or (when history is given) counts a different number of entries.
+
+    Args:
+        history: DataFrame of stored entries to check against and rebuild from
+    """
+    if ROLLUPS_STATE_FILE.exists():
+        try:
+            with open(ROLLUPS_STATE_FILE, 'r') as f:
+                state = json.load(f)
+            if state.get('keys') == ROLLUP_KEYS and (history is None or state['entries'] == len(history)):
+                return state
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    if history is None:
+        from .data import load_data
+        history = load_data()
+    state = _rebuild_from_history(history)
+    _save_rollups(state)
+    return state
+
+
+def _save_rollups(state: Dict) -> None:
+    """Write atomically (the dashboard may be reading); dumps() is much faster than dump() here."""
+    ROLLUPS_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = ROLLUPS_STATE_FILE.with_suffix('.json.tmp')
+    with open(tmp_file, 'w') as f:
+        f.write(json.dumps(state, separators=(',', ':')))
+    os.replace(tmp_file, ROLLUPS_STATE_FILE)
+
+
+def record_rollup(entry: Dict, history=None) -> None:
+    """
+    Add a newly saved entry to its week and month buckets.
+
+    Args:
+        entry: Metrics dict being saved
+        history: Entries stored before this one (used to validate / rebuild)
+    """
+    state = load_rollups(history)
+    _add_entry(state, entry)
+    _save_rollups(state)
+
+
+def _percentile(hist: Dict[str, int], n: int, q: float) -> float:
+    """Nearest-rank percentile from a value histogram."""
+    rank = max(1, math.ceil(q * n))
+    seen = 0
+    for level, count in sorted(hist.items(), key=lambda item: int(item[0])):
+        seen += count
+        if seen >= rank:
+            return float(level)
+    return float('nan')
+
+
+def rollup_table(period: str, key: str, thresholds: Optional[Dict] = None, since=None,
+                 state: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    One row per bucket for a metric, oldest first.
+
+    Args:
+        period: 'week' or 'month'
+        key: metric key
+        thresholds: threshold map; '{key}_high' decides what counts as "above"
+        since: only buckets containing or after this date
+        state: rollups from load_rollups() (loaded if omitted)
+
+    Returns:
+        DataFrame with date (bucket start), count, mean, max, p90 and above
+        (share of entries at or above the threshold)
+    """
+    thresholds = thresholds if thresholds is not None else THRESHOLDS
+    threshold = thresholds.get(f'{key}_high', thresholds.get('problem_threshold', PROBLEM_THRESHOLD))
+    first = bucket_start(since, period) if since is not None else None
+
+    rows = []
+    state = state if state is not None else load_rollups()
+    for start, bucket in sorted(state['buckets'][period].items()):
+        stats = bucket.get(key)
+        if not stats or (first and start < first):
+            continue
+        above = sum(count for level, count in stats['hist'].items() if int(level) >= threshold)
+        rows.append({
+            'date': start,
+            'count': stats['n'],
+            'mean': round(stats['sum'] / stats['n'], 2),
+            'max': stats['max'],
+            'p90': _percentile(stats['hist'], stats['n'], P90),
+            'above': round(above / stats['n'], 3),
+        })
+    table = pd.DataFrame(rows, columns=['date', 'count', 'mean', 'max', 'p90', 'above'])
+    table['date'] = pd.to_datetime(table['date'])
+    return table
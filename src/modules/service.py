@@ -0,0 +1,213 @@
+"""
+Service module - one local process that owns writes, model state and narratives
+Run src/metrics_service.py and both Streamlit front-ends send saves, anomaly
+and archetype scoring, the narrative pipeline, background jobs and
+speculation here as JSON over HTTP (see service_client), so that work and
+its caches exist once instead of once per app, and a single process
+serialises every write to the data files. Reads of the data file stay in
+the front-ends; the file remains the source of truth.
+
+Each call carries a request ID; a repeated ID gets the first run's result
+instead of running again, so a client may resend a call whose answer it
+lost. The service exposes paid Claude calls and writes: it only listens on
+a non-loopback interface with a shared token, which every call must send.
+"""
+import hmac
+import importlib
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+# name -> (module, function, writes data files)
+OPERATIONS: Dict[str, Tuple[str, str, bool]] = {
+    'save_entry': ('data', 'save_entry', True),
+    'update_entry_recommendation': ('data', 'update_entry_recommendation', True),
+    'save_narrative': ('narratives', 'save_narrative', True),
+    'update_narrative_with_feedback': ('analysis', 'update_narrative_with_feedback', True),
+    'score_entry': ('anomaly', 'score_entry', False),
+    'get_entry_anomaly': ('anomaly', 'get_entry_anomaly', False),
+    'classify_entry': ('archetypes', 'classify_entry', False),
+    'analyze_with_narrative': ('analysis', 'analyze_with_narrative', False),
+    'discard_cached_narratives': ('narrative_cache', 'discard_cached_narratives', False),
+    'narrative_cache_stats': ('narrative_cache', 'narrative_cache_stats', False),
+    'clear_narrative_cache': ('narrative_cache', 'clear_narrative_cache', False),
+    'prompt_cache_stats': ('analysis', 'prompt_cache_stats', False),
+    'submit_narrative_job': ('jobs', 'submit_narrative_job', False),
+    'record_narrative_job': ('jobs', 'record_narrative_job', False),
+    'poll_job': ('jobs', 'poll_job', False),
+    'claim_job': ('jobs', 'claim_job', False),
+    'latest_unclaimed_job': ('jobs', 'latest_unclaimed_job', False),
+    'speculate': ('speculation', 'speculate', False),
+    'discard_speculation': ('speculation', 'discard_speculation', False),
+    'take_speculation': ('speculation', 'take_speculation', False),
+}
+JOB_OPERATIONS = ('submit_narrative_job', 'record_narrative_job', 'poll_job', 'claim_job', 'latest_unclaimed_job')
+REPLY_SLOTS = 256  # Request IDs remembered for repeated calls
+
+
+def is_loopback(host: str) -> bool:
+    """True if every address host resolves to is a loopback address."""
+    if not host:
+        return False  # All interfaces
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(address.split('%')[0]).is_loopback for address in addresses)
+
+
+def resolve_operation(name: str) -> Callable:
+    """The in-process function behind an operation name."""
+    module, function, _ = OPERATIONS[name]
+    return getattr(importlib.import_module(f'.{module}', __package__), function)
+
+
+def to_json(payload) -> bytes:
+    """JSON with numpy scalars and timestamps made plain (NaN passes through)."""
+    def plain(value):
+        if hasattr(value, 'item'):
+            return value.item()
+        return str(value)
+    return json.dumps(payload, default=plain).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep connections open between requests
+    wbufsize = 64 * 1024           # One segment per response (no Nagle + delayed ACK stall)
+    disable_nagle_algorithm = True
+    server: 'MetricsService'
+
+    def log_message(self, format, *args):  # Quiet unless something fails
+        pass
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = to_json(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        sent = self.headers.get('Authorization', '')
+        if hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+            return True
+        self.close_connection = True  # The unread request body must not reach the next request
+        self._send_json(401, {'error': "Missing or wrong service token"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path.split('?')[0] == '/health':
+            self._send_json(200, self.server.health())
+        else:
+            self._send_json(404, {'error': f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        path = self.path.split('?')[0]
+        name = path[len('/call/'):] if path.startswith('/call/') else None
+        if name not in OPERATIONS:
+            self._send_json(404, {'error': f"Unknown operation: {path}"})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            result = self.server.call(name, request.get('args', []), request.get('kwargs', {}),
+                                      request.get('request_id'))
+        except Exception as e:
+            print(f"⚠️ Service call {name} failed: {type(e).__name__}: {e}")
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, {'result': result})
+
+
+class MetricsService(ThreadingHTTPServer):
+    """
+    Threaded HTTP/JSON server for OPERATIONS; writes run one at a time.
+
+    Raises ValueError for a non-loopback host without a token.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8503, token: Optional[str] = None):
+        if not token and not is_loopback(host):
+            raise ValueError(f"{host} is reachable from other machines; set METRICS_SERVICE_TOKEN to serve on it")
+        super().__init__((host, port), _Handler)
+        self.token = token
+        self.started = time.time()
+        self.calls: Dict[str, int] = {}
+        self._write_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._replies: 'OrderedDict[str, Future]' = OrderedDict()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def call(self, name: str, args, kwargs, request_id: Optional[str] = None):
+        """Run an operation; a request_id seen before returns (or waits for) that call's result."""
+        if request_id is None:
+            return self._run(name, args, kwargs)
+        with self._counter_lock:
+            reply = self._replies.get(request_id)
+            repeated = reply is not None
+            if not repeated:
+                reply = self._replies[request_id] = Future()
+                while len(self._replies) > REPLY_SLOTS:
+                    self._replies.popitem(last=False)
+        if repeated:
+            return reply.result()
+        try:
+            result = self._run(name, args, kwargs)
+        except Exception as e:
+            reply.set_exception(e)
+            raise
+        reply.set_result(result)
+        return result
+
+    def _run(self, name: str, args, kwargs):
+        with self._counter_lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        function = resolve_operation(name)
+        if OPERATIONS[name][2]:
+            with self._write_lock:
+                return function(*args, **kwargs)
+        return function(*args, **kwargs)
+
+    def health(self) -> Dict:
+        with self._counter_lock:
+            calls = dict(self.calls)
+        return {'status': 'ok', 'pid': os.getpid(), 'uptime_s': round(time.time() - self.started, 1),
+                'calls': calls}
+
+    def start(self) -> 'MetricsService':
+        """Serve from a background thread (tests and benchmarks)."""
+        self._thread = threading.Thread(target=self.serve_forever, name='metrics-service', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
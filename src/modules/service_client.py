@@ -0,0 +1,210 @@
+"""
+Service client module - thin-client calls to the shared metrics service
+Same names and signatures as the functions they stand in for. Each call
+goes to the service at METRICS_SERVICE_URL; if the connection cannot even
+be opened the function runs in-process instead, and the client stays
+in-process for METRICS_SERVICE_RETRY seconds before trying the service
+again. Once a request may have reached the service nothing runs locally: a
+connection lost mid-call is resent once with the same request ID (the
+service answers a repeat from its first run), and operation errors or slow
+answers are reported, so a save cannot happen twice. Job operations never
+run in-process while a service is configured, so one job pool owns the jobs.
+"""
+import json
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+
+from .config import METRICS_SERVICE_RETRY, METRICS_SERVICE_TIMEOUT, METRICS_SERVICE_TOKEN, METRICS_SERVICE_URL
+from .service import JOB_OPERATIONS, resolve_operation, to_json
+from .speculation import TAKE_WAIT
+
+CONNECT_TIMEOUT = 0.5
+
+_settings = {
+    'url': METRICS_SERVICE_URL,
+    'timeout': METRICS_SERVICE_TIMEOUT,
+    'retry_after': METRICS_SERVICE_RETRY,
+    'token': METRICS_SERVICE_TOKEN
+}
+_session: Optional[requests.Session] = None
+_down_until = 0.0
+_lock = threading.Lock()
+
+
+class ServiceError(RuntimeError):
+    """The service ran the operation and it raised, or could not be asked."""
+
+
+def configure_service_client(**overrides) -> None:
+    """Point the client elsewhere (url='' keeps every call in-process)."""
+    global _down_until
+    unknown = set(overrides) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown service client settings: {', '.join(sorted(unknown))}")
+    with _lock:
+        _settings.update(overrides)
+        _down_until = 0.0
+
+
+def service_settings() -> Dict:
+    return dict(_settings)
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()  # Keep-alive to the service
+        return _session
+
+
+def service_available() -> bool:
+    """True when calls currently go to the service rather than in-process."""
+    return bool(_settings['url']) and time.monotonic() >= _down_until
+
+
+def _headers() -> Dict[str, str]:
+    headers = {'Content-Type': 'application/json'}
+    if _settings['token']:
+        headers['Authorization'] = f"Bearer {_settings['token']}"
+    return headers
+
+
+def _not_connected(error: requests.ConnectionError) -> bool:
+    """True if the connection was never opened (refused, unreachable, connect timeout)."""
+    reason = error.args[0] if error.args else None
+    return isinstance(error, requests.ConnectTimeout) or isinstance(
+        getattr(reason, 'reason', reason), ConnectTimeoutError  # NewConnectionError is a ConnectTimeoutError
+    )
+
+
+def call(name: str, *args, **kwargs):
+    """Run operation name on the service, or in-process when the service cannot be reached."""
+    global _down_until
+    if service_available():
+        body = to_json({'args': args, 'kwargs': kwargs, 'request_id': uuid.uuid4().hex})
+        for attempt in range(2):
+            try:
+                response = _get_session().post(
+                    f"{_settings['url']}/call/{name}", data=body, headers=_headers(),
+                    timeout=(CONNECT_TIMEOUT, _settings['timeout'])
+                )
+            except requests.ConnectionError as e:
+                if _not_connected(e):
+                    with _lock:
+                        _down_until = time.monotonic() + _settings['retry_after']
+                    break
+                if attempt:
+                    raise ServiceError(f"Lost the metrics service during {name}: {e}") from e
+                continue  # It may have run: resend under the same request ID
+            payload = json.loads(response.content)
+            if response.status_code != 200:
+                raise ServiceError(payload.get('error', f"HTTP {response.status_code}"))
+            return payload['result']
+    if _settings['url'] and name in JOB_OPERATIONS:
+        raise ServiceError(f"The metrics service at {_settings['url']} is not reachable, so background "
+                           f"stories are unavailable; start it with make service.")
+    return resolve_operation(name)(*args, **kwargs)
+
+
+def service_health() -> Optional[Dict]:
+    """The service's /health payload, or None if it is not reachable."""
+    if not _settings['url']:
+        return None
+    try:
+        return _get_session().get(f"{_settings['url']}/health", headers=_headers(),
+                                  timeout=(CONNECT_TIMEOUT, 5)).json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+# Storage writes
+
+def save_entry(metrics: Dict) -> None:
+    call('save_entry', metrics)
+
+
+def update_entry_recommendation(date, recommendation: str) -> bool:
+    return call('update_entry_recommendation', date, recommendation)
+
+
+def save_narrative(date, narrative: str, feedback: Optional[str] = None, mode: Optional[str] = None) -> None:
+    call('save_narrative', date, narrative, feedback, mode)
+
+
+def update_narrative_with_feedback(date, feedback: str) -> bool:
+    return call('update_narrative_with_feedback', date, feedback)
+
+
+# Model state
+
+def score_entry(entry: Dict) -> Optional[Dict]:
+    return call('score_entry', entry)
+
+
+def get_entry_anomaly(date) -> Optional[Dict]:
+    return call('get_entry_anomaly', date)
+
+
+def classify_entry(entry: Dict) -> Optional[Dict]:
+    return call('classify_entry', entry)
+
+
+# Narrative pipeline, background jobs and speculation
+
+def analyze_with_narrative(metrics: Dict, previous: Optional[Dict] = None, changes: Optional[Dict] = None,
+                           **options) -> Tuple[Optional[str], Optional[str]]:
+    narrative, error = call('analyze_with_narrative', metrics, previous, changes, **options)
+    return narrative, error
+
+
+def submit_narrative_job(metrics: Dict, previous: Optional[Dict] = None, changes: Optional[Dict] = None,
+                         **options) -> str:
+    return call('submit_narrative_job', metrics, previous, changes, **options)
+
+
+def record_narrative_job(narrative: str, metrics: Dict, previous: Optional[Dict] = None,
+                         changes: Optional[Dict] = None, **options) -> str:
+    return call('record_narrative_job', narrative, metrics, previous, changes, **options)
+
+
+def poll_job(job_id: str) -> Optional[Dict]:
+    return call('poll_job', job_id)
+
+
+def claim_job(job_id: str) -> None:
+    call('claim_job', job_id)
+
+
+def latest_unclaimed_job(session_id: Optional[str] = None) -> Optional[Dict]:
+    return call('latest_unclaimed_job', session_id)
+
+
+def narrative_cache_stats() -> Dict:
+    return call('narrative_cache_stats')
+
+
+def clear_narrative_cache() -> None:
+    call('clear_narrative_cache')
+
+
+def prompt_cache_stats() -> Dict:
+    return call('prompt_cache_stats')
+
+
+def speculate(metrics: Dict, previous: Optional[Dict], custom_thresholds: Dict,
+              problem_threshold: float, increase_threshold: float) -> str:
+    return call('speculate', metrics, previous, custom_thresholds, problem_threshold, increase_threshold)
+
+
+def discard_speculation(key: Optional[str]) -> None:
+    call('discard_speculation', key)
+
+
+def take_speculation(key: str, wait: float = TAKE_WAIT) -> Optional[Dict]:
+    return call('take_speculation', key, wait)
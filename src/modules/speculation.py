@@ -0,0 +1,116 @@
+"""
+Speculation module - Free-mode analysis computed before "Analyze & Save"
+As soon as every required radar answer is in, the Input tab hands the
+current answers to speculate(): changes, severity, the anomaly score, the
+day archetype and the local narrative are computed on a background thread.
+The result is keyed by the answers, thresholds and data version, so a
+changed answer simply misses; submitting reuses it only on an exact match.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+SPECULATION_SLOTS = 4  # Recent answer sets kept (one per open session is plenty)
+TAKE_WAIT = 2.0        # Seconds submit waits for a speculation still running
+
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speculation')
+_results: 'OrderedDict[str, Future]' = OrderedDict()
+
+
+def _plain(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def speculation_key(metrics: Dict, previous: Optional[Dict], custom_thresholds: Dict,
+                    problem_threshold: float, increase_threshold: float) -> str:
+    """Fingerprint of everything a Free-mode analysis of these answers depends on."""
+    from .data import get_data_version
+
+    payload = json.dumps(
+        [metrics, previous, custom_thresholds, problem_threshold, increase_threshold, get_data_version()],
+        sort_keys=True, default=_plain
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _analyze(metrics: Dict, previous: Optional[Dict], custom_thresholds: Dict,
+             problem_threshold: float, increase_threshold: float) -> Dict:
+    """Everything submit computes in Free mode, plus the narrative itself."""
+    from .analysis import analyze_with_narrative
+    from .anomaly import score_entry
+    from .archetypes import classify_entry
+    from .data import get_metric_changes
+    from .severity import analyze_metrics_severity
+
+    changes = get_metric_changes(metrics, previous)
+    severity_results = analyze_metrics_severity(
+        metrics, previous,
+        problem_threshold=problem_threshold,
+        increase_threshold=increase_threshold,
+        custom_thresholds=custom_thresholds
+    )
+    anomaly = score_entry(metrics)
+    archetype = classify_entry(metrics)
+    narrative, error = analyze_with_narrative(
+        metrics, previous, changes, mode='Free',
+        severity_results=severity_results, custom_thresholds=custom_thresholds,
+        anomaly=anomaly, archetype=archetype
+    )
+    return {
+        'changes': changes, 'severity_results': severity_results, 'anomaly': anomaly,
+        'archetype': archetype, 'narrative': narrative, 'error': error
+    }
+
+
+def speculate(metrics: Dict, previous: Optional[Dict], custom_thresholds: Dict,
+              problem_threshold: float, increase_threshold: float) -> str:
+    """
+    Start a Free-mode analysis of these answers unless one is already under way.
+
+    Returns:
+        str: the speculation key (pass it to take_speculation at submit)
+    """
+    key = speculation_key(metrics, previous, custom_thresholds, problem_threshold, increase_threshold)
+    with _lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return key
+        _results[key] = _executor.submit(
+            _analyze, dict(metrics), previous, dict(custom_thresholds), problem_threshold, increase_threshold
+        )
+        while len(_results) > SPECULATION_SLOTS:
+            _results.popitem(last=False)[1].cancel()
+    return key
+
+
+def discard_speculation(key: Optional[str]) -> None:
+    """Drop a speculation whose answers changed (cancelled if it has not started)."""
+    with _lock:
+        future = _results.pop(key, None)
+    if future is not None:
+        future.cancel()
+
+
+def take_speculation(key: str, wait: float = TAKE_WAIT) -> Optional[Dict]:
+    """
+    Result of the speculation for key, waiting briefly if it is still running.
+
+    Returns:
+        dict with changes, severity_results, anomaly, archetype, narrative and
+        error; None if nothing was speculated for key, it failed or timed out
+    """
+    with _lock:
+        future = _results.pop(key, None)
+    if future is None or future.cancelled():
+        return None
+    try:
+        result = future.result(timeout=wait)
+    except Exception:
+        return None
+    return None if result['error'] else result
@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
-from typing import Optional
+import time
+import uuid
+from typing import Optional, Tuple
 
 import streamlit as st
 
 from .config import ANTHROPIC_API_KEY
 from .analysis import get_available_claude_models
+from .jobs import PENDING_STATUSES
+from .service_client import ServiceError, claim_job, latest_unclaimed_job, poll_job, submit_narrative_job
+
+JOB_POLL_INTERVAL = 1.0     # Seconds between status checks while a story is being written
+STREAM_POLL_INTERVAL = 0.2  # Seconds between job reads while write_narrative shows a story streaming in
 
 
 def render_model_controls(section_key: str, *, show_heading: bool = True) -> None:
@@ -67,3 +74,302 @@ def render_model_controls(section_key: str, *, show_heading: bool = True) -> Non
         st.caption("Using offline rule-based narrative generation (no API calls).")
     else:
         st.info("Add `ANTHROPIC_API_KEY` to enable Claude AI models.")
+
+
+def _comparison_caption(result: dict) -> str:
+    usage = result.get("usage")
+    if not usage:
+        return f"⏱️ {result['latency_s']:.2f}s"
+    cached = usage["cache_read_input_tokens"]
+    tokens = f"{usage['input_tokens'] + cached + usage['cache_creation_input_tokens']:,} in"
+    if cached:
+        tokens += f" ({cached:,} cached)"
+    cost = f" · ${result['cost']:.4f}" if result.get("cost") is not None else ""
+    return f"⏱️ {result['latency_s']:.2f}s · {tokens} / {usage['output_tokens']:,} out{cost}"
+
+
+def render_model_comparison(section_key: str, metrics: dict, previous: Optional[dict] = None,
+                            changes: Optional[dict] = None, anomaly: Optional[dict] = None) -> None:
+    """Run one narrative prompt on 2-4 Claude models at once and show the answers side by side.
+
+    Each column fills in as soon as its model finishes; the last comparison is
+    kept in session state so it survives reruns.
+
+    Args:
+        section_key: Unique suffix for Streamlit widget keys.
+        metrics: Entry to narrate (as passed to analyze_with_narrative).
+        previous: Previous entry, if any.
+        changes: Metric changes, if any.
+        anomaly: Multivariate anomaly score, if any.
+    """
+    from .compare import MAX_MODELS, MIN_MODELS, compare_models
+
+    models = get_available_claude_models()
+    names = {model["id"]: model["name"] for model in models}
+    default = [model["id"] for model in models[:MIN_MODELS]]
+    selected = st.multiselect(
+        f"Compare {MIN_MODELS}-{MAX_MODELS} models",
+        options=list(names),
+        default=default,
+        format_func=names.get,
+        max_selections=MAX_MODELS,
+        key=f"compare_models_{section_key}",
+    )
+
+    state_key = f"model_comparison_{section_key}"
+    run = st.button(
+        "⚖️ Compare side by side",
+        key=f"compare_run_{section_key}",
+        disabled=len(selected) < MIN_MODELS,
+        use_container_width=True,
+    )
+
+    comparison = st.session_state.get(state_key)
+    if run:
+        comparison = None
+    columns = st.columns(len(comparison["results"]) if comparison else max(len(selected), 1))
+
+    if run:
+        slots = {}
+        for column, model_id in zip(columns, selected):
+            with column:
+                st.markdown(f"**{names.get(model_id, model_id)}**")
+                slots[model_id] = st.empty()
+                slots[model_id].caption("⏳ Waiting for response...")
+
+        def show_result(result: dict) -> None:
+            with slots[result["model"]].container():
+                _render_comparison_result(result)
+
+        results = compare_models(metrics, previous, changes, selected, anomaly=anomaly, on_result=show_result)
+        st.session_state[state_key] = {"date": metrics.get("date"), "results": results}
+    elif comparison:
+        if comparison["date"] != metrics.get("date"):
+            st.caption(f"Comparison from {comparison['date']}")
+        for column, result in zip(columns, comparison["results"]):
+            with column:
+                st.markdown(f"**{names.get(result['model'], result['model'])}**")
+                _render_comparison_result(result)
+
+
+def _render_comparison_result(result: dict) -> None:
+    if result["error"]:
+        st.error(result["error"])
+    else:
+        st.caption(_comparison_caption(result))
+        st.markdown(result["narrative"])
+
+
+def render_narrative_fallback(section_key: str, story_date: Optional[str], checkbox_key: str) -> None:
+    """Swap a late Claude story in for the local stand-in, or say why the local one is shown.
+
+    Call before the story is drawn. The swapped story goes through the usual
+    save confirmation (as an update if the local one was already saved).
+
+    Args:
+        section_key: Unique suffix for widget keys.
+        story_date: Date of the story currently shown.
+        checkbox_key: Session key of that view's save-confirmation checkbox.
+    """
+    fallback = st.session_state.get('narrative_fallback')
+    if not fallback:
+        return
+    if fallback['date'] != story_date:
+        st.session_state.narrative_fallback = None
+        return
+
+    call = fallback['call']
+    if call is None:
+        st.caption(fallback['notice'])
+        return
+    if not call.done():
+        st.caption("⏳ Claude is still writing this story; the local version is shown until it arrives.")
+        if st.button("🔄 Check for Claude's story", key=f"check_claude_{section_key}"):
+            st.rerun()
+        return
+
+    st.session_state.narrative_fallback = None
+    if not call.narrative:
+        st.warning(f"Claude's story did not arrive ({call.error}); keeping the local one.")
+        return
+    st.session_state.latest_narrative = call.narrative
+    metrics = dict(st.session_state.latest_metrics)
+    metrics['recommendation'] = call.narrative
+    st.session_state.latest_metrics = metrics
+    if not st.session_state.get('pending_save_required'):
+        st.session_state.pending_save_required = True
+        st.session_state.pending_save_mode = 'update'
+    st.session_state.pop(checkbox_key, None)
+    st.success(f"✨ Claude's story ({call.model}) arrived and replaced the local one.")
+
+
+class _JobLateStory:
+    """The late Claude story of a narrative job, read the way render_narrative_fallback reads a PendingNarrative."""
+
+    def __init__(self, job_id: str, model: str):
+        self.job_id = job_id
+        self.model = model
+        self.narrative: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def done(self) -> bool:
+        try:
+            job = poll_job(self.job_id)
+        except ServiceError as e:
+            st.caption(f"⚠️ {e}")
+            return False
+        late = (job or {}).get('late') or {'status': 'failed', 'error': 'the job is no longer in the job table'}
+        self.narrative, self.error = late.get('narrative'), late.get('error')
+        return late['status'] != 'pending'
+
+
+def browser_session_id() -> str:
+    """ID of this browser tab's session for the job table, kept in the URL (?sid=) so a reload keeps it."""
+    if 'browser_session_id' not in st.session_state:
+        sid = st.query_params.get('sid') if hasattr(st, 'query_params') else None
+        if not sid:
+            sid = uuid.uuid4().hex[:12]
+            if hasattr(st, 'query_params'):
+                st.query_params['sid'] = sid
+        st.session_state.browser_session_id = sid
+    return st.session_state.browser_session_id
+
+
+def _job_status(job_id: str) -> None:
+    """Status line and text so far of a pending narrative job; reruns the page once it has finished."""
+    try:
+        job = poll_job(job_id)
+    except ServiceError as e:
+        st.warning(f"⚠️ {e}")
+        return
+    if job is None or job['status'] not in PENDING_STATUSES:
+        st.rerun()
+    started = job.get('started_at') or job['submitted_at']
+    st.info(f"✍️ Your story is being written in the background ({job['status']} since {started[11:19]}). "
+            "It appears here as soon as it is ready; you can keep using the app meanwhile.")
+    if job.get('partial'):
+        st.markdown(job['partial'] + " ▌")
+
+
+if hasattr(st, 'fragment'):
+    # Polls without rerunning the rest of the page
+    _job_status = st.fragment(run_every=JOB_POLL_INTERVAL)(_job_status)
+
+
+def render_narrative_job(checkbox_key: str) -> bool:
+    """Show the pending "Analyze & Save" job, or move its finished story into the view.
+
+    The job ID lives in session state; after a page reload the newest job
+    of this browser session nobody has taken yet is picked up from the job
+    table instead. A finished
+    story goes through the usual save confirmation; a local fallback is
+    handed to render_narrative_fallback with the job's late Claude story.
+
+    Args:
+        checkbox_key: Session key of the view's save-confirmation checkbox.
+
+    Returns:
+        True while the job is still running (the caller should not draw a story yet).
+    """
+    job_id = st.session_state.get('narrative_job_id')
+    try:
+        job = poll_job(job_id) if job_id else latest_unclaimed_job(browser_session_id())
+    except ServiceError as e:
+        st.warning(f"⚠️ {e}")
+        return bool(job_id)
+    if job is None:
+        st.session_state.narrative_job_id = None
+        return False
+
+    st.session_state.narrative_job_id = job['id']
+    if job['status'] in PENDING_STATUSES:
+        _job_status(job['id'])
+        if not hasattr(st, 'fragment') and st.button("🔄 Check for your story", key="check_narrative_job"):
+            st.rerun()
+        return True
+
+    claim_job(job['id'])
+    st.session_state.narrative_job_id = None
+    if job['error']:
+        st.error(job['error'])
+        return False
+
+    args = job['args']
+    metrics = dict(args['metrics'])
+    metrics['recommendation'] = job['narrative']
+    st.session_state.latest_narrative = job['narrative']
+    st.session_state.latest_metrics = metrics
+    st.session_state.latest_previous = args.get('previous')
+    st.session_state.latest_changes = args.get('changes')
+    st.session_state.latest_anomaly = args.get('anomaly')
+    st.session_state.last_analysis_date = metrics.get('date')
+    st.session_state.pending_save_required = True
+    st.session_state.pending_save_mode = 'new'
+    st.session_state.pending_feedback_text = None
+    st.session_state.narrative_fallback = None
+    st.session_state.checkbox_reset_date = metrics.get('date')
+    st.session_state.pop(checkbox_key, None)
+    st.success("✅ Analysis ready!")
+    if job.get('fallback'):
+        st.warning(job['notice'])
+        late = job.get('late')
+        st.session_state.narrative_fallback = {
+            'date': metrics.get('date'), 'notice': job['notice'],
+            'call': _JobLateStory(job['id'], late['model']) if late else None
+        }
+    return False
+
+
+def write_narrative(story_date: str, metrics: dict, previous: Optional[dict] = None, changes: Optional[dict] = None,
+                    placeholder=None, **options) -> Tuple[Optional[str], Optional[str]]:
+    """Write a story through the narrative job pool (the metrics service's when it runs) and wait for it.
+
+    The text written so far is drawn into placeholder while the job runs, and
+    the placeholder is cleared on error so a partial story never lingers. A
+    local fallback is handed to render_narrative_fallback with the job's late
+    Claude story, as render_narrative_job does.
+
+    Args:
+        story_date: Date of the entry the story belongs to.
+        metrics: Entry to narrate.
+        previous: Previous entry, if any.
+        changes: Metric changes, if any.
+        placeholder: st.empty() to stream the text into (None = only wait).
+        **options: Remaining submit_narrative_job arguments (mode, model, ...).
+
+    Returns:
+        (narrative, error) - narrative is None if an error occurred.
+    """
+    st.session_state.narrative_fallback = None
+    try:
+        job_id = submit_narrative_job(metrics, previous, changes, **options)
+        job = poll_job(job_id)
+        while job is not None and job['status'] in PENDING_STATUSES:
+            if placeholder is not None and job.get('partial'):
+                placeholder.markdown(job['partial'] + " ▌")
+            time.sleep(STREAM_POLL_INTERVAL)
+            job = poll_job(job_id)
+        if job is not None:
+            claim_job(job_id)
+    except ServiceError as e:
+        job = {'error': f"⚠️ {e}"}
+    if job is None:
+        job = {'error': "❌ The story's job is no longer in the job table."}
+    if job['error']:
+        if placeholder is not None:
+            placeholder.empty()
+        return None, job['error']
+
+    if placeholder is not None:
+        placeholder.markdown(job['narrative'])
+    # Only freshly streamed stories have meaningful latency to show
+    timing = job.get('timing')
+    st.session_state.latest_narrative_timing = timing if timing and timing['source'] == 'stream' else None
+    if job.get('fallback'):
+        st.warning(job['notice'])
+        late = job.get('late')
+        st.session_state.narrative_fallback = {
+            'date': story_date, 'notice': job['notice'],
+            'call': _JobLateStory(job_id, late['model']) if late else None
+        }
+    return job['narrative'], None
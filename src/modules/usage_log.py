@@ -0,0 +1,156 @@
+"""
+Usage log module - token and cost accounting for every Claude call
+Each call (blocking, streamed, model comparison or batch backfill) appends
+one CSV row with its model, token counts, latency and dollar cost to
+data/claude_usage.csv. The file is append-only; the Configuration tab rolls
+it up per day and model with p50/p95 latency.
+"""
+import csv
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from .config import USAGE_LOG_FILE
+
+# Prompt-cache billing relative to the base input price
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+USAGE_FIELDS = [
+    'timestamp', 'model', 'source', 'input_tokens', 'output_tokens',
+    'cache_read_input_tokens', 'cache_creation_input_tokens', 'latency_s', 'cost_usd', 'error'
+]
+TOKEN_FIELDS = USAGE_FIELDS[3:7]
+
+_write_lock = threading.Lock()
+_frame: Optional[pd.DataFrame] = None
+_frame_stamp = None
+
+
+def narrative_cost(usage: Dict[str, int], pricing: Optional[Dict[str, float]]) -> Optional[float]:
+    """
+    Dollar cost of one call from its token usage and per-million-token prices.
+
+    Returns:
+        Cost in USD, or None if the model has no known pricing
+    """
+    if not pricing:
+        return None
+    input_cost = pricing['input_cost']
+    return (
+        usage['input_tokens'] * input_cost
+        + usage['cache_creation_input_tokens'] * input_cost * CACHE_WRITE_MULTIPLIER
+        + usage['cache_read_input_tokens'] * input_cost * CACHE_READ_MULTIPLIER
+        + usage['output_tokens'] * pricing['output_cost']
+    ) / 1_000_000
+
+
+def usage_record(model: str, source: str, usage: Optional[Dict[str, int]], latency_s: Optional[float],
+                 error: bool = False, cost: Optional[float] = None, pricing: Optional[Dict] = None) -> Dict:
+    """
+    One usage-log row. Cost is computed from pricing (default: the cached
+    catalog prices) unless given; failed calls are logged with zero tokens.
+    """
+    usage = usage or dict.fromkeys(TOKEN_FIELDS, 0)
+    if cost is None and not error:
+        if pricing is None:
+            from .analysis import fetch_claude_pricing_from_web
+            pricing = fetch_claude_pricing_from_web()
+        cost = narrative_cost(usage, pricing.get(model))
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'model': model,
+        'source': source,
+        **{key: usage[key] for key in TOKEN_FIELDS},
+        'latency_s': latency_s,
+        'cost_usd': round(cost, 6) if cost is not None else None,
+        'error': int(bool(error))
+    }
+
+
+def append_usage(records: Iterable[Dict]) -> None:
+    """Append rows to the usage log (header written once, when the file is created)."""
+    records = list(records)
+    if not records:
+        return
+    with _write_lock:
+        USAGE_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not USAGE_LOG_FILE.exists()
+        with open(USAGE_LOG_FILE, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=USAGE_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(records)
+
+
+def log_claude_call(timing: Dict) -> None:
+    """Log a narrative timing record (see analysis.record_narrative_timing) as one usage row."""
+    append_usage([usage_record(
+        timing['model'], timing['source'], timing.get('usage'), timing.get('total_s'), error=timing.get('error')
+    )])
+
+
+def load_usage_log() -> pd.DataFrame:
+    """The whole usage log as a DataFrame, re-read only when the file changes."""
+    global _frame, _frame_stamp
+    try:
+        stat = USAGE_LOG_FILE.stat()
+    except OSError:
+        return pd.DataFrame(columns=USAGE_FIELDS)
+    stamp = (str(USAGE_LOG_FILE), stat.st_mtime_ns, stat.st_size)
+    if _frame is None or stamp != _frame_stamp:
+        frame = pd.read_csv(USAGE_LOG_FILE)
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], errors='coerce')
+        _frame, _frame_stamp = frame, stamp
+    return _frame
+
+
+def _window(frame: pd.DataFrame, days: Optional[int]) -> pd.DataFrame:
+    if days is None or len(frame) == 0:
+        return frame
+    return frame[frame['timestamp'] >= pd.Timestamp.now().normalize() - pd.Timedelta(days=days - 1)]
+
+
+def usage_rollup(days: Optional[int] = None) -> pd.DataFrame:
+    """
+    Usage totals per day and model, newest day first.
+
+    Args:
+        days: Only include the last n days (default: everything logged)
+
+    Returns:
+        DataFrame with day, model, calls, errors, the four token counts,
+        cost_usd and p50_latency_s / p95_latency_s
+    """
+    frame = _window(load_usage_log(), days)
+    columns = ['day', 'model', 'calls', 'errors', *TOKEN_FIELDS, 'cost_usd', 'p50_latency_s', 'p95_latency_s']
+    if len(frame) == 0:
+        return pd.DataFrame(columns=columns)
+
+    frame = frame.assign(day=frame['timestamp'].dt.date)
+    groups = frame.groupby(['day', 'model'])
+    rollup = groups.agg(
+        calls=('source', 'size'), errors=('error', 'sum'),
+        **{key: (key, 'sum') for key in TOKEN_FIELDS},
+        cost_usd=('cost_usd', 'sum')
+    )
+    latency = groups['latency_s']
+    rollup['p50_latency_s'] = latency.quantile(0.5)
+    rollup['p95_latency_s'] = latency.quantile(0.95)
+    return rollup.reset_index().sort_values(['day', 'model'], ascending=[False, True])[columns].reset_index(drop=True)
+
+
+def usage_totals(days: Optional[int] = None) -> Dict:
+    """Calls, tokens, cost and p50/p95 latency across all models for the panel header."""
+    frame = _window(load_usage_log(), days)
+    latency = frame['latency_s'].dropna() if len(frame) else pd.Series(dtype=float)
+    return {
+        'calls': int(len(frame)),
+        'errors': int(frame['error'].sum()) if len(frame) else 0,
+        **{key: int(frame[key].sum()) if len(frame) else 0 for key in TOKEN_FIELDS},
+        'cost_usd': float(frame['cost_usd'].sum()) if len(frame) else 0.0,
+        'p50_latency_s': float(latency.quantile(0.5)) if len(latency) else None,
+        'p95_latency_s': float(latency.quantile(0.95)) if len(latency) else None
+    }
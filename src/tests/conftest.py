@@ -0,0 +1,80 @@
+"""
+Shared pytest fixtures.
+Every test runs against its own state directory: each data/state file path
+a module imported from config points into tmp_path, and the process-wide
+caches, clients and settings start fresh. Background work a test started
+(narrative jobs, speculation, the model catalog refresh) is drained before
+the real paths come back, so nothing is ever written to data/.
+"""
+
+from collections import OrderedDict, deque
+from concurrent.futures import wait
+
+import pytest
+
+from modules import (
+    analysis, anomaly, archetypes, backfill, charts, claude_client, config, data, downsample, effectiveness,
+    history, jobs, model_catalog, narrative_cache, narratives, renarrate, resilience, rollups, service_client,
+    speculation, usage_log
+)
+from modules.narrative_cache import NarrativeCache
+from modules.resilience import CircuitBreaker
+
+STATE_DIR = config.BASE_DIR / 'data'
+# Every *_FILE / *_DIR under data/ and the modules holding their own copy of it
+STATE_PATHS = [name for name, value in vars(config).items()
+               if name.endswith(('_FILE', '_DIR')) and getattr(value, 'parent', None) == STATE_DIR]
+STATE_MODULES = [anomaly, archetypes, backfill, data, effectiveness, jobs, model_catalog, narrative_cache,
+                 narratives, renarrate, rollups, usage_log]
+DRAIN_TIMEOUT = 30
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """State files in tmp_path, empty caches, default client settings."""
+    for module in STATE_MODULES:
+        for name in STATE_PATHS:
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, tmp_path / getattr(config, name).name)
+
+    monkeypatch.setattr(narrative_cache, '_cache', NarrativeCache(max_entries=8))
+    monkeypatch.setattr(effectiveness, '_memo', {})
+    monkeypatch.setattr(anomaly, '_verified_version', None)
+    monkeypatch.setattr(archetypes, '_verified_version', None)
+    monkeypatch.setattr(history, '_history', None)
+    monkeypatch.setattr(history, '_timelines', OrderedDict())
+    monkeypatch.setattr(charts, '_figures', OrderedDict())
+    monkeypatch.setattr(downsample, '_series', OrderedDict())
+    monkeypatch.setattr(usage_log, '_frame', None)
+    monkeypatch.setattr(usage_log, '_frame_stamp', None)
+    monkeypatch.setattr(model_catalog, '_snapshot', None)
+    monkeypatch.setattr(model_catalog, '_snapshot_mtime', None)
+    monkeypatch.setattr(model_catalog, '_last_attempt', 0.0)
+    monkeypatch.setattr(analysis, '_timings', deque(maxlen=analysis._timings.maxlen))
+    monkeypatch.setattr(jobs, '_futures', {})
+    monkeypatch.setattr(speculation, '_results', OrderedDict())
+
+    monkeypatch.setattr(claude_client, '_settings', dict(claude_client._settings))
+    monkeypatch.setattr(claude_client, '_client', None)
+    monkeypatch.setattr(resilience, '_breaker', CircuitBreaker())
+    monkeypatch.setattr(service_client, '_settings', dict(service_client._settings))
+    monkeypatch.setattr(service_client, '_down_until', 0.0)
+
+    yield tmp_path
+
+    wait(list(jobs._futures.values()), timeout=DRAIN_TIMEOUT)
+    # Speculation runs on one worker in order, so this also outlasts runs already discarded from _results
+    speculation._executor.submit(lambda: None).result(timeout=DRAIN_TIMEOUT)
+    if model_catalog.catalog_refreshing():
+        model_catalog._refresher.join(DRAIN_TIMEOUT)
+    claude_client.close_claude_client()
+
+
+@pytest.fixture
+def use_claude(monkeypatch):
+    """Switch Claude mode to a mock server: use_claude(base_url, **client_settings)."""
+    def use(base_url, **overrides):
+        monkeypatch.setattr(analysis, 'ANTHROPIC_API_KEY', 'mock-key')
+        claude_client.configure_claude_client(**{'api_key': 'mock-key', 'base_url': base_url, 'max_retries': 0,
+                                                 **overrides})
+    return use
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test multivariate anomaly scoring.
+Verifies the incremental statistics match a full refit, that an unusual
+combination is flagged even when no single metric crosses a threshold, and
+that the stored state is rebuilt when the data file changes outside the app.
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_history
+from modules import anomaly, data
+from modules.anomaly import RunningCovariance, MIN_HISTORY, describe_anomaly
+from modules.local_narrative import build_local_narrative
+from modules.severity import analyze_metrics_severity
+
+KEYS = ['signal_body_tension', 'signal_mind_noise', 'anxiety', 'sleep_issues']
+
+
+def _history(n=60, seed=7):
+    """Correlated history: mind noise tracks body tension, anxiety tracks sleep issues."""
+    rng = np.random.default_rng(seed)
+    tension = rng.integers(2, 6, n)
+    sleep = rng.integers(1, 5, n)
+    return [
+        {
+            'signal_body_tension': int(t),
+            'signal_mind_noise': int(t + rng.integers(-1, 2)),
+            'anxiety': int(s + rng.integers(0, 2)),
+            'sleep_issues': int(s),
+        }
+        for t, s in zip(tension, sleep)
+    ]
+
+
+def test_incremental_matches_refit():
+    """Running mean/co-moment should equal the batch estimate."""
+    print("🧪 Testing incremental statistics against a full refit")
+    entries = _history()
+    stats = RunningCovariance(KEYS)
+    for entry in entries:
+        stats.update(entry)
+
+    matrix = np.array([[e[k] for k in KEYS] for e in entries], dtype=float)
+    assert stats.n == len(entries)
+    assert np.allclose(stats.mean, matrix.mean(axis=0))
+    assert np.allclose(stats.m2 / (stats.n - 1), np.cov(matrix, rowvar=False))
+    print("✅ PASSED: incremental mean/covariance match numpy")
+
+
+def test_unusual_combination_flagged():
+    """Break the usual correlation without crossing any *_high threshold."""
+    print("\n🧪 Testing anomaly on a below-threshold but unusual day")
+    stats = RunningCovariance(KEYS)
+    for entry in _history():
+        stats.update(entry)
+
+    typical = {'signal_body_tension': 4, 'signal_mind_noise': 4, 'anxiety': 3, 'sleep_issues': 2}
+    unusual = {'signal_body_tension': 2, 'signal_mind_noise': 6, 'anxiety': 6, 'sleep_issues': 1}
+
+    typical_score = stats.score(typical)
+    unusual_score = stats.score(unusual)
+    print(f"   typical: {typical_score['distance']} ({typical_score['level']})")
+    print(f"   unusual: {unusual_score['distance']} ({unusual_score['level']})")
+
+    assert unusual_score['distance'] > typical_score['distance']
+    assert unusual_score['level'] in ('unusual', 'rare')
+    assert typical_score['level'] == 'typical'
+    assert unusual_score['top_contributors'], "expected driving metrics"
+
+    severity = analyze_metrics_severity(unusual, None)
+    assert not severity['severity_increase'] and not severity['continuous_issue']
+
+    narrative = build_local_narrative(unusual, None, severity_results=severity, anomaly=unusual_score)
+    assert '**Overall Pattern:**' in narrative
+    assert describe_anomaly(unusual_score) in narrative
+    print("✅ PASSED: unusual combination surfaced in the narrative")
+
+
+def test_short_history_and_missing_values():
+    """No score before MIN_HISTORY; missing metrics are skipped, not zeroed."""
+    print("\n🧪 Testing short history and missing values")
+    stats = RunningCovariance(KEYS)
+    for entry in _history(MIN_HISTORY - 1):
+        stats.update(entry)
+    assert stats.score({'anxiety': 5}) is None
+
+    stats.update({'anxiety': float('nan'), 'signal_body_tension': 3})
+    assert stats.n == MIN_HISTORY
+    result = stats.score({'anxiety': 4, 'sleep_issues': None})
+    assert result is not None and result['dof'] == 1
+    print("✅ PASSED: short histories and gaps handled")
+
+
+def test_state_follows_the_data_file(monkeypatch):
+    """Saves extend the stored statistics; a replaced data file rebuilds them."""
+    print("\n🧪 Testing anomaly state against the data file")
+    make_history(20).to_csv(data.DATA_FILE, index=False)
+    stats, _ = anomaly.load_anomaly_state()
+    assert stats.entries == 20
+
+    rebuilds = []
+    rebuild = anomaly._rebuild_from_history
+
+    def counting_rebuild(history):
+        rebuilds.append(len(history))
+        return rebuild(history)
+
+    monkeypatch.setattr(anomaly, '_rebuild_from_history', counting_rebuild)
+    data.save_entry(make_history(21, seed=1).iloc[-1].to_dict())
+    stats, _ = anomaly.load_anomaly_state()
+    assert stats.entries == 21 and rebuilds == []  # Folded in, not replayed
+
+    restored = make_history(30, seed=2)  # E.g. a backup restored by hand
+    restored.to_csv(data.DATA_FILE, index=False)
+    stats, _ = anomaly.load_anomaly_state()
+    expected, _ = rebuild(restored)
+    assert rebuilds == [30] and stats.entries == 30 and np.allclose(stats.mean, expected.mean)
+    print("✅ PASSED: state extended by saves, rebuilt for a replaced file")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
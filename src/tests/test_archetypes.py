@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test day-archetype clustering.
+Verifies mini-batch k-means separates distinct kinds of days, names them,
+that online updates move only the assigned centroid, and that the stored
+model is refitted when the data file changes outside the app.
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_history
+from modules import archetypes, data
+from modules.archetypes import ArchetypeModel, describe_archetype
+from modules.local_narrative import build_local_narrative
+
+
+def _days(n=30, seed=3):
+    """Two recurring patterns: meeting-overload days and sleep-debt days."""
+    rng = np.random.default_rng(seed)
+    meeting = [
+        {'unwanted_meetings': int(rng.integers(7, 10)), 'quiet_blocks_insufficient': int(rng.integers(7, 10)),
+         'urgent_alignment': int(rng.integers(6, 9)), 'sleep_issues': int(rng.integers(0, 3)),
+         'signal_energy_drain': int(rng.integers(2, 4))}
+        for _ in range(n)
+    ]
+    sleep = [
+        {'unwanted_meetings': int(rng.integers(0, 3)), 'quiet_blocks_insufficient': int(rng.integers(1, 3)),
+         'urgent_alignment': int(rng.integers(0, 3)), 'sleep_issues': int(rng.integers(7, 10)),
+         'signal_energy_drain': int(rng.integers(7, 10)), 'signal_tension_headache': int(rng.integers(6, 9))}
+        for _ in range(n)
+    ]
+    return meeting, sleep
+
+
+def test_separates_and_names_archetypes():
+    """Each pattern should land in its own, correctly named cluster."""
+    print("🧪 Testing archetype separation and naming")
+    meeting, sleep = _days()
+    model = ArchetypeModel(k=2)
+    assignments = model.fit(meeting + sleep)
+
+    meeting_clusters = set(assignments[:len(meeting)])
+    sleep_clusters = set(assignments[len(meeting):])
+    print(f"   meeting → {meeting_clusters}, sleep → {sleep_clusters}, names → {model.names()}")
+    assert len(meeting_clusters) == 1 and len(sleep_clusters) == 1
+    assert meeting_clusters != sleep_clusters
+    assert model.names()[meeting_clusters.pop()] == 'Meeting overload'
+    assert model.names()[sleep_clusters.pop()] == 'Sleep-debt spiral'
+    assert int(model.sizes.sum()) == len(meeting) + len(sleep)
+    print("✅ PASSED: archetypes separated and named")
+
+
+def test_online_update_moves_assigned_centroid_only():
+    """A saved entry nudges its own centroid and leaves the others alone."""
+    print("\n🧪 Testing online mini-batch update")
+    meeting, sleep = _days()
+    model = ArchetypeModel(k=2)
+    model.fit(meeting + sleep)
+    before = model.centroids.copy()
+
+    entry = {'unwanted_meetings': 10, 'quiet_blocks_insufficient': 10}
+    cluster = model.partial_fit([entry])[0]
+    other = 1 - cluster
+    assert np.allclose(model.centroids[other], before[other])
+    assert not np.allclose(model.centroids[cluster], before[cluster])
+    print("✅ PASSED: only the assigned centroid moved")
+
+
+def test_narrative_cites_archetype():
+    """Free-mode narrative includes the archetype citation when given one."""
+    print("\n🧪 Testing archetype citation in narrative")
+    archetype = {
+        'cluster': 0, 'name': 'Meeting overload', 'distance': 1.2, 'size': 12, 'share': 40.0,
+        'signature': [{'key': 'unwanted_meetings', 'label': 'Unwanted meetings attended', 'value': 8.0}]
+    }
+    narrative = build_local_narrative({'unwanted_meetings': 8}, None, archetype=archetype)
+    assert '**Day Archetype:**' in narrative
+    assert describe_archetype(archetype) in narrative
+    print("✅ PASSED: narrative cites the archetype")
+
+
+def test_state_follows_the_data_file():
+    """Saves extend the stored model; a replaced data file refits it."""
+    print("\n🧪 Testing archetype state against the data file")
+    make_history(30).to_csv(data.DATA_FILE, index=False)
+    model, _ = archetypes.load_archetypes()
+    assert model.entries == 30
+
+    data.save_entry(make_history(31, seed=1).iloc[-1].to_dict())
+    model, assignments = archetypes.load_archetypes()
+    assert model.entries == 31 and len(assignments) == 31
+
+    restored = make_history(40, seed=2)  # E.g. a backup restored by hand
+    restored['date'] = [f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(40)]
+    restored.to_csv(data.DATA_FILE, index=False)
+    model, assignments = archetypes.load_archetypes()
+    assert model.entries == 40 and set(assignments) <= set(restored['date'])
+    print("✅ PASSED: model extended by saves, refitted for a replaced file")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the Claude narrative backfill through the Message Batches API.
+Runs against the local mock server's batch endpoints and a temporary data
+directory; checks ranged write-back (recorded as Claude stories, so a Free
+re-narration keeps them), usage/cost accounting, resuming from saved batch
+IDs and per-request errors.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer, DEFAULT_TEXT
+from modules import backfill, claude_client, data, narratives, usage_log
+from modules.config import QUESTIONS
+
+MODEL = 'claude-3-5-haiku-20241022'
+
+
+def _write_history(n=20):
+    """n random entries with a stale story in the (temporary) data file."""
+    rng = np.random.default_rng(9)
+    frame = pd.DataFrame({'date': pd.date_range('2025-01-01', periods=n).strftime('%Y-%m-%d')})
+    for q in QUESTIONS:
+        frame[q['key']] = rng.integers(0, 2 if q['type'] == 'yesno' else 11, n)
+    frame['recommendation'] = 'stale'
+    frame.to_csv(data.DATA_FILE, index=False)
+    return frame
+
+
+def _client(server):
+    return claude_client.build_claude_client(api_key='mock-key', base_url=server.url, max_retries=0)
+
+
+def test_range_backfilled_from_batch():
+    """Only the chosen range gets Claude narratives; usage and batch cost are recorded."""
+    print("🧪 Testing ranged batch backfill")
+    _write_history()
+    with MockAnthropicServer(batch_delay=0.2) as server:
+        job = backfill.run_backfill(date(2025, 1, 6), date(2025, 1, 15), MODEL,
+                                    poll_interval=0.05, client=_client(server))
+        df = data.load_data()
+        assert job['status'] == 'completed' and job['done'] == job['total'] == 10, job
+        assert len(server.batches) == 1 and not job['errors']
+        assert (df['recommendation'].iloc[5:15] == DEFAULT_TEXT).all()
+        assert (df['recommendation'].iloc[:5] == 'stale').all() and (df['recommendation'].iloc[15:] == 'stale').all()
+        assert narratives.kept_narrative_dates() == set(df['date'].iloc[5:15])
+        assert job['usage']['input_tokens'] > 0 and job['usage']['output_tokens'] > 0
+        assert job['cost'] is not None and job['cost'] > 0
+        logged = usage_log.load_usage_log()
+        assert len(logged) == 10 and (logged['source'] == 'batch').all()
+        assert abs(logged['cost_usd'].sum() - job['cost']) < 1e-5
+    print(f"✅ PASSED: 10 entries written, batch cost ${job['cost']:.5f}")
+
+
+def test_resume_polls_saved_batches():
+    """An interrupted job resumes from its saved batch IDs without resubmitting."""
+    print("\n🧪 Testing resume from saved batch IDs")
+    start, end = date(2025, 1, 1), date(2025, 1, 8)
+    _write_history(n=8)
+    with MockAnthropicServer(batch_delay=0.3) as server:
+        client = _client(server)
+        # Stop after the first poll round, before the batch has ended
+        first = backfill.run_backfill(start, end, MODEL, poll_interval=0.05, client=client,
+                                      progress=lambda job: backfill.stop_backfill())
+        assert first['status'] == 'interrupted' and first['done'] == 0 and len(first['batches']) == 1
+
+        resumed = backfill.run_backfill(start, end, MODEL, poll_interval=0.05, client=client)
+        assert resumed['status'] == 'completed' and resumed['done'] == 8
+        assert len(server.batches) == 1 and resumed['batches'][0]['id'] == first['batches'][0]['id']
+        assert (data.load_data()['recommendation'] == DEFAULT_TEXT).all()
+    print("✅ PASSED: resumed job collected the original batch")
+
+
+def test_errored_requests_reported():
+    """Requests the API rejects are listed per date and leave the stored text alone."""
+    print("\n🧪 Testing errored batch requests")
+    _write_history(n=4)
+    with MockAnthropicServer() as server:
+        job = backfill.run_backfill(date(2025, 1, 1), date(2025, 1, 4), 'claude-unknown',
+                                    poll_interval=0.05, client=_client(server))
+        assert job['status'] == 'completed' and job['done'] == 0
+        assert sorted(job['errors']) == ['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-04']
+        assert (data.load_data()['recommendation'] == 'stale').all()
+    print("✅ PASSED: 4 errored requests reported")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
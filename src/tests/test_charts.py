@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the shared dashboard figure builder.
+Checks the WebGL switch on long traces, that figures are reused for the
+same selection, window and data version, and that any change to those
+builds a new figure.
+"""
+
+import numpy as np
+import pandas as pd
+
+from modules import charts
+from modules.charts import build_metric_figure, metric_figure
+
+METRICS = [{'key': 'anxiety', 'label': 'Anxiety'}, {'key': 'irritability', 'label': 'Irritability'}]
+
+
+def _history(n=3000):
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        'date': pd.date_range('2017-01-01', periods=n),
+        'anxiety': rng.integers(0, 11, n).astype(float),
+        'irritability': rng.integers(0, 11, n).astype(float),
+    })
+
+
+def test_webgl_switch():
+    """Traces longer than the threshold use Scattergl; short ones stay SVG."""
+    print("🧪 Testing WebGL trace switch")
+    df = _history()
+    labels = {m['key']: m['label'] for m in METRICS}
+    long_fig = build_metric_figure({'anxiety': df[['date', 'anxiety']]}, labels, webgl_points=1000)
+    short_fig = build_metric_figure({'anxiety': df.tail(200)[['date', 'anxiety']]}, labels, webgl_points=1000)
+    assert long_fig.data[0].type == 'scattergl' and short_fig.data[0].type == 'scatter'
+    assert long_fig.data[0].name == 'Anxiety' and long_fig.layout.height == charts.CHART_STYLES['adhd']['height']
+    print("✅ PASSED: Scattergl above the threshold")
+
+
+def test_figure_cache():
+    """Same selection, window and version reuse the figure; anything else rebuilds it."""
+    print("\n🧪 Testing figure cache")
+    df = _history()
+    charts.clear_figure_cache()
+    first = metric_figure(df, METRICS, 2000, max_points=300, version='v1')
+    assert metric_figure(df, METRICS, 2000, max_points=300, version='v1') is first
+    assert all(len(trace.x) <= 300 for trace in first.data)
+    for other in (
+        metric_figure(df, METRICS[:1], 2000, max_points=300, version='v1'),
+        metric_figure(df, METRICS, 1000, max_points=300, version='v1'),
+        metric_figure(df, METRICS, 2000, max_points=300, version='v2'),
+        metric_figure(df, METRICS, 2000, raw=True, max_points=300, version='v1'),
+        metric_figure(df, METRICS, 2000, style='mobile', max_points=300, version='v1'),
+    ):
+        assert other is not first
+
+    assert [trace.name for trace in first.data] == ['Anxiety', 'Irritability']
+    raw = metric_figure(df, METRICS, 2000, raw=True, max_points=300, version='v1')
+    assert len(raw.data[0].x) == 2000 and raw.data[0].type == 'scattergl'
+    charts.clear_figure_cache()
+    print("✅ PASSED: figures reused per selection, window and version")
+
+
+if __name__ == "__main__":
+    test_webgl_switch()
+    test_figure_cache()
+    print("\n🎉 All chart tests passed!")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test the shared, pooled Anthropic client.
+Uses the local mock Messages endpoint; no API key or network needed.
+"""
+
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer, DEFAULT_TEXT
+from modules import claude_client
+from modules.analysis import analyze_with_narrative
+
+
+def test_provider_reuses_client():
+    """One client per process until settings change."""
+    print("🧪 Testing client provider reuse")
+    claude_client.configure_claude_client(api_key='mock-key')
+    first = claude_client.get_claude_client()
+    assert claude_client.get_claude_client() is first
+    claude_client.configure_claude_client(timeout=12.0)
+    second = claude_client.get_claude_client()
+    assert second is not first and second.timeout.read == 12.0
+    assert claude_client.client_settings()['timeout'] == 12.0
+    with pytest.raises(ValueError):
+        claude_client.configure_claude_client(pool_size=3)  # Unknown setting
+    print("✅ PASSED: same client returned, rebuilt on reconfigure")
+
+
+def test_claude_calls_share_one_connection(use_claude):
+    """Repeated Claude-mode analyses reuse a single keep-alive connection."""
+    print("\n🧪 Testing keep-alive reuse through analyze_with_narrative")
+    with MockAnthropicServer() as server:
+        use_claude(server.url)
+        for _ in range(3):
+            narrative, error = analyze_with_narrative(
+                {'anxiety': 8}, None, mode='Claude AI', model='claude-sonnet-4-20250514', use_cache=False
+            )
+            assert error is None and narrative == DEFAULT_TEXT
+        print(f"   requests: {server.request_count}, connections: {server.connection_count}")
+        assert server.request_count == 3 and server.connection_count == 1
+    print("✅ PASSED: 3 calls over 1 TCP connection")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test parallel multi-model comparison.
+Runs against the local mock server with a fixed per-call latency, so the
+calls only overlap if they are truly concurrent.
+"""
+
+import time
+
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer, DEFAULT_TEXT
+from modules import narrative_cache
+from modules.compare import compare_models, narrative_cost
+from modules.narrative_cache import prompt_cache_key
+from modules.narratives import SYSTEM_PROMPT, build_context_prompt
+
+MODELS = ['claude-3-5-haiku-20241022', 'claude-sonnet-4-20250514', 'claude-opus-4-20250514']
+
+
+def test_narrative_cost():
+    """Cost uses per-million prices, with cache writes at 1.25x and reads at 0.1x input."""
+    print("🧪 Testing cost calculation")
+    usage = {'input_tokens': 1000, 'output_tokens': 500,
+             'cache_creation_input_tokens': 2000, 'cache_read_input_tokens': 10000}
+    cost = narrative_cost(usage, {'input_cost': 3.0, 'output_cost': 15.0})
+    assert abs(cost - (3000 + 7500 + 3000 + 7500) / 1e6) < 1e-12
+    assert narrative_cost(usage, None) is None
+    print("✅ PASSED: cost matches the pricing table")
+
+
+def test_models_run_concurrently(use_claude):
+    """Three 0.3 s calls finish in well under 0.9 s, each reported as it lands."""
+    print("\n🧪 Testing concurrent comparison")
+    seen = []
+    with MockAnthropicServer(latency=0.3) as server:
+        use_claude(server.url)
+        with pytest.raises(ValueError):
+            compare_models({'anxiety': 8}, None, None, MODELS[:1])  # A single model
+
+        started = time.perf_counter()
+        results = compare_models({'anxiety': 8}, None, None, MODELS, on_result=lambda r: seen.append(r['model']))
+        elapsed = time.perf_counter() - started
+        prompt = build_context_prompt({'anxiety': 8}, None, None)
+        cached = narrative_cache._cache.get(prompt_cache_key(MODELS[2], SYSTEM_PROMPT, prompt))
+
+    print(f"   {len(MODELS)} models in {elapsed:.2f}s")
+    assert elapsed < 0.6 and sorted(seen) == sorted(MODELS)
+    assert [r['model'] for r in results] == MODELS
+    for result in results:
+        assert result['error'] is None and result['narrative'] == DEFAULT_TEXT
+        assert result['latency_s'] >= 0.3 and result['usage']['output_tokens'] > 0
+    assert results[0]['cost'] < results[1]['cost'] < results[2]['cost']
+    assert cached == DEFAULT_TEXT
+    print("✅ PASSED: calls overlapped and were priced")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
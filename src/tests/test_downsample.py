@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test chart downsampling.
+Checks that thinned traces respect the point cap, keep the first and last
+entry and every bucket's extremes, skip missing values, and that results
+are reused per data version and window.
+"""
+
+import numpy as np
+import pandas as pd
+
+from modules import downsample
+from modules.downsample import chart_series, downsample_series, max_points_for_width, minmax_indices
+
+
+def _history(n=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 11, n).astype(float)
+    values[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame({'date': pd.date_range('2015-01-01', periods=n), 'anxiety': values})
+
+
+def test_minmax_keeps_shape():
+    """Cap respected; first, last, global and per-bucket extremes kept."""
+    print("🧪 Testing min/max bucket downsampling")
+    rng = np.random.default_rng(1)
+    values = rng.normal(5, 1, 10_000)
+    values[1234], values[8765] = 50.0, -50.0  # Spikes must survive
+    keep = minmax_indices(values, 200)
+
+    assert len(keep) <= 200 and np.all(np.diff(keep) > 0)
+    assert keep[0] == 0 and keep[-1] == len(values) - 1
+    assert 1234 in keep and 8765 in keep
+    assert np.array_equal(minmax_indices(values[:150], 200), np.arange(150))  # Short: untouched
+
+    buckets = (np.arange(1, len(values) - 1) - 1) * 99 // (len(values) - 2)
+    inner = values[1:-1]
+    for b in (0, 42, 98):
+        assert inner[buckets == b].max() in values[keep] and inner[buckets == b].min() in values[keep]
+    assert max_points_for_width(1200) == 600 and max_points_for_width(10) == downsample.MIN_POINTS
+    print("✅ PASSED: extremes kept under the cap")
+
+
+def test_series_and_cache():
+    """Missing values are skipped when thinning; results are memoised per version and window."""
+    print("\n🧪 Testing chart series cache")
+    df = _history()
+    thinned = downsample_series(df, 'anxiety', 300)
+    assert len(thinned) <= 300 and thinned['anxiety'].notna().all()
+    assert thinned['date'].is_monotonic_increasing
+    assert len(downsample_series(df.tail(100), 'anxiety', 300)) == 100  # Raw when it fits (gaps kept)
+
+    downsample.clear_chart_cache()
+    first = chart_series(df, 'anxiety', 4000, 300, version='v1')
+    assert chart_series(df, 'anxiety', 4000, 300, version='v1') is first
+    assert chart_series(df, 'anxiety', 2000, 300, version='v1') is not first
+    assert chart_series(df, 'anxiety', 4000, 300, version='v2') is not first
+    assert first['date'].iloc[0] >= df['date'].iloc[-4000]
+    downsample.clear_chart_cache()
+    print("✅ PASSED: series memoised per version and window")
+
+
+if __name__ == "__main__":
+    test_minmax_keeps_shape()
+    test_series_and_cache()
+    print("\n🎉 All downsampling tests passed!")
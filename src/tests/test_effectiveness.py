@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test recommendation-effectiveness analytics.
+Verifies protocol tagging of stored narratives and the forward-change aggregation.
+"""
+
+import pandas as pd
+import pytest
+
+from modules import data, effectiveness
+from modules.data import load_data
+from modules.effectiveness import tag_recommendation, compute_effectiveness, format_effectiveness_table
+from modules.local_narrative import build_local_narrative
+from modules.narratives import build_context_prompt
+
+
+def test_tags_free_mode_narrative():
+    """Free-mode recommendations should map onto named protocols."""
+    print("🧪 Testing protocol tagging of a Free-mode narrative")
+    metrics = {'anxiety': 9, 'project_chaos': 8, 'quiet_blocks_insufficient': 8}
+    narrative = build_local_narrative(metrics, None)
+    tags = tag_recommendation(narrative)
+    print(f"   tags: {tags}")
+    assert 'Calm Reset' in tags
+    assert 'Anti-Chaos Routine' in tags
+    assert 'Deep-Work Anchor' in tags
+    assert tag_recommendation(None) == []
+    print("✅ PASSED: narrative tagged with triggered protocols")
+
+
+def test_forward_change_aggregation():
+    """Calm Reset followed by lower anxiety should show a negative mean change."""
+    print("\n🧪 Testing forward-change aggregation")
+    df = pd.DataFrame({
+        'date': [f'2025-01-{d:02d}' for d in range(1, 9)],
+        'anxiety':      [9, 6, 5, 9, 6, 4, 5, 5],
+        'irritability': [8, 6, 6, 8, 5, 5, 5, 5],
+        'recommendation': [
+            'Calm Reset: nVNS + walk', 'ok', 'ok',
+            'Calm Reset again', 'ok', 'ok', 'ok', 'ok'
+        ],
+    })
+    effects = {e['protocol']: e for e in compute_effectiveness(df)}
+    calm = effects['Calm Reset']
+    print(f"   Calm Reset: {calm['horizons']}")
+    assert calm['uses'] == 2
+    # +1 deltas: anxiety -3, -3; irritability -2, -3 -> mean -2.75
+    assert calm['horizons'][1]['mean_change'] == -2.75
+    assert calm['horizons'][1]['n'] == 4
+    assert calm['horizons'][1]['net'] < 0
+
+    table = format_effectiveness_table(list(effects.values()))
+    assert table.splitlines()[2].startswith('| Calm Reset | 2 | -2.8')
+    print("✅ PASSED: effects aggregated and formatted")
+
+
+def test_prompt_building_reads_effects_once_without_writing(monkeypatch):
+    """Prompts reuse one effectiveness table per data version and never write the cache file."""
+    print("\n🧪 Testing effectiveness in prompt building")
+    loads = []
+    monkeypatch.setattr(effectiveness, 'load_data', lambda: loads.append(1) or load_data())
+    pd.DataFrame({
+        'date': [f'2025-01-{d:02d}' for d in range(1, 9)],
+        'anxiety': [9, 6, 5, 9, 6, 4, 5, 5],
+        'recommendation': ['Calm Reset: nVNS + walk', 'ok', 'ok', 'Calm Reset again', 'ok', 'ok', 'ok', 'ok'],
+    }).to_csv(data.DATA_FILE, index=False)
+    prompts = [build_context_prompt({'date': '2025-01-09', 'anxiety': 6}, None, None, compact=compact)
+               for compact in (True, False, True)]
+    assert not effectiveness.EFFECTIVENESS_CACHE_FILE.exists()
+    assert len(loads) == 1
+    assert all('Calm Reset' in prompt for prompt in prompts)
+    print("✅ PASSED: one computation, no cache file written")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
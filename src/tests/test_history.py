@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the history index behind the Analysis date browser.
+Checks an entry opened from the index matches what the data file and the
+anomaly state hold (previous entry, changes, story), date snapping and
+stepping, and that the severity timeline equals per-entry classification,
+including after entries are appended and thresholds change.
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_history
+from modules import anomaly, data, history
+from modules.data import get_metric_changes, load_data
+from modules.history import (
+    entry_view, load_history, nearest_entry_date, severity_timeline, step_entry_date
+)
+from modules.severity import analyze_metrics_severity, calculate_severity_statistics
+
+
+def _write_history(entries=120):
+    """Synthetic entries in the (temporary) data file, a third of them without a story."""
+    frame = make_history(entries)
+    frame['recommendation'] = [f"Story {i}" if i % 3 else '' for i in range(entries)]
+    frame.to_csv(data.DATA_FILE, index=False)
+    return frame
+
+
+def _expected_counts(records, i, **thresholds):
+    stats = calculate_severity_statistics(
+        analyze_metrics_severity(records[i], records[i - 1] if i > 0 else None, **thresholds)
+    )
+    return stats['severity_increase_count'], stats['continuous_issue_count'], stats['safe_count']
+
+
+def test_entry_view_matches_storage():
+    """Any date opens with its previous entry, changes, story and stored anomaly."""
+    print("🧪 Testing history entry lookup")
+    frame = _write_history()
+    records = load_data().to_dict('records')
+    view = entry_view('2020-02-10')
+    i = 40
+    assert view['metrics']['date'] == '2020-02-10' and view['position'] == i
+    assert view['previous']['date'] == records[i - 1]['date']
+    assert repr(view['changes']) == repr(get_metric_changes(records[i], records[i - 1]))  # NaN-safe
+    assert view['narrative'] == 'Story 40' and entry_view('2020-02-09')['narrative'] is None
+    assert view['anomaly'] == anomaly.get_entry_anomaly('2020-02-10')
+    assert entry_view('2020-01-01')['previous'] is None and entry_view('2031-01-01') is None
+
+    view['metrics']['anxiety'] = 99  # Views are copies; the shared index is untouched
+    assert entry_view('2020-02-10')['metrics']['anxiety'] != 99
+
+    assert nearest_entry_date('2031-05-05') == frame['date'].iloc[-1]
+    assert nearest_entry_date('2019-01-01') == '2020-01-01'
+    assert step_entry_date('2020-02-10', -1) == '2020-02-09'
+    assert step_entry_date('2020-01-01', -5) == '2020-01-01'
+    assert step_entry_date(frame['date'].iloc[-1], 1) == frame['date'].iloc[-1]
+    print("✅ PASSED: index lookups equal the stored entries")
+
+
+def test_severity_timeline_incremental(monkeypatch):
+    """Timeline counts equal per-entry classification, across appends and threshold changes."""
+    print("\n🧪 Testing severity timeline")
+    frame = _write_history(100)
+    thresholds = {'problem_threshold': 6, 'increase_threshold': 1.0}
+    timeline = severity_timeline(**thresholds)
+    records = load_data().to_dict('records')
+    assert len(timeline) == 100
+    for i in (0, 1, 57, 99):
+        row = timeline.iloc[i]
+        assert (row['increasing'], row['continuous'], row['safe']) == _expected_counts(records, i, **thresholds)
+    assert severity_timeline(**thresholds) is timeline  # Same version and thresholds: cached
+
+    make_history(105).iloc[100:].to_csv(data.DATA_FILE, mode='a', header=False, index=False)
+    calls = []
+    monkeypatch.setattr(history, 'analyze_metrics_severity',
+                        lambda *a, **k: calls.append(1) or analyze_metrics_severity(*a, **k))
+    appended = severity_timeline(**thresholds)
+    assert len(calls) == 5  # Only the new entries are classified
+    assert appended.iloc[:100].equals(timeline)
+    records = load_data().to_dict('records')
+    assert tuple(appended.iloc[100][['increasing', 'continuous', 'safe']]) == _expected_counts(records, 100, **thresholds)
+
+    stricter = severity_timeline(problem_threshold=9, increase_threshold=1.0)
+    assert len(stricter) == 105
+    assert np.all(stricter['increasing'] + stricter['continuous']
+                  <= appended['increasing'] + appended['continuous'])
+    assert load_history()['version'] != '0'
+    print("✅ PASSED: timeline equals per-entry severity")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
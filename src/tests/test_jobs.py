@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test background narrative jobs.
+Submits "Analyze & Save" stories to the job pool with a temporary job table;
+checks submission does not wait for Claude, results and errors land on the
+persisted job, streamed text and a late Claude story reach the job record,
+a reloaded page finds its own session's newest unclaimed job, a job cut off
+by a restart is re-queued from its stored inputs (but not one another live
+process is running), and processes writing the table at once lose nothing.
+"""
+
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer, DEFAULT_TEXT
+from modules import jobs
+from modules.analysis import analyze_with_narrative
+
+METRICS = {'date': '2025-03-04', 'anxiety': np.int64(8), 'project_chaos': 7, 'sleep_issues': None}
+PREVIOUS = {'date': '2025-03-03', 'anxiety': np.int64(5), 'project_chaos': 4, 'sleep_issues': 3}
+
+
+def test_free_job_completes_and_persists():
+    """A Free-mode job stores the same story as a direct call, readable from the table file."""
+    print("🧪 Testing Free-mode narrative job")
+    expected, _ = analyze_with_narrative(METRICS, PREVIOUS, mode='Free', use_cache=False)
+    job_id = jobs.submit_narrative_job(METRICS, PREVIOUS, mode='Free')
+    job = jobs.wait_job(job_id, timeout=10)
+    assert job['status'] == 'completed' and job['error'] is None
+    assert job['narrative'] == expected
+    assert job['args']['metrics']['anxiety'] == 8 and job['args']['metrics']['sleep_issues'] is None
+
+    stored = json.loads(jobs.NARRATIVE_JOBS_FILE.read_text())
+    assert [j['id'] for j in stored] == [job_id] and stored[0]['narrative'] == expected
+
+    # A reloaded page picks the newest job up once; after the claim it is gone
+    assert jobs.latest_unclaimed_job()['id'] == job_id
+    jobs.claim_job(job_id)
+    assert jobs.latest_unclaimed_job() is None
+
+    # ...and only in the browser session that submitted it
+    mine = jobs.record_narrative_job('Story.', METRICS, PREVIOUS, mode='Free', session_id='tab-a')
+    assert jobs.latest_unclaimed_job('tab-a')['id'] == mine
+    assert jobs.latest_unclaimed_job('tab-b') is None and jobs.latest_unclaimed_job() is None
+    print("✅ PASSED: story stored on the job and claimed once, by its own session")
+
+
+def test_claude_job_runs_off_the_caller_thread(use_claude):
+    """Submitting returns before Claude answers; polling sees running, then the story."""
+    print("\n🧪 Testing Claude job against a slow mock")
+    with MockAnthropicServer(latency=0.5) as server:
+        use_claude(server.url)
+        started = time.perf_counter()
+        job_id = jobs.submit_narrative_job(METRICS, PREVIOUS, mode='Claude AI', model='claude-3-5-haiku-20241022')
+        submit_s = time.perf_counter() - started
+        print(f"   submit returned in {submit_s * 1000:.1f} ms")
+        assert submit_s < 0.25
+        assert jobs.poll_job(job_id)['status'] in jobs.PENDING_STATUSES
+
+        job = jobs.wait_job(job_id, timeout=10)
+        assert job['status'] == 'completed' and job['narrative'] == DEFAULT_TEXT
+        assert server.request_count == 1
+    print("✅ PASSED: submission did not wait for Claude")
+
+
+def test_claude_job_streams_and_keeps_latency_budget(use_claude, monkeypatch):
+    """Partial text is saved while Claude streams; a missed budget stores the local story, then the late one."""
+    print("\n🧪 Testing streamed and late Claude jobs")
+    monkeypatch.setattr(jobs, 'PARTIAL_SAVE_INTERVAL', 0.0)
+    seen = []
+    update = jobs._update
+
+    def recording_update(job_id, **fields):
+        seen.append(fields.get('partial'))
+        return update(job_id, **fields)
+
+    monkeypatch.setattr(jobs, '_update', recording_update)
+    with MockAnthropicServer(chunk_delay=0.01) as server:
+        use_claude(server.url)
+        job = jobs.wait_job(jobs.submit_narrative_job(METRICS, PREVIOUS, mode='Claude AI'), timeout=10)
+        assert job['narrative'] == DEFAULT_TEXT and not job['fallback'] and job['partial'] is None
+        partials = [text for text in seen if text]
+        assert len(partials) > 1 and DEFAULT_TEXT.startswith(partials[-1])
+
+    local, _ = analyze_with_narrative(METRICS, PREVIOUS, mode='Free')
+    with MockAnthropicServer(latency=0.5) as server:
+        use_claude(server.url)
+        job_id = jobs.submit_narrative_job(METRICS, PREVIOUS, mode='Claude AI', latency_budget=0.1,
+                                             use_cache=False)
+        for _ in range(100):
+            job = jobs.poll_job(job_id)
+            if job['status'] not in jobs.PENDING_STATUSES:
+                break
+            time.sleep(0.02)
+        assert job['status'] == 'completed' and job['fallback'] and job['narrative'] == local
+        assert job['notice'] and job['late']['status'] == 'pending'
+
+        job = jobs.wait_job(job_id, timeout=10)
+        assert job['narrative'] == local
+        assert job['late']['status'] == 'completed' and job['late']['narrative'] == DEFAULT_TEXT
+    print("✅ PASSED: partial text streamed, local story first, Claude's late story stored")
+
+
+def test_failed_and_orphaned_jobs():
+    """Errors are stored on the job; a 'running' job no worker owns is re-queued and finishes."""
+    print("\n🧪 Testing failed and orphaned jobs")
+    failed = jobs.wait_job(jobs.submit_narrative_job(METRICS, PREVIOUS, mode='Bogus'), timeout=10)
+    assert failed['status'] == 'failed' and failed['narrative'] is None
+    assert 'Unknown mode' in failed['error']
+
+    # As left behind by a server that stopped mid-job
+    orphan = {
+        'id': 'orphan000001', 'kind': 'narrative', 'status': 'running', 'claimed': False,
+        'args': {'metrics': {'date': '2025-03-04', 'anxiety': 8}, 'previous': None, 'changes': None,
+                 'mode': 'Free'},
+        'narrative': None, 'error': None, 'submitted_at': '2025-03-04T09:00:00',
+        'started_at': '2025-03-04T09:00:01', 'finished_at': None
+    }
+    table = json.loads(jobs.NARRATIVE_JOBS_FILE.read_text()) + [orphan]
+    jobs.NARRATIVE_JOBS_FILE.write_text(json.dumps(table))
+
+    assert jobs.latest_unclaimed_job()['id'] == 'orphan000001'
+    job = jobs.wait_job('orphan000001', timeout=10)
+    assert job['status'] == 'completed' and job['requeued_at'] and job['narrative']
+    assert job['owner'] == jobs._owner()
+    print("✅ PASSED: errors recorded, orphaned job re-queued")
+
+
+def test_jobs_of_other_processes():
+    """A job another live process runs is left alone; one whose process died is adopted."""
+    print("\n🧪 Testing jobs owned by other processes")
+    other = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        alive = {'pid': other.pid, 'started': jobs._process_started(other.pid)}
+        args = {'metrics': {'date': '2025-03-04', 'anxiety': 8}, 'previous': None, 'changes': None, 'mode': 'Free'}
+        table = [
+            {'id': f'{name}00000001', 'kind': 'narrative', 'status': 'running', 'claimed': False, 'owner': owner,
+             'session': None, 'args': args, 'narrative': None, 'error': None,
+             'submitted_at': '2025-03-04T09:00:00', 'started_at': None, 'finished_at': None}
+            for name, owner in [('live', alive), ('dead', {'pid': other.pid, 'started': 'a reused pid'})]
+        ]
+        jobs.NARRATIVE_JOBS_FILE.write_text(json.dumps(table))
+
+        assert jobs.poll_job('live00000001')['status'] == 'running' and 'live00000001' not in jobs._futures
+        job = jobs.wait_job('dead00000001', timeout=10)
+        assert job['status'] == 'completed' and job['owner'] == jobs._owner()
+    finally:
+        other.kill()
+        other.wait()
+    job = jobs.wait_job('live00000001', timeout=10)  # Its process is gone now
+    assert job['status'] == 'completed' and job['requeued_at']
+    print("✅ PASSED: live owners kept their job, dead owners' jobs re-queued")
+
+
+def _record_jobs(count: int) -> None:
+    for _ in range(count):
+        jobs.record_narrative_job('Story.', METRICS, PREVIOUS, mode='Free')
+
+
+@pytest.mark.skipif(jobs.fcntl is None, reason="file lock needs fcntl")
+def test_processes_writing_at_once_lose_no_job():
+    """Record updates from several processes are serialized by the table's file lock."""
+    print("\n🧪 Testing concurrent writers")
+    context = multiprocessing.get_context('fork')  # Children keep this test's table path
+    writers = [context.Process(target=_record_jobs, args=(10,)) for _ in range(3)]
+    for writer in writers:
+        writer.start()
+    _record_jobs(10)
+    for writer in writers:
+        writer.join(30)
+    assert len(json.loads(jobs.NARRATIVE_JOBS_FILE.read_text())) == 40
+    print("✅ PASSED: 40 jobs from 4 processes, none lost")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
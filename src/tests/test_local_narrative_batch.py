@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test batch regeneration of Free-mode narratives.
+The vectorized facts pass must reproduce build_local_narrative row by row.
+"""
+
+import numpy as np
+import pandas as pd
+
+from modules.config import QUESTIONS, THRESHOLDS
+from modules.local_narrative import build_local_narrative, build_local_narratives_batch, build_narrative_facts
+from modules.severity import analyze_metrics_severity
+
+
+def _history(n=120, seed=3):
+    """Random history with int required metrics and NaN gaps in optional ones."""
+    rng = np.random.default_rng(seed)
+    data = {'date': [f'2025-01-{i:03d}' for i in range(n)]}
+    for q in QUESTIONS:
+        values = rng.integers(0, 2 if q['type'] == 'yesno' else 11, n)
+        if q.get('required'):
+            data[q['key']] = values
+        else:
+            values = values.astype(float)
+            values[rng.random(n) < 0.3] = np.nan
+            data[q['key']] = values
+    return pd.DataFrame(data)
+
+
+def test_batch_matches_per_entry():
+    """Batch output equals per-entry output for default and custom thresholds."""
+    print("🧪 Testing batch narratives against per-entry narratives")
+    df = _history()
+    rows = df.to_dict('records')
+    custom = dict(THRESHOLDS, anxiety_high=5, unwanted_meetings_high=8)
+    for thresholds, problem, increase in [(None, None, None), (custom, 5, 2.0)]:
+        batch = build_local_narratives_batch(df, problem, increase, thresholds)
+        for i, row in enumerate(rows):
+            previous = rows[i - 1] if i else None
+            severity = analyze_metrics_severity(row, previous, problem, increase, thresholds)
+            expected = build_local_narrative(row, previous, severity_results=severity, custom_thresholds=thresholds)
+            assert batch[i] == expected, f"row {i} differs"
+    print(f"✅ PASSED: {len(rows)} rows identical under both threshold sets")
+
+
+def test_facts_are_render_free():
+    """Facts carry the findings; rendering happens separately."""
+    print("\n🧪 Testing the facts stage")
+    facts = build_narrative_facts({'anxiety': 9, 'project_chaos': 8}, None)
+    assert facts['continuous'] == 2 and facts['increasing'] == 0
+    assert facts['issues'][0][:3] == ('continuous_issue', 'Anxiety', 9.0)
+    assert "High project chaos correlates with elevated anxiety" in facts['correlations']
+    assert any('Anti-Chaos Routine' in alert for alert in facts['alerts'])
+    assert build_local_narratives_batch(pd.DataFrame()) == []
+    print("✅ PASSED: facts computed without formatting")
+
+
+if __name__ == "__main__":
+    test_batch_matches_per_entry()
+    test_facts_are_render_free()
+    print("\n🎉 All batch narrative tests passed!")
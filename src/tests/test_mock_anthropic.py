@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the mock Anthropic server's knobs used by the benchmarks.
+Checks latency distributions (shape and bad specs), injected API errors
+and fixed token usage, and that a seeded server is reproducible.
+"""
+
+import random
+import statistics
+import warnings
+
+import anthropic
+
+from benchmarks.mock_anthropic import MockAnthropicServer, latency_sampler
+from modules.claude_client import build_claude_client
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)  # Model deprecation notices
+
+MODEL = 'claude-3-5-haiku-20241022'
+PROMPT = [{'role': 'user', 'content': 'How was today?'}]
+
+
+def test_latency_distributions():
+    """Specs draw from the named distribution; malformed specs are rejected."""
+    print("🧪 Testing latency distributions")
+    rng = random.Random(7)
+    assert latency_sampler(0.05)(rng) == 0.05 and latency_sampler('0.05')(rng) == 0.05
+    uniform = [latency_sampler('uniform:0.1,0.2')(rng) for _ in range(500)]
+    assert 0.1 <= min(uniform) and max(uniform) <= 0.2
+    lognormal = [latency_sampler('lognormal:0.5,0.6')(rng) for _ in range(2000)]
+    median = statistics.median(lognormal)
+    assert 0.45 < median < 0.55 and statistics.mean(lognormal) > median  # Right-skewed
+    assert min(latency_sampler('normal:0.01,1')(rng) for _ in range(200)) == 0.0  # Clipped
+    for bad in ('gamma:1,2', 'uniform:0.1', 'lognormal'):
+        try:
+            latency_sampler(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} accepted")
+    print("✅ PASSED: distributions and spec validation")
+
+
+def test_errors_and_usage():
+    """Every call fails at error_rate=1; fixed output tokens are reported; seeds repeat."""
+    print("\n🧪 Testing injected errors and usage")
+    with MockAnthropicServer(error_rate=1.0, error_statuses=(429,)) as server:
+        client = build_claude_client(api_key='mock-key', base_url=server.url, max_retries=0)
+        try:
+            client.messages.create(model=MODEL, max_tokens=50, messages=PROMPT)
+            raise AssertionError("no error injected")
+        except anthropic.RateLimitError as e:
+            assert e.status_code == 429
+        client.close()
+        assert server.error_count == 1
+
+    with MockAnthropicServer(output_tokens=321) as server:
+        client = build_claude_client(api_key='mock-key', base_url=server.url, max_retries=0)
+        assert client.messages.create(model=MODEL, max_tokens=50, messages=PROMPT).usage.output_tokens == 321
+        client.close()
+
+    def draws(seed):
+        server = MockAnthropicServer(latency='exp:0.1', error_rate=0.3, seed=seed)
+        try:
+            return [(server.sample_latency(), server.injected_error()) for _ in range(20)]
+        finally:
+            server.server_close()
+    assert draws(3) == draws(3) != draws(4)
+    print("✅ PASSED: errors, usage and seeding")
+
+
+if __name__ == "__main__":
+    test_latency_distributions()
+    test_errors_and_usage()
+    print("\n🎉 All mock server tests passed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the snapshot-backed model catalog.
+Uses the local mock server for the Models API and pricing page and a
+temporary snapshot file; no network needed.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer, MOCK_PRICING_HTML
+from modules import model_catalog
+
+
+@pytest.fixture
+def server(use_claude, monkeypatch):
+    """Mock Models API and pricing page."""
+    with MockAnthropicServer() as server:
+        monkeypatch.setattr(model_catalog, 'PRICING_URL', f"{server.url}/pricing")
+        use_claude(server.url)
+        yield server
+
+
+def test_pricing_parse_is_bounded():
+    """Prices are read per family, and a pathological page stops at the time budget."""
+    print("🧪 Testing pricing page parse")
+    pricing = model_catalog.parse_pricing_html(MOCK_PRICING_HTML)
+    assert pricing['claude-3-5-haiku-20241022'] == {'input_cost': 0.8, 'output_cost': 4.0}
+    assert pricing['claude-sonnet-4-20250514'] == pricing['claude-3-5-sonnet-20241022']
+    assert pricing['claude-opus-4-20250514'] == {'input_cost': 15.0, 'output_cost': 75.0}
+
+    hidden = '<script>var p = "Haiku $9 / MTok";</script><!-- Haiku <b>$9 / MTok</b> -->'
+    assert model_catalog.parse_pricing_html(hidden + MOCK_PRICING_HTML) == pricing
+
+    # Unclosed tags, deep nesting and price spam all stop at the budget, tag stripping included
+    for hostile in ('Sonnet $3 / MTok ' * 150000, '<p ' * 700000, '<div>' * 400000):
+        started = time.perf_counter()
+        assert model_catalog.parse_pricing_html(hostile, time_budget=0.05) == {}
+        elapsed = time.perf_counter() - started
+        print(f"   hostile page ({hostile[:6]!r}...) gave up after {elapsed * 1000:.0f} ms")
+        assert elapsed < 0.5
+    print("✅ PASSED: prices parsed, parse bounded")
+
+
+def test_renders_read_snapshot_and_refresh_in_background(server):
+    """First read is the built-in fallback; a background refresh persists a live snapshot."""
+    print("\n🧪 Testing snapshot reads and background refresh")
+    models = model_catalog.get_model_catalog()
+    assert [m['id'] for m in models][0] == 'claude-3-5-haiku-20241022'
+    assert models[0]['input_cost'] == 1.0          # Fallback until the refresh lands
+    model_catalog._refresher.join(timeout=10)
+
+    snapshot = json.loads(model_catalog.MODEL_CATALOG_FILE.read_text())
+    assert (snapshot['pricing_source'], snapshot['models_source']) == ('live', 'api')
+    models = model_catalog.get_model_catalog()
+    assert models[0]['input_cost'] == 0.8 and models[0]['name'] == 'Claude Haiku 3.5'
+    requests_after_refresh = server.request_count
+    for _ in range(20):
+        model_catalog.get_model_catalog()
+    assert server.request_count == requests_after_refresh   # Fresh snapshot: no network
+    assert not model_catalog.catalog_status()['stale']
+
+    # Past the TTL: still served instantly, refreshed behind the scenes
+    snapshot['fetched_at'] = (datetime.now() - timedelta(days=3)).isoformat()
+    model_catalog.MODEL_CATALOG_FILE.write_text(json.dumps(snapshot))
+    model_catalog._last_attempt = 0.0
+    assert model_catalog.get_model_catalog()[0]['input_cost'] == 0.8
+    model_catalog._refresher.join(timeout=10)
+    assert not model_catalog.catalog_status()['stale']
+    assert server.request_count == requests_after_refresh + 2
+    print("✅ PASSED: renders never waited on the network")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the memoized narrative cache.
+Covers key canonicalization, Claude keys following the prompt, LRU eviction,
+TTL expiry, the disk tier and cache hits through analyze_with_narrative.
+"""
+
+import numpy as np
+import pytest
+
+from modules import analysis, narrative_cache, narratives
+from modules.analysis import analyze_with_narrative, claude_cache_key
+from modules.narrative_cache import NarrativeCache, narrative_cache_key
+
+
+def test_key_is_canonical():
+    """Key ignores dict order, NaN vs None and numpy wrappers, but not int vs float."""
+    print("🧪 Testing cache key canonicalization")
+    base = narrative_cache_key('Free', 'm', {'anxiety': 7, 'sleep_issues': None})
+    assert base == narrative_cache_key('Free', 'other-model', {'sleep_issues': float('nan'), 'anxiety': np.int64(7)})
+    assert base != narrative_cache_key('Free', 'm', {'anxiety': 7.0, 'sleep_issues': None})
+    claude = narrative_cache_key('Claude AI', 'm', {'anxiety': 7})
+    assert claude != narrative_cache_key('Claude AI', 'other-model', {'anxiety': 7})
+    assert claude != narrative_cache_key('Claude AI', 'm', {'anxiety': 7}, feedback=[('2025-01-01', 'shorter')])
+    print("✅ PASSED: equivalent inputs share a key")
+
+
+def test_claude_key_follows_the_prompt(monkeypatch):
+    """Effectiveness data and the prompt encoding change the Claude key, as they change the prompt."""
+    print("\n🧪 Testing Claude keys against the prompt")
+    monkeypatch.setattr(analysis, 'ANTHROPIC_API_KEY', 'mock-key')
+    metrics, previous = {'date': '2025-01-09', 'anxiety': 7}, {'date': '2025-01-08', 'anxiety': 5}
+    key, prompt, error = claude_cache_key('m', metrics, previous)
+    assert error is None and key == claude_cache_key('m', dict(metrics), dict(previous))[0]
+    assert key != claude_cache_key('other-model', metrics, previous)[0]
+
+    monkeypatch.setattr(narratives, 'format_effectiveness_table', lambda effects: "| Calm Reset | 3 | -1.0 |")
+    with_effects, effects_prompt, _ = claude_cache_key('m', metrics, previous)
+    assert 'Calm Reset' in effects_prompt and with_effects != key
+
+    encoding = 'verbose' if narratives.CLAUDE_PROMPT_ENCODING != 'verbose' else 'compact'
+    monkeypatch.setattr(narratives, 'CLAUDE_PROMPT_ENCODING', encoding)
+    assert claude_cache_key('m', metrics, previous)[0] not in (key, with_effects)
+    print("✅ PASSED: a different prompt never shares a cached story")
+
+
+def test_lru_ttl_and_disk_tier(tmp_path):
+    """Eviction, expiry and promotion from disk are counted in the stats."""
+    print("\n🧪 Testing LRU eviction, TTL and disk tier")
+    cache = NarrativeCache(max_entries=2, disk_dir=tmp_path)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'          # a becomes most recent
+    cache.put('c', 'C', persist=False)    # evicts b from memory
+    assert cache.stats()['evictions'] == 1
+    assert cache.get('b') == 'B'          # served from disk, promoted
+    assert cache.get('c') == 'C'
+    cache.put('d', 'D', ttl=60)
+    cache._memory['d']['created_at'] -= 120
+    assert cache.get('d') is None         # expired (memory and disk)
+
+    fresh = NarrativeCache(max_entries=2, disk_dir=tmp_path)
+    assert fresh.get('a') == 'A' and fresh.get('c') is None and fresh.get('d') is None
+
+    stats = cache.stats()
+    print(f"   stats: {stats}")
+    assert (stats['hits'], stats['disk_hits'], stats['misses'], stats['expired']) == (2, 1, 1, 1)
+    assert abs(stats['hit_rate'] - 0.75) < 1e-9
+    print("✅ PASSED: LRU, TTL and disk tier behave")
+
+
+def test_analyze_with_narrative_hits_cache():
+    """A repeated Free-mode analysis is served from the cache."""
+    print("\n🧪 Testing analyze_with_narrative memoization")
+    metrics = {'anxiety': 9, 'project_chaos': 8}
+    first, error = analyze_with_narrative(metrics, None, mode='Free')
+    second, _ = analyze_with_narrative(dict(metrics), None, mode='Free')
+    uncached, _ = analyze_with_narrative(metrics, None, mode='Free', use_cache=False)
+    stats = narrative_cache._cache.stats()
+    assert error is None and first == second == uncached
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    print("✅ PASSED: second call was a cache hit")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test streamed narratives.
+Streams from the local mock Messages endpoint and checks the deltas add up to
+the same story the blocking call returns, plus the recorded timings.
+"""
+
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer, DEFAULT_TEXT
+from modules import analysis
+from modules.analysis import analyze_with_narrative, analyze_with_narrative_stream, recent_narrative_timings
+
+
+def test_claude_stream_matches_blocking_call(use_claude):
+    """Deltas arrive one by one, join to the full text, and are cached like the blocking path."""
+    print("🧪 Testing streamed Claude narrative")
+    with MockAnthropicServer(latency=0.05, chunk_delay=0.005) as server:
+        use_claude(server.url)
+        metrics = {'anxiety': 8, 'project_chaos': 7}
+        stream = analyze_with_narrative_stream(metrics, None, mode='Claude AI', model='claude-3-5-haiku-20241022')
+        deltas = list(stream)
+        assert len(deltas) == len(DEFAULT_TEXT.split(' ')) and ''.join(deltas) == DEFAULT_TEXT
+        assert stream.narrative == DEFAULT_TEXT and stream.error is None
+        timing = stream.timing
+        print(f"   first token {timing['first_token_s']}s, total {timing['total_s']}s")
+        assert timing['source'] == 'stream' and 0.05 <= timing['first_token_s'] <= timing['total_s']
+        assert recent_narrative_timings(1) == [timing]
+
+        # Stored under the same key as the blocking call, so either path hits it
+        blocking, error = analyze_with_narrative(metrics, None, mode='Claude AI', model='claude-3-5-haiku-20241022')
+        assert error is None and blocking == DEFAULT_TEXT
+        repeat = analyze_with_narrative_stream(metrics, None, mode='Claude AI', model='claude-3-5-haiku-20241022')
+        assert list(repeat) == [DEFAULT_TEXT] and repeat.timing['source'] == 'cache'
+        assert server.request_count == 1
+    print("✅ PASSED: streamed text equals the blocking result")
+
+
+def test_free_and_error_streams(monkeypatch):
+    """Free mode yields the local story in one piece; a missing key yields nothing but an error."""
+    print("\n🧪 Testing Free-mode and error streams")
+    metrics = {'anxiety': 9}
+    stream = analyze_with_narrative_stream(metrics, None, mode='Free', use_cache=False)
+    expected, _ = analyze_with_narrative(metrics, None, mode='Free', use_cache=False)
+    assert list(stream) == [expected] and stream.timing['source'] == 'local'
+
+    monkeypatch.setattr(analysis, 'ANTHROPIC_API_KEY', None)
+    stream = analyze_with_narrative_stream(metrics, None, mode='Claude AI')
+    assert list(stream) == [] and stream.narrative is None and 'API key' in stream.error
+    assert stream.timing['first_token_s'] is None and stream.timing['error']
+    print("✅ PASSED: non-streaming sources behave like the blocking call")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
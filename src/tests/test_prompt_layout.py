@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the cache-friendly Claude prompt layout.
+Static rules + OFFICIAL instructions form a cacheable system prompt; the user
+message only carries per-request data. Cache reads are checked against the
+local mock server, which emulates prompt caching.
+"""
+
+import json
+import os
+
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer
+from modules import analysis, config, narratives
+from modules.analysis import analyze_with_narrative, analyze_with_narrative_stream, prompt_cache_stats
+from modules.data import get_metric_changes
+from modules.narratives import OFFICIAL_INSTRUCTIONS, build_context_prompt, build_system_prompt
+
+
+def test_static_prefix_and_dynamic_suffix():
+    """Rules live in the cached system block; directive and context lead the user message."""
+    print("🧪 Testing prompt layout")
+    narratives.NARRATIVES_FILE.write_text(json.dumps([
+        {'date': '2025-01-01', 'narrative': 'a', 'feedback': 'older note'},
+        {'date': '2025-01-02', 'narrative': 'b', 'feedback': 'Be shorter'},
+    ]))
+    system = build_system_prompt()
+    assert system == build_system_prompt()      # Byte-identical across calls
+    assert len(system) == 1 and system[0]['cache_control'] == {'type': 'ephemeral'}
+    text = system[0]['text']
+    assert 'Priority Rules You Must Follow' in text and text.endswith(OFFICIAL_INSTRUCTIONS)
+
+    prompt = build_context_prompt({'date': '2025-01-03', 'anxiety': 8, 'context': 'Moving house'}, None, None,
+                                  compact=False)
+    assert 'REFLEX ACTION RULES' not in prompt and 'Priority Rules' not in prompt
+    assert prompt.index('Be shorter') < prompt.index('Moving house') < prompt.index('Anxiety: 8')
+    assert prompt.index('Anxiety: 8') < prompt.index('older note')
+    print(f"   system {len(text)} chars (cached), user message {len(prompt)} chars")
+    print("✅ PASSED: static prefix, compact dynamic suffix")
+
+
+def test_compact_encoding(monkeypatch):
+    """One metric table with codes from the system legend; repeated feedback listed once."""
+    print("\n🧪 Testing compact prompt encoding")
+    narratives.NARRATIVES_FILE.write_text(json.dumps([
+        {'date': '2025-01-01', 'narrative': 'a', 'feedback': 'Less jargon'},
+        {'date': '2025-01-02', 'narrative': 'b', 'feedback': 'less  jargon'},
+        {'date': '2025-01-03', 'narrative': 'c', 'feedback': 'Be shorter'},
+    ]))
+    current = {'date': '2025-01-04', 'anxiety': 8, 'project_chaos': 6.0, 'sleep_issues': None}
+    previous = {'date': '2025-01-03', 'anxiety': 5, 'project_chaos': 6.0, 'sleep_issues': 3.5,
+                'recommendation': 'Take a walk.'}
+    changes = get_metric_changes(current, previous)
+    prompt = build_context_prompt(current, previous, changes, compact=True)
+    verbose = build_context_prompt(current, previous, changes, compact=False)
+
+    print(prompt)
+    codes = narratives.METRIC_CODES
+    assert f"{codes['anxiety']} = Anxiety" in build_system_prompt()[0]['text']
+    table = prompt.split('## Metrics (prev 2025-01-03, curr 2025-01-04)\n', 1)[1].split('\n\n', 1)[0].splitlines()
+    assert table[0].split() == ['m', 'prev', 'curr', 'Δ']
+    assert [line.split() for line in table[1:]] == [
+        [codes['anxiety'], '5', '8', '+3'], [codes['project_chaos'], '6', '6', '+0'], [codes['sleep_issues'], '3.5', '-']
+    ]
+    assert len({len(line) for line in table[:3]}) == 1                   # Aligned columns
+    assert 'Take a walk.' in prompt and prompt.index('Be shorter') < prompt.index('## Metrics')
+    assert prompt.count('jargon') == 1 and '2025-01-01, 2025-01-02: Less jargon' in prompt
+    assert len(prompt) < len(verbose)
+
+    # Compact is opt-in: without CLAUDE_PROMPT_ENCODING=compact the verbose lists are sent
+    assert config.CLAUDE_PROMPT_ENCODING != 'compact' or 'CLAUDE_PROMPT_ENCODING' in os.environ
+    for encoding, expected in [('verbose', verbose), ('', verbose), ('compact', prompt)]:
+        monkeypatch.setattr(narratives, 'CLAUDE_PROMPT_ENCODING', encoding)
+        assert build_context_prompt(current, previous, changes) == expected
+    print("✅ PASSED: one aligned table, deduplicated feedback, verbose by default")
+
+
+def test_cached_tokens_recorded(use_claude):
+    """The second call reads the system prompt from the cache, and usage is recorded."""
+    print("\n🧪 Testing cached-token accounting")
+    before = prompt_cache_stats()
+    with MockAnthropicServer() as server:
+        use_claude(server.url)
+        _, error = analyze_with_narrative({'anxiety': 8}, None, mode='Claude AI', use_cache=False)
+        stream = analyze_with_narrative_stream({'anxiety': 6}, None, mode='Claude AI', use_cache=False)
+        list(stream)
+    assert error is None and stream.error is None
+    first, second = analysis.recent_narrative_timings(2)
+    assert first['usage']['cache_creation_input_tokens'] > 1000 and first['usage']['cache_read_input_tokens'] == 0
+    assert second['usage']['cache_read_input_tokens'] == first['usage']['cache_creation_input_tokens']
+    assert second['usage']['input_tokens'] < second['usage']['cache_read_input_tokens'] / 10
+    after = prompt_cache_stats()
+    assert after['calls'] == before['calls'] + 2
+    print(f"   second call: {second['usage']}")
+    print("✅ PASSED: cache writes and reads recorded")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
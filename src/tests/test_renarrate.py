@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test bulk re-narration of stored history.
+Runs against a temporary data directory; checks batched writes, the process
+pool path, resuming an interrupted job, that Claude and feedback stories are
+kept unless overwrite is asked for, and that an entry saved during a write
+is not lost.
+"""
+
+import json
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import anomaly, archetypes, data, narrative_cache, narratives, renarrate
+from modules.config import QUESTIONS
+from modules.local_narrative import build_local_narrative
+from modules.severity import analyze_metrics_severity
+
+
+def _write_history(n=40):
+    """n random entries with a stale story in the (temporary) data file."""
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame({'date': pd.date_range('2025-01-01', periods=n).strftime('%Y-%m-%d')})
+    for q in QUESTIONS:
+        frame[q['key']] = rng.integers(0, 2 if q['type'] == 'yesno' else 11, n)
+    frame['recommendation'] = 'stale'
+    frame.to_csv(data.DATA_FILE, index=False)
+    return frame
+
+
+def _expected(rows, i, profile):
+    previous = rows[i - 1] if i else None
+    severity = analyze_metrics_severity(
+        rows[i], previous, profile['problem_threshold'], profile['increase_threshold'], profile['custom_thresholds']
+    )
+    return build_local_narrative(
+        rows[i], previous, severity_results=severity, custom_thresholds=profile['custom_thresholds'],
+        anomaly=anomaly.get_entry_anomaly(rows[i]['date']), archetype=archetypes.classify_entry(rows[i])
+    )
+
+
+def test_range_rewritten_in_batches():
+    """Only the chosen range is rewritten, with the same text as per-entry regeneration."""
+    print("🧪 Testing ranged re-narration on a process pool")
+    profile = renarrate.threshold_profile({'problem_threshold': 5, 'increase_threshold': 2.0, 'anxiety_high': 4})
+    _write_history()
+    job = renarrate.run_renarration(date(2025, 1, 11), date(2025, 1, 30), profile, workers=2, chunk_size=6)
+    df = data.load_data()
+    rows = df.to_dict('records')
+    assert job['status'] == 'completed' and job['done'] == job['total'] == 20
+    assert (df['recommendation'].iloc[:10] == 'stale').all()
+    assert (df['recommendation'].iloc[30:] == 'stale').all()
+    for i in range(10, 30):
+        assert rows[i]['recommendation'] == _expected(rows, i, profile), f"row {i} differs"
+    print("✅ PASSED: 20 entries regenerated, others untouched")
+
+
+def test_resume_skips_completed_dates():
+    """A rerun of an interrupted job only processes the dates it had not written."""
+    print("\n🧪 Testing resume after interruption")
+    profile = renarrate.threshold_profile({})
+    _write_history(n=12)
+    start, end = date(2025, 1, 1), date(2025, 1, 12)
+    renarrate._save_job({
+        'key': renarrate._job_key(start, end, profile), 'start': str(start), 'end': str(end),
+        'profile': profile, 'status': 'running', 'total': 12,
+        'completed': ['2025-01-01', '2025-01-02', '2025-01-03'], 'error': None
+    })
+    assert renarrate.load_renarration_job()['status'] == 'interrupted'
+
+    calls = []
+    job = renarrate.run_renarration(start, end, profile, workers=1, progress=lambda d, t: calls.append((d, t)))
+    df = data.load_data()
+    assert job['status'] == 'completed' and job['done'] == 12
+    assert (df['recommendation'].iloc[:3] == 'stale').all()
+    assert not (df['recommendation'].iloc[3:] == 'stale').any()
+    assert calls[-1] == (12, 12)
+    print("✅ PASSED: resumed job skipped 3 already-written dates")
+
+
+def test_kept_stories_and_narrative_records():
+    """Claude and feedback stories survive unless overwrite is set; replaced records and cached stories follow."""
+    print("\n🧪 Testing kept stories")
+    profile = renarrate.threshold_profile({})
+    _write_history(n=6)
+    narratives.save_narrative('2025-01-02', 'claude', mode='Claude AI')
+    narratives.save_narrative('2025-01-03', 'regenerated', 'shorter please', mode='Free')
+    narratives.save_narrative('2025-01-04', 'stale', mode='Free')
+    cache = narrative_cache.get_narrative_cache()
+    cache.put('free-key', 'old story', persist=False, mode='Free')
+    cache.put('claude-key', 'paid story', mode='Claude AI')
+
+    job = renarrate.run_renarration(date(2025, 1, 1), date(2025, 1, 6), profile, workers=1)
+    df = data.load_data()
+    assert job['status'] == 'completed' and job['done'] == 6 and job['skipped'] == 2
+    assert df['recommendation'].tolist()[1:3] == ['stale', 'stale']
+    assert not df['recommendation'].iloc[[0, 3, 4, 5]].eq('stale').any()
+    records = {n['date']: n for n in json.loads(narratives.NARRATIVES_FILE.read_text())}
+    assert records['2025-01-02']['narrative'] == 'claude'
+    assert records['2025-01-04']['narrative'] == df['recommendation'].iloc[3]
+    assert [n['date'] for n in narratives.load_narratives()] == [f'2025-01-0{i}' for i in range(1, 7)]
+    assert cache.get('free-key') is None and cache.get('claude-key') == 'paid story'
+
+    job = renarrate.run_renarration(date(2025, 1, 1), date(2025, 1, 6), profile, workers=1, overwrite=True)
+    assert job['skipped'] == 0 and not data.load_data()['recommendation'].eq('stale').any()
+    assert narratives.kept_narrative_dates() == {'2025-01-03'}  # Its feedback is kept with the new story
+    print("✅ PASSED: 2 stories kept, then replaced on request")
+
+
+def test_entry_saved_during_a_write_is_kept(monkeypatch):
+    """save_entry waits for a batch write instead of being overwritten by it."""
+    print("\n🧪 Testing a save during a batch write")
+    _write_history(n=12)
+    entry = {**data.load_data().iloc[-1].to_dict(), 'date': '2025-02-01', 'recommendation': 'new'}
+    load = data.load_data
+    savers = []
+
+    def load_then_save():
+        frame = load()
+        if data._file_holds and not savers:  # Inside the batch write
+            savers.append(threading.Thread(target=data.save_entry, args=(entry,)))
+            savers[0].start()
+            savers[0].join(0.2)
+            assert savers[0].is_alive()  # Waits for the lock
+        return frame
+
+    monkeypatch.setattr(data, 'load_data', load_then_save)
+    job = renarrate.run_renarration(date(2025, 1, 1), date(2025, 1, 12), renarrate.threshold_profile({}), workers=1)
+    savers[0].join(30)
+    df = load()
+    assert job['status'] == 'completed' and len(df) == 13
+    assert df['recommendation'].iloc[-1] == 'new' and not df['recommendation'].iloc[:12].eq('stale').any()
+    print("✅ PASSED: the saved entry and the rewritten stories are both in the file")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
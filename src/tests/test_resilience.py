@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the Claude latency budget, retries and circuit breaker.
+Uses the local mock server with a slow first token, a refused connection
+for failures and a fake clock for the breaker's cool-down.
+"""
+
+import anthropic
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer, DEFAULT_TEXT
+from modules import claude_client, narrative_cache, resilience, usage_log
+from modules.analysis import analyze_with_narrative, analyze_with_narrative_stream, claude_cache_key
+from modules.resilience import CircuitBreaker, call_with_retries
+
+MODEL = 'claude-3-5-haiku-20241022'
+METRICS = {'anxiety': 8, 'project_chaos': 7}
+
+
+def _local_story():
+    narrative, _ = analyze_with_narrative(METRICS, None, mode='Free', use_cache=False)
+    return narrative
+
+
+def test_breaker_opens_and_half_opens():
+    """Consecutive failures open the breaker; after the cool-down one trial decides."""
+    print("🧪 Testing circuit breaker states")
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=30, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow() and breaker.retry_in() == 30
+    now[0] = 31
+    assert breaker.state == 'half-open' and breaker.allow() and not breaker.allow()  # One trial only
+    breaker.record_failure()                                                        # Trial failed
+    assert breaker.state == 'open'
+    now[0] = 62
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    print("✅ PASSED: closed → open → half-open → closed")
+
+
+def test_retries_with_backoff():
+    """Transient errors are retried with bounded jittered waits; not-found errors are not."""
+    print("\n🧪 Testing jittered retries")
+    refused = claude_client.build_claude_client(api_key='mock-key', base_url='http://127.0.0.1:9', max_retries=0)
+    waits = []
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            refused.models.list()  # Connection refused
+        return 'ok'
+
+    breaker = CircuitBreaker(failure_threshold=5, cooldown=60)
+    assert call_with_retries(flaky, retries=2, breaker=breaker, sleep=waits.append) == 'ok'
+    assert len(attempts) == 3 and len(waits) == 2 and 0 <= waits[0] <= 0.5 and 0 <= waits[1] <= 1.0
+    assert breaker.state == 'closed'
+
+    attempts.clear()
+    with MockAnthropicServer() as server:
+        client = claude_client.build_claude_client(api_key='mock-key', base_url=server.url, max_retries=0)
+
+        def missing():
+            attempts.append(1)
+            return client.messages.batches.retrieve('msgbatch_missing')
+
+        try:
+            call_with_retries(missing, retries=3, breaker=breaker, sleep=waits.append)
+            assert False, "a 404 was swallowed"
+        except anthropic.NotFoundError:
+            pass
+    assert len(attempts) == 1 and len(waits) == 2
+    print(f"✅ PASSED: 2 waits {[round(w, 3) for w in waits]}, no retry on 404")
+
+
+def test_slow_claude_falls_back_then_lands(use_claude):
+    """Past the budget the local story is shown at once; the late Claude story is cached."""
+    print("\n🧪 Testing latency budget fallback")
+    with MockAnthropicServer(latency=0.6) as server:
+        use_claude(server.url)
+        stream = analyze_with_narrative_stream(METRICS, None, mode='Claude AI', model=MODEL, latency_budget=0.15)
+        chunks = list(stream)
+        assert stream.fallback and stream.error is None and chunks == [_local_story()]
+        assert stream.timing['total_s'] < 0.5 and stream.pending is not None and not stream.pending.done()
+
+        assert stream.pending.wait(5) and stream.pending.narrative == DEFAULT_TEXT
+        again, error = analyze_with_narrative(METRICS, None, mode='Claude AI', model=MODEL)
+        assert error is None and again == DEFAULT_TEXT and server.request_count == 1  # Served from cache
+    print(f"✅ PASSED: local story after {stream.timing['total_s']:.2f}s, Claude's arrived later")
+
+
+def test_failures_fall_back_and_open_breaker(use_claude, monkeypatch):
+    """Failed calls show the local story; once the breaker opens the network is skipped."""
+    print("\n🧪 Testing failure fallback and breaker")
+    monkeypatch.setattr(resilience, '_breaker', CircuitBreaker(failure_threshold=2, cooldown=60))
+    use_claude('http://127.0.0.1:9')
+    for _ in range(2):
+        stream = analyze_with_narrative_stream(METRICS, None, mode='Claude AI', model=MODEL)
+        assert list(stream) == [_local_story()] and stream.fallback and stream.pending is None
+        assert 'Error calling Claude API' in stream.notice
+    assert resilience.get_claude_breaker().state == 'open'
+
+    stream = analyze_with_narrative_stream(METRICS, None, mode='Claude AI', model=MODEL)
+    assert list(stream) == [_local_story()] and 'paused' in stream.notice
+    narrative, error = analyze_with_narrative(METRICS, None, mode='Claude AI', model=MODEL)
+    assert error is None and narrative.startswith('> ⏸️') and narrative.endswith(_local_story())
+    narrative, error = analyze_with_narrative(METRICS, None, mode='Claude AI', model=MODEL, fallback=False)
+    assert narrative is None and 'paused' in error
+    assert len(usage_log.load_usage_log()) == 2  # Skipped calls are not logged
+    print("✅ PASSED: two failures, then calls skipped")
+
+
+def test_blocking_call_falls_back_like_the_stream(use_claude):
+    """analyze_with_narrative answers a failed Claude call with the local story and a notice."""
+    print("\n🧪 Testing blocking-call fallback")
+    use_claude('http://127.0.0.1:9')
+    narrative, error = analyze_with_narrative(METRICS, None, mode='Claude AI', model=MODEL)
+    assert error is None and narrative.startswith('> ❌ Error calling Claude API')
+    assert narrative.endswith(_local_story())
+    assert narrative_cache._cache.get(claude_cache_key(MODEL, METRICS)[0]) is None  # Not cached as Claude's
+    print("✅ PASSED: local story with the reason it was shown")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
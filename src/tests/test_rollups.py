@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test weekly and monthly rollups.
+Compares the stored aggregates with pandas over the raw entries, checks that
+saving entries one by one gives the same state as a full rebuild, and that
+a state out of step with the data file is rebuilt.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import rollups
+from modules.rollups import load_rollups, record_rollup, rollup_table
+
+
+def _history(n=200, seed=2):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=n).strftime('%Y-%m-%d')})
+    for key in rollups.ROLLUP_KEYS:
+        values = rng.integers(0, 11, n).astype(float)
+        values[rng.random(n) < 0.25] = np.nan
+        frame[key] = values
+    return frame
+
+
+def test_stats_match_pandas():
+    """Mean, max, p90, count and share above threshold equal a groupby over the raw rows."""
+    print("🧪 Testing rollup statistics")
+    history = _history()
+    state = load_rollups(history)
+    table = rollup_table('month', 'anxiety', {'anxiety_high': 7}, state=state)
+
+    months = pd.to_datetime(history['date']).dt.to_period('M')
+    grouped = history.groupby(months)['anxiety']
+    assert len(table) == grouped.ngroups
+    for row, (_, values) in zip(table.itertuples(), grouped):
+        values = values.dropna().sort_values().to_numpy()
+        assert row.count == len(values) and row.max == values.max()
+        assert math.isclose(row.mean, round(values.mean(), 2))
+        assert row.p90 == values[math.ceil(0.9 * len(values)) - 1]  # Nearest rank
+        assert math.isclose(row.above, round((values >= 7).mean(), 3))
+
+    weeks = rollup_table('week', 'anxiety', state=state, since='2024-03-13')
+    assert weeks['date'].iloc[0] == pd.Timestamp('2024-03-11')  # Monday of that week
+    assert (weeks['date'].dt.weekday == 0).all()
+    stricter = rollup_table('month', 'anxiety', {'anxiety_high': 9}, state=state)
+    assert (stricter['above'] <= table['above']).all()  # Threshold applied at read time
+    print("✅ PASSED: rollups equal pandas aggregates")
+
+
+def test_incremental_matches_rebuild():
+    """Saving entries one at a time gives the rebuilt state; stale state is rebuilt."""
+    print("\n🧪 Testing incremental rollups")
+    history = _history(120)
+    load_rollups(history.iloc[:100])
+    for i in range(100, 120):
+        record_rollup(history.iloc[i].to_dict(), history=history.iloc[:i])
+    incremental = load_rollups(history)
+    rollups.ROLLUPS_STATE_FILE.unlink()
+    assert load_rollups(history) == incremental
+
+    shorter = load_rollups(history.iloc[:50])  # Data file replaced behind our back
+    assert shorter['entries'] == 50 and shorter != incremental
+    print("✅ PASSED: incremental state equals a rebuild")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the shared metrics service and its thin client.
+Runs the service on a free port against temporary data files; checks calls
+through the client return what the in-process functions return, saves land
+in the data file, regenerating and cache statistics run in the service, a
+closed port falls back to in-process (except for job operations), operation
+errors are reported instead of retried locally, a
+resent request runs once, and only a token opens a non-loopback service.
+"""
+
+import json
+import socket
+
+import numpy as np
+import pytest
+import requests
+
+from benchmarks.synthetic import make_history
+from modules import anomaly, archetypes, data, jobs, narrative_cache, service_client
+from modules.service import MetricsService, to_json
+from modules.service_client import ServiceError, configure_service_client
+
+ENTRY = {'date': '2030-01-01', 'anxiety': np.int64(8), 'project_chaos': 7, 'sleep_issues': 2}
+
+
+@pytest.fixture
+def service():
+    """60 synthetic entries and a running service the client points at."""
+    make_history(60).to_csv(data.DATA_FILE, index=False)
+    service = MetricsService(port=0).start()
+    configure_service_client(url=service.url)
+    yield service
+    service.stop()
+
+
+def _plain(value):
+    return json.loads(to_json(value))
+
+
+def _closed_port_url():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def test_calls_match_in_process(service):
+    """Scoring, classifying and saving through the service equal the direct calls."""
+    print("🧪 Testing service calls against in-process results")
+    assert service_client.score_entry(ENTRY) == _plain(anomaly.score_entry(ENTRY))
+    assert service_client.classify_entry(ENTRY) == _plain(archetypes.classify_entry(ENTRY))
+
+    service_client.save_entry(ENTRY)
+    stored = data.load_data()
+    assert len(stored) == 61 and str(stored['date'].iloc[-1])[:10] == '2030-01-01'
+    assert service_client.get_entry_anomaly('2030-01-01') == anomaly.get_entry_anomaly('2030-01-01')
+    assert service_client.service_health()['calls'] == {
+        'score_entry': 1, 'classify_entry': 1, 'save_entry': 1, 'get_entry_anomaly': 1
+    }
+    print("✅ PASSED: service results equal in-process results")
+
+
+def test_regenerate_and_cache_stats_run_in_the_service(service):
+    """A regenerated story comes from the service's job pool and its cache stats reach the client."""
+    print("\n🧪 Testing regenerate and cache statistics through the service")
+    narrative_cache.clear_narrative_cache()
+    job = jobs.wait_job(service_client.submit_narrative_job(ENTRY, mode='Free'), timeout=10)
+    assert job['status'] == 'completed' and job['narrative'] and job['timing']['source'] == 'local'
+    stats = service_client.narrative_cache_stats()
+    assert stats['size'] == 1 and stats['misses'] == 1 and stats['max_entries'] > 0
+    assert service_client.prompt_cache_stats()['calls'] == 0
+    service_client.clear_narrative_cache()
+    assert narrative_cache.narrative_cache_stats()['size'] == 0
+    calls = service.health()['calls']
+    assert calls['submit_narrative_job'] == 1 and calls['narrative_cache_stats'] == 1
+    assert calls['prompt_cache_stats'] == 1 and calls['clear_narrative_cache'] == 1
+    print("✅ PASSED: story, cache statistics and clearing went through the service")
+
+
+def test_fallback_and_errors(service):
+    """A closed port runs in-process; unknown operations and failing calls are errors."""
+    print("\n🧪 Testing fallback and error reporting")
+    response = requests.post(f"{service.url}/call/drop_tables", data=b'{}')
+    assert response.status_code == 404
+    try:
+        service_client.call('poll_job')  # Missing argument raises inside the service
+    except ServiceError as e:
+        assert 'TypeError' in str(e)
+    else:
+        raise AssertionError("expected ServiceError")
+    assert service_client.service_available()  # An operation error is not an outage
+
+    configure_service_client(url=_closed_port_url(), retry_after=60)
+    assert service_client.score_entry(ENTRY) == anomaly.score_entry(ENTRY)
+    assert not service_client.service_available()  # Stays in-process for retry_after
+    assert service.health()['calls'].get('score_entry') is None
+    with pytest.raises(ServiceError, match='not reachable'):
+        service_client.submit_narrative_job(ENTRY, mode='Free')  # No second job pool in the app
+
+    configure_service_client(url='')
+    assert service_client.classify_entry(ENTRY) == archetypes.classify_entry(ENTRY)
+    print("✅ PASSED: fallback runs in-process, errors are reported")
+
+
+def test_lost_answer_is_resent_not_rerun(service, monkeypatch):
+    """A connection lost after the service saved is resent with the same request ID and saves once."""
+    print("\n🧪 Testing resent writes")
+    session = service_client._get_session()
+    post = session.post
+    lost = []
+
+    def post_and_lose_first_answer(*args, **kwargs):
+        response = post(*args, **kwargs)
+        if not lost:
+            lost.append(json.loads(kwargs['data'])['request_id'])
+            raise requests.ConnectionError("Connection reset by peer")
+        return response
+
+    monkeypatch.setattr(session, 'post', post_and_lose_first_answer)
+    service_client.save_entry(ENTRY)
+    assert len(data.load_data()) == 61 and lost
+    assert service.health()['calls']['save_entry'] == 1
+    assert service_client.service_available()
+    print("✅ PASSED: one save for a resent request")
+
+
+def test_non_loopback_needs_token():
+    """Without a token the service refuses an outside interface; with one, calls must carry it."""
+    print("\n🧪 Testing service token")
+    with pytest.raises(ValueError, match='METRICS_SERVICE_TOKEN'):
+        MetricsService(host='0.0.0.0', port=0)
+
+    with MetricsService(host='0.0.0.0', port=0, token='s3cret') as service:
+        configure_service_client(url=f"http://127.0.0.1:{service.server_address[1]}")
+        with pytest.raises(ServiceError, match='token'):
+            service_client.classify_entry(ENTRY)
+        configure_service_client(token='s3cret')
+        assert service_client.classify_entry(ENTRY) == _plain(archetypes.classify_entry(ENTRY))
+    print("✅ PASSED: token required off loopback")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
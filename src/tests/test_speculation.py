@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test speculative Free-mode analysis.
+Speculates on a set of answers against a temporary history and checks the
+result equals what submit would compute, and that a changed answer, a new
+stored entry or a discarded speculation misses.
+"""
+
+from concurrent.futures import wait
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import data, speculation
+from modules.analysis import analyze_with_narrative
+from modules.config import QUESTIONS, THRESHOLDS
+from modules.data import get_metric_changes
+from modules.severity import analyze_metrics_severity
+
+PROBLEM, INCREASE = 6, 1.0
+
+
+@pytest.fixture
+def frame():
+    """30 random entries in the (temporary) data file."""
+    n = 30
+    rng = np.random.default_rng(4)
+    frame = pd.DataFrame({'date': pd.date_range('2025-01-01', periods=n).strftime('%Y-%m-%d')})
+    for q in QUESTIONS:
+        frame[q['key']] = rng.integers(0, 2 if q['type'] == 'yesno' else 11, n)
+    frame.to_csv(data.DATA_FILE, index=False)
+    return frame
+
+
+def _answers(value=6):
+    answers = {'date': '2025-02-01'}
+    for q in QUESTIONS:
+        if q.get('category') == 'adhd_primary':
+            answers[q['key']] = 0 if q['type'] == 'yesno' else value
+    return answers
+
+
+def test_speculation_matches_submit(frame):
+    """The speculated story and severity equal a fresh computation of the same answers."""
+    print("🧪 Testing speculation result")
+    previous = frame.iloc[-1].to_dict()
+    answers = _answers()
+    key = speculation.speculate(answers, previous, THRESHOLDS.copy(), PROBLEM, INCREASE)
+    assert speculation.speculate(answers, previous, THRESHOLDS.copy(), PROBLEM, INCREASE) == key
+
+    result = speculation.take_speculation(key)
+    changes = get_metric_changes(answers, previous)
+    severity = analyze_metrics_severity(answers, previous, problem_threshold=PROBLEM,
+                                        increase_threshold=INCREASE, custom_thresholds=THRESHOLDS.copy())
+    expected, _ = analyze_with_narrative(
+        answers, previous, changes, mode='Free', severity_results=severity,
+        custom_thresholds=THRESHOLDS.copy(), anomaly=result['anomaly'], archetype=result['archetype'],
+        use_cache=False
+    )
+    assert result['narrative'] == expected and result['severity_results'] == severity
+    assert speculation.take_speculation(key) is None  # Taken once
+    print("✅ PASSED: speculated story equals the submit-time story")
+
+
+def test_changed_inputs_miss(frame):
+    """Another answer, a new stored entry or a discard each make the old result unusable."""
+    print("\n🧪 Testing speculation invalidation")
+    previous = frame.iloc[-1].to_dict()
+    key = speculation.speculate(_answers(6), previous, THRESHOLDS.copy(), PROBLEM, INCREASE)
+    assert speculation.speculation_key(_answers(7), previous, THRESHOLDS.copy(), PROBLEM, INCREASE) != key
+    assert speculation.speculation_key(_answers(6), previous, THRESHOLDS.copy(), PROBLEM + 1, INCREASE) != key
+
+    frame.iloc[:-1].to_csv(data.DATA_FILE, index=False)  # Stored history changed
+    assert speculation.speculation_key(_answers(6), previous, THRESHOLDS.copy(), PROBLEM, INCREASE) != key
+
+    key = speculation.speculate(_answers(6), previous, THRESHOLDS.copy(), PROBLEM, INCREASE)
+    future = speculation._results[key]
+    speculation.discard_speculation(key)
+    assert speculation.take_speculation(key) is None
+    wait([future], timeout=30)  # A discarded run may already be scoring against this test's state files
+    print("✅ PASSED: changed inputs miss")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the Claude usage log.
+Checks that real Claude calls (and only those) are appended with tokens and
+cost, and the per-day/model rollup with latency percentiles.
+"""
+
+import pytest
+
+from benchmarks.mock_anthropic import MockAnthropicServer
+from modules import analysis, claude_client, usage_log
+from modules.analysis import analyze_with_narrative
+
+MODEL = 'claude-3-5-haiku-20241022'
+PRICING = {MODEL: {'input_cost': 1.0, 'output_cost': 5.0}}
+
+
+def test_calls_logged_with_cost(use_claude):
+    """A Claude call is logged once with its usage; cache hits and Free mode are not."""
+    print("🧪 Testing usage logging of Claude calls")
+    with MockAnthropicServer() as server:
+        use_claude(server.url)
+        metrics = {'anxiety': 8}
+        analyze_with_narrative(metrics, None, mode='Claude AI', model=MODEL)
+        analyze_with_narrative(metrics, None, mode='Claude AI', model=MODEL)   # Cache hit
+        analyze_with_narrative(metrics, None, mode='Free')
+        claude_client.configure_claude_client(base_url='http://127.0.0.1:9')       # Connection refused
+        analyze_with_narrative({'anxiety': 3}, None, mode='Claude AI', model=MODEL)
+        logged = usage_log.load_usage_log()
+
+    print(logged[['model', 'source', 'input_tokens', 'output_tokens', 'cost_usd', 'error']].to_string(index=False))
+    assert len(logged) == 2 and list(logged['error']) == [0, 1]
+    ok = logged.iloc[0]
+    assert ok['model'] == MODEL and ok['source'] == 'request' and ok['output_tokens'] > 0
+    expected = usage_log.narrative_cost(ok[usage_log.TOKEN_FIELDS].to_dict(), analysis.fetch_claude_pricing_from_web()[MODEL])
+    assert abs(ok['cost_usd'] - expected) < 1e-6 and ok['latency_s'] > 0
+    print("✅ PASSED: one row per Claude call, errors flagged")
+
+
+def test_rollup_per_day_and_model():
+    """Rows roll up per day and model with summed tokens/cost and latency percentiles."""
+    print("\n🧪 Testing daily rollup")
+    usage = {'input_tokens': 100, 'output_tokens': 50,
+             'cache_read_input_tokens': 1000, 'cache_creation_input_tokens': 0}
+    rows = [usage_log.usage_record(MODEL, 'request', usage, latency, pricing=PRICING)
+            for latency in (0.1, 0.2, 0.3, 0.4, 1.0)]
+    rows.append(usage_log.usage_record('claude-sonnet-4-20250514', 'stream', None, 2.0, error=True))
+    usage_log.append_usage(rows[:3])
+    usage_log.append_usage(rows[3:])
+    rollup = usage_log.usage_rollup(days=1)
+    totals = usage_log.usage_totals()
+
+    print(rollup.to_string(index=False))
+    haiku = rollup[rollup['model'] == MODEL].iloc[0]
+    assert len(rollup) == 2 and haiku['calls'] == 5 and haiku['output_tokens'] == 250
+    assert abs(haiku['cost_usd'] - 5 * (100 + 100 + 250) / 1e6) < 1e-9
+    assert abs(haiku['p50_latency_s'] - 0.3) < 1e-9 and abs(haiku['p95_latency_s'] - 0.88) < 1e-9
+    assert totals['calls'] == 6 and totals['errors'] == 1
+    print("✅ PASSED: rollup sums and percentiles match")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-s']))  # conftest.py isolates state files and settings